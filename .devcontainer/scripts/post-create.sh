@@ -15,9 +15,16 @@ echo ""
 echo "=== Configuring Poetry ==="
 poetry config virtualenvs.in-project true
 
-# Install dependencies
+# Install dependencies: reuse the venv baked into the image when it matches poetry.lock,
+# otherwise restore the locked venv offline when an 'invoke env.snapshot' exists
 echo ""
 echo "=== Installing project dependencies ==="
+if [ -n "${PREBAKED_VENV:-}" ] && [ ! -e .venv ] && cmp -s poetry.lock "${PREBAKED_ROOT}/poetry.lock"; then
+    echo "Using prebaked dependencies from ${PREBAKED_VENV}"
+    ln -s "${PREBAKED_VENV}" .venv
+else
+    python -m project.environment_snapshot restore || echo "No environment snapshot found; installing from the package index"
+fi
 poetry install
 
 # Install pre-commit hooks
@@ -0,0 +1,354 @@
+"""Persistent cache of pytest's collection results, keyed by test file content.
+
+Runs that pass ``--collection-cache`` record the node ids, markers and parametrisation ids of
+every test they collect, per test file and the sha256 of its content. The cache as a whole is
+keyed by a digest of the pytest configuration: the ``[tool.pytest.ini_options]`` table, every
+``conftest.py`` at the root or under TEST_ROOT, and the pytest and Python versions. A change to
+any of them discards the cache.
+
+Collecting a test file means importing it, so a run that selects tests by marker can use the
+cache to pass pytest only the files that contain matching tests; the other unchanged files are
+never imported. Files that changed since they were cached, or were never cached, are always
+passed so pytest collects them afresh.
+
+The ``-m`` expression is evaluated against the cached marker names by marker_matcher(), which
+accepts the subset of pytest's grammar that names markers: ``and``, ``or``, ``not``, parentheses
+and marker names. pytest's own parser is private API, so it is not used; an expression outside
+that subset, such as one matching marker keyword arguments, selects every file and leaves the
+selection to pytest.
+"""
+
+import hashlib
+import json
+import re
+import sys
+import tomllib
+from collections.abc import Callable, Collection
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pytest
+
+from project.utils import ensure_directory
+
+COLLECTION_CACHE_DIRECTORY = Path(".quality/pytest/collection")
+CACHE_SCHEMA_VERSION = "1"
+PYPROJECT = "pyproject.toml"
+TEST_ROOT = "tests"
+MARKER_TOKEN_PATTERN = re.compile(r"\(|\)|[\w:+\-.\[\]\\/]+|\S")
+MARKER_NAME_PATTERN = re.compile(r"[\w:+\-.\[\]\\/]+")
+MARKER_KEYWORDS = frozenset({"and", "or", "not"})
+
+MarkerMatcher = Callable[[Collection[str]], bool]
+
+
+@dataclass
+class CachedTest:
+    """A collected test.
+
+    Attributes:
+        nodeid: The pytest node id.
+        markers: The names of the markers applied to the test.
+        parameters: The parametrisation id, or None if the test is not parametrised.
+
+    """
+
+    nodeid: str
+    markers: list[str] = field(default_factory=list)
+    parameters: str | None = None
+
+
+def file_digest(path: str | Path) -> str:
+    """Hash a file's content.
+
+    Args:
+        path: The file.
+
+    Returns:
+        A hex sha256 digest.
+
+    """
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def config_digest(root: str | Path = ".") -> str:
+    """Hash the configuration that decides what pytest collects.
+
+    Args:
+        root: The project root holding pyproject.toml and the TEST_ROOT directory.
+
+    Returns:
+        A hex sha256 digest.
+
+    """
+    root_path = Path(root)
+    try:
+        with (root_path / PYPROJECT).open("rb") as file:
+            settings = tomllib.load(file).get("tool", {}).get("pytest", {})
+    except FileNotFoundError:
+        settings = {}
+    conftests = sorted([*root_path.glob("conftest.py"), *(root_path / TEST_ROOT).rglob("conftest.py")])
+    material = {
+        "schema": CACHE_SCHEMA_VERSION,
+        "python": f"{sys.version_info.major}.{sys.version_info.minor}",
+        "pytest": pytest.__version__,
+        "settings": settings,
+        "conftests": {conftest.relative_to(root_path).as_posix(): file_digest(conftest) for conftest in conftests},
+    }
+    return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CollectionCache:
+    """The cached collection results for one configuration.
+
+    Attributes:
+        path: The JSON file the cache is loaded from and saved to.
+        config: The config_digest() the cached results are valid for.
+        files: Mapping of test file path to its content digest and collected tests.
+
+    """
+
+    def __init__(self, path: str | Path, config: str, files: dict[str, dict] | None = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: The JSON file the cache is saved to.
+            config: The config_digest() the cached results are valid for.
+            files: Optional cached entries keyed by test file path.
+
+        """
+        self.path = Path(path)
+        self.config = config
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path: str | Path, config: str) -> "CollectionCache":
+        """Load the cache, starting empty if it is missing, unreadable or for another configuration.
+
+        Args:
+            path: The JSON file to load.
+            config: The current config_digest().
+
+        Returns:
+            The cache.
+
+        """
+        try:
+            cached = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path, config)
+        if cached.get("config") != config:
+            return cls(path, config)
+        return cls(path, config, cached.get("files", {}))
+
+    def lookup(self, test_file: str) -> list[CachedTest] | None:
+        """Return a file's cached tests if its content has not changed since they were collected.
+
+        Args:
+            test_file: The test file path.
+
+        Returns:
+            The cached tests, or None if the file is not cached or has changed.
+
+        """
+        entry = self.files.get(test_file)
+        if entry is None or not Path(test_file).is_file() or entry["digest"] != file_digest(test_file):
+            return None
+        return [CachedTest(**test) for test in entry["tests"]]
+
+    def record(self, test_file: str, tests: list[CachedTest]) -> None:
+        """Cache the tests collected from a file.
+
+        Args:
+            test_file: The test file path.
+            tests: The tests collected from it.
+
+        """
+        self.files[test_file] = {"digest": file_digest(test_file), "tests": [asdict(test) for test in tests]}
+
+    def save(self) -> None:
+        """Write the cache to disk."""
+        ensure_directory(self.path.parent)
+        cached = {"config": self.config, "files": dict(sorted(self.files.items()))}
+        self.path.write_text(json.dumps(cached, indent=2) + "\n", encoding="utf-8")
+
+
+class _MarkerExpressionParser:
+    """Recursive descent parser for the marker-name subset of pytest's ``-m`` grammar."""
+
+    def __init__(self, expression: str) -> None:
+        """Split the expression into tokens."""
+        self.tokens = MARKER_TOKEN_PATTERN.findall(expression)
+        self.position = 0
+
+    def _peek(self) -> str | None:
+        """Return the next token without consuming it, or None at the end."""
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _accept(self, token: str) -> bool:
+        """Consume the next token if it is the given one."""
+        if self._peek() != token:
+            return False
+        self.position += 1
+        return True
+
+    def parse(self) -> MarkerMatcher:
+        """Parse the whole expression; an empty one matches nothing, as in pytest."""
+        if not self.tokens:
+            return lambda _: False
+        matcher = self._any()
+        if self._peek() is not None:
+            msg = f"Unexpected {self._peek()!r} in marker expression"
+            raise ValueError(msg)
+        return matcher
+
+    def _any(self) -> MarkerMatcher:
+        """Parse ``and_expr ('or' and_expr)*``."""
+        operands = [self._all()]
+        while self._accept("or"):
+            operands.append(self._all())
+        return lambda markers: any(operand(markers) for operand in operands)
+
+    def _all(self) -> MarkerMatcher:
+        """Parse ``not_expr ('and' not_expr)*``."""
+        operands = [self._negation()]
+        while self._accept("and"):
+            operands.append(self._negation())
+        return lambda markers: all(operand(markers) for operand in operands)
+
+    def _negation(self) -> MarkerMatcher:
+        """Parse ``'not' not_expr | '(' expr ')' | marker``."""
+        if self._accept("not"):
+            operand = self._negation()
+            return lambda markers: not operand(markers)
+        if self._accept("("):
+            matcher = self._any()
+            if not self._accept(")"):
+                msg = "Unclosed parenthesis in marker expression"
+                raise ValueError(msg)
+            return matcher
+        return self._marker()
+
+    def _marker(self) -> MarkerMatcher:
+        """Parse a marker name, rejecting keyword arguments, which the cache does not record."""
+        name = self._peek()
+        if name is None or name in MARKER_KEYWORDS or not MARKER_NAME_PATTERN.fullmatch(name):
+            msg = f"Expected a marker name, got {name!r}"
+            raise ValueError(msg)
+        self.position += 1
+        if self._peek() == "(":
+            msg = f"Keyword arguments are not supported in marker expressions: {name}(...)"
+            raise ValueError(msg)
+        return lambda markers: name in markers
+
+
+def marker_matcher(expression: str) -> MarkerMatcher:
+    """Compile a ``-m`` expression into a check of a test's marker names.
+
+    Args:
+        expression: The expression, e.g. ``slow and not network``.
+
+    Returns:
+        A function taking a test's marker names and returning whether the expression selects it.
+
+    Raises:
+        ValueError: If the expression is invalid or uses syntax beyond marker names, e.g. keyword arguments.
+
+    """
+    return _MarkerExpressionParser(expression).parse()
+
+
+def select_files(cache: CollectionCache, test_files: list[str], marker_expression: str) -> list[str]:
+    """Pick the test files pytest needs to import to run the tests a marker expression selects.
+
+    Args:
+        cache: The collection cache.
+        test_files: The candidate test files.
+        marker_expression: The ``-m`` expression the run selects tests with, e.g. ``not slow``.
+
+    Returns:
+        The files that changed since they were cached, or whose cached tests include a match; every file
+        when the expression is beyond what marker_matcher() evaluates.
+
+    """
+    try:
+        matches = marker_matcher(marker_expression)
+    except ValueError:
+        return list(test_files)
+    selected = []
+    for test_file in test_files:
+        tests = cache.lookup(test_file)
+        if tests is None or any(matches(test.markers) for test in tests):
+            selected.append(test_file)
+    return selected
+
+
+def _cached_test(item: pytest.Item) -> CachedTest:
+    """Describe a collected item for the cache."""
+    callspec = getattr(item, "callspec", None)
+    return CachedTest(
+        nodeid=item.nodeid,
+        markers=sorted({marker.name for marker in item.iter_markers()}),
+        parameters=callspec.id if callspec is not None else None,
+    )
+
+
+class CollectionRecorder:
+    """Records what a pytest session collects into the collection cache.
+
+    Attributes:
+        cache: The cache being updated.
+        deselected: The items other plugins deselected before the recorder ran.
+
+    """
+
+    def __init__(self, cache: CollectionCache) -> None:
+        """Initialize the recorder.
+
+        Args:
+            cache: The cache to update.
+
+        """
+        self.cache = cache
+        self.deselected: list[pytest.Item] = []
+
+    def pytest_deselected(self, items: list[pytest.Item]) -> None:
+        """Remember deselected items, which are still part of their files' collection."""
+        self.deselected.extend(items)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config: pytest.Config, items: list[pytest.Item]) -> None:
+        """Cache the collected tests of every fully collected file, including deselected ones.
+
+        Running last records the markers other plugins add while modifying the items.
+
+        """
+        # Files named with a node id in the arguments were only partly collected
+        partial = {argument.split("::")[0] for argument in config.args if "::" in argument}
+        collected: dict[str, list[CachedTest]] = {}
+        for item in sorted([*items, *self.deselected], key=lambda item: item.nodeid):
+            test_file = Path(item.path).relative_to(config.rootpath).as_posix()
+            if test_file not in partial:
+                collected.setdefault(test_file, []).append(_cached_test(item))
+        for test_file, tests in collected.items():
+            self.cache.record(test_file, tests)
+
+    def pytest_sessionfinish(self) -> None:
+        """Write the updated cache."""
+        self.cache.save()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the collection cache option."""
+    parser.getgroup("collection-cache", "persistent collection cache").addoption(
+        "--collection-cache", default=None, help="Record the collected tests in this JSON file."
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Activate the recorder when a collection cache file is given."""
+    cache_path = config.getoption("collection_cache")
+    if cache_path is None:
+        return
+    cache = CollectionCache.load(cache_path, config_digest(config.rootpath))
+    config.pluginmanager.register(CollectionRecorder(cache), "collection-recorder")
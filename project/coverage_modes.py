@@ -0,0 +1,151 @@
+"""Coverage measurement modes for the pytest tasks.
+
+coverage.py can trace with the classic C tracer (``ctrace``), the pure Python tracer
+(``pytrace``) or the low-overhead ``sys.monitoring`` core (``sysmon``, Python 3.12+). The
+core is selected with the COVERAGE_CORE environment variable. Branch coverage, which both
+coveragerc files enable, is only supported by ``sysmon`` from Python 3.14.
+"""
+
+import configparser
+import shlex
+import sys
+from pathlib import Path
+
+from invoke.context import Context
+
+from project.utils import ensure_directory, merge_base, nul_separated
+
+COVERAGE_CORES = ("auto", "sysmon", "ctrace", "pytrace", "none")
+SYSMON_MINIMUM_VERSION = (3, 12)
+SYSMON_BRANCH_MINIMUM_VERSION = (3, 14)
+
+
+def sysmon_unavailable_reason(*, branch: bool = True) -> str | None:
+    """Explain why the sys.monitoring core cannot be used on this interpreter.
+
+    Args:
+        branch: Whether branch coverage is being measured.
+
+    Returns:
+        The reason, or None if sysmon is usable.
+
+    """
+    if sys.version_info < SYSMON_MINIMUM_VERSION:
+        return "sys.monitoring requires Python 3.12+"
+    if branch and sys.version_info < SYSMON_BRANCH_MINIMUM_VERSION:
+        return "sys.monitoring branch coverage requires Python 3.14+"
+    return None
+
+
+def resolve_coverage_core(requested: str, *, branch: bool = True) -> str | None:
+    """Resolve a requested coverage mode to the core coverage.py should use.
+
+    Args:
+        requested: One of COVERAGE_CORES.
+        branch: Whether branch coverage is being measured.
+
+    Returns:
+        The COVERAGE_CORE value, or None when coverage is disabled.
+
+    Raises:
+        ValueError: If the requested mode is unknown.
+
+    """
+    if requested not in COVERAGE_CORES:
+        msg = f"Unknown coverage core {requested!r}; expected one of {', '.join(COVERAGE_CORES)}"
+        raise ValueError(msg)
+    if requested == "none":
+        return None
+    if requested == "auto":
+        return "ctrace" if sysmon_unavailable_reason(branch=branch) else "sysmon"
+    if requested == "sysmon":
+        reason = sysmon_unavailable_reason(branch=branch)
+        if reason:
+            print(f"Coverage: {reason}; falling back to ctrace")
+            return "ctrace"
+    return requested
+
+
+def is_branch_coverage(coveragerc: str | Path) -> bool:
+    """Check whether a coveragerc file enables branch coverage.
+
+    Args:
+        coveragerc: The coverage configuration file.
+
+    Returns:
+        True if ``[run] branch`` is enabled.
+
+    """
+    config = configparser.ConfigParser()
+    config.read(coveragerc, encoding="utf-8")
+    return config.getboolean("run", "branch", fallback=False)
+
+
+def coverage_fail_under(coveragerc: str | Path) -> float:
+    """Read the coverage threshold from a coveragerc file.
+
+    Args:
+        coveragerc: The coverage configuration file.
+
+    Returns:
+        The ``[report] fail_under`` percentage, or 0 if none is set.
+
+    """
+    config = configparser.ConfigParser()
+    config.read(coveragerc, encoding="utf-8")
+    return config.getfloat("report", "fail_under", fallback=0.0)
+
+
+def changed_python_files(context: Context, base_ref: str, roots: list[str]) -> list[str]:
+    """List Python files under the given roots that differ from where HEAD branched off a base ref.
+
+    Committed, uncommitted and untracked changes are all included; changes made on the base
+    branch since HEAD branched off are not.
+
+    Args:
+        context: The invoke context.
+        base_ref: The git ref to compare against, e.g. ``origin/main``.
+        roots: Directories whose files are of interest, e.g. ``["src", "project"]``.
+
+    Returns:
+        Sorted relative paths of the changed files that still exist.
+
+    """
+    diff = context.run(shlex.join(["git", "diff", "--name-only", "-z", merge_base(context, base_ref), "--"]), hide=True)
+    untracked = context.run("git ls-files -z -o --exclude-standard", hide=True)
+    names = {*nul_separated(diff), *nul_separated(untracked)}
+    return sorted(
+        name
+        for name in names
+        if name.endswith(".py") and any(Path(name).is_relative_to(root) for root in roots) and Path(name).is_file()
+    )
+
+
+def write_changed_only_coveragerc(base_coveragerc: str | Path, files: list[str], output: str | Path) -> Path:
+    """Derive a coveragerc that measures only the given files.
+
+    The repository-wide ``fail_under`` threshold is dropped because it is meaningless for a
+    subset of files, so the derived configuration gates nothing; only a diff coverage run, which
+    applies the threshold to the changed lines, still fails on low coverage.
+
+    Args:
+        base_coveragerc: The coveragerc to start from.
+        files: The files to measure.
+        output: Where to write the derived configuration.
+
+    Returns:
+        The path of the written configuration.
+
+    """
+    config = configparser.ConfigParser()
+    config.read(base_coveragerc, encoding="utf-8")
+    if not config.has_section("run"):
+        config.add_section("run")
+    config.set("run", "include", "\n" + "\n".join(files))
+    if config.has_option("report", "fail_under"):
+        config.remove_option("report", "fail_under")
+    output_path = Path(output)
+    ensure_directory(output_path.parent)
+    with output_path.open("w", encoding="utf-8") as handle:
+        config.write(handle)
+    return output_path
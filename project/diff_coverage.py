@@ -0,0 +1,177 @@
+"""Coverage of the lines changed against a base ref.
+
+The changed lines are read from ``git diff -U0`` between the working tree and the merge-base
+with the base ref, so committed and uncommitted changes count but changes made on the base branch
+since do not. They are intersected with the statements in a coverage.py JSON report, so the gate
+only judges code the change added or modified. Files git does not track yet count as entirely
+changed. Coverage is line-based: a changed line counts as
+covered once it ran, even if one of its branches did not.
+"""
+
+import json
+import re
+import shlex
+from dataclasses import dataclass
+from pathlib import Path
+
+from invoke.context import Context
+
+from project.utils import merge_base, nul_separated
+
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@")
+NEW_FILE_PREFIX = "+++ b/"
+
+
+def parse_changed_lines(diff: str) -> dict[str, set[int]]:
+    """Read the added and modified line numbers from a zero-context unified diff.
+
+    Args:
+        diff: The output of ``git diff -U0``.
+
+    Returns:
+        Mapping of file path to its changed line numbers in the new version.
+
+    """
+    changed: dict[str, set[int]] = {}
+    current = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            current = line.removeprefix(NEW_FILE_PREFIX) if line.startswith(NEW_FILE_PREFIX) else None
+        elif current is not None and (match := HUNK_PATTERN.match(line)) and match["count"] != "0":
+            start = int(match["start"])
+            changed.setdefault(current, set()).update(range(start, start + int(match["count"] or 1)))
+    return changed
+
+
+def changed_lines(context: Context, base_ref: str, files: list[str]) -> dict[str, set[int]]:
+    """List the lines of the given files that differ from where HEAD branched off a base ref.
+
+    Args:
+        context: The invoke context.
+        base_ref: The git ref to compare against, e.g. ``origin/main``.
+        files: The files of interest.
+
+    Returns:
+        Mapping of file path to its changed line numbers; untracked files map to all their lines.
+
+    """
+    if not files:
+        return {}
+    base = merge_base(context, base_ref)
+    diff_command = ["git", "-c", "core.quotePath=false", "diff", "-U0", "--no-color", "--no-ext-diff", base, "--"]
+    diff = context.run(shlex.join([*diff_command, *files]), hide=True)
+    changed = parse_changed_lines(diff.stdout if diff is not None else "")
+    untracked = context.run(shlex.join(["git", "ls-files", "-z", "-o", "--exclude-standard", "--", *files]), hide=True)
+    for name in nul_separated(untracked):
+        line_count = len(Path(name).read_text(encoding="utf-8").splitlines())
+        changed[name] = set(range(1, line_count + 1))
+    return changed
+
+
+@dataclass
+class FileDiffCoverage:
+    """Coverage of the changed statements in one file.
+
+    Attributes:
+        path: The file path.
+        statements: The changed lines that are executable statements.
+        missing: The changed statements that did not run.
+
+    """
+
+    path: str
+    statements: list[int]
+    missing: list[int]
+
+    @property
+    def covered(self) -> int:
+        """Return how many changed statements ran."""
+        return len(self.statements) - len(self.missing)
+
+
+def diff_coverage(report: dict, changed: dict[str, set[int]]) -> list[FileDiffCoverage]:
+    """Intersect a coverage.py JSON report with the changed lines.
+
+    Args:
+        report: The parsed JSON report.
+        changed: Mapping of file path to its changed line numbers.
+
+    Returns:
+        The coverage of each measured file with changed statements, ordered by path.
+
+    """
+    files = []
+    for path, lines in sorted(changed.items()):
+        measured = report["files"].get(path)
+        if measured is None:
+            continue
+        missing = lines.intersection(measured["missing_lines"])
+        statements = lines.intersection(measured["executed_lines"]) | missing
+        if statements:
+            files.append(FileDiffCoverage(path=path, statements=sorted(statements), missing=sorted(missing)))
+    return files
+
+
+def load_report(path: str | Path) -> dict:
+    """Load a coverage.py JSON report.
+
+    Args:
+        path: The report file written by ``--cov-report=json:<path>``.
+
+    Returns:
+        The parsed report.
+
+    """
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def total_percent(files: list[FileDiffCoverage]) -> float:
+    """Return the percentage of changed statements that ran, or 100 when none changed.
+
+    Args:
+        files: The per-file diff coverage.
+
+    Returns:
+        The covered percentage.
+
+    """
+    statements = sum(len(file.statements) for file in files)
+    return 100.0 * sum(file.covered for file in files) / statements if statements else 100.0
+
+
+def format_line_ranges(lines: list[int]) -> str:
+    """Collapse sorted line numbers into ranges, e.g. ``3-5, 9``.
+
+    Args:
+        lines: Sorted line numbers.
+
+    Returns:
+        The formatted ranges.
+
+    """
+    ranges: list[list[int]] = []
+    for line in lines:
+        if ranges and line == ranges[-1][1] + 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
+
+
+def report_lines(files: list[FileDiffCoverage]) -> list[str]:
+    """Format the diff coverage of each touched file and the total.
+
+    Args:
+        files: The per-file diff coverage.
+
+    Returns:
+        The report lines.
+
+    """
+    lines = [
+        f"{file.path}: {file.covered}/{len(file.statements)} changed statements covered"
+        + (f", missing {format_line_ranges(file.missing)}" if file.missing else "")
+        for file in files
+    ]
+    lines.append(f"Diff coverage: {total_percent(files):.1f}% of {sum(len(f.statements) for f in files)} statements")
+    return lines
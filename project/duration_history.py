@@ -0,0 +1,93 @@
+"""Persistent per-task duration history used to plan task execution."""
+
+import json
+import statistics
+import threading
+from pathlib import Path
+
+from project.utils import ensure_directory
+
+DEFAULT_HISTORY_PATH = Path(".quality/project/durations.json")
+DEFAULT_ESTIMATE_SECONDS = 30.0
+MAX_SAMPLES = 10
+
+
+class DurationHistory:
+    """Records how long each task took on previous runs.
+
+    Samples are kept per task name, capped at the most recent MAX_SAMPLES, and the
+    median is used as the estimate so a single unusually slow run does not dominate.
+
+    Attributes:
+        path: The JSON file the history is loaded from and saved to.
+        samples: Mapping of task name to its most recent durations in seconds.
+
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_HISTORY_PATH, samples: dict[str, list[float]] | None = None) -> None:
+        """Initialize the duration history.
+
+        Args:
+            path: The JSON file the history is saved to.
+            samples: Optional pre-existing samples keyed by task name.
+
+        """
+        self.path = Path(path)
+        self.samples = samples or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_HISTORY_PATH) -> "DurationHistory":
+        """Load the history from disk, starting empty if the file is missing or unreadable.
+
+        Args:
+            path: The JSON file to load.
+
+        Returns:
+            A DurationHistory populated from the file.
+
+        """
+        history_path = Path(path)
+        try:
+            raw = json.loads(history_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(history_path)
+        samples = {str(name): [float(value) for value in values] for name, values in raw.items()}
+        return cls(history_path, samples)
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a new duration sample for a task.
+
+        Args:
+            name: The task name.
+            seconds: How long the task took.
+
+        """
+        with self._lock:
+            task_samples = self.samples.setdefault(name, [])
+            task_samples.append(round(seconds, 3))
+            del task_samples[:-MAX_SAMPLES]
+
+    def estimate(self, name: str, default: float = DEFAULT_ESTIMATE_SECONDS) -> float:
+        """Estimate how long a task will take.
+
+        Args:
+            name: The task name.
+            default: The estimate to use for tasks with no recorded samples.
+
+        Returns:
+            The median of the recorded samples, or the default.
+
+        """
+        with self._lock:
+            task_samples = self.samples.get(name)
+            if not task_samples:
+                return default
+            return statistics.median(task_samples)
+
+    def save(self) -> None:
+        """Write the history to disk."""
+        ensure_directory(self.path.parent)
+        with self._lock:
+            content = json.dumps(self.samples, indent=2, sort_keys=True)
+        self.path.write_text(content + "\n", encoding="utf-8")
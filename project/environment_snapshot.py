@@ -0,0 +1,298 @@
+"""Offline environment snapshots keyed by the poetry.lock hash.
+
+A snapshot holds a wheelhouse of every locked distribution, the pinned requirements and an
+archive of the virtual environment built from them. Absolute paths to the venv and the project
+in scripts, ``.pth`` files and ``pyvenv.cfg`` are replaced with placeholders when archiving, so
+the archive can be restored into another checkout in seconds without network access.
+
+This module only uses the standard library so environments can be restored before invoke is
+installed, e.g. ``python -m project.environment_snapshot restore`` in the devcontainer
+post-create script or ``python -m project.environment_snapshot install`` in a tox env.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import sysconfig
+import tarfile
+import time
+from pathlib import Path
+
+ENV_SNAPSHOTS_PATH = Path(".quality/env")
+LOCK_FILE = Path("poetry.lock")
+ARCHIVE_NAME = "venv.tar.gz"
+WHEELHOUSE_NAME = "wheelhouse"
+REQUIREMENTS_NAME = "requirements.txt"
+MANIFEST_NAME = "manifest.json"
+VENV_PLACEHOLDER = b"@@SNAPSHOT_VENV@@"
+PROJECT_PLACEHOLDER = b"@@SNAPSHOT_PROJECT@@"
+LOCK_HASH_LENGTH = 16
+
+
+def lock_digest(lock_file: str | Path = LOCK_FILE) -> str:
+    """Hash the lock file that pins the environment's contents.
+
+    Args:
+        lock_file: The poetry lock file.
+
+    Returns:
+        The hex sha256 digest of the lock file.
+
+    """
+    return hashlib.sha256(Path(lock_file).read_bytes()).hexdigest()
+
+
+def snapshot_key(lock_hash: str, python_version: str, platform_tag: str | None = None) -> str:
+    """Build the snapshot key for a lock file, interpreter version and platform.
+
+    Args:
+        lock_hash: The poetry.lock digest.
+        python_version: The interpreter's major.minor version, e.g. ``3.13``.
+        platform_tag: The platform tag; defaults to the current platform, e.g. ``linux-x86_64``.
+
+    Returns:
+        The key naming the snapshot directory.
+
+    """
+    return f"{lock_hash[:LOCK_HASH_LENGTH]}-py{python_version}-{platform_tag or sysconfig.get_platform()}"
+
+
+def current_snapshot_directory(root: str | Path = ENV_SNAPSHOTS_PATH, lock_file: str | Path = LOCK_FILE) -> Path:
+    """Return the snapshot directory matching the lock file and the running interpreter.
+
+    Args:
+        root: The directory snapshots are stored in.
+        lock_file: The poetry lock file.
+
+    Returns:
+        The snapshot directory, which may not exist yet.
+
+    """
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    return Path(root) / snapshot_key(lock_digest(lock_file), python_version)
+
+
+def venv_python(venv: str | Path) -> Path:
+    """Return the interpreter path inside a virtual environment.
+
+    Args:
+        venv: The virtual environment directory.
+
+    Returns:
+        ``Scripts/python.exe`` on Windows, ``bin/python`` elsewhere.
+
+    """
+    if os.name == "nt":
+        return Path(venv) / "Scripts" / "python.exe"
+    return Path(venv) / "bin" / "python"
+
+
+def _relocate(data: bytes, venv: Path, project_root: Path) -> bytes:
+    """Replace absolute venv and project paths in a text file's content with placeholders."""
+    return data.replace(str(venv).encode(), VENV_PLACEHOLDER).replace(str(project_root).encode(), PROJECT_PLACEHOLDER)
+
+
+def _is_relocatable(relative: Path) -> bool:
+    """Check whether an archived file can embed absolute paths: scripts, ``.pth`` files and pyvenv.cfg."""
+    return relative.parts[0] in {"bin", "Scripts"} or relative.suffix == ".pth" or relative.name == "pyvenv.cfg"
+
+
+def _add_entry(archive: tarfile.TarFile, path: Path, relative: Path, roots: tuple[Path, Path]) -> bool:
+    """Add one venv entry to the archive, relocating text files that can embed absolute paths.
+
+    Returns:
+        True if the entry's content was relocated.
+
+    """
+    info = archive.gettarinfo(str(path), arcname=relative.as_posix())
+    if not info.isfile():
+        archive.addfile(info)
+        return False
+    data = path.read_bytes()
+    relocated = _relocate(data, *roots) if _is_relocatable(relative) and b"\0" not in data else data
+    info.size = len(relocated)
+    archive.addfile(info, io.BytesIO(relocated))
+    return relocated != data
+
+
+def archive_venv(venv: str | Path, archive_file: str | Path, project_root: str | Path = ".") -> list[str]:
+    """Archive a virtual environment with its absolute paths replaced by placeholders.
+
+    Args:
+        venv: The virtual environment directory.
+        archive_file: The ``.tar.gz`` file to write.
+        project_root: The project the venv was created for.
+
+    Returns:
+        The archive paths whose content was relocated and must be rewritten on restore.
+
+    """
+    roots = (Path(venv).resolve(), Path(project_root).resolve())
+    relocated = []
+    with tarfile.open(archive_file, "w:gz") as archive:
+        for directory, dirnames, filenames in os.walk(roots[0]):
+            for name in sorted(dirnames + filenames):
+                path = Path(directory) / name
+                relative = path.relative_to(roots[0])
+                if _add_entry(archive, path, relative, roots):
+                    relocated.append(relative.as_posix())
+    return relocated
+
+
+def extract_venv(snapshot: str | Path, venv: str | Path, project_root: str | Path = ".") -> Path:
+    """Restore a snapshot's venv archive into a directory, replacing any existing venv.
+
+    Args:
+        snapshot: The snapshot directory.
+        venv: Where to restore the virtual environment.
+        project_root: The project the restored venv is for.
+
+    Returns:
+        The restored venv directory.
+
+    Raises:
+        FileNotFoundError: If the snapshot has no archive or its base interpreter is missing.
+        ValueError: If the target is the venv of the running interpreter.
+
+    """
+    target = Path(venv).resolve()
+    if target == Path(sys.prefix).resolve():
+        msg = f"Cannot replace {target} while running from it; run the restore with another interpreter"
+        raise ValueError(msg)
+    manifest = read_manifest(snapshot)
+    archive_file = Path(snapshot) / ARCHIVE_NAME
+    if not archive_file.is_file():
+        msg = f"No venv archive in {snapshot}"
+        raise FileNotFoundError(msg)
+    if not Path(manifest["home"]).is_dir():
+        msg = f"Base interpreter directory {manifest['home']} of snapshot {snapshot} does not exist"
+        raise FileNotFoundError(msg)
+    shutil.rmtree(target, ignore_errors=True)
+    with tarfile.open(archive_file, "r:gz") as archive:
+        archive.extractall(target, filter="tar")
+    venv_root, project = str(target).encode(), str(Path(project_root).resolve()).encode()
+    for relative in manifest["relocated"]:
+        path = target / relative
+        path.write_bytes(path.read_bytes().replace(VENV_PLACEHOLDER, venv_root).replace(PROJECT_PLACEHOLDER, project))
+    return target
+
+
+def write_manifest(snapshot: str | Path, *, key: str, home: str, relocated: list[str]) -> Path:
+    """Describe a snapshot so it can be validated and restored.
+
+    Args:
+        snapshot: The snapshot directory.
+        key: The snapshot key.
+        home: The base interpreter directory the venv was created from.
+        relocated: The archive paths holding path placeholders.
+
+    Returns:
+        The manifest path.
+
+    """
+    manifest_file = Path(snapshot) / MANIFEST_NAME
+    manifest = {"key": key, "home": home, "relocated": relocated, "created_at": time.time()}
+    manifest_file.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return manifest_file
+
+
+def read_manifest(snapshot: str | Path) -> dict:
+    """Read a snapshot's manifest.
+
+    Args:
+        snapshot: The snapshot directory.
+
+    Returns:
+        The manifest.
+
+    Raises:
+        FileNotFoundError: If the snapshot does not exist.
+
+    """
+    manifest_file = Path(snapshot) / MANIFEST_NAME
+    if not manifest_file.is_file():
+        msg = f"No environment snapshot at {snapshot}; run 'invoke env.snapshot' first"
+        raise FileNotFoundError(msg)
+    return json.loads(manifest_file.read_text(encoding="utf-8"))
+
+
+def base_interpreter_home(venv: str | Path) -> str:
+    """Read the base interpreter directory from a venv's pyvenv.cfg.
+
+    Args:
+        venv: The virtual environment directory.
+
+    Returns:
+        The ``home`` value, or an empty string if it is not set.
+
+    """
+    for line in (Path(venv) / "pyvenv.cfg").read_text(encoding="utf-8").splitlines():
+        name, _, value = line.partition("=")
+        if name.strip() == "home":
+            return value.strip()
+    return ""
+
+
+def wheelhouse_install_command(snapshot: str | Path, python: str | Path) -> list[str]:
+    """Build the pip command that installs the snapshot's requirements offline.
+
+    Args:
+        snapshot: The snapshot directory.
+        python: The interpreter to install into.
+
+    Returns:
+        The command as an argument list.
+
+    """
+    snapshot_path = Path(snapshot)
+    return [
+        str(python),
+        "-m",
+        "pip",
+        "install",
+        "--no-index",
+        "--find-links",
+        str(snapshot_path / WHEELHOUSE_NAME),
+        "-r",
+        str(snapshot_path / REQUIREMENTS_NAME),
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Restore the current snapshot without invoke.
+
+    ``restore`` extracts the venv archive and ``install`` installs the wheelhouse into the running
+    interpreter. Both exit with status 1 when no usable snapshot exists so callers can fall back
+    to a normal ``poetry install``.
+
+    Args:
+        argv: Command-line arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        The exit status.
+
+    """
+    parser = argparse.ArgumentParser(prog="python -m project.environment_snapshot")
+    parser.add_argument("action", choices=["restore", "install"])
+    parser.add_argument("--venv", default=".venv", help="venv directory to restore into")
+    parser.add_argument("--root", default=str(ENV_SNAPSHOTS_PATH), help="directory snapshots are stored in")
+    arguments = parser.parse_args(argv)
+    snapshot = current_snapshot_directory(arguments.root)
+    try:
+        if arguments.action == "restore":
+            print(f"Restored {extract_venv(snapshot, arguments.venv)} from {snapshot}")
+            return 0
+        read_manifest(snapshot)
+    except (FileNotFoundError, ValueError) as error:
+        print(error)
+        return 1
+    return subprocess.run(wheelhouse_install_command(snapshot, sys.executable), check=False).returncode  # noqa: S603
+
+
+if __name__ == "__main__":
+    sys.exit(main())
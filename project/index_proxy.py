@@ -0,0 +1,333 @@
+"""A local caching proxy for a PEP 503 simple package index, for pip.
+
+The proxy serves ``/simple/`` and ``/simple/<project>/`` pages fetched from an upstream index and
+rewrites the links to distribution files on the upstream or FILE_HOSTS so they point back at the
+proxy under ``/files/<scheme>/<host>/<path>``. Pages are kept on disk under DEFAULT_INDEX_PATH and
+refetched once they are older than the page TTL. Published files never change, so each is
+downloaded once and served from disk from then on. When the upstream cannot be reached, or the
+proxy runs offline, cached pages are served however old they are, so a warmed cache keeps installs
+working without a network.
+
+While 'invoke index.proxy' runs it records its URL in the cache directory, and
+proxy_environment() turns that into PIP_INDEX_URL for the tasks that run pip. Only pip reads that
+setting: poetry resolves and installs from the sources declared in pyproject.toml, so ``poetry
+lock`` and ``poetry install``, including the one tox runs in each environment, bypass the proxy.
+"""
+
+import html
+import http.server
+import os
+import re
+import shutil
+import socket
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+from urllib.parse import urljoin, urlsplit
+
+from project.utils import ensure_directory
+
+DEFAULT_INDEX_PATH = Path(".quality/index")
+DEFAULT_UPSTREAM = "https://pypi.org/simple/"
+FILE_HOSTS = ("files.pythonhosted.org",)
+DEFAULT_INDEX_PORT = 8767
+DEFAULT_PAGE_TTL_SECONDS = 600.0
+UPSTREAM_TIMEOUT_SECONDS = 30.0
+LIVENESS_TIMEOUT_SECONDS = 0.2
+PROXY_URL_FILE = "proxy-url"
+ROOT_PAGE = "_index"
+HREF_PATTERN = re.compile(r'href="([^"]*)"')
+UNSAFE_SEGMENTS = frozenset({"", ".", ".."})
+CHUNK_SIZE = 64 * 1024
+
+
+def normalize_project(name: str) -> str:
+    """Normalize a project name as PEP 503 does, e.g. ``Foo_Bar`` to ``foo-bar``.
+
+    Args:
+        name: The project name.
+
+    Returns:
+        The normalized name.
+
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def rewrite_links(page: str, page_url: str, hosts: set[str]) -> str:
+    """Point the links to files on the given hosts at the proxy, keeping their hash fragments.
+
+    Args:
+        page: The HTML of an index page.
+        page_url: The URL the page was fetched from, which relative links resolve against.
+        hosts: The hosts whose files the proxy caches; links elsewhere are left alone.
+
+    Returns:
+        The rewritten page.
+
+    """
+
+    def rewrite(match: re.Match[str]) -> str:
+        target = urlsplit(urljoin(page_url, html.unescape(match[1])))
+        if target.scheme not in {"http", "https"} or target.netloc not in hosts:
+            return match[0]
+        fragment = f"#{target.fragment}" if target.fragment else ""
+        return f'href="{html.escape(f"/files/{target.scheme}/{target.netloc}{target.path}{fragment}")}"'
+
+    return HREF_PATTERN.sub(rewrite, page)
+
+
+def _write_atomically(path: Path, chunks: Iterable[bytes]) -> None:
+    """Write chunks to a file so concurrent readers never see a partial file."""
+    ensure_directory(path.parent)
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, suffix=".tmp", delete=False) as temp:
+        try:
+            for chunk in chunks:
+                temp.write(chunk)
+        except BaseException:
+            temp.close()
+            Path(temp.name).unlink()
+            raise
+    Path(temp.name).replace(path)
+
+
+class IndexCache:
+    """Pages and files of an upstream index, cached on disk.
+
+    Attributes:
+        root: The directory pages and files are cached in.
+        upstream: The upstream simple index URL.
+        hosts: The hosts whose files are cached: the upstream's and FILE_HOSTS.
+        page_ttl: How many seconds a cached page is served before it is refetched.
+        offline: Never contact the upstream; serve only what is cached.
+
+    """
+
+    def __init__(
+        self,
+        root: str | Path = DEFAULT_INDEX_PATH,
+        upstream: str = DEFAULT_UPSTREAM,
+        *,
+        page_ttl: float = DEFAULT_PAGE_TTL_SECONDS,
+        offline: bool = False,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            root: The directory pages and files are cached in.
+            upstream: The upstream simple index URL.
+            page_ttl: How many seconds a cached page is served before it is refetched.
+            offline: Never contact the upstream; serve only what is cached.
+
+        Raises:
+            ValueError: If the upstream is not an http(s) URL.
+
+        """
+        if not upstream.startswith(("http://", "https://")):
+            msg = f"Upstream index must use http or https: {upstream}"
+            raise ValueError(msg)
+        self.root = Path(root)
+        self.upstream = upstream.rstrip("/") + "/"
+        self.hosts = {urlsplit(self.upstream).netloc, *FILE_HOSTS}
+        self.page_ttl = page_ttl
+        self.offline = offline
+
+    def _is_fresh(self, path: Path) -> bool:
+        """Check whether a cached page may be served without asking the upstream."""
+        return self.offline or time.time() - path.stat().st_mtime < self.page_ttl
+
+    def page(self, project: str | None) -> bytes | None:
+        """Return an index page, from the cache while it is fresh or the upstream is unreachable.
+
+        Args:
+            project: The project name, or None for the root page listing every project.
+
+        Returns:
+            The page with its file links pointing at the proxy, or None if the project does not exist.
+
+        Raises:
+            OSError: If the page is not cached and the upstream cannot be reached.
+
+        """
+        name = ROOT_PAGE if project is None else normalize_project(project)
+        path = self.root / "pages" / f"{name}.html"
+        if path.is_file() and self._is_fresh(path):
+            return path.read_bytes()
+        if self.offline:
+            return None
+        page_url = self.upstream if project is None else urljoin(self.upstream, f"{name}/")
+        request = urllib.request.Request(page_url, headers={"Accept": "text/html"})  # noqa: S310
+        try:
+            with urllib.request.urlopen(request, timeout=UPSTREAM_TIMEOUT_SECONDS) as response:  # noqa: S310
+                page = rewrite_links(response.read().decode("utf-8"), response.url, self.hosts).encode("utf-8")
+        except OSError as error:
+            if isinstance(error, urllib.error.HTTPError) and error.code == http.HTTPStatus.NOT_FOUND:
+                return None
+            if path.is_file():
+                return path.read_bytes()
+            raise
+        _write_atomically(path, [page])
+        return page
+
+    def file(self, scheme: str, host: str, file_path: str) -> Path | None:
+        """Return a cached distribution file, downloading it first if needed.
+
+        Args:
+            scheme: The scheme of the file's upstream URL.
+            host: The host of the file's upstream URL.
+            file_path: The path of the file on the host, without the leading slash.
+
+        Returns:
+            The cached file, or None if the file is not one the proxy may serve or does not exist.
+
+        Raises:
+            OSError: If the file is not cached and the upstream cannot be reached.
+
+        """
+        segments = file_path.split("/")
+        if scheme not in {"http", "https"} or host not in self.hosts or not UNSAFE_SEGMENTS.isdisjoint(segments):
+            return None
+        path = self.root.joinpath("files", scheme, host, *segments)
+        if path.is_file() or self.offline:
+            return path if path.is_file() else None
+        try:
+            with urllib.request.urlopen(f"{scheme}://{host}/{file_path}", timeout=UPSTREAM_TIMEOUT_SECONDS) as response:  # noqa: S310
+                _write_atomically(path, iter(lambda: response.read(CHUNK_SIZE), b""))
+        except urllib.error.HTTPError as error:
+            if error.code == http.HTTPStatus.NOT_FOUND:
+                return None
+            raise
+        return path
+
+
+class IndexProxyRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves an IndexCache to pip and other simple index clients."""
+
+    server: "IndexProxyServer"
+
+    def do_GET(self) -> None:
+        """Serve an index page or a distribution file."""
+        try:
+            match urlsplit(self.path).path.strip("/").split("/"):
+                case ["simple"]:
+                    self._send_page(None)
+                case ["simple", project]:
+                    self._send_page(project)
+                case ["files", scheme, host, *segments] if segments:
+                    self._send_file(self.server.cache.file(scheme, host, "/".join(segments)))
+                case _:
+                    self.send_error(404)
+        except OSError as error:
+            self.send_error(502, f"Upstream index unavailable: {error}")
+
+    def _send_page(self, project: str | None) -> None:
+        """Send an index page, or 404 if the project does not exist."""
+        page = self.server.cache.page(project)
+        if page is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(page)))
+        self.end_headers()
+        self.wfile.write(page)
+
+    def _send_file(self, path: Path | None) -> None:
+        """Send a cached distribution file, or 404 if there is none."""
+        if path is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.end_headers()
+        with path.open("rb") as file:
+            shutil.copyfileobj(file, self.wfile)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """Only log requests when INDEX_PROXY_VERBOSE is set."""
+        if os.environ.get("INDEX_PROXY_VERBOSE"):
+            super().log_message(format, *args)
+
+
+class IndexProxyServer(http.server.ThreadingHTTPServer):
+    """HTTP server exposing an IndexCache as a simple index.
+
+    Attributes:
+        cache: The cache pages and files are served from.
+        host: The interface the proxy listens on.
+
+    """
+
+    def __init__(self, address: tuple[str, int], cache: IndexCache) -> None:
+        """Initialize the proxy server.
+
+        Args:
+            address: The (host, port) to listen on.
+            cache: The cache pages and files are served from.
+
+        """
+        self.cache = cache
+        self.host = address[0]
+        super().__init__(address, IndexProxyRequestHandler)
+
+    @property
+    def url(self) -> str:
+        """Return the URL of the proxy's simple index."""
+        return f"http://{self.host}:{self.server_port}/simple/"
+
+
+def record_proxy_url(url: str, root: str | Path = DEFAULT_INDEX_PATH) -> Path:
+    """Record the URL of a running proxy so tasks can find it.
+
+    Args:
+        url: The proxy's simple index URL.
+        root: The proxy's cache directory.
+
+    Returns:
+        The file the URL is recorded in.
+
+    """
+    path = Path(root) / PROXY_URL_FILE
+    _write_atomically(path, [url.encode("utf-8")])
+    return path
+
+
+def running_proxy_url(root: str | Path = DEFAULT_INDEX_PATH) -> str | None:
+    """Return the URL of the running proxy, if one is recorded and accepts connections.
+
+    Args:
+        root: The proxy's cache directory.
+
+    Returns:
+        The proxy's simple index URL, or None if no proxy is running.
+
+    """
+    try:
+        url = (Path(root) / PROXY_URL_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    address = urlsplit(url)
+    try:
+        with socket.create_connection((address.hostname, address.port), timeout=LIVENESS_TIMEOUT_SECONDS):
+            return url
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def proxy_environment(root: str | Path = DEFAULT_INDEX_PATH) -> dict[str, str]:
+    """Return the settings that point pip at the proxy; poetry does not read them.
+
+    Args:
+        root: The proxy's cache directory.
+
+    Returns:
+        The environment variables to set, or an empty mapping when no proxy is running.
+
+    """
+    url = running_proxy_url(root)
+    return {} if url is None else {"PIP_INDEX_URL": url}
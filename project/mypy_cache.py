@@ -0,0 +1,236 @@
+"""Shared, content-addressed mypy cache for worktrees, tox envs and devcontainer rebuilds.
+
+mypy only reuses a cache written by the same mypy version for the same target Python version and
+configuration, so cache entries are keyed by all three. Each checkout runs mypy against its own
+working copy of the entry under LOCAL_CACHE_ROOT. A cold working copy is seeded from the shared
+store, and a working copy that mypy changed is published back. Readers copy entries under a
+shared lock and writers swap in a complete entry under an exclusive lock, so concurrent runs never
+see a half-written entry. Windows has no shared file locks, so there every lock is exclusive.
+The least recently used entries are evicted once the store exceeds its size limit, along with
+staging directories that interrupted publishers left behind.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tomllib
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+from project.utils import ensure_directory
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+LOCAL_CACHE_ROOT = Path(".quality/mypy/keyed")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+LOCK_NAME = ".lock"
+LAST_USED_NAME = ".last-used"
+CONFIG_HASH_LENGTH = 16
+STALE_STAGING_SECONDS = 3600.0
+
+
+def config_digest(pyproject: str | Path = "pyproject.toml") -> str:
+    """Hash the mypy configuration, which invalidates the cache when it changes.
+
+    Args:
+        pyproject: The pyproject.toml holding the ``[tool.mypy]`` table.
+
+    Returns:
+        A hex sha256 digest of the table.
+
+    """
+    with Path(pyproject).open("rb") as file:
+        config = tomllib.load(file).get("tool", {}).get("mypy", {})
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def cache_key(python_version: str, mypy_version: str, config_hash: str) -> str:
+    """Build the key of a shared cache entry.
+
+    Args:
+        python_version: The major.minor version mypy checks against, e.g. ``3.13``.
+        mypy_version: The mypy version.
+        config_hash: The config_digest() of the mypy configuration.
+
+    Returns:
+        The key naming the entry directory.
+
+    """
+    return f"py{python_version}-mypy{mypy_version}-{config_hash[:CONFIG_HASH_LENGTH]}"
+
+
+def directory_fingerprint(path: Path) -> str:
+    """Summarise the files in a directory by path, size and modification time.
+
+    Args:
+        path: The directory.
+
+    Returns:
+        A digest that changes whenever a file is added, removed or rewritten.
+
+    """
+    digest = hashlib.sha256()
+    for directory, _, filenames in sorted(os.walk(path)):
+        for name in sorted(filenames):
+            stat = (Path(directory) / name).stat()
+            digest.update(f"{directory}/{name}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _last_used(entry: Path) -> float:
+    """Return when an entry was last restored or published, or 0 if that is unknown."""
+    try:
+        return (entry / LAST_USED_NAME).stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def _directory_size(path: Path) -> int:
+    """Return the total size of the files in a directory."""
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def _lock(lock_file: IO[str], *, exclusive: bool) -> None:
+    """Lock a file, waiting for other holders; shared locks are exclusive on Windows."""
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError:  # LK_LOCK gives up after ten seconds
+                continue
+            return
+    else:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _unlock(lock_file: IO[str]) -> None:
+    """Release a lock taken by _lock()."""
+    if sys.platform == "win32":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def store_lock(store: Path, *, exclusive: bool) -> Iterator[None]:
+    """Hold the store-wide lock, shared for readers or exclusive for writers.
+
+    Args:
+        store: The shared store directory.
+        exclusive: Whether to take the lock exclusively.
+
+    Yields:
+        None.
+
+    """
+    ensure_directory(store)
+    with (store / LOCK_NAME).open("a") as lock_file:
+        _lock(lock_file, exclusive=exclusive)
+        try:
+            yield
+        finally:
+            _unlock(lock_file)
+
+
+class SharedMypyCache:
+    """A checkout's working copy of a shared mypy cache entry.
+
+    Attributes:
+        store: The shared store directory holding one directory per key.
+        key: The entry key from cache_key().
+        local: The working copy mypy reads and writes.
+        max_bytes: The store size above which least recently used entries are evicted.
+
+    """
+
+    def __init__(self, store: str | Path, key: str, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initialize the cache.
+
+        Args:
+            store: The shared store directory.
+            key: The entry key from cache_key().
+            max_bytes: The store size above which least recently used entries are evicted.
+
+        """
+        self.store = Path(store)
+        self.key = key
+        self.local = LOCAL_CACHE_ROOT / key
+        self.max_bytes = max_bytes
+
+    def restore(self) -> bool:
+        """Seed a cold working copy from the shared entry.
+
+        Returns:
+            True if the working copy was seeded.
+
+        """
+        entry = self.store / self.key
+        if self.local.is_dir():
+            return False
+        with store_lock(self.store, exclusive=False):
+            if not entry.is_dir():
+                return False
+            shutil.copytree(entry, self.local, ignore=shutil.ignore_patterns(LAST_USED_NAME))
+            (entry / LAST_USED_NAME).touch()
+        return True
+
+    def publish(self) -> list[str]:
+        """Replace the shared entry with the working copy and evict entries over the size limit.
+
+        The working copy is staged next to the entry outside the lock, so readers are only blocked
+        while it is swapped in.
+
+        Returns:
+            The keys of the evicted entries.
+
+        """
+        ensure_directory(self.store)
+        staging = Path(tempfile.mkdtemp(prefix=f".{self.key}-", dir=self.store))
+        try:
+            shutil.copytree(self.local, staging, dirs_exist_ok=True)
+            (staging / LAST_USED_NAME).touch()
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        with store_lock(self.store, exclusive=True):
+            shutil.rmtree(self.store / self.key, ignore_errors=True)
+            staging.rename(self.store / self.key)
+            self._sweep_staging()
+            return self._evict()
+
+    def _sweep_staging(self) -> None:
+        """Remove staging directories that publishers which were killed mid-copy left behind.
+
+        Staging directories are named ``.<key>-<random>``. Only those untouched for
+        STALE_STAGING_SECONDS are removed, so a publisher still copying is left alone.
+        """
+        cutoff = time.time() - STALE_STAGING_SECONDS
+        for path in self.store.glob(".*-*"):
+            if path.is_dir() and path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _evict(self) -> list[str]:
+        """Remove least recently used entries, never this one, until the store fits its limit."""
+        entries = [path for path in self.store.iterdir() if path.is_dir() and not path.name.startswith(".")]
+        sizes = {entry: _directory_size(entry) for entry in entries}
+        total = sum(sizes.values())
+        evicted = []
+        for entry in sorted(entries, key=_last_used):
+            if total <= self.max_bytes:
+                break
+            if entry.name != self.key:
+                shutil.rmtree(entry)
+                total -= sizes[entry]
+                evicted.append(entry.name)
+        return evicted
@@ -0,0 +1,209 @@
+"""Split a mypy run into import-graph-respecting shards and merge their reports.
+
+Files are grouped by top-level package (``src/<package>`` counts as ``<package>``). Packages that
+import each other, directly or through other packages, form a cycle and are checked in the same
+shard; every other package gets a shard of its own. Each shard is checked by its own mypy process,
+and the reports are merged into one with mypy's summary line and exit status.
+
+Every shard process starts from its own copy of the cache and re-checks the packages it imports, so
+bound_shards() packs the shards into a limited number of groups before they are run.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+SOURCE_ROOT = "src"
+DIAGNOSTIC_PATTERN = re.compile(r"^(?P<path>[^:\s][^:]*):\d+(?::\d+)?: (?P<severity>error|warning|note): ")
+SUMMARY_PATTERN = re.compile(r"^(Found \d+ errors? in \d+ files?|Success: no issues found)")
+
+
+def top_level_package(path: str) -> str:
+    """Return the top-level package or module a file belongs to.
+
+    Args:
+        path: The file path relative to the workspace root.
+
+    Returns:
+        The first component of the file's module name, e.g. ``project`` or ``lessons_learnt``.
+
+    """
+    parts = PurePosixPath(path).parts
+    if parts[0] == SOURCE_ROOT and len(parts) > 1:
+        parts = parts[1:]
+    return PurePosixPath(parts[0]).stem
+
+
+def _imports_of(node: ast.AST) -> set[str]:
+    """Return the top-level packages an import statement imports absolutely."""
+    if isinstance(node, ast.Import):
+        return {alias.name.split(".")[0] for alias in node.names}
+    if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+        return {node.module.split(".")[0]}
+    return set()
+
+
+def imported_packages(path: str | Path) -> set[str]:
+    """Return the top-level packages a file imports with absolute imports.
+
+    Args:
+        path: The Python file.
+
+    Returns:
+        The imported top-level package names; empty if the file cannot be parsed.
+
+    """
+    try:
+        tree = ast.parse(Path(path).read_bytes())
+    except (OSError, SyntaxError, ValueError):
+        return set()
+    return set().union(*(_imports_of(node) for node in ast.walk(tree)))
+
+
+def _reachable(graph: dict[str, set[str]], start: str) -> set[str]:
+    """Return the packages reachable from a package, including itself."""
+    seen = {start}
+    stack = [start]
+    while stack:
+        for package in graph[stack.pop()] - seen:
+            seen.add(package)
+            stack.append(package)
+    return seen
+
+
+def _import_graph(files: dict[str, list[str]]) -> dict[str, set[str]]:
+    """Map each package to the other workspace packages its files import."""
+    graph = {}
+    for package, package_files in files.items():
+        imported = set().union(*(imported_packages(path) for path in package_files))
+        graph[package] = (imported & files.keys()) - {package}
+    return graph
+
+
+def plan_shards(paths: list[str]) -> list[list[str]]:
+    """Group files into shards whose packages do not import each other cyclically.
+
+    Args:
+        paths: The Python files to check.
+
+    Returns:
+        The files of each shard, ordered by the shard's first package name.
+
+    """
+    files: dict[str, list[str]] = {}
+    for path in paths:
+        files.setdefault(top_level_package(path), []).append(path)
+    graph = _import_graph(files)
+    reachable = {package: _reachable(graph, package) for package in graph}
+    # Packages that reach each other form a cycle and must be checked together
+    components = {frozenset(other for other in reachable[package] if package in reachable[other]) for package in graph}
+    return [
+        [path for package in sorted(component) for path in files[package]] for component in sorted(components, key=min)
+    ]
+
+
+def bound_shards(shards: list[list[str]], limit: int) -> list[list[str]]:
+    """Pack shards into at most a given number of groups with similar numbers of files.
+
+    Any union of shards is still a valid shard, since only packages importing each other
+    cyclically have to be checked together.
+
+    Args:
+        shards: The shards, as returned by plan_shards().
+        limit: The maximum number of groups.
+
+    Returns:
+        The groups, each listing its files in the order of the shards it combines.
+
+    """
+    if len(shards) <= limit:
+        return shards
+    groups: list[list[int]] = [[] for _ in range(max(limit, 1))]
+    sizes = [0] * len(groups)
+    for index in sorted(range(len(shards)), key=lambda index: -len(shards[index])):
+        smallest = sizes.index(min(sizes))
+        groups[smallest].append(index)
+        sizes[smallest] += len(shards[index])
+    return [[path for index in sorted(group) for path in shards[index]] for group in groups if group]
+
+
+def _plural(count: int, noun: str) -> str:
+    """Format a count the way mypy's summary does, e.g. ``1 error`` or ``2 errors``."""
+    return f"{count} {noun}{'' if count == 1 else 's'}"
+
+
+@dataclass
+class MergedReport:
+    """The combined output of several mypy runs.
+
+    Attributes:
+        lines: Diagnostics and other output, without duplicates or per-run summaries.
+        summary: The summary line in mypy's format.
+        exit_code: mypy's exit status for the combined run.
+
+    """
+
+    lines: list[str]
+    summary: str
+    exit_code: int
+
+
+def _unique_lines(outputs: list[str]) -> list[str]:
+    """Return the non-summary output lines of all runs, each once, in first-seen order."""
+    lines: dict[str, None] = {}
+    for output in outputs:
+        lines.update((line, None) for line in output.splitlines() if line and not SUMMARY_PATTERN.match(line))
+    return list(lines)
+
+
+def _crash_lines(exit_codes: list[int], errors: list[str]) -> list[str]:
+    """Return the stderr of each shard that crashed, under a line naming the shard and its status."""
+    lines = []
+    for index, (exit_code, error) in enumerate(zip(exit_codes, errors, strict=False)):
+        if exit_code > 1:
+            lines.extend([f"mypy shard {index} exited with status {exit_code}:", *error.splitlines()])
+    return lines
+
+
+def _summary(lines: list[str], checked_files: int, crashed: int) -> str:
+    """Build mypy's summary line for the merged diagnostics, never claiming success if a shard crashed."""
+    errors = [match for match in map(DIAGNOSTIC_PATTERN.match, lines) if match and match["severity"] == "error"]
+    checked = f"checked {_plural(checked_files, 'source file')}"
+    failed = f"mypy failed in {_plural(crashed, 'shard')}"
+    if not errors:
+        return (
+            f"{failed} ({checked})"
+            if crashed
+            else f"Success: no issues found in {_plural(checked_files, 'source file')}"
+        )
+    error_files = len({match["path"] for match in errors})
+    found = f"Found {_plural(len(errors), 'error')} in {_plural(error_files, 'file')} ({checked})"
+    return f"{found}; {failed}" if crashed else found
+
+
+def merge_reports(
+    outputs: list[str], exit_codes: list[int], checked_files: int, errors: list[str] | None = None
+) -> MergedReport:
+    """Merge the output of the shard runs as if mypy had checked all files in one run.
+
+    Diagnostics for modules that several shards import are reported once. mypy writes the
+    traceback of a crash to stderr, so the stderr of every shard that exited with a status above
+    1 is appended as it is.
+
+    Args:
+        outputs: The stdout of each shard run.
+        exit_codes: The exit status of each shard run.
+        checked_files: The number of files passed to the shard runs.
+        errors: The stderr of each shard run.
+
+    Returns:
+        The merged report; the exit status is the highest shard status, so crashes (2) win over
+        type errors (1).
+
+    """
+    lines = _unique_lines(outputs)
+    summary = _summary(lines, checked_files, sum(exit_code > 1 for exit_code in exit_codes))
+    return MergedReport(
+        lines=[*lines, *_crash_lines(exit_codes, errors or [])], summary=summary, exit_code=max(exit_codes, default=0)
+    )
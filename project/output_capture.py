@@ -0,0 +1,158 @@
+"""Bounded-memory capture of tool output for invoke's ``context.run``.
+
+Invoke keeps every byte a subprocess writes in memory for the returned ``Result``. For output
+that is shown to the user, BoundedCaptureRunner instead streams each chunk to a log file under
+CAPTURE_LOG_DIRECTORY and keeps only a bounded tail in memory, so memory stays flat however
+chatty a tool is. Hidden streams are still captured in full because callers parse them, e.g.
+``git ls-files`` output, and so are watched streams because watchers match against the whole
+buffer.
+"""
+
+import hashlib
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import IO, Any
+
+from invoke.context import Context
+from invoke.runners import Local, Result
+
+from project.trace_timeline import active_recorder
+from project.utils import ensure_directory
+
+CAPTURE_LOG_DIRECTORY = Path(".quality/logs")
+DEFAULT_TAIL_CHARACTERS = 64_000
+MAX_SLUG_LENGTH = 48
+
+
+def capture_log_path(command: str, stream: str, directory: Path = CAPTURE_LOG_DIRECTORY) -> Path:
+    """Return the log file a command's output stream is written to.
+
+    The name is derived from the command, so reporters can find the latest output of a tool.
+
+    Args:
+        command: The shell command.
+        stream: ``stdout`` or ``stderr``.
+        directory: The log directory.
+
+    Returns:
+        The log file path.
+
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", command)[:MAX_SLUG_LENGTH].strip("-")
+    digest = hashlib.sha256(command.encode("utf-8")).hexdigest()[:8]
+    return directory / f"{slug}-{digest}.{stream}.log"
+
+
+class CapturedResult(Result):
+    """A command result whose shown output is a tail, with the full output in log files.
+
+    Attributes:
+        stdout_log: The file holding the full stdout, or None if stdout was hidden.
+        stderr_log: The file holding the full stderr, or None if stderr was hidden.
+
+    """
+
+    def __init__(self, *, stdout_log: Path | None = None, stderr_log: Path | None = None, **kwargs: Any) -> None:  # noqa: ANN401
+        """Initialize the result.
+
+        Args:
+            stdout_log: The file holding the full stdout.
+            stderr_log: The file holding the full stderr.
+            **kwargs: Arguments for invoke's Result.
+
+        """
+        super().__init__(**kwargs)
+        self.stdout_log = stdout_log
+        self.stderr_log = stderr_log
+
+
+class BoundedCaptureRunner(Local):
+    """Local runner that tees shown output to log files and keeps a bounded tail in memory.
+
+    Attributes:
+        tail_characters: How much of each shown stream to keep in memory.
+        log_directory: Where the full output is written.
+        command: The command being run.
+        log_files: The log file of each stream captured to disk.
+        started: When the command started, for its trace span.
+
+    """
+
+    tail_characters = DEFAULT_TAIL_CHARACTERS
+    log_directory = CAPTURE_LOG_DIRECTORY
+
+    def __init__(self, context: Context) -> None:
+        """Initialize the runner.
+
+        Args:
+            context: The invoke context.
+
+        """
+        super().__init__(context)
+        self.command = ""
+        self.log_files: dict[str, Path] = {}
+        self.started = 0.0
+
+    def start(self, command: str, shell: str, env: dict[str, Any]) -> None:
+        """Start a command, remembering it to name the log files and trace its span.
+
+        Args:
+            command: The shell command.
+            shell: The shell to run it with.
+            env: The command's environment.
+
+        """
+        self.command = command
+        self.started = time.perf_counter()
+        super().start(command, shell, env)
+
+    def handle_stdout(self, buffer_: list[str], hide: bool, output: IO) -> None:  # noqa: FBT001
+        """Capture stdout, bounded unless it is hidden or watched."""
+        if hide or self.watchers:
+            super().handle_stdout(buffer_, hide, output)
+        else:
+            self._capture(buffer_, output, self.read_proc_stdout, "stdout")
+
+    def handle_stderr(self, buffer_: list[str], hide: bool, output: IO) -> None:  # noqa: FBT001
+        """Capture stderr, bounded unless it is hidden or watched."""
+        if hide or self.watchers:
+            super().handle_stderr(buffer_, hide, output)
+        else:
+            self._capture(buffer_, output, self.read_proc_stderr, "stderr")
+
+    def _capture(self, buffer_: list[str], output: IO, reader: Callable, stream: str) -> None:
+        """Echo a stream, write it to its log file and keep only its tail in the buffer.
+
+        Args:
+            buffer_: The capture buffer shared with the main thread.
+            output: The stream to echo to.
+            reader: Reads chunks of the subprocess stream.
+            stream: ``stdout`` or ``stderr``.
+
+        """
+        log_file = capture_log_path(self.command, stream, self.log_directory)
+        ensure_directory(log_file.parent)
+        self.log_files[stream] = log_file
+        tail: deque[str] = deque()
+        size = 0
+        with log_file.open("w", encoding="utf-8", errors="replace") as log:
+            for data in self.read_proc_output(reader):  # type: ignore[func-returns-value,attr-defined]
+                self.write_our_output(stream=output, string=data)
+                log.write(data)
+                tail.append(data)
+                size += len(data)
+                while size > self.tail_characters and len(tail) > 1:
+                    size -= len(tail.popleft())
+        buffer_[:] = ["".join(tail)[-self.tail_characters :]]
+
+    def generate_result(self, **kwargs: Any) -> CapturedResult:  # noqa: ANN401
+        """Create a result that records where the full output was written, tracing the command."""
+        recorder = active_recorder()
+        if recorder is not None:
+            recorder.add_span(self.command, "command", self.started, recorder.now(), {"exited": kwargs.get("exited")})
+        return CapturedResult(
+            stdout_log=self.log_files.get("stdout"), stderr_log=self.log_files.get("stderr"), **kwargs
+        )
@@ -0,0 +1,159 @@
+"""Binary search over git history for the commit that made a task slower.
+
+Each candidate commit is timed several times after discarded warm-up runs, and the median is
+compared with the median of the known good commit. A commit counts as slow when its median is more
+than the threshold percentage above the good median. Like ``git bisect``, the search assumes the
+slowdown persists once introduced, so it needs about log2(n) measurements for n commits.
+"""
+
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from project.utils import ensure_directory
+
+BISECT_REPORT_PATH = Path(".quality/benchmarks/bisect.json")
+
+
+@dataclass
+class Measurement:
+    """Timings of the benchmarked command at one commit.
+
+    Attributes:
+        commit: The commit hash.
+        subject: The commit's subject line.
+        samples: The measured durations in seconds, excluding warm-up runs.
+
+    """
+
+    commit: str
+    subject: str
+    samples: list[float]
+
+    @property
+    def median(self) -> float:
+        """Return the median duration in seconds."""
+        return statistics.median(self.samples)
+
+    @property
+    def spread(self) -> float:
+        """Return the range of the samples relative to the median, as a percentage."""
+        return (max(self.samples) - min(self.samples)) / self.median * 100 if self.median else 0.0
+
+
+def time_runs(run: Callable[[], None], repeat: int, warmup: int) -> list[float]:
+    """Time a command several times, discarding warm-up runs that fill caches.
+
+    Args:
+        run: Runs the command once.
+        repeat: How many timed runs to make.
+        warmup: How many untimed runs to make first.
+
+    Returns:
+        The duration of each timed run in seconds.
+
+    """
+    for _ in range(warmup):
+        run()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def slowdown(baseline: Measurement, candidate: Measurement) -> float:
+    """Return how much slower a candidate is than a baseline, as a percentage of the baseline.
+
+    Args:
+        baseline: The reference measurement.
+        candidate: The measurement to compare.
+
+    Returns:
+        The relative difference of the medians; negative when the candidate is faster.
+
+    """
+    return (candidate.median / baseline.median - 1) * 100 if baseline.median else 0.0
+
+
+def first_slow_commit(commits: list[str], is_slow: Callable[[str], bool]) -> int:
+    """Find the first slow commit, given that the first commit is fast and the last is slow.
+
+    Args:
+        commits: Commits in history order, from the good commit to the bad commit.
+        is_slow: Measures a commit and decides whether it is slow.
+
+    Returns:
+        The index of the first slow commit.
+
+    """
+    fast, slow = 0, len(commits) - 1
+    while slow - fast > 1:
+        middle = (fast + slow) // 2
+        if is_slow(commits[middle]):
+            slow = middle
+        else:
+            fast = middle
+    return slow
+
+
+@dataclass
+class BisectReport:
+    """The outcome of a performance bisect.
+
+    Attributes:
+        target: What was benchmarked, e.g. an invoke task name or a pytest selection.
+        threshold: The slowdown in percent that counts as a regression.
+        measurements: Every commit measured, in history order.
+        culprit: The first slow commit, or None if the bad commit was not slow.
+
+    """
+
+    target: str
+    threshold: float
+    measurements: list[Measurement]
+    culprit: str | None
+
+    def lines(self) -> list[str]:
+        """Format the report as a table of measured commits followed by the verdict.
+
+        Returns:
+            The report lines.
+
+        """
+        baseline = self.measurements[0]
+        lines = [f"{'commit':<10} {'median (s)':>10} {'spread':>8} {'vs good':>9}  subject"]
+        lines.extend(
+            f"{measurement.commit[:10]:<10} {measurement.median:>10.2f} {measurement.spread:>7.1f}%"
+            f" {slowdown(baseline, measurement):>+8.1f}%  {measurement.subject}"
+            for measurement in self.measurements
+        )
+        if self.culprit is None:
+            lines.append(f"No slowdown above {self.threshold:.1f}% between the good and bad commits for {self.target}")
+            return lines
+        index = next(i for i, measurement in enumerate(self.measurements) if measurement.commit == self.culprit)
+        culprit = self.measurements[index]
+        lines.append(
+            f"First slow commit for {self.target}: {culprit.commit[:10]} {culprit.subject}"
+            f" ({slowdown(baseline, culprit):+.1f}% vs good, {slowdown(self.measurements[index - 1], culprit):+.1f}%"
+            f" vs {self.measurements[index - 1].commit[:10]})"
+        )
+        return lines
+
+    def write(self, path: Path = BISECT_REPORT_PATH) -> Path:
+        """Write the report as JSON.
+
+        Args:
+            path: The report file.
+
+        Returns:
+            The report file path.
+
+        """
+        ensure_directory(path.parent)
+        path.write_text(json.dumps(asdict(self), indent=2) + "\n", encoding="utf-8")
+        return path
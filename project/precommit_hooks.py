@@ -0,0 +1,145 @@
+"""Concurrent scheduling of the hooks configured in .pre-commit-config.yaml.
+
+``pre-commit run --all-files`` runs every hook one after another. Hooks that only read files are
+independent of each other, so they can run at the same time, each as its own
+``pre-commit run <id> --all-files``. Hooks that rewrite files cannot: two fixers touching the same
+file would race, and a checker reading a file while it is rewritten could see half of it. The
+file-modifying hooks therefore run first, one at a time, and the read-only hooks run concurrently
+once the files have settled.
+
+A hook counts as file-modifying when its id is in FILE_MODIFYING_HOOKS or its arguments include
+one of AUTOFIX_ARGUMENTS; add new fixers to the set when they are configured.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+import yaml
+from invoke.context import Context
+
+PRE_COMMIT_CONFIG = Path(".pre-commit-config.yaml")
+FILE_MODIFYING_HOOKS = frozenset(
+    {
+        "double-quote-string-fixer",
+        "end-of-file-fixer",
+        "file-contents-sorter",
+        "fix-byte-order-marker",
+        "md-toc",
+        "mixed-line-ending",
+        "requirements-txt-fixer",
+        "trailing-whitespace",
+    }
+)
+AUTOFIX_ARGUMENTS = frozenset({"--autofix", "--fix"})
+
+
+@dataclass(frozen=True)
+class Hook:
+    """A configured pre-commit hook.
+
+    Attributes:
+        hook_id: The hook id passed to ``pre-commit run``.
+        args: The arguments the hook is configured with.
+
+    """
+
+    hook_id: str
+    args: tuple[str, ...] = ()
+
+    @property
+    def modifies_files(self) -> bool:
+        """Return whether the hook may rewrite the files it checks."""
+        return self.hook_id in FILE_MODIFYING_HOOKS or not AUTOFIX_ARGUMENTS.isdisjoint(self.args)
+
+
+@dataclass
+class HookResult:
+    """The outcome of running one hook over all files.
+
+    Attributes:
+        hook_id: The hook id.
+        ok: Whether the hook passed without changing any file.
+        seconds: How long the hook took.
+        output: The hook's combined output.
+
+    """
+
+    hook_id: str
+    ok: bool
+    seconds: float
+    output: str
+
+
+def load_hooks(path: str | Path = PRE_COMMIT_CONFIG) -> list[Hook]:
+    """Read the hooks from a pre-commit configuration, in the order they are configured.
+
+    ``pre-commit run <id>`` runs every hook with that id, so a repeated id is listed once, and it
+    counts as file-modifying if any of its configurations does.
+
+    Args:
+        path: The pre-commit configuration file.
+
+    Returns:
+        The hooks.
+
+    """
+    config = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+    hooks: dict[str, Hook] = {}
+    for repo in config.get("repos", []):
+        for entry in repo.get("hooks", []):
+            hook = Hook(hook_id=entry["id"], args=tuple(entry.get("args", ())))
+            if hook.hook_id not in hooks or hook.modifies_files:
+                hooks[hook.hook_id] = hook
+    return list(hooks.values())
+
+
+def _run_hook(context: Context, hook: Hook) -> HookResult:
+    """Run one hook over all files, capturing its output."""
+    start = perf_counter()
+    result = context.run(f"poetry run pre-commit run {hook.hook_id} --all-files", hide=True, warn=True, in_stream=False)
+    seconds = perf_counter() - start
+    output = "" if result is None else result.stdout + result.stderr
+    return HookResult(hook_id=hook.hook_id, ok=result is not None and result.ok, seconds=seconds, output=output)
+
+
+def run_hooks(context: Context, hooks: list[Hook], *, jobs: int) -> list[HookResult]:
+    """Run the file-modifying hooks one at a time, then the read-only hooks concurrently.
+
+    Args:
+        context: The invoke context.
+        hooks: The hooks to run.
+        jobs: How many read-only hooks to run at once.
+
+    Returns:
+        The outcome of each hook, file-modifying hooks first, otherwise in the given order.
+
+    """
+    results = [_run_hook(context, hook) for hook in hooks if hook.modifies_files]
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results.extend(executor.map(lambda hook: _run_hook(context, hook), [h for h in hooks if not h.modifies_files]))
+    return results
+
+
+def summary_lines(results: list[HookResult], wall_seconds: float) -> list[str]:
+    """Format each hook's result and timing, and the totals.
+
+    Args:
+        results: The outcome of each hook.
+        wall_seconds: How long running all the hooks took.
+
+    Returns:
+        The summary lines.
+
+    """
+    width = max((len(result.hook_id) for result in results), default=0)
+    lines = [
+        f"{'✓' if result.ok else '✗'} {result.hook_id:<{width}}  {result.seconds:6.2f}s"
+        + ("" if result.ok else "  failed")
+        for result in results
+    ]
+    hook_seconds = sum(result.seconds for result in results)
+    passed = sum(result.ok for result in results)
+    lines.append(f"{passed} of {len(results)} hook(s) passed in {wall_seconds:.2f}s ({hook_seconds:.2f}s of hook time)")
+    return lines
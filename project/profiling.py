@@ -0,0 +1,168 @@
+"""Helpers for running Python-based tools under cProfile and summarising the results."""
+
+import pstats
+from pathlib import Path
+
+from project.utils import ensure_directory
+
+PROFILES_DIRECTORY = Path(".quality/profiles")
+MAX_STACK_DEPTH = 64
+MIN_STACK_FRACTION = 1e-4
+
+FunctionKey = tuple[str, int, str]
+
+
+def profile_path(profile_name: str) -> Path:
+    """Return the pstats file path for a profiled task.
+
+    Args:
+        profile_name: The task name the profile belongs to, e.g. ``mypy.check``.
+
+    Returns:
+        The path of the pstats file under PROFILES_DIRECTORY.
+
+    """
+    return PROFILES_DIRECTORY / f"{profile_name}.pstats"
+
+
+def tool_command(tool: str, arguments: str, *, module: str | None = None, profile_name: str | None = None) -> str:
+    """Build the command that runs a Python-based tool, optionally under cProfile.
+
+    Args:
+        tool: The tool's console script, e.g. ``mypy``.
+        arguments: The arguments passed to the tool.
+        module: The module to run with ``python -m`` when profiling; defaults to the tool name.
+        profile_name: When given, run the tool under cProfile and write the stats for this name.
+
+    Returns:
+        The shell command to run.
+
+    """
+    if profile_name is None:
+        return f"poetry run {tool} {arguments}"
+    ensure_directory(PROFILES_DIRECTORY)
+    return f"poetry run python -m cProfile -o {profile_path(profile_name)} -m {module or tool} {arguments}"
+
+
+def _format_function(function: FunctionKey) -> str:
+    """Format a pstats function key as a single collapsed-stack frame."""
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def _callees(raw: dict[FunctionKey, tuple]) -> dict[FunctionKey, dict[FunctionKey, float]]:
+    """Map each function to its callees and the cumulative time recorded on each edge."""
+    callees: dict[FunctionKey, dict[FunctionKey, float]] = {}
+    for function, (_cc, _nc, _tt, _ct, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[function] = edge[3]
+    return callees
+
+
+def _reachable(roots: list[FunctionKey], callees: dict[FunctionKey, dict[FunctionKey, float]]) -> set[FunctionKey]:
+    """Collect the functions reachable from the roots through the call graph."""
+    reached: set[FunctionKey] = set()
+    pending = list(roots)
+    while pending:
+        function = pending.pop()
+        if function not in reached:
+            reached.add(function)
+            pending.extend(callees.get(function, {}))
+    return reached
+
+
+def _roots(raw: dict[FunctionKey, tuple], callees: dict[FunctionKey, dict[FunctionKey, float]]) -> list[FunctionKey]:
+    """Pick the functions stacks start from.
+
+    Functions without callers are roots. Under ``python -m cProfile -m <tool>`` runpy and exec call
+    each other, so every frame of the tool has a caller; each group of functions no root reaches
+    is entered at its ``<module>`` frame with the most cumulative time, or failing that the member
+    with the most cumulative time.
+
+    """
+    roots = [function for function, entry in raw.items() if not entry[4]]
+    reached = _reachable(roots, callees)
+    while unreached := [function for function in raw if function not in reached]:
+        root = max(unreached, key=lambda function: (function[2] == "<module>", raw[function][3]))
+        roots.append(root)
+        reached |= _reachable([root], callees)
+    return roots
+
+
+def collapse_stacks(stats: pstats.Stats) -> dict[str, int]:
+    """Approximate collapsed stacks from a deterministic profile's call graph.
+
+    cProfile only records caller/callee pairs, so each callee's time is attributed to its
+    callers in proportion to the cumulative time recorded on that edge. The result is suitable
+    for flamegraph tools that accept the ``frame;frame;frame count`` format. A call graph can
+    have exponentially many paths, so a callee whose share on a path is below
+    MIN_STACK_FRACTION of the profile is kept as a leaf instead of being walked further.
+
+    Args:
+        stats: The loaded profile.
+
+    Returns:
+        Mapping of semicolon-joined stack to self time in microseconds.
+
+    """
+    raw: dict[FunctionKey, tuple] = stats.stats  # type: ignore[attr-defined]
+    callees = _callees(raw)
+    roots = _roots(raw, callees)
+    minimum = MIN_STACK_FRACTION * sum(raw[root][3] for root in roots)
+    stacks: dict[str, int] = {}
+
+    def add(stack: tuple[FunctionKey, ...], seconds: float) -> None:
+        if seconds > 0:
+            key = ";".join(_format_function(frame) for frame in stack)
+            stacks[key] = stacks.get(key, 0) + round(seconds * 1_000_000)
+
+    def walk(function: FunctionKey, budget: float, path: tuple[FunctionKey, ...]) -> None:
+        stack = (*path, function)
+        children = {child: time for child, time in callees.get(function, {}).items() if child not in stack and time > 0}
+        child_total = sum(children.values())
+        scale = min(1.0, budget / child_total) if child_total else 0.0
+        add(stack, budget - child_total * scale)
+        for child, time in children.items():
+            if len(stack) >= MAX_STACK_DEPTH or time * scale < minimum:
+                add((*stack, child), time * scale)
+            else:
+                walk(child, time * scale, stack)
+
+    for root in roots:
+        walk(root, raw[root][3], ())
+    return {stack: micros for stack, micros in stacks.items() if micros > 0}
+
+
+def write_collapsed_stacks(pstats_file: Path) -> Path:
+    """Write the collapsed-stack file next to a pstats file.
+
+    Args:
+        pstats_file: The pstats file to convert.
+
+    Returns:
+        The path of the written ``.collapsed`` file.
+
+    """
+    stacks = collapse_stacks(pstats.Stats(str(pstats_file)))
+    collapsed_file = pstats_file.with_suffix(".collapsed")
+    lines = [f"{stack} {micros}" for stack, micros in sorted(stacks.items())]
+    collapsed_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return collapsed_file
+
+
+def hottest_frames(pstats_file: Path, limit: int) -> list[tuple[str, float, float]]:
+    """List the functions with the most self time in a profile.
+
+    Args:
+        pstats_file: The pstats file to read.
+        limit: The maximum number of frames to return.
+
+    Returns:
+        Tuples of (frame, self seconds, cumulative seconds), hottest first.
+
+    """
+    raw: dict[FunctionKey, tuple] = pstats.Stats(str(pstats_file)).stats  # type: ignore[attr-defined]
+    ranked = sorted(raw.items(), key=lambda item: item[1][2], reverse=True)
+    return [(_format_function(function), entry[2], entry[3]) for function, entry in ranked[:limit]]
@@ -3,9 +3,30 @@
 from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
+from invoke.exceptions import Exit
 
+from project.duration_history import DurationHistory
 from project.project_task_runner import ProjectTask, ProjectTaskRunner
+from project.remote_workers import RemoteWorkerBackend, create_snapshot_ref, worker_token
+from project.result_cache import (
+    ResultCache,
+    cache_write_token,
+    compute_input_digest,
+    create_store,
+    environment_fingerprint,
+)
 from project.tasks import deptry, mypy, pipaudit, poetry, precommit, ruff, testing, trivy, vulture, xenon
+from project.tasks import profile as profile_tasks
+from project.tool_probes import ToolProbe, probe_environment, probe_versions
+from project.trace_timeline import TraceRecorder
+from project.worktree_pool import (
+    SHARED_RESULTS_DIRECTORY,
+    WorktreePool,
+    check_command,
+    check_in_pool,
+    resolve_refs,
+    summary_lines,
+)
 
 
 @task(iterable=["skip"])
@@ -26,45 +47,313 @@ def update(context: Context, skip: list[str] | None = None) -> None:
     runner.run()
 
 
-@task(iterable=["skip"])
-def check(
-    context: Context,
-    skip: list[str] | None = None,
+FIXING_TASKS = ("precommit.check", "ruff.format", "ruff.lint")
+ALWAYS_FIXING_TASKS = ("precommit.check",)
+QUICK_TASKS = ("ruff.format", "ruff.lint", "vulture.check", "xenon.check")
+STANDARD_TASKS = (*QUICK_TASKS, "precommit.check", "mypy.check", "tests.unit", "deptry.check")
+CHECK_PRESETS: dict[str, tuple[str, ...] | None] = {"quick": QUICK_TASKS, "standard": STANDARD_TASKS, "full": None}
+CHECK_PRIORITIES = {
+    "ruff.format": 5,
+    "ruff.lint": 5,
+    "mypy.check": 4,
+    "tests.unit": 4,
+    "precommit.check": 3,
+    "tests.integration": 3,
+    "vulture.check": 2,
+    "xenon.check": 2,
+    "deptry.check": 2,
+    "pipaudit.check": 1,
+    "trivy.check": 1,
+}
+CHECK_REQUIREMENTS = {
+    "precommit.check": ("poetry", "pre-commit"),
+    "ruff.format": ("poetry", "ruff"),
+    "ruff.lint": ("poetry", "ruff"),
+    "mypy.check": ("poetry", "mypy"),
+    "vulture.check": ("poetry", "vulture"),
+    "xenon.check": ("poetry", "xenon"),
+    "tests.unit": ("poetry", "pytest", "coverage"),
+    "tests.integration": ("poetry", "pytest", "coverage"),
+    "pipaudit.check": ("poetry", "pip-audit"),
+    "deptry.check": ("poetry", "deptry"),
+    "trivy.check": ("docker",),
+}
+PROFILED_TASKS = ("mypy.check", "vulture.check", "tests.unit", "tests.integration", "pipaudit.check", "deptry.check")
+
+
+def _check_tasks(
     *,
-    apply_safe_fixes: bool = False,
-    apply_unsafe_fixes: bool = False,
-) -> None:
-    """Run all project checks.
+    preset: str,
+    apply_safe_fixes: bool,
+    apply_unsafe_fixes: bool,
+    profile: bool,
+    jobs: int = 1,
+) -> list[ProjectTask]:
+    """Build the tasks run by project.check.
+
+    When fixes are applied the fixing tasks rewrite files, so they run one after another and
+    every other task waits for them. Some pre-commit hooks (end-of-file-fixer, md-toc,
+    pretty-format-json --autofix) rewrite files even without fixes, so when tasks run concurrently
+    every other task waits for precommit.check.
 
     Args:
-        context: The invoke context.
-        skip: Optional list of task names to skip (use --skip taskname multiple times).
+        preset: The check preset naming the tasks to include, one of CHECK_PRESETS.
         apply_safe_fixes: Whether to apply safe fixes for precommit and ruff.
         apply_unsafe_fixes: Whether to apply unsafe fixes for ruff.
+        profile: Whether to profile the Python-based tools.
+        jobs: The number of tasks run at once locally.
+
+    Returns:
+        The project tasks, in their sequential run order.
+
+    Raises:
+        ValueError: If the preset is unknown.
 
     """
     tasks = [
-        ProjectTask(name="precommit.check", func=precommit.check, kwargs={"apply_safe_fixes": apply_safe_fixes}),
-        ProjectTask(name="ruff.format", func=ruff.format, kwargs={"apply_safe_fixes": apply_safe_fixes}),
+        ProjectTask(
+            name="precommit.check",
+            func=precommit.check,
+            kwargs={"apply_safe_fixes": apply_safe_fixes},
+            cacheable=True,
+        ),
+        ProjectTask(
+            name="ruff.format",
+            func=ruff.format,
+            kwargs={"apply_safe_fixes": apply_safe_fixes},
+            cacheable=True,
+        ),
         ProjectTask(
             name="ruff.lint",
             func=ruff.lint,
             kwargs={"apply_safe_fixes": apply_safe_fixes, "apply_unsafe_fixes": apply_unsafe_fixes},
+            cacheable=True,
         ),
-        ProjectTask(name="mypy.check", func=mypy.check, kwargs={}),
-        ProjectTask(name="vulture.check", func=vulture.check, kwargs={}),
-        ProjectTask(name="xenon.check", func=xenon.check, kwargs={}),
-        ProjectTask(name="tests.unit", func=testing.unit, kwargs={}),
-        ProjectTask(name="tests.integration", func=testing.integration, kwargs={}),
-        ProjectTask(name="pipaudit.check", func=pipaudit.check, kwargs={}),
-        ProjectTask(name="deptry.check", func=deptry.check, kwargs={}),
+        ProjectTask(name="mypy.check", func=mypy.check, kwargs={"profile": profile}, cacheable=True),
+        ProjectTask(name="vulture.check", func=vulture.check, kwargs={"profile": profile}, cacheable=True),
+        ProjectTask(name="xenon.check", func=xenon.check, kwargs={}, cacheable=True),
+        ProjectTask(name="tests.unit", func=testing.unit, kwargs={"profile": profile}, cacheable=True),
+        ProjectTask(
+            name="tests.integration",
+            func=testing.integration,
+            kwargs={"profile": profile},
+            cacheable=True,
+        ),
+        ProjectTask(name="pipaudit.check", func=pipaudit.check, kwargs={"profile": profile}),
+        ProjectTask(name="deptry.check", func=deptry.check, kwargs={"profile": profile}, cacheable=True),
         ProjectTask(name="trivy.check", func=trivy.check, kwargs={}),
     ]
+    tasks = _apply_preset(tasks, preset)
+    if apply_safe_fixes or apply_unsafe_fixes:
+        _order_after_fixes(tasks, FIXING_TASKS)
+    elif jobs > 1:
+        _order_after_fixes(tasks, ALWAYS_FIXING_TASKS)
+    if profile:
+        tasks.append(
+            ProjectTask(name="profile.report", func=profile_tasks.report, kwargs={}, depends_on=PROFILED_TASKS),
+        )
+    return tasks
 
-    runner = ProjectTaskRunner(context, tasks, skip)
+
+def _apply_preset(tasks: list[ProjectTask], preset: str) -> list[ProjectTask]:
+    """Keep the tasks included in a check preset and assign their priorities and required tools.
+
+    Args:
+        tasks: All check tasks.
+        preset: The preset name, one of CHECK_PRESETS.
+
+    Returns:
+        The tasks included in the preset.
+
+    Raises:
+        ValueError: If the preset is unknown.
+
+    """
+    if preset not in CHECK_PRESETS:
+        msg = f"Unknown check preset {preset!r}; expected one of {', '.join(CHECK_PRESETS)}"
+        raise ValueError(msg)
+    included = CHECK_PRESETS[preset]
+    selected = [project_task for project_task in tasks if included is None or project_task.name in included]
+    for project_task in selected:
+        project_task.priority = CHECK_PRIORITIES[project_task.name]
+        project_task.requires = CHECK_REQUIREMENTS[project_task.name]
+    return selected
+
+
+def _order_after_fixes(tasks: list[ProjectTask], fixing: tuple[str, ...]) -> None:
+    """Make each fixing task wait for the previous one and every other task wait for the last.
+
+    Args:
+        tasks: The project tasks, with the fixing tasks first.
+        fixing: The names of the tasks that rewrite files.
+
+    """
+    previous: tuple[str, ...] = ()
+    for project_task in tasks:
+        project_task.depends_on = previous
+        if project_task.name in fixing:
+            previous = (project_task.name,)
+
+
+def _result_cache(
+    context: Context, cache_remote: str | None, *, read_only: bool, probes: dict[str, ToolProbe]
+) -> ResultCache:
+    """Create the result cache for the current workspace.
+
+    Args:
+        context: The invoke context.
+        cache_remote: Optional shared cache tier, either an http(s) URL or a directory path.
+        read_only: Whether to read from the shared tier without uploading to it.
+        probes: The tool probes, whose versions become part of every cache key.
+
+    Returns:
+        The result cache keyed by the workspace input digest.
+
+    """
+    remote_store = create_store(cache_remote, token=cache_write_token()) if cache_remote else None
+    return ResultCache(
+        compute_input_digest(context),
+        remote=remote_store,
+        read_only=read_only,
+        tool_versions={**environment_fingerprint(), **probe_versions(probes)},
+    )
+
+
+def _worker_backend(
+    context: Context, workers: list[str], history: DurationHistory, *, ref: str | None, snapshot: bool
+) -> RemoteWorkerBackend:
+    """Create the backend that distributes tasks to remote workers.
+
+    Args:
+        context: The invoke context.
+        workers: The worker addresses (host:port).
+        history: The duration history used to balance tasks across workers.
+        ref: Git ref the workers should check out before running tasks.
+        snapshot: Ship a snapshot of the current working tree instead of a ref.
+
+    Returns:
+        The remote worker backend.
+
+    """
+    if snapshot:
+        ref = create_snapshot_ref(context)
+    return RemoteWorkerBackend(workers, history, ref=ref, token=worker_token())
+
+
+@task(iterable=["skip", "workers"])
+def check(  # noqa: PLR0913
+    context: Context,
+    skip: list[str] | None = None,
+    *,
+    apply_safe_fixes: bool = False,
+    apply_unsafe_fixes: bool = False,
+    workers: list[str] | None = None,
+    ref: str | None = None,
+    snapshot: bool = False,
+    cache: bool = True,
+    cache_remote: str | None = None,
+    cache_read_only: bool = False,
+    profile: bool = False,
+    jobs: int = 1,
+    preset: str = "full",
+    budget: float = 0.0,
+    trace: bool = False,
+    allow_missing_tools: bool = False,
+) -> None:
+    """Run all project checks.
+
+    Args:
+        context: The invoke context.
+        skip: Optional list of task names to skip (use --skip taskname multiple times).
+        apply_safe_fixes: Whether to apply safe fixes for precommit and ruff.
+        apply_unsafe_fixes: Whether to apply unsafe fixes for ruff.
+        workers: Optional worker addresses (host:port) to distribute tasks to (use --workers multiple times);
+            PROJECT_WORKER_TOKEN must hold the token the workers were started with.
+        ref: Git ref the workers should check out before running tasks.
+        snapshot: Ship a snapshot of the current working tree to the workers instead of a ref.
+        cache: Reuse green results of tasks whose inputs are unchanged (disabled when applying fixes or running
+            on workers, whose tree is not the local workspace).
+        cache_remote: Shared result cache tier, either an http(s) URL or a directory path; uploads to a URL
+            send PROJECT_CACHE_TOKEN.
+        cache_read_only: Read from the shared result cache without uploading results to it.
+        profile: Profile the Python-based tools and summarise the hottest frames (disables the result cache).
+        jobs: Run up to this many tasks at once locally, longest critical path first.
+        preset: The set of checks to run: quick (fast static checks), standard or full.
+        budget: Time budget in seconds, 0 for none; lower-priority checks that do not fit are deferred.
+        trace: Write a Chrome trace of the run to .quality/trace/check.json for chrome://tracing or Perfetto.
+        allow_missing_tools: Pass even if checks were skipped because their tools are unavailable.
+
+    """
+    tasks = _check_tasks(
+        preset=preset,
+        apply_safe_fixes=apply_safe_fixes,
+        apply_unsafe_fixes=apply_unsafe_fixes,
+        profile=profile,
+        jobs=jobs,
+    )
+    history = DurationHistory.load()
+    probes = probe_environment(context)
+    backend = _worker_backend(context, workers, history, ref=ref, snapshot=snapshot) if workers else None
+
+    result_cache = None
+    # The cache is keyed by the local workspace, which is not the tree workers check out
+    if cache and backend is None and not (apply_safe_fixes or apply_unsafe_fixes or profile):
+        result_cache = _result_cache(context, cache_remote, read_only=cache_read_only, probes=probes)
+
+    runner = ProjectTaskRunner(
+        context,
+        tasks,
+        skip,
+        backend=backend,
+        history=history,
+        cache=result_cache,
+        jobs=jobs,
+        budget=budget or None,
+        trace=TraceRecorder() if trace else None,
+        probes=None if backend else probes,
+        allow_missing_tools=allow_missing_tools,
+    )
     runner.run()
 
 
+@task(iterable=["ref", "skip"])
+def check_refs(
+    context: Context,
+    ref: list[str] | None = None,
+    skip: list[str] | None = None,
+    *,
+    jobs: int = 2,
+    preset: str = "full",
+) -> None:
+    """Run project.check for several git refs concurrently in a pool of reusable worktrees.
+
+    The worktrees live under .quality/worktrees and keep their git-ignored caches between runs.
+    Each ref's output is written to .quality/worktrees/logs, and one summary is printed at the end.
+
+    Args:
+        context: The invoke context.
+        ref: The git refs to check (use --ref multiple times).
+        skip: Optional list of task names to skip (use --skip taskname multiple times).
+        jobs: How many refs to check at once, which is also the number of pooled worktrees.
+        preset: The set of checks to run: quick (fast static checks), standard or full.
+
+    Raises:
+        Exit: If no ref is given, a ref is unknown or any ref fails its checks.
+
+    """
+    if not ref:
+        msg = "Pass at least one --ref to check"
+        raise Exit(msg, code=1)
+    commits = resolve_refs(context, ref)
+    command = check_command({"preset": preset, "skip": skip or []}, SHARED_RESULTS_DIRECTORY.resolve())
+    print(f"Checking {len(commits)} ref(s), {jobs} at a time")
+    results = check_in_pool(WorktreePool(context, size=jobs), commits, command, jobs=jobs)
+    print("\n".join(summary_lines(results)))
+    if not all(result.ok for result in results):
+        raise Exit(code=1)
+
+
 collection = Collection("project")
 collection.add_task(update)
 collection.add_task(check)
+collection.add_task(check_refs)
@@ -1,11 +1,33 @@
 """Task runner for orchestrating multiple project tasks with banners and skip functionality."""
 
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import AbstractContextManager, nullcontext
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Protocol
 
 from invoke.context import Context
+from invoke.exceptions import Exit, Failure
+from invoke.runners import Result
 from invoke.tasks import Task
 
+from project.duration_history import DEFAULT_ESTIMATE_SECONDS
+from project.scheduling import (
+    critical_path_priorities,
+    next_ready,
+    select_within_budget,
+    simulate_makespan,
+    unmet_dependencies,
+)
+from project.tool_probes import missing_tools
+from project.trace_timeline import recording
+
+if TYPE_CHECKING:
+    from project.duration_history import DurationHistory
+    from project.result_cache import ResultCache
+    from project.tool_probes import ToolProbe
+    from project.trace_timeline import TraceRecorder
+
 
 @dataclass
 class ProjectTask:
@@ -15,12 +37,46 @@ class ProjectTask:
         name: The display name of the task.
         func: The invoke task to execute.
         kwargs: Keyword arguments to pass to the task function.
+        cacheable: Whether a green result can be reused when the task's inputs are unchanged.
+        depends_on: Names of tasks that must finish successfully before this one starts.
+        priority: How valuable the task is when a time budget forces some tasks to be deferred.
+        requires: Names of the tools the task needs; it is skipped when a probe finds one unavailable.
 
     """
 
     name: str
     func: Task
     kwargs: dict[str, Any]
+    cacheable: bool = False
+    depends_on: tuple[str, ...] = ()
+    priority: int = 0
+    requires: tuple[str, ...] = ()
+
+
+@dataclass
+class TaskOutcome:
+    """The result of a task run by a backend.
+
+    Attributes:
+        name: The display name of the task.
+        exit_code: The task's exit code, where 0 means success.
+        duration: How long the task took in seconds.
+        worker: Where the task ran.
+
+    """
+
+    name: str
+    exit_code: int
+    duration: float
+    worker: str = "local"
+
+
+class TaskBackend(Protocol):
+    """Executes tasks somewhere other than the current process."""
+
+    def run(self, tasks: list[ProjectTask]) -> list[TaskOutcome]:
+        """Run the tasks after the tasks they depend on and return one outcome per task started."""
+        ...
 
 
 class ProjectTaskRunner:
@@ -30,16 +86,38 @@ class ProjectTaskRunner:
         context: The invoke context for running tasks.
         tasks: List of ProjectTask instances to execute.
         skip_list: List of task names to skip.
+        backend: Optional backend that runs the tasks instead of the current process.
+        history: Optional duration history updated with each task's duration.
+        cache: Optional result cache used to skip cacheable tasks whose inputs are unchanged; None
+            when a backend runs the tasks.
+        jobs: The number of tasks run at once when running locally.
+        budget: Optional time budget in seconds that the selected tasks must fit in.
+        trace: Optional recorder of the run's timeline, written when the run ends.
+        probes: Optional tool probes; tasks requiring an unavailable tool are skipped up front.
+        allow_missing_tools: Whether the run may pass with tasks skipped for unavailable tools.
         executed: List of task names that were executed.
         skipped: List of task names that were skipped.
+        cached: List of task names whose green result was reused from the cache.
+        deferred: List of task names left out to stay within the time budget.
+        failed: List of task names that failed when run by a backend or concurrently.
+        unavailable: List of task names skipped because a tool they require is unavailable.
 
     """
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         context: Context,
         tasks: list[ProjectTask],
         skip: list[str] | None = None,
+        *,
+        backend: TaskBackend | None = None,
+        history: "DurationHistory | None" = None,
+        cache: "ResultCache | None" = None,
+        jobs: int = 1,
+        budget: float | None = None,
+        trace: "TraceRecorder | None" = None,
+        probes: "dict[str, ToolProbe] | None" = None,
+        allow_missing_tools: bool = False,
     ) -> None:
         """Initialize the task runner.
 
@@ -47,23 +125,111 @@ class ProjectTaskRunner:
             context: The invoke context for running tasks.
             tasks: List of ProjectTask instances to execute.
             skip: Optional list of task names to skip.
+            backend: Optional backend that runs the tasks instead of the current process.
+            history: Optional duration history updated with each task's duration.
+            cache: Optional result cache used to skip cacheable tasks whose inputs are unchanged. It is
+                keyed by the local workspace, so it is ignored when a backend runs the tasks against
+                another tree, such as a ref or snapshot checked out by remote workers.
+            jobs: The number of tasks run at once when running locally; above one, tasks are
+                started in critical-path order as their dependencies finish.
+            budget: Optional time budget in seconds; the highest-priority tasks whose predicted
+                makespan fits are run and the rest are deferred.
+            trace: Optional recorder of the run's timeline with a span per task and per command,
+                written when the run ends.
+            probes: Optional tool probes; tasks requiring an unavailable tool are skipped before
+                anything runs instead of failing halfway through.
+            allow_missing_tools: Let the run pass with tasks skipped for unavailable tools;
+                otherwise the other tasks still run but the run fails at the end.
 
         """
         self.context = context
         self.tasks = tasks
         self.skip_list = skip or []
+        self.backend = backend
+        self.history = history
+        self.cache = None if backend is not None else cache
+        self.jobs = jobs
+        self.budget = budget
+        self.trace = trace
+        self.probes = probes
+        self.allow_missing_tools = allow_missing_tools
         self.executed: list[str] = []
         self.skipped: list[str] = []
+        self.cached: list[str] = []
+        self.deferred: list[str] = []
+        self.failed: list[str] = []
+        self.unavailable: list[str] = []
 
     def run(self) -> None:
-        """Execute all configured tasks and print summary."""
+        """Execute all configured tasks and print summary.
+
+        Raises:
+            Exit: If the backend or a concurrent run reports that any task failed, or a task was
+                skipped for an unavailable tool without allow_missing_tools.
+
+        """
+        pending = []
         for task in self.tasks:
+            missing = self._missing_tools(task)
             if task.name in self.skip_list:
                 self._skip_task(task.name)
-            else:
-                self._execute_task(task)
+            elif missing:
+                self._skip_task(task.name, f"{', '.join(missing)} unavailable")
+                self.unavailable.append(task.name)
+            elif not self._restore_from_cache(task):
+                pending.append(task)
+        if self.budget is not None:
+            pending = self._fit_budget(pending, self.budget)
+
+        try:
+            with recording(self.trace):
+                self._execute(pending)
+        finally:
+            if self.history is not None:
+                self.history.save()
+            if self.trace is not None:
+                print(f"\nTrace written to {self.trace.write()}")
 
         self._print_summary()
+        self._check_outcome()
+
+    def _check_outcome(self) -> None:
+        """Fail the run if a task failed or was skipped for an unavailable tool.
+
+        Raises:
+            Exit: If any task failed, or a task was skipped for an unavailable tool without
+                allow_missing_tools.
+
+        """
+        if self.failed:
+            raise Exit(code=1)
+        if self.unavailable and not self.allow_missing_tools:
+            msg = (
+                f"Skipped {len(self.unavailable)} task(s) whose tools are unavailable: {', '.join(self.unavailable)} "
+                "(pass --allow-missing-tools to accept)"
+            )
+            raise Exit(msg, code=1)
+
+    def _execute(self, tasks: list[ProjectTask]) -> None:
+        """Run the tasks on the backend, concurrently or one after another.
+
+        Args:
+            tasks: The tasks to run.
+
+        """
+        if self.backend is not None:
+            self._execute_on_backend(self.backend, tasks)
+        elif self.jobs > 1:
+            self._execute_concurrently(tasks)
+        else:
+            for task in tasks:
+                self._execute_task(task)
+
+    def _span(self, task: ProjectTask) -> AbstractContextManager[None]:
+        """Trace a task's span if the run is traced."""
+        if self.trace is None:
+            return nullcontext()
+        return self.trace.span(task.name, "task")
 
     def _execute_task(self, task: ProjectTask) -> None:
         """Execute a single task with banner.
@@ -73,17 +239,198 @@ class ProjectTaskRunner:
 
         """
         self._print_banner(task.name)
-        task.func(self.context, **task.kwargs)
+        start = time.perf_counter()
+        with self._span(task):
+            task.func(self.context, **task.kwargs)
+        self._record_success(task, time.perf_counter() - start)
+        self.executed.append(task.name)
+
+    def _restore_from_cache(self, task: ProjectTask) -> bool:
+        """Reuse a cached green result for a task if one exists.
+
+        Args:
+            task: The ProjectTask to look up.
+
+        Returns:
+            True if the task was satisfied from the cache.
+
+        """
+        if self.cache is None or not task.cacheable:
+            return False
+        entry = self.cache.get(task)
+        if entry is None:
+            return False
+        print(f"\n↺ Cached: {task.name} (saves {entry.duration:.1f}s)")
+        self.cached.append(task.name)
+        return True
+
+    def _record_success(self, task: ProjectTask, duration: float) -> None:
+        """Record a successful task's duration and store its result in the cache.
+
+        Args:
+            task: The ProjectTask that succeeded.
+            duration: How long the task took in seconds.
+
+        """
+        if self.history is not None:
+            self.history.record(task.name, duration)
+        if self.cache is not None and task.cacheable:
+            self.cache.put(task, duration)
+
+    def _execute_on_backend(self, backend: TaskBackend, tasks: list[ProjectTask]) -> None:
+        """Run tasks on a backend and track their outcomes.
+
+        Tasks the backend reports no outcome for were not started because a dependency failed.
+
+        Args:
+            backend: The backend to run the tasks on.
+            tasks: The tasks to run.
+
+        """
+        print(f"\n{'=' * 60}")
+        print(f"Dispatching {len(tasks)} task(s) to {type(backend).__name__}")
+        print("=" * 60)
+        outcomes = backend.run(tasks)
+        for outcome in outcomes:
+            status = "✓" if outcome.exit_code == 0 else "✗"
+            print(f"{status} {outcome.name} on {outcome.worker} ({outcome.duration:.1f}s)")
+            if outcome.exit_code == 0:
+                self.executed.append(outcome.name)
+            else:
+                self.failed.append(outcome.name)
+        reported = {outcome.name for outcome in outcomes}
+        for task in tasks:
+            if task.name not in reported:
+                self._skip_task(task.name, "a dependency failed")
+
+    def _fit_budget(self, tasks: list[ProjectTask], budget: float) -> list[ProjectTask]:
+        """Defer the lowest-priority tasks that do not fit in the time budget.
+
+        Args:
+            tasks: The tasks still to run.
+            budget: The wall time available in seconds.
+
+        Returns:
+            The tasks to run.
+
+        """
+        selected, deferred = select_within_budget(tasks, budget, self.jobs, self._estimate)
+        for task in deferred:
+            print(f"\n⏸ Deferring: {task.name} (~{self._estimate(task.name):.1f}s, budget {budget:.1f}s)")
+            self.deferred.append(task.name)
+        return selected
+
+    def _estimate(self, task_name: str) -> float:
+        """Estimate a task's duration from the history, or a flat default without one."""
+        if self.history is None:
+            return DEFAULT_ESTIMATE_SECONDS
+        return self.history.estimate(task_name)
+
+    def _execute_concurrently(self, tasks: list[ProjectTask]) -> None:
+        """Run tasks on a thread pool, starting ready tasks in critical-path order.
+
+        A failed task does not stop the others, but the tasks depending on it are not started.
+
+        Args:
+            tasks: The tasks to run.
+
+        """
+        priorities = critical_path_priorities(tasks, self._estimate)
+        predicted = simulate_makespan(tasks, self.jobs, self._estimate)
+        tasks_by_name = {task.name: task for task in tasks}
+        waiting = unmet_dependencies(tasks)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            running: dict[Future[float | None], ProjectTask] = {}
+            while waiting or running:
+                for name in next_ready(waiting, priorities)[: self.jobs - len(running)]:
+                    del waiting[name]
+                    running[executor.submit(self._run_timed, tasks_by_name[name])] = tasks_by_name[name]
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._finish_concurrent_task(running.pop(future), future.result(), waiting)
+        actual = time.perf_counter() - start
+        for name in waiting:
+            print(f"\n⊘ Skipping: {name} (a dependency failed)")
+            self.skipped.append(name)
+        print(f"\nMakespan with {self.jobs} jobs: predicted {predicted:.1f}s, actual {actual:.1f}s")
+
+    def _run_timed(self, task: ProjectTask) -> float | None:
+        """Run a task on a worker thread.
+
+        Any exception the task raises counts as a failure, so one broken task does not abort the others.
+
+        Args:
+            task: The ProjectTask to run.
+
+        Returns:
+            The task's duration in seconds, or None if it failed.
+
+        """
+        self._print_banner(task.name)
+        start = time.perf_counter()
+        try:
+            with self._span(task):
+                task.func(self.context, **task.kwargs)
+        except Failure as error:
+            self._print_output_logs(task.name, error.result)
+            return None
+        except Exit:
+            return None
+        except Exception as error:  # noqa: BLE001
+            print(f"\n✗ {task.name} raised {type(error).__name__}: {error}")
+            return None
+        return time.perf_counter() - start
+
+    def _print_output_logs(self, task_name: str, result: Result) -> None:
+        """Point at the files holding the full output of a failed command.
+
+        Args:
+            task_name: The name of the task whose command failed.
+            result: The failed command's result.
+
+        """
+        for stream in ("stdout", "stderr"):
+            log_file = getattr(result, f"{stream}_log", None)
+            if log_file is not None:
+                print(f"  {task_name}: full {stream} in {log_file}")
+
+    def _finish_concurrent_task(self, task: ProjectTask, duration: float | None, waiting: dict[str, set[str]]) -> None:
+        """Track a finished concurrent task and release the tasks waiting on it.
+
+        Args:
+            task: The ProjectTask that finished.
+            duration: Its duration in seconds, or None if it failed.
+            waiting: Pending dependencies of the tasks not yet started.
+
+        """
+        if duration is None:
+            print(f"✗ {task.name}")
+            self.failed.append(task.name)
+            return
+        print(f"✓ {task.name} ({duration:.1f}s)")
+        self._record_success(task, duration)
         self.executed.append(task.name)
+        for dependencies in waiting.values():
+            dependencies.discard(task.name)
 
-    def _skip_task(self, task_name: str) -> None:
+    def _missing_tools(self, task: ProjectTask) -> list[str]:
+        """List the tools a task requires that the probes found unavailable."""
+        if self.probes is None:
+            return []
+        return missing_tools(task.requires, self.probes)
+
+    def _skip_task(self, task_name: str, reason: str | None = None) -> None:
         """Skip a task and track it.
 
         Args:
             task_name: The name of the task to skip.
+            reason: Optional reason shown next to the task name.
 
         """
-        print(f"\n⊘ Skipping: {task_name}")
+        print(f"\n⊘ Skipping: {task_name}" + (f" ({reason})" if reason else ""))
         self.skipped.append(task_name)
 
     def _print_banner(self, task_name: str) -> None:
@@ -103,13 +450,18 @@ class ProjectTaskRunner:
         print("SUMMARY")
         print("=" * 60)
         print(f"✓ Completed: {len(self.executed)} task(s)")
-        if self.executed:
-            for task_name in self.executed:
-                print(f"  - {task_name}")
-
-        if self.skipped:
-            print(f"\n⊘ Skipped: {len(self.skipped)} task(s)")
-            for task_name in self.skipped:
-                print(f"  - {task_name}")
+        for task_name in self.executed:
+            print(f"  - {task_name}")
+
+        for heading, task_names in (
+            ("↺ Cached", self.cached),
+            ("⏸ Deferred", self.deferred),
+            ("⊘ Skipped", self.skipped),
+            ("✗ Failed", self.failed),
+        ):
+            if task_names:
+                print(f"\n{heading}: {len(task_names)} task(s)")
+                for task_name in task_names:
+                    print(f"  - {task_name}")
 
         print("=" * 60)
@@ -0,0 +1,274 @@
+"""Pytest plugin providing a ``benchmark`` fixture and baseline comparison of its results.
+
+tests/conftest.py registers the plugin. A benchmark test hands the fixture a callable that
+processes ``size`` inputs; the callable is run ``--benchmark-warmup`` times untimed and then
+``--benchmark-rounds`` times timed. Each timed round is one latency sample, from which the 50th,
+90th and 99th percentiles and the throughput in inputs per second at the median are derived.
+Runs that pass ``--benchmark-report`` write the results to that JSON file, keyed by node id, and
+every run lists them in the terminal summary.
+
+The tests.benchmark task compares a report with the baseline saved under
+BENCHMARK_RESULTS_DIRECTORY. A benchmark regresses when its median latency is more than the
+tolerance percentage above the baseline's; benchmarks missing from either side are reported but
+never fail the comparison.
+"""
+
+import json
+import math
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from project.utils import ensure_directory
+
+BENCHMARK_RESULTS_DIRECTORY = Path(".quality/benchmarks")
+BENCHMARK_REPORT_PATH = BENCHMARK_RESULTS_DIRECTORY / "latest.json"
+BENCHMARK_BASELINE_PATH = BENCHMARK_RESULTS_DIRECTORY / "baseline.json"
+DEFAULT_ROUNDS = 10
+DEFAULT_WARMUP = 1
+DEFAULT_TOLERANCE = 20.0
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of some samples.
+
+    Args:
+        samples: The samples; at least one.
+        percent: The percentile, from 0 to 100.
+
+    Returns:
+        The smallest sample that at least ``percent`` percent of the samples do not exceed.
+
+    """
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class BenchmarkResult:
+    """The latency samples of one benchmark.
+
+    Attributes:
+        name: The benchmark's pytest node id.
+        size: How many inputs each round processes.
+        samples: The duration of each timed round in seconds.
+
+    """
+
+    name: str
+    size: int
+    samples: list[float]
+
+    @property
+    def throughput(self) -> float:
+        """Return the inputs processed per second at the median latency."""
+        median = percentile(self.samples, 50)
+        return self.size / median if median else math.inf
+
+    def summary(self) -> dict[str, float]:
+        """Summarise the samples for the report.
+
+        Returns:
+            The size, the number of rounds, each latency percentile and the throughput.
+
+        """
+        latencies = {f"p{percent}": percentile(self.samples, percent) for percent in PERCENTILES}
+        return {"size": self.size, "rounds": len(self.samples), **latencies, "throughput": self.throughput}
+
+
+class BenchmarkRecorder:
+    """Collects the results of a session's benchmarks.
+
+    Attributes:
+        report_path: The JSON file the results are written to, or None to only list them.
+        rounds: How many timed rounds each benchmark makes.
+        warmup: How many untimed rounds each benchmark makes first.
+        results: The results so far, keyed by node id.
+
+    """
+
+    def __init__(self, report_path: str | Path | None, *, rounds: int, warmup: int) -> None:
+        """Initialize the recorder.
+
+        Args:
+            report_path: The JSON file the results are written to, or None to only list them.
+            rounds: How many timed rounds each benchmark makes.
+            warmup: How many untimed rounds each benchmark makes first.
+
+        """
+        self.report_path = None if report_path is None else Path(report_path)
+        self.rounds = rounds
+        self.warmup = warmup
+        self.results: dict[str, BenchmarkResult] = {}
+
+    def measure(self, name: str, run: Callable[[], object], size: int) -> BenchmarkResult:
+        """Time a callable and record the result.
+
+        The clock is bound at import so tests that patch ``time.perf_counter`` do not affect it.
+
+        Args:
+            name: The benchmark's node id.
+            run: Processes ``size`` inputs once.
+            size: How many inputs each call of run processes.
+
+        Returns:
+            The recorded result.
+
+        """
+        for _ in range(self.warmup):
+            run()
+        samples = []
+        for _ in range(self.rounds):
+            start = perf_counter()
+            run()
+            samples.append(perf_counter() - start)
+        self.results[name] = BenchmarkResult(name=name, size=size, samples=samples)
+        return self.results[name]
+
+    def pytest_sessionfinish(self) -> None:
+        """Write the results when a report file was requested."""
+        if self.report_path is None:
+            return
+        ensure_directory(self.report_path.parent)
+        report = {name: result.summary() for name, result in sorted(self.results.items())}
+        self.report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        """List each benchmark's latency percentiles and throughput."""
+        if not self.results:
+            return
+        terminalreporter.write_sep("-", "benchmarks")
+        terminalreporter.write_line(f"{'p50 (ms)':>10} {'p90 (ms)':>10} {'p99 (ms)':>10} {'inputs/s':>14}  benchmark")
+        for name, result in sorted(self.results.items()):
+            p50, p90, p99 = (percentile(result.samples, percent) * 1000 for percent in PERCENTILES)
+            terminalreporter.write_line(f"{p50:10.3f} {p90:10.3f} {p99:10.3f} {result.throughput:14,.0f}  {name}")
+        if self.report_path is not None:
+            terminalreporter.write_line(f"Benchmark results written to {self.report_path}")
+
+
+RECORDER_KEY = pytest.StashKey[BenchmarkRecorder]()
+
+
+@pytest.fixture
+def benchmark(request: pytest.FixtureRequest) -> Callable[..., BenchmarkResult]:
+    """Measure a callable as this test's benchmark.
+
+    Call the fixture once per test as ``benchmark(run, size=n)``, where ``run`` processes ``n``
+    inputs.
+
+    Args:
+        request: The pytest fixture request.
+
+    Returns:
+        A function that times the callable and returns its BenchmarkResult.
+
+    """
+    recorder = request.config.stash[RECORDER_KEY]
+
+    def measure(run: Callable[[], object], *, size: int) -> BenchmarkResult:
+        return recorder.measure(request.node.nodeid, run, size)
+
+    return measure
+
+
+@dataclass(frozen=True)
+class Regression:
+    """A benchmark whose median latency exceeds its baseline by more than the tolerance.
+
+    Attributes:
+        name: The benchmark's node id.
+        baseline: The baseline median latency in seconds.
+        current: The current median latency in seconds.
+
+    """
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def slowdown(self) -> float:
+        """Return how much slower the current median is, as a percentage of the baseline."""
+        return (self.current / self.baseline - 1) * 100 if self.baseline else 0.0
+
+
+def load_results(path: str | Path) -> dict[str, dict[str, float]]:
+    """Load a benchmark report.
+
+    Args:
+        path: The report file written by ``--benchmark-report``.
+
+    Returns:
+        Mapping of benchmark node id to its summary.
+
+    """
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def find_regressions(
+    current: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float
+) -> list[Regression]:
+    """Compare the median latency of every benchmark present in both reports.
+
+    Args:
+        current: The current report.
+        baseline: The baseline report.
+        tolerance: How many percent slower than the baseline a benchmark may get.
+
+    Returns:
+        The benchmarks that regressed past the tolerance, ordered by name.
+
+    """
+    compared = [
+        Regression(name=name, baseline=baseline[name]["p50"], current=summary["p50"])
+        for name, summary in sorted(current.items())
+        if name in baseline
+    ]
+    return [regression for regression in compared if regression.slowdown > tolerance]
+
+
+def comparison_lines(current: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]) -> list[str]:
+    """Format how every benchmark's median latency changed against the baseline.
+
+    Args:
+        current: The current report.
+        baseline: The baseline report.
+
+    Returns:
+        One line per benchmark, including those only present in one of the reports.
+
+    """
+    lines = []
+    for name in sorted(current.keys() | baseline.keys()):
+        if name not in baseline:
+            lines.append(f"{'new':>8}  {current[name]['p50'] * 1000:10.3f} ms  {name}")
+        elif name not in current:
+            lines.append(f"{'missing':>8}  {'':>13}  {name}")
+        else:
+            change = Regression(name=name, baseline=baseline[name]["p50"], current=current[name]["p50"]).slowdown
+            lines.append(f"{change:+7.1f}%  {current[name]['p50'] * 1000:10.3f} ms  {name}")
+    return lines
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the benchmark options."""
+    group = parser.getgroup("benchmarks", "micro-benchmarks")
+    group.addoption("--benchmark-report", default=None, help="Write the benchmark results to this JSON file.")
+    group.addoption("--benchmark-rounds", type=int, default=DEFAULT_ROUNDS, help="Timed rounds per benchmark.")
+    group.addoption("--benchmark-warmup", type=int, default=DEFAULT_WARMUP, help="Untimed rounds per benchmark.")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the recorder the benchmark fixture reports to."""
+    recorder = BenchmarkRecorder(
+        config.getoption("benchmark_report"),
+        rounds=config.getoption("benchmark_rounds"),
+        warmup=config.getoption("benchmark_warmup"),
+    )
+    config.stash[RECORDER_KEY] = recorder
+    config.pluginmanager.register(recorder, "benchmark-recorder")
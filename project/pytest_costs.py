@@ -0,0 +1,328 @@
+"""Pytest plugin that records per-test wall time and memory peaks and enforces budgets.
+
+tests/conftest.py registers the plugin, and it stays inactive until a run passes
+``--cost-report``, as the tests.unit and tests.integration tasks do when asked for costs or
+budgets. While active, each test's call phase is timed. Tracing allocations makes a run roughly
+twice as slow, so memory peaks above the memory live when a test started are only recorded with
+``--cost-memory``, or for the tests that have a memory budget. The costs are written to the report
+file, the slowest and most memory-hungry tests are listed in the terminal summary, and ``slow``
+markers are suggested from the measured times. A test that passes but exceeds its budget fails.
+A test's budget comes from its own ``@pytest.mark.budget(seconds=..., memory_mib=...)`` marker,
+else from the first matching ``--marker-budget``, else from ``--time-budget`` and
+``--memory-budget``.
+"""
+
+import argparse
+import json
+import tracemalloc
+from collections.abc import Generator
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+import pytest
+
+from project.utils import ensure_directory
+
+COST_REPORTS_DIRECTORY = Path(".quality/pytest/costs")
+BUDGET_MARKER = "budget"
+SLOW_MARKER = "slow"
+DEFAULT_TOP = 5
+DEFAULT_SLOW_SECONDS = 1.0
+BYTES_PER_MIB = 1024 * 1024
+
+
+@dataclass
+class CostRecord:
+    """The measured cost of one test's call phase.
+
+    Attributes:
+        nodeid: The pytest node id.
+        seconds: The wall time in seconds.
+        peak_bytes: The tracemalloc peak above the memory traced when the test started, or None if
+            memory was not traced.
+        markers: The names of the markers applied to the test.
+
+    """
+
+    nodeid: str
+    seconds: float
+    peak_bytes: int | None
+    markers: list[str] = field(default_factory=list)
+
+    @property
+    def peak_mib(self) -> float | None:
+        """Return the memory peak in MiB, or None if memory was not traced."""
+        return None if self.peak_bytes is None else self.peak_bytes / BYTES_PER_MIB
+
+
+@dataclass(frozen=True)
+class Budget:
+    """The most a test may cost before it fails.
+
+    Attributes:
+        seconds: The wall time limit, or None for no limit.
+        memory_mib: The memory peak limit in MiB, or None for no limit.
+
+    """
+
+    seconds: float | None = None
+    memory_mib: float | None = None
+
+    def violations(self, cost: CostRecord) -> list[str]:
+        """Describe how a test's cost exceeds this budget.
+
+        Args:
+            cost: The measured cost.
+
+        Returns:
+            One message per exceeded limit; empty if the test is within budget.
+
+        """
+        messages = []
+        if self.seconds is not None and cost.seconds > self.seconds:
+            messages.append(f"took {cost.seconds:.2f}s, budget {self.seconds:g}s")
+        if self.memory_mib is not None and cost.peak_mib is not None and cost.peak_mib > self.memory_mib:
+            messages.append(f"peaked at {cost.peak_mib:.1f} MiB, budget {self.memory_mib:g} MiB")
+        return messages
+
+
+def _optional_float(value: str) -> float | None:
+    """Parse a budget limit, where an empty string means no limit."""
+    return float(value) if value else None
+
+
+def parse_marker_budget(value: str) -> tuple[str, Budget]:
+    """Parse a ``MARKER=SECONDS[:MIB]`` budget, e.g. ``integration=5`` or ``slow=30:512``.
+
+    Args:
+        value: The option value; either limit may be left empty.
+
+    Returns:
+        The marker name and its budget.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is malformed.
+
+    """
+    marker, _, limits = value.partition("=")
+    seconds, _, memory_mib = limits.partition(":")
+    try:
+        budget = Budget(seconds=_optional_float(seconds), memory_mib=_optional_float(memory_mib))
+    except ValueError:
+        budget = None
+    if not marker or budget is None:
+        msg = f"expected MARKER=SECONDS[:MIB], got {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+    return marker, budget
+
+
+def slow_marker_suggestions(costs: list[CostRecord], slow_seconds: float) -> list[str]:
+    """Suggest adding or removing ``slow`` markers based on measured times.
+
+    Args:
+        costs: The measured costs.
+        slow_seconds: The wall time from which a test counts as slow.
+
+    Returns:
+        One suggestion per test whose marker disagrees with its measured time.
+
+    """
+    suggestions = []
+    for cost in sorted(costs, key=lambda cost: cost.nodeid):
+        marked = SLOW_MARKER in cost.markers
+        if not marked and cost.seconds >= slow_seconds:
+            suggestions.append(f"add @pytest.mark.slow to {cost.nodeid} ({cost.seconds:.2f}s)")
+        elif marked and cost.seconds < slow_seconds:
+            suggestions.append(f"remove @pytest.mark.slow from {cost.nodeid} ({cost.seconds:.2f}s)")
+    return suggestions
+
+
+class CostRecorder:
+    """Records test costs for a session and fails tests that exceed their budget.
+
+    Attributes:
+        report_path: The JSON file the costs are written to.
+        default_budget: The budget of tests without a budget marker or marker budget.
+        marker_budgets: Budgets for tests carrying each marker.
+        top: How many of the slowest and most memory-hungry tests to list.
+        slow_seconds: The wall time from which a test counts as slow.
+        memory: Record every test's memory peak, not just those of tests with a memory budget.
+        costs: The costs recorded so far, keyed by node id.
+
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        report_path: str | Path,
+        *,
+        default_budget: Budget,
+        marker_budgets: dict[str, Budget],
+        top: int = DEFAULT_TOP,
+        slow_seconds: float = DEFAULT_SLOW_SECONDS,
+        memory: bool = False,
+    ) -> None:
+        """Initialize the recorder.
+
+        Args:
+            report_path: The JSON file the costs are written to.
+            default_budget: The budget of tests without a budget marker or marker budget.
+            marker_budgets: Budgets for tests carrying each marker.
+            top: How many of the slowest and most memory-hungry tests to list.
+            slow_seconds: The wall time from which a test counts as slow.
+            memory: Record every test's memory peak, not just those of tests with a memory budget.
+
+        """
+        self.report_path = Path(report_path)
+        self.default_budget = default_budget
+        self.marker_budgets = marker_budgets
+        self.top = top
+        self.slow_seconds = slow_seconds
+        self.memory = memory
+        self.costs: dict[str, CostRecord] = {}
+        self._started_tracing = False
+
+    def budget_for(self, item: pytest.Item) -> Budget:
+        """Return the budget that applies to a test.
+
+        Args:
+            item: The test item.
+
+        Returns:
+            The test's own budget marker, else the first marker budget it matches, else the default.
+
+        """
+        own = item.get_closest_marker(BUDGET_MARKER)
+        if own is not None:
+            return Budget(**own.kwargs)
+        markers = {marker.name for marker in item.iter_markers()}
+        return next((budget for name, budget in self.marker_budgets.items() if name in markers), self.default_budget)
+
+    def pytest_sessionstart(self) -> None:
+        """Start tracing allocations for the session if every memory peak is recorded."""
+        if self.memory:
+            self._start_tracing()
+
+    def _start_tracing(self) -> None:
+        """Start tracing allocations unless something else already does."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def _stop_tracing(self) -> None:
+        """Stop tracing allocations if this recorder started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Generator[None, object, object]:
+        """Measure a test's call phase and fail it if it passed but exceeded its budget.
+
+        Allocations are traced during the session with ``--cost-memory``, and otherwise only while
+        a test with a memory budget runs. The clock is bound at import so tests that patch
+        ``time.perf_counter`` do not affect it.
+        """
+        budget = self.budget_for(item)
+        traced = self.memory or budget.memory_mib is not None
+        if traced:
+            self._start_tracing()
+            tracemalloc.reset_peak()
+        traced_at_start = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        try:
+            result = yield
+        finally:
+            cost = CostRecord(
+                nodeid=item.nodeid,
+                seconds=perf_counter() - start,
+                peak_bytes=max(tracemalloc.get_traced_memory()[1] - traced_at_start, 0) if traced else None,
+                markers=sorted({marker.name for marker in item.iter_markers()}),
+            )
+            self.costs[item.nodeid] = cost
+            if not self.memory:
+                self._stop_tracing()
+        violations = budget.violations(cost)
+        if violations:
+            pytest.fail(f"Over budget: {'; '.join(violations)}", pytrace=False)
+        return result
+
+    def pytest_sessionfinish(self) -> None:
+        """Stop tracing allocations and write the cost report."""
+        self._stop_tracing()
+        ensure_directory(self.report_path.parent)
+        report = [asdict(cost) for _, cost in sorted(self.costs.items())]
+        self.report_path.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    def summary_lines(self) -> dict[str, list[str]]:
+        """Format the terminal summary.
+
+        Returns:
+            Mapping of section title to its lines; sections without lines are left out.
+
+        """
+        costs = list(self.costs.values())
+        slowest = sorted(costs, key=lambda cost: cost.seconds, reverse=True)[: self.top]
+        traced = [cost for cost in costs if cost.peak_bytes is not None]
+        hungriest = sorted(traced, key=lambda cost: cost.peak_bytes or 0, reverse=True)[: self.top]
+        sections = {
+            f"{len(slowest)} slowest tests": [f"{cost.seconds:8.2f}s  {cost.nodeid}" for cost in slowest],
+            f"{len(hungriest)} most memory-hungry tests": [
+                f"{cost.peak_mib or 0.0:8.1f} MiB  {cost.nodeid}" for cost in hungriest
+            ],
+            "slow marker suggestions": slow_marker_suggestions(costs, self.slow_seconds),
+        }
+        return {title: lines for title, lines in sections.items() if lines}
+
+    def pytest_terminal_summary(self, terminalreporter: pytest.TerminalReporter) -> None:
+        """List the costliest tests and slow marker suggestions after the run."""
+        for title, lines in self.summary_lines().items():
+            terminalreporter.write_sep("-", title)
+            for line in lines:
+                terminalreporter.write_line(line)
+        terminalreporter.write_line(f"Test costs written to {self.report_path}")
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Register the cost recording and budget options."""
+    group = parser.getgroup("costs", "per-test time and memory costs")
+    group.addoption("--cost-report", default=None, help="Record test costs and write them to this JSON file.")
+    group.addoption(
+        "--cost-memory",
+        action="store_true",
+        default=False,
+        help="Also record every test's memory peak; tracing allocations slows the run down.",
+    )
+    group.addoption("--cost-top", type=int, default=DEFAULT_TOP, help="How many of the costliest tests to list.")
+    group.addoption("--time-budget", type=float, default=None, help="Fail tests taking longer than this many seconds.")
+    group.addoption("--memory-budget", type=float, default=None, help="Fail tests peaking above this many MiB.")
+    group.addoption(
+        "--marker-budget",
+        action="append",
+        type=parse_marker_budget,
+        default=[],
+        help="Budget for tests with a marker, as MARKER=SECONDS[:MIB]; may be repeated.",
+    )
+    group.addoption(
+        "--slow-threshold",
+        type=float,
+        default=DEFAULT_SLOW_SECONDS,
+        help="Suggest slow markers for tests taking at least this many seconds.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Register the budget marker and activate the recorder when a cost report is requested."""
+    config.addinivalue_line("markers", f"{BUDGET_MARKER}(seconds, memory_mib): per-test time and memory budget")
+    report_path = config.getoption("cost_report")
+    if report_path is None:
+        return
+    recorder = CostRecorder(
+        report_path,
+        default_budget=Budget(seconds=config.getoption("time_budget"), memory_mib=config.getoption("memory_budget")),
+        marker_budgets=dict(config.getoption("marker_budget")),
+        top=config.getoption("cost_top"),
+        slow_seconds=config.getoption("slow_threshold"),
+        memory=config.getoption("cost_memory"),
+    )
+    config.pluginmanager.register(recorder, "cost-recorder")
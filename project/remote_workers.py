@@ -0,0 +1,488 @@
+"""Remote worker backend for running project tasks on other processes or machines.
+
+A coordinator ships each ProjectTask to a worker as a single JSON line over TCP. The worker
+runs the task with invoke, optionally inside a temporary git worktree for a given ref, and
+streams JSON lines back: one ``log`` event per output line followed by a final ``exit`` event.
+Tasks are dispatched in waves that respect ProjectTask.depends_on, so fixers finish before the
+checks that read the files they rewrite, and tasks whose dependencies failed are not dispatched.
+
+Workers run commands on request, so they only accept the tasks of project.check listed in
+WORKER_TASKS, with their known flags, from coordinators that send the shared token both sides
+read from WORKER_TOKEN_VARIABLE. The token is sent in clear text; keep workers on a trusted network.
+"""
+
+import hmac
+import json
+import os
+import re
+import socket
+import socketserver
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from io import BufferedIOBase
+from pathlib import Path
+from typing import IO, Any
+
+from invoke.context import Context
+
+from project.duration_history import DurationHistory
+from project.project_task_runner import ProjectTask, TaskOutcome
+from project.scheduling import unmet_dependencies
+
+DEFAULT_WORKER_HOST = "127.0.0.1"
+DEFAULT_WORKER_PORT = 8765
+TASK_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+REF_PATTERN = re.compile(r"^[\w./~^@{}+][\w./~^@{}+-]*$")
+WORKER_ERROR_EXIT_CODE = 255
+DEFAULT_WORKER_TIMEOUT_SECONDS = 900.0
+WORKER_TOKEN_VARIABLE = "PROJECT_WORKER_TOKEN"  # noqa: S105
+WORKER_TASKS: dict[str, frozenset[str]] = {
+    "precommit.check": frozenset({"apply_safe_fixes"}),
+    "ruff.format": frozenset({"apply_safe_fixes"}),
+    "ruff.lint": frozenset({"apply_safe_fixes", "apply_unsafe_fixes"}),
+    "mypy.check": frozenset({"profile"}),
+    "vulture.check": frozenset({"profile"}),
+    "xenon.check": frozenset(),
+    "tests.unit": frozenset({"profile"}),
+    "tests.integration": frozenset({"profile"}),
+    "pipaudit.check": frozenset({"profile"}),
+    "deptry.check": frozenset({"profile"}),
+    "trivy.check": frozenset(),
+    "profile.report": frozenset(),
+}
+
+
+def worker_token() -> str:
+    """Return the token shared by coordinators and workers.
+
+    Returns:
+        The value of WORKER_TOKEN_VARIABLE.
+
+    Raises:
+        ValueError: If the variable is unset or empty.
+
+    """
+    token = os.environ.get(WORKER_TOKEN_VARIABLE, "")
+    if not token:
+        msg = f"Set {WORKER_TOKEN_VARIABLE} to the token shared by the coordinator and its workers"
+        raise ValueError(msg)
+    return token
+
+
+@dataclass
+class TaskRequest:
+    """A task shipped from the coordinator to a worker.
+
+    Attributes:
+        name: The invoke task name, e.g. ``mypy.check``.
+        kwargs: Keyword arguments for the task, converted to command-line flags by the worker.
+        ref: Optional git ref or snapshot commit to run the task against.
+        token: The token shared by the coordinator and its workers.
+
+    """
+
+    name: str
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    ref: str | None = None
+    token: str = ""
+
+    def to_line(self) -> bytes:
+        """Serialize the request as a JSON line."""
+        return json.dumps(asdict(self)).encode("utf-8") + b"\n"
+
+    @classmethod
+    def from_line(cls, line: bytes) -> "TaskRequest":
+        """Deserialize a request from a JSON line.
+
+        Only the tasks in WORKER_TASKS are accepted, with their known flags set to booleans.
+
+        Raises:
+            ValueError: If the line is not a valid request.
+
+        """
+        payload = json.loads(line)
+        if not isinstance(payload, dict):
+            payload = {}
+        name = payload.get("name")
+        if not isinstance(name, str) or not TASK_NAME_PATTERN.match(name) or name not in WORKER_TASKS:
+            msg = f"Invalid task name: {name!r}"
+            raise ValueError(msg)
+        kwargs = _validated_kwargs(name, payload.get("kwargs") or {})
+        ref = payload.get("ref")
+        if ref is not None and (not isinstance(ref, str) or not REF_PATTERN.match(ref)):
+            msg = f"Invalid ref: {ref!r}"
+            raise ValueError(msg)
+        return cls(name=name, kwargs=kwargs, ref=ref, token=str(payload.get("token") or ""))
+
+
+def _validated_kwargs(name: str, kwargs: object) -> dict[str, bool]:
+    """Check that a request only sets the flags its task accepts on a worker.
+
+    Raises:
+        ValueError: If an argument is unknown or is not a boolean flag.
+
+    """
+    if not isinstance(kwargs, dict) or not set(kwargs) <= WORKER_TASKS[name]:
+        msg = f"Invalid arguments for {name}: {kwargs!r}"
+        raise ValueError(msg)
+    if not all(isinstance(value, bool) for value in kwargs.values()):
+        msg = f"Arguments for {name} must be flags: {kwargs!r}"
+        raise ValueError(msg)
+    return kwargs
+
+
+def build_invoke_argv(name: str, kwargs: dict[str, Any]) -> list[str]:
+    """Build the invoke command line for a task and its keyword arguments.
+
+    Args:
+        name: The invoke task name.
+        kwargs: Keyword arguments; true booleans become flags and lists become repeated options.
+
+    Returns:
+        The argument vector to execute.
+
+    """
+    argv = [sys.executable, "-m", "invoke", name]
+    for key, value in kwargs.items():
+        flag = f"--{key.replace('_', '-')}"
+        if isinstance(value, bool):
+            if value:
+                argv.append(flag)
+        elif isinstance(value, list | tuple):
+            for item in value:
+                argv.extend([flag, str(item)])
+        elif value is not None:
+            argv.extend([flag, str(value)])
+    return argv
+
+
+def plan_assignments(
+    tasks: list[ProjectTask],
+    workers: list[str],
+    history: DurationHistory,
+) -> dict[str, list[ProjectTask]]:
+    """Assign tasks to workers, longest expected task first, onto the least loaded worker.
+
+    Args:
+        tasks: The tasks to distribute.
+        workers: The worker addresses.
+        history: Duration history used to estimate each task's cost.
+
+    Returns:
+        Mapping of worker address to the tasks it should run, in order.
+
+    """
+    assignments: dict[str, list[ProjectTask]] = {worker: [] for worker in workers}
+    load = dict.fromkeys(workers, 0.0)
+    for task in sorted(tasks, key=lambda item: history.estimate(item.name), reverse=True):
+        worker = min(workers, key=lambda address: load[address])
+        assignments[worker].append(task)
+        load[worker] += history.estimate(task.name)
+    return assignments
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """Split a ``host:port`` worker address.
+
+    Args:
+        address: The worker address; the port defaults to DEFAULT_WORKER_PORT.
+
+    Returns:
+        A (host, port) tuple.
+
+    """
+    host, _, port = address.rpartition(":")
+    if not host:
+        return address, DEFAULT_WORKER_PORT
+    return host, int(port)
+
+
+class RemoteWorkerBackend:
+    """Runs project tasks on remote workers, one queue per worker.
+
+    Attributes:
+        workers: Worker addresses in ``host:port`` form.
+        history: Duration history used for load balancing and updated with measured durations.
+        ref: Optional git ref each worker checks out before running its tasks.
+        token: The token shared with the workers.
+        timeout: Socket timeout in seconds while waiting for worker output.
+
+    """
+
+    def __init__(
+        self,
+        workers: list[str],
+        history: DurationHistory | None = None,
+        ref: str | None = None,
+        *,
+        token: str,
+        timeout: float = DEFAULT_WORKER_TIMEOUT_SECONDS,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            workers: Worker addresses in ``host:port`` form.
+            history: Optional duration history; an empty in-memory history is used if omitted.
+            ref: Optional git ref each worker checks out before running its tasks.
+            token: The token shared with the workers.
+            timeout: How many seconds a worker may stay silent before its task counts as failed.
+
+        """
+        if not workers:
+            msg = "At least one worker address is required"
+            raise ValueError(msg)
+        self.workers = workers
+        self.history = history or DurationHistory()
+        self.ref = ref
+        self.token = token
+        self.timeout = timeout
+
+    def run(self, tasks: list[ProjectTask]) -> list[TaskOutcome]:
+        """Run the tasks across the workers in dependency order and wait for all of them to finish.
+
+        Each wave holds the tasks whose dependencies have all succeeded and is balanced across the
+        workers; the next wave starts once it finishes.
+
+        Args:
+            tasks: The tasks to run.
+
+        Returns:
+            One outcome per task that was run; tasks whose dependencies failed are left out.
+
+        """
+        waiting = unmet_dependencies(tasks)
+        outcomes: list[TaskOutcome] = []
+        while wave := [task for task in tasks if waiting.get(task.name) == set()]:
+            for task in wave:
+                del waiting[task.name]
+            wave_outcomes = self._run_wave(wave)
+            outcomes.extend(wave_outcomes)
+            succeeded = {outcome.name for outcome in wave_outcomes if outcome.exit_code == 0}
+            for dependencies in waiting.values():
+                dependencies.difference_update(succeeded)
+        return outcomes
+
+    def _run_wave(self, tasks: list[ProjectTask]) -> list[TaskOutcome]:
+        """Run tasks that do not depend on each other across the workers."""
+        assignments = plan_assignments(tasks, self.workers, self.history)
+        with ThreadPoolExecutor(max_workers=len(self.workers)) as executor:
+            futures = [
+                executor.submit(self._run_queue, worker, queue) for worker, queue in assignments.items() if queue
+            ]
+            return [outcome for future in futures for outcome in future.result()]
+
+    def _run_queue(self, worker: str, queue: list[ProjectTask]) -> list[TaskOutcome]:
+        """Run a worker's tasks one after another."""
+        return [self._run_on_worker(worker, task) for task in queue]
+
+    def _run_on_worker(self, worker: str, task: ProjectTask) -> TaskOutcome:
+        """Ship a single task to a worker, streaming its output to stdout.
+
+        Args:
+            worker: The worker address.
+            task: The task to run.
+
+        Returns:
+            The task outcome reported by the worker.
+
+        """
+        request = TaskRequest(name=task.name, kwargs=task.kwargs, ref=self.ref, token=self.token)
+        start = time.perf_counter()
+        exit_code = WORKER_ERROR_EXIT_CODE
+        try:
+            with socket.create_connection(parse_address(worker), timeout=self.timeout) as connection:
+                connection.sendall(request.to_line())
+                with connection.makefile("rb") as stream:
+                    exit_code = self._consume_events(task.name, stream)
+        except OSError as error:
+            print(f"[{task.name}] worker {worker} failed: {error}")
+        duration = time.perf_counter() - start
+        if exit_code == 0:
+            self.history.record(task.name, duration)
+        return TaskOutcome(name=task.name, exit_code=exit_code, duration=duration, worker=worker)
+
+    @staticmethod
+    def _consume_events(task_name: str, stream: IO[bytes]) -> int:
+        """Print log events from a worker and return the reported exit code.
+
+        A malformed event, or a stream that ends without an exit event, counts as a worker failure.
+
+        """
+        for raw in stream:
+            try:
+                event = json.loads(raw)
+            except json.JSONDecodeError as error:
+                print(f"[{task_name}] malformed event from worker: {error}")
+                return WORKER_ERROR_EXIT_CODE
+            kind = event.get("event") if isinstance(event, dict) else None
+            if kind == "log":
+                print(f"[{task_name}] {event.get('line', '')}")
+            elif kind == "exit":
+                return _exit_code(task_name, event)
+            else:
+                print(f"[{task_name}] malformed event from worker: {raw!r}")
+                return WORKER_ERROR_EXIT_CODE
+        print(f"[{task_name}] worker closed the connection without an exit event")
+        return WORKER_ERROR_EXIT_CODE
+
+
+def _exit_code(task_name: str, event: dict[str, Any]) -> int:
+    """Return the exit code of an exit event, or WORKER_ERROR_EXIT_CODE if it has none."""
+    code = event.get("code")
+    if isinstance(code, int) and not isinstance(code, bool):
+        return code
+    print(f"[{task_name}] malformed exit event from worker: {event!r}")
+    return WORKER_ERROR_EXIT_CODE
+
+
+@contextmanager
+def checkout_workspace(workspace: Path, ref: str | None) -> Iterator[Path]:
+    """Provide a directory containing the requested ref.
+
+    Args:
+        workspace: The worker's repository checkout.
+        ref: Optional git ref; without one the workspace itself is used.
+
+    Yields:
+        The directory to run the task in.
+
+    """
+    if not ref:
+        yield workspace
+        return
+    with tempfile.TemporaryDirectory(prefix="worker-") as temp_dir:
+        worktree = Path(temp_dir) / "worktree"
+        subprocess.run(  # noqa: S603
+            ["git", "-C", str(workspace), "worktree", "add", "--detach", str(worktree), ref],  # noqa: S607
+            check=True,
+            capture_output=True,
+        )
+        try:
+            yield worktree
+        finally:
+            subprocess.run(  # noqa: S603
+                ["git", "-C", str(workspace), "worktree", "remove", "--force", str(worktree)],  # noqa: S607
+                check=False,
+                capture_output=True,
+            )
+
+
+def _send_event(wfile: BufferedIOBase, **event: Any) -> None:  # noqa: ANN401
+    """Write a single JSON event line to the coordinator."""
+    wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+    wfile.flush()
+
+
+def _reject(wfile: BufferedIOBase, reason: str) -> None:
+    """Answer a request the worker will not run with an error exit code."""
+    _send_event(wfile, event="log", line=f"Rejected request: {reason}")
+    _send_event(wfile, event="exit", code=WORKER_ERROR_EXIT_CODE)
+
+
+def handle_request(rfile: BufferedIOBase, wfile: BufferedIOBase, workspace: Path, token: str) -> None:
+    """Run a single task request read from ``rfile`` and stream events to ``wfile``.
+
+    Args:
+        rfile: Stream the request line is read from.
+        wfile: Stream the JSON events are written to.
+        workspace: The worker's repository checkout.
+        token: The token the request must carry.
+
+    """
+    try:
+        request = TaskRequest.from_line(rfile.readline())
+    except ValueError as error:
+        _reject(wfile, str(error))
+        return
+    if not hmac.compare_digest(request.token.encode("utf-8"), token.encode("utf-8")):
+        _reject(wfile, "invalid token")
+        return
+
+    try:
+        with checkout_workspace(workspace, request.ref) as directory:
+            process = subprocess.Popen(  # noqa: S603
+                build_invoke_argv(request.name, request.kwargs),
+                cwd=directory,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+            )
+            for line in process.stdout or ():
+                _send_event(wfile, event="log", line=line.rstrip("\n"))
+            exit_code = process.wait()
+    except (OSError, subprocess.CalledProcessError) as error:
+        _send_event(wfile, event="log", line=f"Worker error: {error}")
+        exit_code = WORKER_ERROR_EXIT_CODE
+    _send_event(wfile, event="exit", code=exit_code)
+
+
+class WorkerRequestHandler(socketserver.StreamRequestHandler):
+    """Socket handler that runs one task per connection."""
+
+    server: "WorkerServer"
+
+    def handle(self) -> None:
+        """Handle a coordinator connection."""
+        handle_request(self.rfile, self.wfile, self.server.workspace, self.server.token)
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    """TCP server that accepts task requests from a coordinator.
+
+    Attributes:
+        workspace: The repository checkout tasks are run in.
+        token: The token requests must carry.
+
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], workspace: Path, token: str) -> None:
+        """Initialize the worker server.
+
+        Args:
+            address: The (host, port) to listen on.
+            workspace: The repository checkout tasks are run in.
+            token: The token requests must carry.
+
+        Raises:
+            ValueError: If the token is empty.
+
+        """
+        if not token:
+            msg = "Workers require a non-empty token"
+            raise ValueError(msg)
+        self.workspace = workspace
+        self.token = token
+        super().__init__(address, WorkerRequestHandler)
+
+
+def create_snapshot_ref(context: Context) -> str:
+    """Capture the working tree as a commit that workers on the same repository can check out.
+
+    Uses ``git stash create``, which records tracked changes without touching the working tree
+    or the stash list, and falls back to HEAD when there are no changes. Untracked files are
+    not included.
+
+    Args:
+        context: The invoke context.
+
+    Returns:
+        The commit hash of the snapshot.
+
+    """
+    stash = context.run("git stash create", hide=True)
+    if stash is not None and stash.stdout.strip():
+        return stash.stdout.strip()
+    head = context.run("git rev-parse HEAD", hide=True)
+    if head is None:
+        msg = "Unable to resolve HEAD for the workspace snapshot"
+        raise RuntimeError(msg)
+    return head.stdout.strip()
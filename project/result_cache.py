@@ -0,0 +1,400 @@
+"""Content-addressed cache of successful task results with optional remote tiers.
+
+A result is keyed by the task name, its keyword arguments, the tool environment and a digest of
+the workspace inputs. Only green results are stored, so a hit means the task can be skipped.
+Entries live in a local directory store and can additionally be shared through a remote store,
+either another directory (e.g. a network share) or an HTTP server such as 'invoke cache.serve'.
+
+Anyone who can write to a shared store can make other runs skip their checks, so a read-write
+HTTP server only accepts uploads carrying the token in CACHE_TOKEN_VARIABLE, which clients send
+when they have it set. The token travels in clear text over http; serve over https or a trusted
+network.
+"""
+
+import hashlib
+import hmac
+import http.server
+import json
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+from invoke.context import Context
+
+from project.utils import ensure_directory, workspace_index
+
+if TYPE_CHECKING:
+    from project.project_task_runner import ProjectTask
+
+DEFAULT_CACHE_PATH = Path(".quality/cache/results")
+CACHE_SCHEMA_VERSION = "1"
+HTTP_TIMEOUT_SECONDS = 5.0
+KEY_LENGTH = 64
+CACHE_TOKEN_VARIABLE = "PROJECT_CACHE_TOKEN"  # noqa: S105
+
+
+def cache_write_token() -> str | None:
+    """Return the token that authorises uploads to a shared HTTP cache, if one is set.
+
+    Returns:
+        The value of CACHE_TOKEN_VARIABLE, or None if it is unset or empty.
+
+    """
+    return os.environ.get(CACHE_TOKEN_VARIABLE) or None
+
+
+@dataclass
+class CacheEntry:
+    """A stored green task result.
+
+    Attributes:
+        task: The task name.
+        duration: How long the task originally took in seconds.
+        created_at: Unix timestamp of when the result was stored.
+
+    """
+
+    task: str
+    duration: float
+    created_at: float
+
+
+class CacheStore(Protocol):
+    """A key/value store for cache entries."""
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry for a key, or None if it is missing."""
+        ...
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under a key."""
+        ...
+
+
+def _is_valid_key(key: str) -> bool:
+    """Check that a key is a hex sha256 digest, so it is safe to use as a path component."""
+    return len(key) == KEY_LENGTH and all(character in "0123456789abcdef" for character in key)
+
+
+class DirectoryStore:
+    """Stores entries as JSON files in a directory, sharded by key prefix.
+
+    Attributes:
+        root: The directory entries are stored in.
+
+    """
+
+    def __init__(self, root: str | Path = DEFAULT_CACHE_PATH) -> None:
+        """Initialize the store.
+
+        Args:
+            root: The directory entries are stored in.
+
+        """
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        """Return the file path for a key."""
+        if not _is_valid_key(key):
+            msg = f"Invalid cache key: {key!r}"
+            raise ValueError(msg)
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Return the entry for a key, or None if it is missing or unreadable."""
+        try:
+            return CacheEntry(**json.loads(self._path(key).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry atomically so concurrent readers never see a partial file."""
+        path = self._path(key)
+        ensure_directory(path.parent)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False, encoding="utf-8") as temp:
+            json.dump(asdict(entry), temp)
+        Path(temp.name).replace(path)
+
+
+class HttpStore:
+    """Stores entries on an HTTP server using GET and PUT of ``<base_url>/<key>``.
+
+    Network errors are treated as cache misses so an unreachable server never fails a run.
+
+    Attributes:
+        base_url: The URL entries are stored under.
+        timeout: Request timeout in seconds.
+        token: Optional token sent with uploads to authorise them.
+
+    """
+
+    def __init__(self, base_url: str, timeout: float = HTTP_TIMEOUT_SECONDS, *, token: str | None = None) -> None:
+        """Initialize the store.
+
+        Args:
+            base_url: The URL entries are stored under.
+            timeout: Request timeout in seconds.
+            token: Optional token sent with uploads to authorise them.
+
+        """
+        if not base_url.startswith(("http://", "https://")):
+            msg = f"Cache URL must use http or https: {base_url}"
+            raise ValueError(msg)
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.token = token
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Fetch the entry for a key, or None on a miss or error."""
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/{key}", timeout=self.timeout) as response:  # noqa: S310
+                return CacheEntry(**json.loads(response.read()))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Upload an entry, ignoring errors."""
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        request = urllib.request.Request(  # noqa: S310
+            f"{self.base_url}/{key}",
+            data=json.dumps(asdict(entry)).encode("utf-8"),
+            method="PUT",
+            headers=headers,
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):  # noqa: S310
+                pass
+        except OSError as error:
+            print(f"Warning: could not upload result to {self.base_url}: {error}")
+
+
+def create_store(location: str, *, token: str | None = None) -> CacheStore:
+    """Create a store from a URL or a directory path.
+
+    Args:
+        location: An http(s) URL or a directory path.
+        token: Optional token an HttpStore sends with uploads.
+
+    Returns:
+        An HttpStore for URLs, otherwise a DirectoryStore.
+
+    """
+    if location.startswith(("http://", "https://")):
+        return HttpStore(location, token=token)
+    return DirectoryStore(location)
+
+
+def compute_input_digest(context: Context) -> str:
+    """Compute a digest of the workspace contents that task results depend on.
+
+    The workspace index is rebuilt so the digest reflects the working tree at the start of the
+    run; tasks that run afterwards reuse the same index.
+
+    Args:
+        context: The invoke context.
+
+    Returns:
+        A hex sha256 digest.
+
+    """
+    return workspace_index(context, refresh=True).digest()
+
+
+def environment_fingerprint() -> dict[str, str]:
+    """Describe the interpreter and platform, which affect tool results beyond the lockfile.
+
+    Tool versions themselves are pinned by poetry.lock and .pre-commit-config.yaml, which are
+    part of the input digest; project.check adds the versions found by project.tool_probes.
+
+    Returns:
+        Mapping of fingerprint component to value.
+
+    """
+    return {"python": f"{sys.version_info.major}.{sys.version_info.minor}", "platform": sys.platform}
+
+
+class ResultCache:
+    """Looks up and stores green task results across a local tier and an optional remote tier.
+
+    Attributes:
+        input_digest: Digest of the workspace inputs for this run.
+        local: The local store, always read and written.
+        remote: Optional shared store consulted after the local store.
+        read_only: When True, results are never written to the remote store.
+        tool_versions: Extra key inputs describing the tool environment.
+
+    """
+
+    def __init__(
+        self,
+        input_digest: str,
+        local: CacheStore | None = None,
+        remote: CacheStore | None = None,
+        *,
+        read_only: bool = False,
+        tool_versions: dict[str, str] | None = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            input_digest: Digest of the workspace inputs for this run.
+            local: The local store; defaults to a DirectoryStore under .quality.
+            remote: Optional shared store consulted after the local store.
+            read_only: When True, results are never written to the remote store.
+            tool_versions: Extra key inputs; defaults to the environment fingerprint.
+
+        """
+        self.input_digest = input_digest
+        self.local = local or DirectoryStore()
+        self.remote = remote
+        self.read_only = read_only
+        self.tool_versions = tool_versions if tool_versions is not None else environment_fingerprint()
+
+    def key_for(self, task: "ProjectTask") -> str:
+        """Compute the cache key for a task.
+
+        Args:
+            task: The task to compute the key for.
+
+        Returns:
+            A hex sha256 digest.
+
+        """
+        material: dict[str, Any] = {
+            "schema": CACHE_SCHEMA_VERSION,
+            "task": task.name,
+            "kwargs": task.kwargs,
+            "tools": self.tool_versions,
+            "inputs": self.input_digest,
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, task: "ProjectTask") -> CacheEntry | None:
+        """Look up a green result for a task, promoting remote hits into the local store.
+
+        Args:
+            task: The task to look up.
+
+        Returns:
+            The cached entry, or None on a miss.
+
+        """
+        key = self.key_for(task)
+        entry = self.local.get(key)
+        if entry is None and self.remote is not None:
+            entry = self.remote.get(key)
+            if entry is not None:
+                self.local.put(key, entry)
+        return entry
+
+    def put(self, task: "ProjectTask", duration: float) -> None:
+        """Store a green result for a task.
+
+        Args:
+            task: The task that succeeded.
+            duration: How long the task took in seconds.
+
+        """
+        key = self.key_for(task)
+        entry = CacheEntry(task=task.name, duration=round(duration, 3), created_at=time.time())
+        self.local.put(key, entry)
+        if self.remote is not None and not self.read_only:
+            self.remote.put(key, entry)
+
+
+class CacheRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a DirectoryStore over HTTP for HttpStore clients."""
+
+    server: "CacheServer"
+
+    def do_GET(self) -> None:
+        """Return the entry for the requested key."""
+        key = self.path.rsplit("/", 1)[-1]
+        entry = self.server.store.get(key) if _is_valid_key(key) else None
+        if entry is None:
+            self.send_error(404)
+            return
+        body = json.dumps(asdict(entry)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self) -> None:
+        """Store the uploaded entry under the requested key."""
+        key = self.path.rsplit("/", 1)[-1]
+        if self.server.read_only:
+            self.send_error(403, "Cache server is read-only")
+            return
+        if not self._is_authorised():
+            self.send_error(401, "Missing or invalid cache token")
+            return
+        if not _is_valid_key(key):
+            self.send_error(400, "Invalid cache key")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            entry = CacheEntry(**json.loads(self.rfile.read(length)))
+        except (ValueError, TypeError):
+            self.send_error(400, "Invalid cache entry")
+            return
+        self.server.store.put(key, entry)
+        self.send_response(204)
+        self.end_headers()
+
+    def _is_authorised(self) -> bool:
+        """Check that an upload carries the server's write token."""
+        expected = f"Bearer {self.server.write_token}".encode()
+        return hmac.compare_digest(self.headers.get("Authorization", "").encode("utf-8"), expected)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002, ANN401
+        """Only log requests when CACHE_SERVER_VERBOSE is set."""
+        if os.environ.get("CACHE_SERVER_VERBOSE"):
+            super().log_message(format, *args)
+
+
+class CacheServer(http.server.ThreadingHTTPServer):
+    """HTTP server exposing a DirectoryStore.
+
+    Attributes:
+        store: The store entries are read from and written to.
+        read_only: When True, uploads are rejected.
+        write_token: The token uploads must carry when the server is read-write.
+
+    """
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        store: DirectoryStore,
+        *,
+        read_only: bool = False,
+        write_token: str | None = None,
+    ) -> None:
+        """Initialize the cache server.
+
+        Args:
+            address: The (host, port) to listen on.
+            store: The store entries are read from and written to.
+            read_only: When True, uploads are rejected.
+            write_token: The token uploads must carry; required unless the server is read-only.
+
+        Raises:
+            ValueError: If a read-write server has no write token.
+
+        """
+        if not read_only and not write_token:
+            msg = f"A read-write cache server needs a write token; set {CACHE_TOKEN_VARIABLE} or serve read-only"
+            raise ValueError(msg)
+        self.store = store
+        self.read_only = read_only
+        self.write_token = write_token
+        super().__init__(address, CacheRequestHandler)
@@ -0,0 +1,168 @@
+"""Critical-path scheduling helpers for running project tasks concurrently.
+
+Each task's priority is the length of the longest chain of estimated durations from the task
+to the end of the run, following the tasks that depend on it. Starting the ready task with
+the highest priority first keeps long chains and slow tasks from being left until last.
+"""
+
+import heapq
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from project.project_task_runner import ProjectTask
+
+Estimator = Callable[[str], float]
+
+
+def _dependents(tasks: list["ProjectTask"]) -> dict[str, list[str]]:
+    """Map each task name to the names of the tasks that depend on it, ignoring absent dependencies."""
+    dependents: dict[str, list[str]] = {task.name: [] for task in tasks}
+    for name, dependencies in unmet_dependencies(tasks).items():
+        for dependency in dependencies:
+            dependents[dependency].append(name)
+    return dependents
+
+
+def critical_path_priorities(tasks: list["ProjectTask"], estimate: Estimator) -> dict[str, float]:
+    """Compute each task's critical-path priority.
+
+    Args:
+        tasks: The tasks to schedule; dependencies on tasks outside this list are ignored.
+        estimate: Returns the expected duration of a task by name.
+
+    Returns:
+        Mapping of task name to the estimated time from its start to the end of its longest chain.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle.
+
+    """
+    dependents = _dependents(tasks)
+    priorities: dict[str, float] = {}
+    visiting: set[str] = set()
+
+    def priority(name: str) -> float:
+        if name in priorities:
+            return priorities[name]
+        if name in visiting:
+            msg = f"Dependency cycle detected at task {name!r}"
+            raise ValueError(msg)
+        visiting.add(name)
+        priorities[name] = estimate(name) + max((priority(child) for child in dependents[name]), default=0.0)
+        visiting.discard(name)
+        return priorities[name]
+
+    for task in tasks:
+        priority(task.name)
+    return priorities
+
+
+def unmet_dependencies(tasks: list["ProjectTask"]) -> dict[str, set[str]]:
+    """Map each task name to the dependencies it is still waiting for.
+
+    Args:
+        tasks: The tasks to schedule; dependencies on tasks outside this list count as met.
+
+    Returns:
+        Mapping of task name to the names of its pending dependencies.
+
+    """
+    names = {task.name for task in tasks}
+    return {task.name: {dependency for dependency in task.depends_on if dependency in names} for task in tasks}
+
+
+def next_ready(waiting: dict[str, set[str]], priorities: dict[str, float]) -> list[str]:
+    """List the tasks whose dependencies are met, highest priority first.
+
+    Args:
+        waiting: Mapping of not-yet-started task name to its pending dependencies.
+        priorities: Critical-path priorities by task name.
+
+    Returns:
+        Ready task names ordered by descending priority, then by name.
+
+    """
+    ready = [name for name, dependencies in waiting.items() if not dependencies]
+    return sorted(ready, key=lambda name: (-priorities[name], name))
+
+
+def simulate_makespan(tasks: list["ProjectTask"], jobs: int, estimate: Estimator) -> float:
+    """Predict the wall time of running the tasks with critical-path list scheduling.
+
+    Args:
+        tasks: The tasks to schedule.
+        jobs: The number of tasks that may run at once.
+        estimate: Returns the expected duration of a task by name.
+
+    Returns:
+        The predicted makespan in seconds.
+
+    """
+    priorities = critical_path_priorities(tasks, estimate)
+    waiting = unmet_dependencies(tasks)
+    running: list[tuple[float, str]] = []
+    now = 0.0
+    while waiting or running:
+        for name in next_ready(waiting, priorities)[: jobs - len(running)]:
+            del waiting[name]
+            heapq.heappush(running, (now + estimate(name), name))
+        if not running:
+            break
+        now, finished = heapq.heappop(running)
+        for dependencies in waiting.values():
+            dependencies.discard(finished)
+    return now
+
+
+def dependency_closure(name: str, waiting: dict[str, set[str]]) -> set[str]:
+    """Collect a task and every task it transitively depends on.
+
+    Args:
+        name: The task name.
+        waiting: Mapping of task name to its dependencies, as returned by unmet_dependencies().
+
+    Returns:
+        The names of the task and its dependencies.
+
+    """
+    closure: set[str] = set()
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        if current not in closure:
+            closure.add(current)
+            pending.extend(waiting[current])
+    return closure
+
+
+def select_within_budget(
+    tasks: list["ProjectTask"],
+    budget: float,
+    jobs: int,
+    estimate: Estimator,
+) -> tuple[list["ProjectTask"], list["ProjectTask"]]:
+    """Pick the most valuable tasks whose predicted makespan fits in a time budget.
+
+    Tasks are considered highest priority first, then shortest first. Each is kept together with
+    the tasks it depends on, whose time counts against the budget, if the predicted makespan of
+    everything kept still fits; otherwise the task is deferred. A shared low-priority dependency
+    such as a fixer is therefore pulled in by the first important task that needs it.
+
+    Args:
+        tasks: The candidate tasks.
+        budget: The wall time available in seconds.
+        jobs: The number of tasks that may run at once.
+        estimate: Returns the expected duration of a task by name.
+
+    Returns:
+        The selected and the deferred tasks, each in their original order.
+
+    """
+    waiting = unmet_dependencies(tasks)
+    selected: set[str] = set()
+    for task in sorted(tasks, key=lambda task: (-task.priority, estimate(task.name))):
+        candidate = selected | dependency_closure(task.name, waiting)
+        if simulate_makespan([task for task in tasks if task.name in candidate], jobs, estimate) <= budget:
+            selected = candidate
+    return [task for task in tasks if task.name in selected], [task for task in tasks if task.name not in selected]
@@ -0,0 +1,148 @@
+"""Duration-balanced splitting of the test suites into shards.
+
+Test files are the unit of sharding. Each file is weighted by the recorded durations of its
+tests, taken from JUnit XML reports, and files are assigned longest-first to the lightest
+shard so every shard finishes in roughly the same time.
+"""
+
+import statistics
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+from project.duration_history import DurationHistory
+from project.utils import ensure_directory
+
+TEST_DURATIONS_PATH = Path(".quality/tests/durations.json")
+SHARDS_DIRECTORY = Path(".quality/tests/shards")
+MERGED_JUNIT_PATH = Path(".quality/tests/junit.xml")
+DEFAULT_FILE_WEIGHT = 1.0
+
+
+def discover_test_files(roots: list[str]) -> list[str]:
+    """Find the pytest test files under the given directories.
+
+    Args:
+        roots: Directories to search, e.g. ``["tests/unit", "tests/integration"]``.
+
+    Returns:
+        Sorted POSIX-style relative paths of ``test_*.py`` files.
+
+    """
+    return sorted(path.as_posix() for root in roots for path in Path(root).rglob("test_*.py"))
+
+
+def file_weights(files: list[str], history: DurationHistory) -> dict[str, float]:
+    """Weight each test file by the total recorded duration of its tests.
+
+    Files without any recorded tests get the median weight of the known files, so new files
+    neither dominate nor vanish from the balancing.
+
+    Args:
+        files: The test files.
+        history: Per-test duration history keyed by pytest node id.
+
+    Returns:
+        Mapping of file to its estimated duration in seconds.
+
+    """
+    known: dict[str, float] = {}
+    for node_id in history.samples:
+        file_name = node_id.split("::", 1)[0]
+        known[file_name] = known.get(file_name, 0.0) + history.estimate(node_id)
+    known_weights = [known[file_name] for file_name in files if file_name in known]
+    default = statistics.median(known_weights) if known_weights else DEFAULT_FILE_WEIGHT
+    return {file_name: known.get(file_name, default) for file_name in files}
+
+
+def plan_shards(weights: dict[str, float], total: int) -> list[list[str]]:
+    """Split files into shards, assigning the heaviest files first to the lightest shard.
+
+    Args:
+        weights: Mapping of file to estimated duration.
+        total: The number of shards.
+
+    Returns:
+        The files of each shard, each shard sorted by path.
+
+    Raises:
+        ValueError: If total is less than one.
+
+    """
+    if total < 1:
+        msg = "The number of shards must be at least 1"
+        raise ValueError(msg)
+    shards: list[list[str]] = [[] for _ in range(total)]
+    loads = [0.0] * total
+    for file_name in sorted(weights, key=lambda name: (-weights[name], name)):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(file_name)
+        loads[lightest] += weights[file_name]
+    return [sorted(shard) for shard in shards]
+
+
+def _node_id(classname: str, name: str) -> str:
+    """Rebuild a pytest node id from a JUnit ``classname`` and test ``name``.
+
+    pytest writes the module path and any test class as one dotted classname, so the longest
+    dotted prefix that exists as a Python file is taken as the module.
+    """
+    parts = classname.split(".")
+    for split in range(len(parts), 0, -1):
+        candidate = "/".join(parts[:split]) + ".py"
+        if Path(candidate).is_file():
+            return "::".join([candidate, *parts[split:], name])
+    return f"{classname}::{name}"
+
+
+def junit_durations(junit_file: Path) -> dict[str, float]:
+    """Read per-test durations from a JUnit XML report.
+
+    Args:
+        junit_file: The report written by ``pytest --junitxml``.
+
+    Returns:
+        Mapping of pytest node id to duration in seconds.
+
+    """
+    root = ET.parse(junit_file).getroot()  # noqa: S314
+    return {
+        _node_id(case.get("classname", ""), case.get("name", "")): float(case.get("time", "0"))
+        for case in root.iter("testcase")
+    }
+
+
+def record_junit_durations(junit_files: list[Path], history: DurationHistory) -> None:
+    """Add the durations from JUnit reports to the test duration history.
+
+    Args:
+        junit_files: The reports to read.
+        history: The history to update.
+
+    """
+    for junit_file in junit_files:
+        for node_id, seconds in junit_durations(junit_file).items():
+            history.record(node_id, seconds)
+
+
+def merge_junit_reports(junit_files: list[Path], output: Path) -> Path:
+    """Combine JUnit reports from several shards into one ``<testsuites>`` document.
+
+    Args:
+        junit_files: The shard reports.
+        output: Where to write the merged report.
+
+    Returns:
+        The path of the merged report.
+
+    """
+    merged = ET.Element("testsuites")
+    for junit_file in junit_files:
+        root = ET.parse(junit_file).getroot()  # noqa: S314
+        suites = [root] if root.tag == "testsuite" else list(root.iter("testsuite"))
+        merged.extend(suites)
+    for attribute in ("tests", "failures", "errors", "skipped"):
+        merged.set(attribute, str(sum(int(suite.get(attribute, "0")) for suite in merged)))
+    merged.set("time", f"{sum(float(suite.get('time', '0')) for suite in merged):.3f}")
+    ensure_directory(output.parent)
+    ET.ElementTree(merged).write(output, encoding="utf-8", xml_declaration=True)
+    return output
@@ -0,0 +1,116 @@
+"""Benchmark tasks for tracking down performance regressions."""
+
+import shlex
+import sys
+from pathlib import Path
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.perf_bisect import BisectReport, Measurement, first_slow_commit, slowdown, time_runs
+from project.remote_workers import build_invoke_argv, checkout_workspace
+from project.utils import get_current_working_directory
+
+
+def _benchmark_command(task_name: str, pytest_selection: str | None) -> str:
+    """Build the command timed at each commit: a pytest selection or an invoke task."""
+    if pytest_selection:
+        return shlex.join(
+            [sys.executable, "-m", "pytest", *shlex.split(pytest_selection), "-q", "-p", "no:cacheprovider"]
+        )
+    return shlex.join(build_invoke_argv(task_name, {}))
+
+
+def _commits(context: Context, good: str, bad: str) -> list[str]:
+    """List the commits from good to bad along the first-parent history, both included."""
+    revisions = context.run(shlex.join(["git", "rev-parse", good, bad]), hide=True).stdout.split()
+    between = context.run(
+        f"git rev-list --reverse --first-parent --ancestry-path {revisions[0]}..{revisions[1]}", hide=True
+    ).stdout.split()
+    return [revisions[0], *between]
+
+
+class _CommitTimer:
+    """Measures the benchmark command at commits, each in its own temporary worktree.
+
+    The worktrees run against the current environment, so only code changes are measured, not
+    changes to the locked dependencies.
+    """
+
+    def __init__(self, context: Context, command: str, *, repeat: int, warmup: int) -> None:
+        self.context = context
+        self.command = command
+        self.repeat = repeat
+        self.warmup = warmup
+        self.measurements: dict[str, Measurement] = {}
+
+    def measure(self, commit: str) -> Measurement:
+        """Measure a commit, reusing an earlier measurement of the same commit."""
+        if commit not in self.measurements:
+            subject = self.context.run(f"git log -1 --format=%s {commit}", hide=True).stdout.strip()
+            print(f"Measuring {commit[:10]} {subject}")
+            with checkout_workspace(get_current_working_directory(), commit) as worktree:
+                samples = time_runs(lambda: self._run(worktree, commit), self.repeat, self.warmup)
+            self.measurements[commit] = Measurement(commit=commit, subject=subject, samples=samples)
+        return self.measurements[commit]
+
+    def _run(self, worktree: Path, commit: str) -> None:
+        """Run the command once in a worktree, failing the bisect if it fails."""
+        env = {"VIRTUAL_ENV": sys.prefix, "PYTHONPATH": str(worktree / "src")}
+        with self.context.cd(str(worktree)):
+            result = self.context.run(self.command, hide=True, warn=True, env=env, in_stream=False)
+        if result is None or not result.ok:
+            msg = f"'{self.command}' failed at {commit[:10]}; a slowdown cannot be measured there"
+            raise Exit(msg, code=1)
+
+
+@task
+def bisect(  # noqa: PLR0913
+    context: Context,
+    good: str,
+    *,
+    bad: str = "HEAD",
+    task: str = "tests.unit",
+    pytest_selection: str | None = None,
+    threshold: float = 10.0,
+    repeat: int = 5,
+    warmup: int = 1,
+) -> None:
+    """Binary-search git history for the commit that made a task or pytest selection slower.
+
+    Each measured commit is checked out into a temporary worktree and timed 'repeat' times after
+    'warmup' discarded runs. A report of every measured commit is printed and written to
+    .quality/benchmarks/bisect.json.
+
+    Args:
+        context: The invoke context.
+        good: A commit where the benchmark is fast.
+        bad: A later commit where the benchmark is slow.
+        task: The invoke task to time, e.g. tests.unit or mypy.check.
+        pytest_selection: Time this pytest selection instead, e.g. "tests/unit -k cache".
+        threshold: The slowdown of the median against the good commit, in percent, that counts as slow.
+        repeat: How many timed runs to make at each commit; the median is compared.
+        warmup: How many untimed runs to make first at each commit.
+
+    """
+    target = pytest_selection or task
+    commits = _commits(context, good, bad)
+    timer = _CommitTimer(context, _benchmark_command(task, pytest_selection), repeat=repeat, warmup=warmup)
+    baseline = timer.measure(commits[0])
+
+    def is_slow(commit: str) -> bool:
+        return slowdown(baseline, timer.measure(commit)) > threshold
+
+    culprit = None
+    if len(commits) > 1 and is_slow(commits[-1]):
+        culprit = commits[first_slow_commit(commits, is_slow)]
+    measured = [timer.measurements[commit] for commit in commits if commit in timer.measurements]
+    report = BisectReport(target=target, threshold=threshold, measurements=measured, culprit=culprit)
+    print("\n" + "\n".join(report.lines()))
+    print(f"\nReport written to {report.write()}")
+
+
+collection = Collection("benchmarks")
+collection.add_task(bisect)
@@ -0,0 +1,41 @@
+"""Result cache tasks for sharing green check results."""
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+
+from project.result_cache import DEFAULT_CACHE_PATH, CacheServer, DirectoryStore, cache_write_token
+
+DEFAULT_CACHE_SERVER_PORT = 8766
+
+
+@task
+def serve(
+    context: Context,  # noqa: ARG001
+    root: str = str(DEFAULT_CACHE_PATH),
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_CACHE_SERVER_PORT,
+    *,
+    read_only: bool = False,
+) -> None:
+    """Serve a result cache directory over HTTP for 'invoke project.check --cache-remote http://host:port'.
+
+    A read-write server only accepts uploads from clients whose PROJECT_CACHE_TOKEN matches its own.
+
+    Args:
+        context: The invoke context.
+        root: The directory cache entries are stored in.
+        host: The interface to listen on.
+        port: The port to listen on.
+        read_only: Reject uploads, e.g. when serving CI results to untrusted clients.
+
+    """
+    write_token = None if read_only else cache_write_token()
+    with CacheServer((host, port), DirectoryStore(root), read_only=read_only, write_token=write_token) as server:
+        mode = "read-only" if read_only else "read-write"
+        print(f"Result cache ({mode}) serving {root} on http://{host}:{port}")
+        server.serve_forever()
+
+
+collection = Collection("cache")
+collection.add_task(serve)
@@ -4,11 +4,19 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.profiling import tool_command
+
 
 @task
-def check(context: Context) -> None:
-    """Run deptry to check for unused dependencies."""
-    context.run("poetry run deptry .", echo=True)
+def check(context: Context, *, profile: bool = False) -> None:
+    """Run deptry to check for unused dependencies.
+
+    Args:
+        context: The invoke context.
+        profile: Run deptry under cProfile, writing stats to .quality/profiles/deptry.check.pstats.
+
+    """
+    context.run(tool_command("deptry", ".", profile_name="deptry.check" if profile else None), echo=True)
 
 
 collection = Collection("deptry")
@@ -4,28 +4,42 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.tool_probes import require_tools
 from project.utils import get_current_working_directory
 
+# Dockerfile stage selected through the DEVCONTAINER_TARGET variable read by devcontainer.json
+PREBAKED_TARGET = "prebaked"
+
 
 @task
-def check(context: Context, *, build_only: bool = False, run_project_check: bool = False) -> None:
+def check(
+    context: Context,
+    *,
+    build_only: bool = False,
+    run_project_check: bool = False,
+    prebaked: bool = False,
+) -> None:
     """Verify the devcontainer builds and runs correctly in headless mode.
 
     Args:
         context: The invoke context.
         build_only: Only build the image, skip up and exec (fast check).
         run_project_check: Run 'invoke project.check' inside container instead of 'invoke --list'.
+        prebaked: Build the image stage with the locked dependencies and pre-commit hook environments
+            baked into cached layers, so post-create only validates the environment.
 
     """
     workspace_path = get_current_working_directory()
+    target_env = {"env": {"DEVCONTAINER_TARGET": PREBAKED_TARGET}} if prebaked else {}
 
-    # Verify Docker is available
-    context.run("docker info", hide=True)
+    # Verify Docker and npx are available, reusing the probes cached for this session
+    require_tools(context, "docker", "npx")
 
     # Build the devcontainer image
     context.run(
         f"npx @devcontainers/cli build --workspace-folder {workspace_path}",
         echo=True,
+        **target_env,
     )
 
     if build_only:
@@ -35,6 +49,7 @@ def check(context: Context, *, build_only: bool = False, run_project_check: bool
     context.run(
         f"npx @devcontainers/cli up --workspace-folder {workspace_path}",
         echo=True,
+        **target_env,
     )
 
     # Verify inside the container
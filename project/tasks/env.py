@@ -0,0 +1,91 @@
+"""Environment snapshot tasks for restoring the locked virtual environment offline."""
+
+import shlex
+import sys
+from pathlib import Path
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.environment_snapshot import (
+    ARCHIVE_NAME,
+    ENV_SNAPSHOTS_PATH,
+    REQUIREMENTS_NAME,
+    WHEELHOUSE_NAME,
+    archive_venv,
+    base_interpreter_home,
+    current_snapshot_directory,
+    extract_venv,
+    lock_digest,
+    snapshot_key,
+    venv_python,
+    wheelhouse_install_command,
+    write_manifest,
+)
+from project.index_proxy import proxy_environment
+from project.utils import ensure_directory
+
+PYTHON_VERSION_COMMAND = "-c \"import sys; print('%d.%d' % sys.version_info[:2])\""
+
+
+@task
+def snapshot(context: Context, venv: str | None = None, root: str = str(ENV_SNAPSHOTS_PATH)) -> None:
+    """Build a wheelhouse and a relocatable venv archive keyed by the poetry.lock hash.
+
+    Args:
+        context: The invoke context.
+        venv: The virtual environment to snapshot; defaults to poetry's environment for the project.
+        root: The directory snapshots are stored in, e.g. a shared network path.
+
+    """
+    venv_path = Path(venv or context.run("poetry env info --path", hide=True).stdout.strip())
+    python = venv_python(venv_path)
+    python_version = context.run(f"{python} {PYTHON_VERSION_COMMAND}", hide=True).stdout.strip()
+    key = snapshot_key(lock_digest(), python_version)
+    snapshot_path = ensure_directory(Path(root) / key)
+
+    requirements = context.run(f"{python} -m pip freeze --exclude-editable", hide=True).stdout
+    (snapshot_path / REQUIREMENTS_NAME).write_text(requirements, encoding="utf-8")
+    context.run(
+        f"{python} -m pip wheel --no-deps -r {snapshot_path / REQUIREMENTS_NAME} -w {snapshot_path / WHEELHOUSE_NAME}",
+        echo=True,
+        env=proxy_environment(),
+    )
+    relocated = archive_venv(venv_path, snapshot_path / ARCHIVE_NAME)
+    write_manifest(snapshot_path, key=key, home=base_interpreter_home(venv_path), relocated=relocated)
+    print(f"Environment snapshot {key} written to {snapshot_path}")
+
+
+@task
+def restore(context: Context, venv: str = ".venv", root: str = str(ENV_SNAPSHOTS_PATH)) -> None:
+    """Restore the venv from the snapshot matching poetry.lock and the current interpreter.
+
+    The venv archive is extracted when its base interpreter exists on this machine; otherwise a
+    fresh venv is created and the wheelhouse installed into it, both without network access.
+
+    Args:
+        context: The invoke context.
+        venv: Where to restore the virtual environment.
+        root: The directory snapshots are stored in.
+
+    Raises:
+        Exit: If there is no snapshot for poetry.lock and the current interpreter.
+
+    """
+    snapshot_path = current_snapshot_directory(root)
+    try:
+        print(f"Restored {extract_venv(snapshot_path, venv)} from {snapshot_path}")
+    except FileNotFoundError as error:
+        if not (snapshot_path / WHEELHOUSE_NAME).is_dir():
+            raise Exit(str(error), code=1) from error
+        print(f"{error}; rebuilding {venv} from the wheelhouse")
+        context.run(f"{sys.executable} -m venv {venv}", echo=True)
+        context.run(shlex.join(wheelhouse_install_command(snapshot_path, venv_python(venv))), echo=True)
+        context.run("poetry install --only-root", echo=True)
+
+
+collection = Collection("env")
+collection.add_task(snapshot)
+collection.add_task(restore)
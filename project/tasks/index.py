@@ -0,0 +1,58 @@
+"""Package index tasks for caching downloads locally."""
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+
+from project.index_proxy import (
+    DEFAULT_INDEX_PATH,
+    DEFAULT_INDEX_PORT,
+    DEFAULT_PAGE_TTL_SECONDS,
+    DEFAULT_UPSTREAM,
+    IndexCache,
+    IndexProxyServer,
+    record_proxy_url,
+)
+
+
+@task
+def proxy(  # noqa: PLR0913
+    context: Context,  # noqa: ARG001
+    root: str = str(DEFAULT_INDEX_PATH),
+    upstream: str = DEFAULT_UPSTREAM,
+    *,
+    host: str = "127.0.0.1",
+    port: int = DEFAULT_INDEX_PORT,
+    page_ttl: float = DEFAULT_PAGE_TTL_SECONDS,
+    offline: bool = False,
+) -> None:
+    """Serve a caching proxy of a simple package index, so repeated pip installs are served from disk.
+
+    While it runs, the pip steps of tests.tox and env.snapshot use it. Only pip is pointed at it:
+    poetry installs from the sources in pyproject.toml, so poetry install, in tox or elsewhere,
+    still downloads from them. To use it with pip elsewhere, set PIP_INDEX_URL to the printed URL.
+
+    Args:
+        context: The invoke context.
+        root: The directory index pages and files are cached in.
+        upstream: The simple index to proxy.
+        host: The interface to listen on.
+        port: The port to listen on.
+        page_ttl: How many seconds a cached index page is served before it is refetched.
+        offline: Serve only what is cached, without contacting the upstream.
+
+    """
+    cache = IndexCache(root, upstream, page_ttl=page_ttl, offline=offline)
+    with IndexProxyServer((host, port), cache) as server:
+        url_file = record_proxy_url(server.url, root)
+        mode = "offline" if offline else f"proxying {cache.upstream}"
+        print(f"Package index ({mode}) caching in {root}, serving on {server.url}")
+        print(f"Point pip at it with: export PIP_INDEX_URL={server.url} (poetry does not use it)")
+        try:
+            server.serve_forever()
+        finally:
+            url_file.unlink(missing_ok=True)
+
+
+collection = Collection("index")
+collection.add_task(proxy)
@@ -1,14 +1,166 @@
 """MyPy tasks for type checking."""
 
+import os
+import shutil
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
 from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
+from invoke.exceptions import Exit
+from invoke.runners import Result
+
+from project.mypy_cache import SharedMypyCache, cache_key, config_digest, directory_fingerprint
+from project.mypy_shards import bound_shards, merge_reports, plan_shards
+from project.profiling import tool_command
+from project.tool_probes import probe_environment
+from project.utils import shell_paths, workspace_index
+
+# Mirrors the exclude list in pyproject.toml, which mypy ignores for files passed explicitly.
+MYPY_EXCLUDE = ("tasks.py",)
+# Overrides the shared store, e.g. to point CI jobs at a persistent volume
+SHARED_CACHE_VARIABLE = "MYPY_SHARED_CACHE"
+# The default store lives in the git common directory, which every worktree of the clone shares
+SHARED_CACHE_SUBDIRECTORY = Path("quality/mypy")
+# The cache_dir from pyproject.toml, used when the shared cache is disabled
+DEFAULT_CACHE_DIR = Path(".quality/mypy/cache")
+# Each shard checks against its own copy of the warm cache, so shards never write to the same cache
+SHARD_CACHE_ROOT = Path(".quality/mypy/shards")
+# Each shard copies the cache and re-checks what it imports, so more processes stop paying off quickly
+MAX_SHARDS = 4
+
+
+def _shared_store(context: Context) -> str | None:
+    """Return the shared store directory, or None outside a git checkout."""
+    store = os.environ.get(SHARED_CACHE_VARIABLE)
+    if store:
+        return store
+    result = context.run("git rev-parse --path-format=absolute --git-common-dir", hide=True, warn=True)
+    if result is None or not result.ok:
+        return None
+    return str(Path(result.stdout.strip()) / SHARED_CACHE_SUBDIRECTORY)
+
+
+def _shared_cache(context: Context) -> SharedMypyCache | None:
+    """Locate the shared mypy cache entry for the current interpreter, mypy version and config.
+
+    Args:
+        context: The invoke context.
+
+    Returns:
+        The shared cache, or None if mypy is unavailable or there is nowhere to share the cache.
+
+    """
+    mypy_probe = probe_environment(context).get("mypy")
+    store = _shared_store(context) if mypy_probe is not None and mypy_probe.available else None
+    if mypy_probe is None or store is None:
+        return None
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    return SharedMypyCache(store, cache_key(python_version, mypy_probe.version, config_digest()))
+
+
+def _run_with_shared_cache(context: Context, cache: SharedMypyCache, arguments: str, profile_name: str | None) -> None:
+    """Run mypy on the working copy of the shared cache and publish it back if mypy changed it.
+
+    Args:
+        context: The invoke context.
+        cache: The shared cache.
+        arguments: The files to check.
+        profile_name: The profile to write stats for, or None.
+
+    """
+    cache.restore()
+    before = directory_fingerprint(cache.local)
+    try:
+        context.run(
+            tool_command("mypy", f"--cache-dir {cache.local} {arguments}", profile_name=profile_name), echo=True
+        )
+    finally:
+        # mypy writes a valid cache even when it reports type errors
+        if cache.local.is_dir() and directory_fingerprint(cache.local) != before:
+            cache.publish()
+
+
+def _check_shard(context: Context, index: int, paths: list[str], base_cache: Path) -> Result:
+    """Check one shard in its own mypy process, starting from a private copy of the warm cache.
+
+    Args:
+        context: The invoke context.
+        index: The shard's position, naming its cache copy.
+        paths: The files in the shard.
+        base_cache: The warm cache to copy.
+
+    Returns:
+        The mypy result, also when mypy reports errors.
+
+    """
+    shard_cache = SHARD_CACHE_ROOT / f"shard-{index}"
+    shutil.rmtree(shard_cache, ignore_errors=True)
+    if base_cache.is_dir():
+        shutil.copytree(base_cache, shard_cache)
+    command = tool_command("mypy", f"--cache-dir {shard_cache} {shell_paths(paths)}")
+    return context.run(command, hide=True, warn=True, in_stream=False)
+
+
+def _run_sharded(context: Context, paths: list[str], cache: SharedMypyCache | None) -> None:
+    """Check import-graph-respecting shards in parallel processes and print one merged report.
+
+    Args:
+        context: The invoke context.
+        paths: The files to check.
+        cache: The shared cache whose working copy seeds the shards, or None to use the default cache.
+
+    Raises:
+        Exit: With mypy's exit status if any shard reported errors or failed.
+
+    """
+    base_cache = DEFAULT_CACHE_DIR
+    if cache is not None:
+        cache.restore()
+        base_cache = cache.local
+    shards = bound_shards(plan_shards(paths) or [paths], min(MAX_SHARDS, os.cpu_count() or 1))
+    print(f"Checking {len(paths)} file(s) in {len(shards)} mypy shard(s)")
+
+    def check_shard(index: int) -> Result:
+        return _check_shard(context, index, shards[index], base_cache)
+
+    with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+        results = list(pool.map(check_shard, range(len(shards))))
+    report = merge_reports(
+        [result.stdout for result in results],
+        [result.exited for result in results],
+        len(paths),
+        [result.stderr for result in results],
+    )
+    print("\n".join([*report.lines, report.summary]))
+    if report.exit_code:
+        raise Exit(code=report.exit_code)
 
 
 @task
-def check(context: Context) -> None:
-    """Run mypy to check for type errors."""
-    context.run("poetry run mypy .", echo=True)
+def check(context: Context, *, profile: bool = False, shared_cache: bool = True, sharded: bool = False) -> None:
+    """Run mypy on the Python files in the workspace index to check for type errors.
+
+    Args:
+        context: The invoke context.
+        profile: Run mypy under cProfile, writing stats to .quality/profiles/mypy.check.pstats.
+        shared_cache: Start from the cache shared by all worktrees and tox envs with the same Python
+            version, mypy version and config, and publish the updated cache back to it.
+        sharded: Check packages that do not import each other cyclically in up to MAX_SHARDS parallel mypy
+            processes, reading the warm cache without updating it; ignored when profiling.
+
+    """
+    paths = workspace_index(context).paths("python", exclude=MYPY_EXCLUDE)
+    profile_name = "mypy.check" if profile else None
+    cache = _shared_cache(context) if shared_cache else None
+    if sharded and profile_name is None:
+        _run_sharded(context, paths, cache)
+    elif cache is None:
+        context.run(tool_command("mypy", shell_paths(paths), profile_name=profile_name), echo=True)
+    else:
+        _run_with_shared_cache(context, cache, shell_paths(paths), profile_name)
 
 
 collection = Collection("mypy")
@@ -4,18 +4,33 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.profiling import tool_command
 from project.utils import ensure_directory
 
 
 @task
-def check(context: Context) -> None:
-    """Run pip-audit to check for vulnerable dependencies."""
+def check(context: Context, *, profile: bool = False) -> None:
+    """Run pip-audit to check for vulnerable dependencies.
+
+    Args:
+        context: The invoke context.
+        profile: Run pip-audit under cProfile, writing stats to .quality/profiles/pipaudit.check.pstats.
+
+    """
     ensure_directory(".quality/pipaudit")
     context.run(
         "poetry export --format=requirements.txt --without-hashes -o .quality/pipaudit/requirements.txt",
         echo=True,
     )
-    context.run("poetry run pip-audit -r .quality/pipaudit/requirements.txt", echo=True)
+    context.run(
+        tool_command(
+            "pip-audit",
+            "-r .quality/pipaudit/requirements.txt",
+            module="pip_audit",
+            profile_name="pipaudit.check" if profile else None,
+        ),
+        echo=True,
+    )
 
 
 collection = Collection("pipaudit")
@@ -1,17 +1,60 @@
 """Pre-commit tasks for running hooks."""
 
+import os
+from time import perf_counter
+
 from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.precommit_hooks import load_hooks, run_hooks, summary_lines
+
+
+def _check_concurrently(context: Context, jobs: int) -> None:
+    """Run the configured hooks with the read-only ones concurrently and summarise each hook.
+
+    Raises:
+        Exit: If any hook failed.
+
+    """
+    hooks = load_hooks()
+    print(f"Running {len(hooks)} pre-commit hook(s), up to {jobs} read-only hook(s) at a time")
+    start = perf_counter()
+    results = run_hooks(context, hooks, jobs=jobs)
+    wall_seconds = perf_counter() - start
+    for result in results:
+        if not result.ok:
+            print(f"\n--- {result.hook_id} ---\n{result.output.rstrip()}")
+    print("\n" + "\n".join(summary_lines(results, wall_seconds)))
+    failed = [result.hook_id for result in results if not result.ok]
+    if failed:
+        msg = f"Pre-commit hook(s) failed: {', '.join(failed)}"
+        raise Exit(msg, code=1)
 
 
 @task
-def check(context: Context, *, apply_safe_fixes: bool = False) -> None:
-    """Run pre-commit checks."""
+def check(context: Context, *, apply_safe_fixes: bool = False, jobs: int = 1) -> None:
+    """Run pre-commit checks.
+
+    With more than one job, the hooks in .pre-commit-config.yaml are scheduled individually: the
+    file-modifying hooks run one at a time first, then the read-only hooks run concurrently, and
+    each hook's result and timing is summarised.
+
+    Args:
+        context: The invoke context.
+        apply_safe_fixes: Whether to run the safe fixers before checking.
+        jobs: How many read-only hooks to run at once; 1 runs pre-commit as usual, 0 uses one per core.
+
+    """
     if apply_safe_fixes:
         context.run("poetry run pre-commit run end-of-file-fixer --all-files", echo=True, warn=True)
         context.run("poetry run pre-commit run pretty-format-json --all-files", echo=True, warn=True)
         context.run("poetry run pre-commit run md-toc --all-files", echo=True, warn=True)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1:
+        _check_concurrently(context, jobs)
+        return
     context.run("poetry run pre-commit run --all-files", echo=True)
 
 
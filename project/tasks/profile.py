@@ -0,0 +1,39 @@
+"""Profiling report tasks for summarising task profiles."""
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+
+from project.profiling import PROFILES_DIRECTORY, hottest_frames, write_collapsed_stacks
+
+DEFAULT_REPORT_LIMIT = 15
+
+
+@task
+def report(context: Context, limit: int = DEFAULT_REPORT_LIMIT) -> None:  # noqa: ARG001
+    """Summarise the hottest frames of each profiled task and write flamegraph-ready collapsed stacks.
+
+    Profiles are produced by running tasks with --profile, e.g. 'invoke project.check --profile'.
+
+    Args:
+        context: The invoke context.
+        limit: The number of frames to show per task.
+
+    """
+    profiles = sorted(PROFILES_DIRECTORY.glob("*.pstats"))
+    if not profiles:
+        print(f"No profiles found in {PROFILES_DIRECTORY}; run a task with --profile first.")
+        return
+
+    for pstats_file in profiles:
+        collapsed_file = write_collapsed_stacks(pstats_file)
+        print(f"\n{'=' * 60}")
+        print(f"Profile: {pstats_file.stem}  (collapsed stacks: {collapsed_file})")
+        print("=" * 60)
+        print(f"{'self (s)':>10} {'cumulative (s)':>15}  frame")
+        for frame, self_seconds, cumulative_seconds in hottest_frames(pstats_file, limit):
+            print(f"{self_seconds:>10.3f} {cumulative_seconds:>15.3f}  {frame}")
+
+
+collection = Collection("profile")
+collection.add_task(report)
@@ -4,25 +4,38 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.utils import shell_paths, workspace_index
+
+
+def _python_files(context: Context) -> str:
+    """Return the indexed Python files as shell arguments.
+
+    ruff skips explicitly passed files only with --force-exclude, so the ruff tasks pass it to keep
+    honouring the exclude list in pyproject.toml.
+    """
+    return shell_paths(workspace_index(context).paths("python"))
+
 
 @task
 def lint(context: Context, *, apply_safe_fixes: bool = False, apply_unsafe_fixes: bool = False) -> None:
-    """Run ruff to check for code style issues."""
+    """Run ruff to check for code style issues on the Python files in the workspace index."""
+    files = _python_files(context)
     if apply_safe_fixes:
-        context.run("poetry run ruff check . --fix ", echo=True)
+        context.run(f"poetry run ruff check {files} --force-exclude --fix ", echo=True)
     elif apply_unsafe_fixes:
-        context.run("poetry run ruff check . --unsafe-fixes", echo=True)
+        context.run(f"poetry run ruff check {files} --force-exclude --unsafe-fixes", echo=True)
     else:
-        context.run("poetry run ruff check . --no-fix", echo=True)
+        context.run(f"poetry run ruff check {files} --force-exclude --no-fix", echo=True)
 
 
 @task
 def format(context: Context, *, apply_safe_fixes: bool = False) -> None:  # noqa: A001
-    """Run ruff to format code."""
+    """Run ruff to format the Python files in the workspace index."""
+    files = _python_files(context)
     if apply_safe_fixes:
-        context.run("poetry run ruff format . --no-preview", echo=True)
+        context.run(f"poetry run ruff format {files} --force-exclude --no-preview", echo=True)
     else:
-        context.run("poetry run ruff format . --check", echo=True)
+        context.run(f"poetry run ruff format {files} --force-exclude --check", echo=True)
 
 
 collection = Collection("ruff")
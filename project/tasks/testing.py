@@ -1,37 +1,537 @@
 """Testing tasks for unit, integration, and multi-version testing."""
 
+import shlex
+import shutil
+import statistics
+import time
+from dataclasses import dataclass
+
 from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
+from invoke.exceptions import Exit
 
+from project.collection_cache import COLLECTION_CACHE_DIRECTORY, CollectionCache, config_digest, select_files
+from project.coverage_modes import (
+    changed_python_files,
+    coverage_fail_under,
+    is_branch_coverage,
+    resolve_coverage_core,
+    sysmon_unavailable_reason,
+    write_changed_only_coveragerc,
+)
+from project.diff_coverage import changed_lines, diff_coverage, load_report, report_lines, total_percent
+from project.duration_history import DurationHistory
+from project.index_proxy import proxy_environment
+from project.profiling import tool_command
+from project.pytest_benchmarks import (
+    BENCHMARK_BASELINE_PATH,
+    BENCHMARK_REPORT_PATH,
+    DEFAULT_ROUNDS,
+    DEFAULT_TOLERANCE,
+    comparison_lines,
+    find_regressions,
+    load_results,
+)
+from project.pytest_costs import COST_REPORTS_DIRECTORY
+from project.sharding import (
+    MERGED_JUNIT_PATH,
+    SHARDS_DIRECTORY,
+    TEST_DURATIONS_PATH,
+    discover_test_files,
+    file_weights,
+    merge_junit_reports,
+    plan_shards,
+    record_junit_durations,
+)
+from project.utils import ensure_directory
 
-@task
-def unit(context: Context) -> None:
-    """Run unit tests using pytest."""
-    context.run(
-        "poetry run pytest tests/unit/ --disable-socket --cov=src --cov=project "
-        "--cov-config=.unit-test-coveragerc --cov-report term-missing --cov-report term:skip-covered",
-        echo=True,
+COVERAGE_REPORT_ARGUMENTS = "--cov-report term-missing --cov-report term:skip-covered"
+BENCHMARK_MODES = ("none", "pytrace", "ctrace", "sysmon")
+BENCHMARK_SUITE_PATH = "tests/benchmarks/"
+
+
+@dataclass(frozen=True)
+class PytestSuite:
+    """A pytest suite and its coverage configuration.
+
+    Attributes:
+        name: The task name, used for profile and derived coverage config names.
+        path: The directory containing the tests.
+        sources: The source directories coverage is measured for.
+        coveragerc: The coverage configuration file.
+
+    """
+
+    name: str
+    path: str
+    sources: tuple[str, ...]
+    coveragerc: str
+
+
+UNIT_SUITE = PytestSuite("tests.unit", "tests/unit/", ("src", "project"), ".unit-test-coveragerc")
+INTEGRATION_SUITE = PytestSuite("tests.integration", "tests/integration/", ("src",), ".integration-test-coveragerc")
+SUITES = (UNIT_SUITE, INTEGRATION_SUITE)
+
+
+def _coverage_sources(suite: PytestSuite) -> str:
+    """Build the pytest-cov source arguments for a suite."""
+    return " ".join(f"--cov={source}" for source in suite.sources)
+
+
+def _diff_report_path(suite: PytestSuite) -> str:
+    """Return the JSON coverage report a diff coverage run writes for a suite."""
+    return f".quality/pytest-cov/{suite.name}.diff.json"
+
+
+def _coverage_arguments(
+    context: Context, suite: PytestSuite, changed_since: str | None, *, diff: bool = False
+) -> str | None:
+    """Build the pytest-cov arguments for a suite.
+
+    Args:
+        context: The invoke context.
+        suite: The suite being run.
+        changed_since: Optional git ref; only files changed since it are measured.
+        diff: Write a JSON report for the diff coverage gate instead of the terminal report.
+
+    Returns:
+        The coverage arguments, or None if there is nothing to measure.
+
+    """
+    if changed_since is None:
+        return f"{_coverage_sources(suite)} --cov-config={suite.coveragerc} {COVERAGE_REPORT_ARGUMENTS}"
+
+    files = changed_python_files(context, changed_since, list(suite.sources))
+    if not files:
+        print(f"No files changed since {changed_since} under {', '.join(suite.sources)}; skipping coverage")
+        return None
+    coveragerc = write_changed_only_coveragerc(suite.coveragerc, files, f".quality/pytest-cov/{suite.name}.coveragerc")
+    if not diff:
+        print(
+            f"Coverage gate disabled: only files changed since {changed_since} are measured and the suite's "
+            "fail_under threshold is not applied; pass --diff-coverage to gate the changed lines"
+        )
+    report_arguments = f"--cov-report=json:{_diff_report_path(suite)}" if diff else COVERAGE_REPORT_ARGUMENTS
+    return f"--cov --cov-config={coveragerc} {report_arguments}"
+
+
+def _diff_base(changed_since: str | None, *, diff_coverage: bool) -> str | None:
+    """Return the ref diff coverage is gated against, or None when it is not requested.
+
+    Raises:
+        ValueError: If diff coverage is requested without changed_since.
+
+    """
+    if diff_coverage and changed_since is None:
+        msg = "Diff coverage needs a base ref; pass --changed-since, e.g. --changed-since origin/main"
+        raise ValueError(msg)
+    return changed_since if diff_coverage else None
+
+
+def _gate_diff_coverage(context: Context, suite: PytestSuite, base_ref: str) -> None:
+    """Report the coverage of the lines changed since a ref and fail below the suite's threshold.
+
+    Args:
+        context: The invoke context.
+        suite: The suite that was run.
+        base_ref: The git ref the changes are measured against.
+
+    Raises:
+        Exit: If the changed lines are covered less than the suite's ``fail_under``.
+
+    """
+    report = load_report(_diff_report_path(suite))
+    files = diff_coverage(report, changed_lines(context, base_ref, sorted(report["files"])))
+    print("\n".join(report_lines(files)))
+    fail_under = coverage_fail_under(suite.coveragerc)
+    if total_percent(files) < fail_under:
+        msg = f"Diff coverage {total_percent(files):.1f}% is below {fail_under:g}% for changes since {base_ref}"
+        raise Exit(msg, code=1)
+
+
+def _cost_arguments(  # noqa: PLR0913
+    suite: PytestSuite,
+    *,
+    costs: bool,
+    memory_costs: bool,
+    time_budget: float,
+    memory_budget: float,
+    marker_budget: list[str] | None,
+) -> str:
+    """Build the arguments that record per-test costs and enforce budgets.
+
+    Costs are only recorded when asked for or when a budget needs them, and memory is only traced
+    for a memory report or budget, since tracing allocations roughly doubles a run's wall time.
+
+    Args:
+        suite: The suite being run.
+        costs: Record each test's wall time.
+        memory_costs: Also record each test's memory peak.
+        time_budget: Fail tests taking longer than this many seconds; 0 for no limit.
+        memory_budget: Fail tests peaking above this many MiB; 0 for no limit.
+        marker_budget: Budgets for tests with a marker, each MARKER=SECONDS[:MIB].
+
+    Returns:
+        The pytest arguments for the cost plugin, empty when nothing is recorded.
+
+    """
+    budgets = _budget_arguments(time_budget=time_budget, memory_budget=memory_budget, marker_budget=marker_budget)
+    if not (costs or memory_costs or budgets):
+        return ""
+    report = f"--cost-report={COST_REPORTS_DIRECTORY / suite.name}.json"
+    return " ".join([report, *(["--cost-memory"] if memory_costs else []), *budgets])
+
+
+def _budget_arguments(*, time_budget: float, memory_budget: float, marker_budget: list[str] | None) -> list[str]:
+    """Build the arguments that enforce per-test budgets, leaving out the limits that are 0."""
+    arguments = []
+    if time_budget:
+        arguments.append(f"--time-budget={time_budget:g}")
+    if memory_budget:
+        arguments.append(f"--memory-budget={memory_budget:g}")
+    arguments.extend(f"--marker-budget={budget}" for budget in marker_budget or [])
+    return arguments
+
+
+def _collection_cache_path(suite: PytestSuite) -> str:
+    """Return the collection cache file a suite's runs record into."""
+    return f"{COLLECTION_CACHE_DIRECTORY / suite.name}.json"
+
+
+def _test_selection(suite: PytestSuite, marker: str | None) -> str | None:
+    """Build the test paths and marker arguments for a run.
+
+    With a marker expression, the collection cache narrows the run to the test files that contain
+    matching tests or changed since they were cached, so pytest does not import the others.
+
+    Args:
+        suite: The suite being run.
+        marker: Optional ``-m`` expression selecting the tests to run.
+
+    Returns:
+        The pytest arguments, or None if no cached test matches the marker expression.
+
+    """
+    if marker is None:
+        return suite.path
+    cache = CollectionCache.load(_collection_cache_path(suite), config_digest())
+    test_files = discover_test_files([suite.path])
+    selected = select_files(cache, test_files, marker)
+    if not selected:
+        print(f"No tests in {suite.path} match -m {marker!r}; skipping")
+        return None
+    print(f"Collecting {len(selected)} of {len(test_files)} test file(s) for -m {marker!r}")
+    return f"{' '.join(selected)} -m {shlex.quote(marker)}"
+
+
+def _run_suite(  # noqa: PLR0913
+    context: Context,
+    suite: PytestSuite,
+    *,
+    profile: bool,
+    coverage_core: str,
+    changed_since: str | None,
+    diff_coverage: bool = False,
+    marker: str | None = None,
+    cost_arguments: str,
+) -> None:
+    """Run a pytest suite with the requested coverage mode.
+
+    Args:
+        context: The invoke context.
+        suite: The suite to run.
+        profile: Run pytest under cProfile.
+        coverage_core: The requested coverage mode, one of COVERAGE_CORES.
+        changed_since: Optional git ref; only files changed since it are measured.
+        diff_coverage: Gate on the coverage of the lines changed since changed_since.
+        marker: Optional ``-m`` expression selecting the tests to run.
+        cost_arguments: The per-test cost recording and budget arguments.
+
+    """
+    diff_base = _diff_base(changed_since, diff_coverage=diff_coverage)
+    selection = _test_selection(suite, marker)
+    if selection is None:
+        return
+    core = resolve_coverage_core(coverage_core, branch=is_branch_coverage(suite.coveragerc))
+    coverage_arguments = _coverage_arguments(context, suite, changed_since, diff=diff_coverage) if core else None
+    arguments = f"{selection} --disable-socket --collection-cache={_collection_cache_path(suite)}"
+    for extra in (cost_arguments, coverage_arguments):
+        if extra:
+            arguments = f"{arguments} {extra}"
+    command = tool_command("pytest", arguments, profile_name=suite.name if profile else None)
+
+    if core and coverage_arguments:
+        context.run(command, echo=True, env={"COVERAGE_CORE": core})
+    else:
+        context.run(command, echo=True)
+    if diff_base and coverage_arguments:
+        _gate_diff_coverage(context, suite, diff_base)
+
+
+@task(iterable=["marker_budget"])
+def unit(  # noqa: PLR0913
+    context: Context,
+    *,
+    profile: bool = False,
+    coverage_core: str = "auto",
+    changed_since: str | None = None,
+    diff_coverage: bool = False,
+    marker: str | None = None,
+    costs: bool = False,
+    memory_costs: bool = False,
+    time_budget: float = 0.0,
+    memory_budget: float = 0.0,
+    marker_budget: list[str] | None = None,
+) -> None:
+    """Run unit tests using pytest, optionally recording per-test costs under .quality/pytest/costs.
+
+    Args:
+        context: The invoke context.
+        profile: Run pytest under cProfile, writing stats to .quality/profiles/tests.unit.pstats.
+        coverage_core: Coverage mode: auto (sysmon when supported, else ctrace), sysmon, ctrace, pytrace or none.
+        changed_since: Only measure coverage for files changed since this git ref; the fail_under threshold is
+            not applied unless diff_coverage is also given.
+        diff_coverage: Instead of the full report, report and gate on the coverage of the lines changed since
+            changed_since, using the suite's fail_under threshold.
+        marker: Only run tests matching this -m expression, importing only the test files the collection cache
+            says contain a match.
+        costs: Record each test's wall time and list the slowest tests.
+        memory_costs: Also record each test's memory peak, which slows the run down.
+        time_budget: Fail tests taking longer than this many seconds; 0 for no limit.
+        memory_budget: Fail tests whose memory peak exceeds this many MiB; 0 for no limit.
+        marker_budget: Budget for tests with a marker, as MARKER=SECONDS[:MIB], e.g. slow=30; may be repeated.
+
+    """
+    _run_suite(
+        context,
+        UNIT_SUITE,
+        profile=profile,
+        coverage_core=coverage_core,
+        changed_since=changed_since,
+        diff_coverage=diff_coverage,
+        marker=marker,
+        cost_arguments=_cost_arguments(
+            UNIT_SUITE,
+            costs=costs,
+            memory_costs=memory_costs,
+            time_budget=time_budget,
+            memory_budget=memory_budget,
+            marker_budget=marker_budget,
+        ),
     )
 
 
-@task
-def integration(context: Context) -> None:
-    """Run integration tests using pytest."""
-    context.run(
-        "poetry run pytest tests/integration/ --disable-socket --cov=src "
-        "--cov-config=.integration-test-coveragerc --cov-report term-missing --cov-report term:skip-covered",
-        echo=True,
+@task(iterable=["marker_budget"])
+def integration(  # noqa: PLR0913
+    context: Context,
+    *,
+    profile: bool = False,
+    coverage_core: str = "auto",
+    changed_since: str | None = None,
+    diff_coverage: bool = False,
+    marker: str | None = None,
+    costs: bool = False,
+    memory_costs: bool = False,
+    time_budget: float = 0.0,
+    memory_budget: float = 0.0,
+    marker_budget: list[str] | None = None,
+) -> None:
+    """Run integration tests using pytest, optionally recording per-test costs under .quality/pytest/costs.
+
+    Args:
+        context: The invoke context.
+        profile: Run pytest under cProfile, writing stats to .quality/profiles/tests.integration.pstats.
+        coverage_core: Coverage mode: auto (sysmon when supported, else ctrace), sysmon, ctrace, pytrace or none.
+        changed_since: Only measure coverage for files changed since this git ref; the fail_under threshold is
+            not applied unless diff_coverage is also given.
+        diff_coverage: Instead of the full report, report and gate on the coverage of the lines changed since
+            changed_since, using the suite's fail_under threshold.
+        marker: Only run tests matching this -m expression, importing only the test files the collection cache
+            says contain a match.
+        costs: Record each test's wall time and list the slowest tests.
+        memory_costs: Also record each test's memory peak, which slows the run down.
+        time_budget: Fail tests taking longer than this many seconds; 0 for no limit.
+        memory_budget: Fail tests whose memory peak exceeds this many MiB; 0 for no limit.
+        marker_budget: Budget for tests with a marker, as MARKER=SECONDS[:MIB], e.g. slow=30; may be repeated.
+
+    """
+    _run_suite(
+        context,
+        INTEGRATION_SUITE,
+        profile=profile,
+        coverage_core=coverage_core,
+        changed_since=changed_since,
+        diff_coverage=diff_coverage,
+        marker=marker,
+        cost_arguments=_cost_arguments(
+            INTEGRATION_SUITE,
+            costs=costs,
+            memory_costs=memory_costs,
+            time_budget=time_budget,
+            memory_budget=memory_budget,
+            marker_budget=marker_budget,
+        ),
     )
 
 
+@task
+def coverage_benchmark(context: Context, repeat: int = 3) -> None:
+    """Measure the unit test overhead of each coverage core against an uninstrumented run.
+
+    Args:
+        context: The invoke context.
+        repeat: How many times to run each mode; the median is reported.
+
+    """
+    branch = is_branch_coverage(UNIT_SUITE.coveragerc)
+    sources = _coverage_sources(UNIT_SUITE)
+    medians: dict[str, float] = {}
+    for mode in BENCHMARK_MODES:
+        reason = sysmon_unavailable_reason(branch=branch) if mode == "sysmon" else None
+        if reason:
+            print(f"Skipping {mode}: {reason}")
+            continue
+        core = resolve_coverage_core(mode, branch=branch)
+        arguments = f"{UNIT_SUITE.path} --disable-socket -q"
+        env = {}
+        if core:
+            arguments = f"{arguments} {sources} --cov-config={UNIT_SUITE.coveragerc} --cov-report="
+            env["COVERAGE_CORE"] = core
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            context.run(tool_command("pytest", arguments), hide=True, warn=True, env=env)
+            timings.append(time.perf_counter() - start)
+        medians[mode] = statistics.median(timings)
+
+    baseline = medians["none"]
+    print(f"\n{'mode':<10} {'median (s)':>12} {'overhead':>10}")
+    for mode, seconds in medians.items():
+        overhead = (seconds / baseline - 1) * 100 if baseline else 0.0
+        print(f"{mode:<10} {seconds:>12.2f} {overhead:>9.1f}%")
+
+
+@task
+def benchmark(
+    context: Context, tolerance: float = DEFAULT_TOLERANCE, rounds: int = DEFAULT_ROUNDS, *, save_baseline: bool = False
+) -> None:
+    """Run the lessons_learnt micro-benchmarks and fail if any regressed against the saved baseline.
+
+    The latency percentiles and throughput of each benchmark are written to
+    .quality/benchmarks/latest.json. The first run, or a run with save_baseline, saves them as the
+    baseline in .quality/benchmarks/baseline.json instead of comparing against it.
+
+    Args:
+        context: The invoke context.
+        tolerance: How many percent slower than the baseline a benchmark's median latency may get.
+        rounds: How many timed rounds each benchmark makes.
+        save_baseline: Save this run's results as the new baseline.
+
+    Raises:
+        Exit: If a benchmark's median latency regressed past the tolerance.
+
+    """
+    arguments = f"{BENCHMARK_SUITE_PATH} --disable-socket -q --benchmark-report={BENCHMARK_REPORT_PATH}"
+    context.run(tool_command("pytest", f"{arguments} --benchmark-rounds={rounds}"), echo=True)
+    if save_baseline or not BENCHMARK_BASELINE_PATH.is_file():
+        shutil.copyfile(BENCHMARK_REPORT_PATH, BENCHMARK_BASELINE_PATH)
+        print(f"Benchmark baseline saved to {BENCHMARK_BASELINE_PATH}")
+        return
+    current, baseline = load_results(BENCHMARK_REPORT_PATH), load_results(BENCHMARK_BASELINE_PATH)
+    print("\n".join(comparison_lines(current, baseline)))
+    regressions = find_regressions(current, baseline, tolerance)
+    if regressions:
+        names = ", ".join(f"{regression.name} (+{regression.slowdown:.1f}%)" for regression in regressions)
+        msg = f"{len(regressions)} benchmark(s) regressed by more than {tolerance:g}%: {names}"
+        raise Exit(msg, code=1)
+
+
+@task
+def shard(context: Context, index: int = 0, total: int = 1, coverage_core: str = "auto") -> None:
+    """Run one duration-balanced shard of the unit and integration tests.
+
+    Coverage data and JUnit reports are written per shard under .quality/tests/shards for
+    'invoke tests.merge-shards' to combine; the coverage threshold is only enforced on merge,
+    which also records the per-test durations used to balance later runs.
+
+    Args:
+        context: The invoke context.
+        index: The zero-based shard to run.
+        total: The total number of shards.
+        coverage_core: Coverage mode: auto (sysmon when supported, else ctrace), sysmon, ctrace, pytrace or none.
+
+    """
+    if not 0 <= index < total:
+        msg = f"Shard index must be between 0 and {total - 1}, got {index}"
+        raise ValueError(msg)
+    history = DurationHistory.load(TEST_DURATIONS_PATH)
+    files = discover_test_files([suite.path for suite in SUITES])
+    shard_files = plan_shards(file_weights(files, history), total)[index]
+    print(f"Shard {index + 1}/{total}: {len(shard_files)} of {len(files)} test file(s)")
+    ensure_directory(SHARDS_DIRECTORY)
+
+    for suite in SUITES:
+        suite_files = [file_name for file_name in shard_files if file_name.startswith(suite.path)]
+        if not suite_files:
+            continue
+        junit_file = SHARDS_DIRECTORY / f"{suite.name}.{index}.xml"
+        arguments = (
+            f"{' '.join(suite_files)} --disable-socket --collection-cache={_collection_cache_path(suite)} "
+            f"--junitxml={junit_file}"
+        )
+        env = {}
+        core = resolve_coverage_core(coverage_core, branch=is_branch_coverage(suite.coveragerc))
+        if core:
+            arguments = (
+                f"{arguments} {_coverage_sources(suite)} --cov-config={suite.coveragerc} "
+                "--cov-report= --cov-fail-under=0"
+            )
+            env = {"COVERAGE_CORE": core, "COVERAGE_FILE": str(SHARDS_DIRECTORY / f"{suite.name}.{index}.coverage")}
+        context.run(tool_command("pytest", arguments), echo=True, env=env)
+
+
+@task
+def merge_shards(context: Context) -> None:
+    """Combine shard coverage and JUnit reports, enforce the coverage thresholds and record test durations.
+
+    Args:
+        context: The invoke context.
+
+    """
+    for suite in SUITES:
+        data_files = sorted(str(path) for path in SHARDS_DIRECTORY.glob(f"{suite.name}.*.coverage"))
+        if not data_files:
+            continue
+        context.run(f"poetry run coverage combine --rcfile={suite.coveragerc} {' '.join(data_files)}", echo=True)
+        context.run(f"poetry run coverage report --rcfile={suite.coveragerc} --show-missing", echo=True)
+
+    junit_files = sorted(SHARDS_DIRECTORY.glob("*.xml"))
+    if junit_files:
+        history = DurationHistory.load(TEST_DURATIONS_PATH)
+        record_junit_durations(junit_files, history)
+        history.save()
+        print(f"Merged {len(junit_files)} JUnit report(s) into {merge_junit_reports(junit_files, MERGED_JUNIT_PATH)}")
+
+
 @task
 def tox(context: Context) -> None:
-    """Run multi-version testing using tox."""
-    context.run("poetry run tox", echo=True)
+    """Run multi-version testing using tox, with its pip installs going through 'invoke index.proxy' when it runs.
+
+    Only pip uses the proxy; the poetry install in each tox environment downloads from poetry's sources.
+
+    Args:
+        context: The invoke context.
+
+    """
+    context.run("poetry run tox", echo=True, env=proxy_environment())
 
 
 collection = Collection("tests")
 collection.add_task(unit)
 collection.add_task(integration)
+collection.add_task(coverage_benchmark)
+collection.add_task(benchmark)
+collection.add_task(shard)
+collection.add_task(merge_shards)
 collection.add_task(tox)
@@ -0,0 +1,25 @@
+"""Tool probe tasks for inspecting the environment project tasks depend on."""
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+
+from project.tool_probes import probe_environment
+
+
+@task
+def probe(context: Context, *, refresh: bool = False) -> None:
+    """Show the versions and availability of the tools project tasks use.
+
+    Args:
+        context: The invoke context.
+        refresh: Probe again instead of reusing the probes cached for this PATH and lock file.
+
+    """
+    for name, tool_probe in sorted(probe_environment(context, refresh=refresh).items()):
+        status = "✓" if tool_probe.available else "✗"
+        print(f"{status} {name:<12} {tool_probe.version}")
+
+
+collection = Collection("tools")
+collection.add_task(probe)
@@ -4,15 +4,22 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
-from project.utils import ensure_directory, get_current_working_directory
+from project.utils import ensure_directory, get_current_working_directory, workspace_index
 
 
 @task
 def check(context: Context) -> None:
-    """Run trivy security scanner using Docker to scan the filesystem for vulnerabilities and security issues."""
+    """Run trivy security scanner using Docker to scan the filesystem for vulnerabilities and security issues.
+
+    Top-level directories without any files in the workspace index, such as .venv and .quality, are skipped.
+    """
     workspace_path = get_current_working_directory()
     cache_path = workspace_path / ".quality" / "trivy"
     ensure_directory(cache_path)
+    skip_dirs = "".join(
+        f"--skip-dirs /workspace/{directory} "
+        for directory in workspace_index(context).unindexed_directories(workspace_path)
+    )
 
     context.run(
         f"docker run --rm "
@@ -21,6 +28,7 @@ def check(context: Context) -> None:
         f"aquasec/trivy fs "
         f"--scanners vuln,secret,misconfig,license "
         f"--exit-code 1 "
+        f"{skip_dirs}"
         f"/workspace",
         echo=True,
     )
@@ -4,11 +4,24 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.profiling import tool_command
+from project.utils import shell_paths, workspace_index
+
 
 @task
-def check(context: Context) -> None:
-    """Run vulture to check for unused code."""
-    context.run("poetry run vulture . vulture_whitelist", echo=True)
+def check(context: Context, *, profile: bool = False) -> None:
+    """Run vulture on the Python files in the workspace index to check for unused code.
+
+    Args:
+        context: The invoke context.
+        profile: Run vulture under cProfile, writing stats to .quality/profiles/vulture.check.pstats.
+
+    """
+    files = shell_paths(workspace_index(context).paths("python"))
+    context.run(
+        tool_command("vulture", f"{files} vulture_whitelist", profile_name="vulture.check" if profile else None),
+        echo=True,
+    )
 
 
 @task
@@ -0,0 +1,30 @@
+"""Remote worker tasks for distributed project checks."""
+
+from invoke import task
+from invoke.collection import Collection
+from invoke.context import Context
+
+from project.remote_workers import DEFAULT_WORKER_HOST, DEFAULT_WORKER_PORT, WorkerServer, worker_token
+from project.utils import get_current_working_directory
+
+
+@task
+def serve(context: Context, host: str = DEFAULT_WORKER_HOST, port: int = DEFAULT_WORKER_PORT) -> None:  # noqa: ARG001
+    """Start a worker that runs tasks shipped by 'invoke project.check --workers host:port'.
+
+    Only coordinators sending the token in PROJECT_WORKER_TOKEN are served, and only the tasks of
+    project.check are run.
+
+    Args:
+        context: The invoke context.
+        host: The interface to listen on.
+        port: The port to listen on.
+
+    """
+    with WorkerServer((host, port), get_current_working_directory(), worker_token()) as server:
+        print(f"Worker listening on {host}:{port}")
+        server.serve_forever()
+
+
+collection = Collection("workers")
+collection.add_task(serve)
@@ -4,11 +4,14 @@ from invoke import task
 from invoke.collection import Collection
 from invoke.context import Context
 
+from project.utils import shell_paths, workspace_index
+
 
 @task
 def check(context: Context) -> None:
-    """Run xenon to check for code complexity."""
-    context.run("poetry run xenon --max-absolute B --max-modules A --max-average A .", echo=True)
+    """Run xenon on the Python files in the workspace index to check for code complexity."""
+    files = shell_paths(workspace_index(context).paths("python"))
+    context.run(f"poetry run xenon --max-absolute B --max-modules A --max-average A {files}", echo=True)
 
 
 collection = Collection("xenon")
@@ -0,0 +1,226 @@
+"""Cached probes of the tools and environment that project tasks depend on.
+
+Versions and availability of docker, npx, poetry, the trivy image and the Python tools in the
+venv are detected once and stored under PROBES_PATH, keyed by ``PATH`` and the poetry.lock
+digest. The cached probes are reused until PROBE_TTL_SECONDS pass, so repeated runs in a session
+do not start the same version subprocesses again. Only available tools are cached: a tool that
+was missing is probed again on every run, so installing it or starting its daemon takes effect
+at once. Probe results feed the result cache key and let project.check skip tasks whose tools are
+unavailable before starting a long run.
+
+Python tools are looked up in the environment invoke runs in first. Tasks run them with ``poetry
+run``, so when invoke itself runs elsewhere, e.g. from pipx, the packages it cannot see are looked
+up in the poetry environment in one extra subprocess.
+"""
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import shlex
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.environment_snapshot import LOCK_FILE, lock_digest
+from project.utils import ensure_directory
+
+PROBES_PATH = Path(".quality/probes")
+PROBE_TTL_SECONDS = 4 * 60 * 60
+PROBE_SCHEMA_VERSION = "1"
+UNAVAILABLE = "unavailable"
+
+# Probe name -> (executable that must be on PATH, command printing the version)
+COMMAND_PROBES = {
+    "docker": ("docker", "docker version --format '{{.Server.Version}}'"),
+    "npx": ("npx", "npx --version"),
+    "poetry": ("poetry", "poetry --version"),
+    "trivy-image": ("docker", "docker image inspect --format '{{index .RepoDigests 0}}' aquasec/trivy"),
+}
+# Distributions whose installed version is read from the venv without starting a subprocess
+PACKAGE_PROBES = ("coverage", "deptry", "mypy", "pip-audit", "pre-commit", "pytest", "ruff", "vulture", "xenon")
+# Prints the versions of the distributions named in its arguments, as seen by the poetry environment
+POETRY_VERSIONS_SCRIPT = (
+    "import importlib.metadata, json, sys; "
+    "print(json.dumps({name: next((d.version for d in importlib.metadata.distributions(name=name)), None) "
+    "for name in sys.argv[1:]}))"
+)
+
+
+@dataclass
+class ToolProbe:
+    """The detected state of one tool.
+
+    Attributes:
+        name: The probe name, e.g. ``docker`` or ``ruff``.
+        available: Whether the tool can be used.
+        version: The reported version, or UNAVAILABLE.
+
+    """
+
+    name: str
+    available: bool
+    version: str = UNAVAILABLE
+
+
+def probe_key(path_variable: str, lock_file: str | Path = LOCK_FILE) -> str:
+    """Compute the key cached probes are valid for.
+
+    Args:
+        path_variable: The ``PATH`` the tools are looked up on.
+        lock_file: The poetry lock file pinning the venv's tools.
+
+    Returns:
+        A hex sha256 digest.
+
+    """
+    lock_hash = lock_digest(lock_file) if Path(lock_file).is_file() else ""
+    material = json.dumps({"schema": PROBE_SCHEMA_VERSION, "path": path_variable, "lock": lock_hash})
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _probe_command(context: Context, name: str, executable: str, command: str) -> ToolProbe:
+    """Run a version command if its executable is on PATH."""
+    if shutil.which(executable) is None:
+        return ToolProbe(name=name, available=False)
+    result = context.run(command, hide=True, warn=True, in_stream=False)
+    if result is None or not result.ok or not result.stdout.strip():
+        return ToolProbe(name=name, available=False)
+    return ToolProbe(name=name, available=True, version=result.stdout.strip().splitlines()[0])
+
+
+def _probe_package(name: str) -> ToolProbe:
+    """Read the installed version of a distribution."""
+    try:
+        return ToolProbe(name=name, available=True, version=importlib.metadata.version(name))
+    except importlib.metadata.PackageNotFoundError:
+        return ToolProbe(name=name, available=False)
+
+
+def _probe_poetry_packages(context: Context, names: list[str]) -> dict[str, ToolProbe]:
+    """Read the versions of distributions installed in the poetry environment the tasks run tools from."""
+    if not names or shutil.which("poetry") is None:
+        return {}
+    command = shlex.join(["poetry", "run", "python", "-c", POETRY_VERSIONS_SCRIPT, *names])
+    result = context.run(command, hide=True, warn=True, in_stream=False)
+    try:
+        versions = json.loads(result.stdout) if result is not None and result.ok else {}
+    except ValueError:
+        return {}
+    return {
+        name: ToolProbe(name=name, available=True, version=str(versions[name]))
+        for name in names
+        if versions.get(name) is not None
+    }
+
+
+def _probe_packages(context: Context, names: list[str]) -> dict[str, ToolProbe]:
+    """Probe distributions in invoke's environment, falling back to the poetry environment."""
+    probes = {name: _probe_package(name) for name in names}
+    probes.update(_probe_poetry_packages(context, [name for name, probe in probes.items() if not probe.available]))
+    return probes
+
+
+def run_probes(context: Context, names: list[str] | None = None) -> dict[str, ToolProbe]:
+    """Probe the given tools, or every tool.
+
+    Args:
+        context: The invoke context.
+        names: Optional probe names; defaults to every command and package probe.
+
+    Returns:
+        Mapping of probe name to its result.
+
+    """
+    names = names or [*COMMAND_PROBES, *PACKAGE_PROBES]
+    probes = {name: _probe_command(context, name, *COMMAND_PROBES[name]) for name in names if name in COMMAND_PROBES}
+    probes.update(_probe_packages(context, [name for name in names if name not in COMMAND_PROBES]))
+    return {name: probes[name] for name in names}
+
+
+def _load_probes(probe_file: Path) -> tuple[float, dict[str, ToolProbe]]:
+    """Load the cached probes and when they were made, or nothing if there are none or they are stale."""
+    try:
+        cached = json.loads(probe_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return time.time(), {}
+    created_at = cached.get("created_at", 0)
+    if time.time() - created_at > PROBE_TTL_SECONDS:
+        return time.time(), {}
+    return created_at, {name: ToolProbe(**probe) for name, probe in cached["probes"].items()}
+
+
+def probe_environment(
+    context: Context, *, refresh: bool = False, root: str | Path = PROBES_PATH
+) -> dict[str, ToolProbe]:
+    """Return the tool probes, reusing the available tools cached for the current PATH and lock file.
+
+    Args:
+        context: The invoke context.
+        refresh: Probe again even if fresh cached probes exist.
+        root: The directory probes are cached in.
+
+    Returns:
+        Mapping of probe name to its result.
+
+    """
+    probe_file = Path(root) / f"{probe_key(os.environ.get('PATH', ''))}.json"
+    created_at, probes = (time.time(), {}) if refresh else _load_probes(probe_file)
+    unprobed = [name for name in [*COMMAND_PROBES, *PACKAGE_PROBES] if name not in probes]
+    if unprobed:
+        probes.update(run_probes(context, unprobed))
+        available = {name: asdict(probe) for name, probe in probes.items() if probe.available}
+        ensure_directory(probe_file.parent)
+        cached = {"created_at": created_at, "probes": available}
+        probe_file.write_text(json.dumps(cached, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return probes
+
+
+def probe_versions(probes: dict[str, ToolProbe]) -> dict[str, str]:
+    """Describe the probed tools as result cache key inputs.
+
+    Args:
+        probes: The tool probes.
+
+    Returns:
+        Mapping of probe name to its version, or UNAVAILABLE.
+
+    """
+    return {name: probe.version for name, probe in sorted(probes.items())}
+
+
+def missing_tools(required: tuple[str, ...], probes: dict[str, ToolProbe]) -> list[str]:
+    """List the required tools that were probed and found unavailable.
+
+    Tools without a probe are assumed to be available.
+
+    Args:
+        required: The names of the tools a task needs.
+        probes: The tool probes.
+
+    Returns:
+        The unavailable tools, in the order they are required.
+
+    """
+    return [name for name in required if name in probes and not probes[name].available]
+
+
+def require_tools(context: Context, *required: str) -> None:
+    """Fail fast if any of the tools a task needs is unavailable.
+
+    Args:
+        context: The invoke context.
+        *required: The names of the tools the task needs.
+
+    Raises:
+        Exit: If a required tool is unavailable.
+
+    """
+    missing = missing_tools(required, probe_environment(context))
+    if missing:
+        msg = f"Required tool(s) unavailable: {', '.join(missing)} (run 'invoke tools.probe --refresh' to re-check)"
+        raise Exit(msg, code=1)
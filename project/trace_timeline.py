@@ -0,0 +1,142 @@
+"""Chrome Trace Event timelines of project task runs.
+
+A TraceRecorder collects complete ("X") events, one track per thread that runs tasks, and writes
+them as Trace Event Format JSON that chrome://tracing and https://ui.perfetto.dev open directly.
+While a recorder is active, BoundedCaptureRunner adds a span for every ``context.run`` command,
+so subprocesses show up nested inside the span of the task that ran them.
+"""
+
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from project.utils import ensure_directory
+
+TRACE_PATH = Path(".quality/trace/check.json")
+MICROSECONDS = 1_000_000
+
+_active_recorder: "TraceRecorder | None" = None
+
+
+class TraceRecorder:
+    """Collects timed spans of a run as Chrome Trace Event Format events.
+
+    Attributes:
+        path: Where the trace is written.
+        events: The recorded trace events.
+
+    """
+
+    def __init__(self, path: Path = TRACE_PATH) -> None:
+        """Initialize the recorder; timestamps are relative to its creation.
+
+        Args:
+            path: Where the trace is written.
+
+        """
+        self.path = path
+        self.events: list[dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._tracks: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def now(self) -> float:
+        """Return the current time in the recorder's clock."""
+        return time.perf_counter()
+
+    def _track(self) -> int:
+        """Return the track of the current thread, naming it on first use."""
+        ident = threading.get_ident()
+        if ident not in self._tracks:
+            track = self._tracks[ident] = len(self._tracks)
+            name = "main" if ident == threading.main_thread().ident else f"worker-{track}"
+            self.events.append(
+                {"ph": "M", "name": "thread_name", "pid": os.getpid(), "tid": track, "args": {"name": name}}
+            )
+        return self._tracks[ident]
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: dict[str, Any] | None = None) -> None:
+        """Record a span on the current thread's track.
+
+        Args:
+            name: The span name shown in the viewer.
+            category: The span category, e.g. ``task`` or ``command``.
+            start: The start time from now().
+            end: The end time from now().
+            args: Optional details shown when the span is selected.
+
+        """
+        with self._lock:
+            self.events.append(
+                {
+                    "ph": "X",
+                    "name": name,
+                    "cat": category,
+                    "pid": os.getpid(),
+                    "tid": self._track(),
+                    "ts": round((start - self._origin) * MICROSECONDS),
+                    "dur": round((end - start) * MICROSECONDS),
+                    "args": args or {},
+                }
+            )
+
+    @contextmanager
+    def span(self, name: str, category: str, args: dict[str, Any] | None = None) -> Iterator[None]:
+        """Record a span around a block, also when the block raises.
+
+        Args:
+            name: The span name shown in the viewer.
+            category: The span category.
+            args: Optional details shown when the span is selected.
+
+        Yields:
+            None.
+
+        """
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, category, start, self.now(), args)
+
+    def write(self) -> Path:
+        """Write the trace as Trace Event Format JSON.
+
+        Returns:
+            The trace file path.
+
+        """
+        ensure_directory(self.path.parent)
+        with self._lock:
+            trace = {"traceEvents": self.events, "displayTimeUnit": "ms"}
+            self.path.write_text(json.dumps(trace) + "\n", encoding="utf-8")
+        return self.path
+
+
+def active_recorder() -> TraceRecorder | None:
+    """Return the recorder of the run in progress, if it is being traced."""
+    return _active_recorder
+
+
+@contextmanager
+def recording(recorder: TraceRecorder | None) -> Iterator[None]:
+    """Make a recorder active for a block so that commands run inside it are traced.
+
+    Args:
+        recorder: The recorder, or None to trace nothing.
+
+    Yields:
+        None.
+
+    """
+    global _active_recorder  # noqa: PLW0603
+    previous, _active_recorder = _active_recorder, recorder
+    try:
+        yield
+    finally:
+        _active_recorder = previous
@@ -1,6 +1,31 @@
 """Utility functions for cross-platform task operations."""
 
-from pathlib import Path
+import fnmatch
+import hashlib
+import shlex
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+
+from invoke.context import Context
+from invoke.runners import Result
+
+REGULAR_FILE_MODE = "100644"
+SYMLINK_MODE = "120000"
+FILE_TYPES = {
+    ".py": "python",
+    ".pyi": "python",
+    ".md": "markdown",
+    ".toml": "toml",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".json": "json",
+    ".sh": "shell",
+}
+
+_workspace_indexes: dict[Path, "WorkspaceIndex"] = {}
+_workspace_index_lock = threading.Lock()
 
 
 def ensure_directory(path: str | Path) -> Path:
@@ -38,3 +63,195 @@ def get_current_working_directory() -> Path:
 
     """
     return Path.cwd().resolve()
+
+
+@dataclass(frozen=True)
+class IndexedFile:
+    """A file in the workspace index.
+
+    Attributes:
+        path: POSIX-style path relative to the repository root.
+        blob: The git blob hash of the file's content.
+        mode: The git file mode, e.g. ``100644``.
+
+    """
+
+    path: str
+    blob: str
+    mode: str
+
+    @property
+    def file_type(self) -> str:
+        """The kind of file, e.g. ``python`` or ``yaml``, derived from the mode and suffix."""
+        if self.mode == SYMLINK_MODE:
+            return "symlink"
+        return FILE_TYPES.get(PurePosixPath(self.path).suffix, "other")
+
+
+@dataclass(frozen=True)
+class WorkspaceIndex:
+    """The files in the workspace: tracked files plus untracked files that are not ignored.
+
+    Attributes:
+        files: The indexed files, sorted by path.
+
+    """
+
+    files: tuple[IndexedFile, ...]
+
+    def paths(self, file_type: str | None = None, exclude: Iterable[str] = ()) -> list[str]:
+        """List indexed paths, optionally filtered.
+
+        Args:
+            file_type: Only include files of this type, e.g. ``python``.
+            exclude: fnmatch patterns of paths to leave out, e.g. ``tasks.py`` or ``docs/*``.
+
+        Returns:
+            The matching paths, sorted.
+
+        Example:
+            >>> workspace_index(context).paths("python", exclude=["tasks.py"])
+            ['project/__init__.py', 'project/project.py', ...]
+
+        """
+        patterns = list(exclude)
+        return [
+            indexed.path
+            for indexed in self.files
+            if file_type in {None, indexed.file_type}
+            and not any(fnmatch.fnmatch(indexed.path, pattern) for pattern in patterns)
+        ]
+
+    def digest(self) -> str:
+        """Return a sha256 hex digest of every indexed path, mode and blob hash."""
+        digest = hashlib.sha256()
+        for indexed in self.files:
+            digest.update(f"{indexed.mode} {indexed.blob}\t{indexed.path}\n".encode())
+        return digest.hexdigest()
+
+    def unindexed_directories(self, root: str | Path = ".") -> list[str]:
+        """List top-level directories that contain no indexed files, such as ``.venv``.
+
+        Args:
+            root: The repository root.
+
+        Returns:
+            Sorted directory names.
+
+        """
+        indexed = {indexed.path.split("/", 1)[0] for indexed in self.files}
+        return sorted(entry.name for entry in Path(root).iterdir() if entry.is_dir() and entry.name not in indexed)
+
+
+def git_blob_hash(path: str | Path) -> str:
+    """Hash a file's content the way git hashes blobs.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        The hex sha1 blob hash.
+
+    """
+    content = Path(path).read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(content) + content, usedforsecurity=False).hexdigest()
+
+
+def nul_separated(result: Result | None) -> list[str]:
+    """Split the output of a git command run with ``-z`` into its entries.
+
+    Args:
+        result: The command's result, or None if it was not run.
+
+    Returns:
+        The entries, without empty ones.
+
+    """
+    return [entry for entry in result.stdout.split("\0") if entry] if result is not None else []
+
+
+def merge_base(context: Context, base_ref: str) -> str:
+    """Find the commit HEAD branched off from a base ref.
+
+    Comparing against the merge-base rather than the base ref itself leaves out the changes made
+    on the base branch since, which are not part of the current branch.
+
+    Args:
+        context: The invoke context.
+        base_ref: The git ref to compare against, e.g. ``origin/main``.
+
+    Returns:
+        The merge-base commit hash.
+
+    Raises:
+        ValueError: If git finds no merge-base.
+
+    """
+    result = context.run(shlex.join(["git", "merge-base", base_ref, "HEAD"]), hide=True)
+    commit = result.stdout.strip() if result is not None else ""
+    if not commit:
+        msg = f"No merge-base between {base_ref} and HEAD"
+        raise ValueError(msg)
+    return commit
+
+
+def build_workspace_index(context: Context) -> WorkspaceIndex:
+    """Build the workspace index from the git index and its stat cache.
+
+    Tracked files take their blob hashes straight from ``git ls-files -s``. Git's stat cache
+    then identifies the files that changed in the working tree, and only those, plus untracked
+    files, are read and hashed. Deleted files and the '.quality' tool output are left out. Paths
+    are read NUL-separated, since git C-quotes paths with non-ASCII or special characters otherwise.
+
+    Args:
+        context: The invoke context.
+
+    Returns:
+        The workspace index.
+
+    """
+    staged = context.run("git ls-files -s -z", hide=True)
+    changed = context.run("git ls-files -z -m -o --exclude-standard -- . ':(exclude).quality'", hide=True)
+    files: dict[str, IndexedFile] = {}
+    for entry in nul_separated(staged):
+        metadata, path = entry.split("\t", 1)
+        mode, blob, _stage = metadata.split()
+        files[path] = IndexedFile(path=path, blob=blob, mode=mode)
+    for path in set(nul_separated(changed)):
+        if Path(path).is_file():
+            mode = files[path].mode if path in files else REGULAR_FILE_MODE
+            files[path] = IndexedFile(path=path, blob=git_blob_hash(path), mode=mode)
+        else:
+            files.pop(path, None)
+    return WorkspaceIndex(files=tuple(files[path] for path in sorted(files)))
+
+
+def workspace_index(context: Context, *, refresh: bool = False) -> WorkspaceIndex:
+    """Return the workspace index for the current directory, building it once per process.
+
+    Args:
+        context: The invoke context.
+        refresh: Rebuild the index even if one was already built.
+
+    Returns:
+        The workspace index.
+
+    """
+    root = get_current_working_directory()
+    with _workspace_index_lock:
+        if refresh or root not in _workspace_indexes:
+            _workspace_indexes[root] = build_workspace_index(context)
+        return _workspace_indexes[root]
+
+
+def shell_paths(paths: list[str]) -> str:
+    """Join paths into shell arguments, falling back to the current directory when empty.
+
+    Args:
+        paths: The paths to pass to a tool.
+
+    Returns:
+        The quoted, space-separated paths, or ``.``.
+
+    """
+    return shlex.join(paths) if paths else "."
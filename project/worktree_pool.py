@@ -0,0 +1,223 @@
+"""A pool of reusable git worktrees for checking several refs at once.
+
+Each slot under WORKTREE_POOL_DIRECTORY is a detached worktree that is switched to the next ref
+with ``git checkout --force`` and ``git clean -fd``. Git-ignored files survive the switch, so a
+slot's ruff, pytest and result caches stay warm between runs; mypy's cache is already shared
+through the git common directory. Checks run against the current virtualenv with the slot's
+``src`` first on ``PYTHONPATH``, so no slot needs its own environment, and they share a result
+cache tier under the main checkout so a ref checked in one slot is not checked again in another.
+"""
+
+import queue
+import re
+import shlex
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.remote_workers import build_invoke_argv
+from project.utils import ensure_directory
+
+WORKTREE_POOL_DIRECTORY = Path(".quality/worktrees")
+SHARED_RESULTS_DIRECTORY = Path(".quality/cache/refs")
+MAX_LOG_SLUG_LENGTH = 48
+
+
+@dataclass
+class RefCheck:
+    """The outcome of project.check for one ref.
+
+    Attributes:
+        ref: The ref as given.
+        commit: The commit the ref resolved to.
+        ok: Whether every check passed.
+        seconds: How long the check took.
+        log: The file holding the check's output.
+
+    """
+
+    ref: str
+    commit: str
+    ok: bool
+    seconds: float
+    log: Path
+
+
+def resolve_refs(context: Context, refs: list[str]) -> dict[str, str]:
+    """Resolve refs to commits, failing before any check starts if one does not exist.
+
+    Args:
+        context: The invoke context.
+        refs: The refs to check.
+
+    Returns:
+        Mapping of each ref to its commit, in the given order.
+
+    Raises:
+        Exit: If a ref does not name a commit.
+
+    """
+    commits = {}
+    for ref in refs:
+        result = context.run(f"git rev-parse --verify --quiet {shlex.quote(ref + '^{commit}')}", hide=True, warn=True)
+        if result is None or not result.ok:
+            msg = f"Unknown git ref: {ref}"
+            raise Exit(msg, code=1)
+        commits[ref] = result.stdout.strip()
+    return commits
+
+
+class WorktreePool:
+    """Reusable detached worktrees, each checked out to one ref at a time.
+
+    Attributes:
+        context: The invoke context git runs in.
+        root: The directory holding the worktree slots.
+
+    """
+
+    def __init__(self, context: Context, size: int, root: str | Path = WORKTREE_POOL_DIRECTORY) -> None:
+        """Initialize the pool.
+
+        Args:
+            context: The invoke context git runs in.
+            size: How many worktrees the pool holds, which bounds how many refs are checked at once.
+            root: The directory holding the worktree slots.
+
+        """
+        self.context = context
+        self.root = Path(root)
+        # Adding and pruning worktrees updates the shared .git/worktrees, so only one thread does it at a time
+        self._admin_lock = threading.Lock()
+        self._free: queue.Queue[Path] = queue.Queue()
+        for index in range(size):
+            self._free.put(self.root / f"slot-{index}")
+
+    def _git(self, command: str) -> None:
+        """Run a git command, failing loudly."""
+        self.context.run(f"git {command}", hide=True, in_stream=False)
+
+    def _prepare(self, slot: Path, commit: str) -> None:
+        """Create a slot's worktree, or switch an existing one to a commit.
+
+        Registering a new worktree is serialised across threads; checking files out into a slot
+        only touches that slot, so it runs concurrently.
+
+        """
+        if not (slot / ".git").exists():
+            with self._admin_lock:
+                ensure_directory(self.root)
+                # A slot deleted by hand is still registered until pruned
+                self._git("worktree prune")
+                self._git(f"worktree add --detach --no-checkout --force {slot} {commit}")
+        self._git(f"-C {slot} checkout --quiet --detach --force {commit}")
+        self._git(f"-C {slot} clean -fd --quiet")
+
+    @contextmanager
+    def checkout(self, commit: str) -> Iterator[Path]:
+        """Check a commit out in a free slot, waiting for one if all are busy.
+
+        Args:
+            commit: The commit to check out.
+
+        Yields:
+            The worktree directory.
+
+        """
+        slot = self._free.get()
+        try:
+            self._prepare(slot, commit)
+            yield slot
+        finally:
+            self._free.put(slot)
+
+
+def log_path(ref: str, root: str | Path = WORKTREE_POOL_DIRECTORY) -> Path:
+    """Return the file a ref's check output is written to.
+
+    Args:
+        ref: The ref.
+        root: The pool directory.
+
+    Returns:
+        The log file path.
+
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", ref).strip("-")[:MAX_LOG_SLUG_LENGTH] or "ref"
+    return Path(root) / "logs" / f"{slug}.log"
+
+
+def check_command(check_options: dict[str, object], shared_results: Path) -> str:
+    """Build the project.check command run in each worktree.
+
+    Args:
+        check_options: Options passed through to project.check.
+        shared_results: The result cache tier shared by the worktrees.
+
+    Returns:
+        The shell command.
+
+    """
+    return shlex.join(build_invoke_argv("project.check", {**check_options, "cache_remote": str(shared_results)}))
+
+
+def _check_ref(pool: WorktreePool, ref: str, commit: str, command: str) -> RefCheck:
+    """Run the check for one ref in a pooled worktree and write its output to a log."""
+    with pool.checkout(commit) as worktree:
+        env = {"VIRTUAL_ENV": sys.prefix, "PYTHONPATH": str(worktree.resolve() / "src")}
+        start = time.perf_counter()
+        result = pool.context.run(
+            f"cd {shlex.quote(str(worktree))} && {command}", hide=True, warn=True, env=env, in_stream=False
+        )
+        seconds = time.perf_counter() - start
+    log = log_path(ref, pool.root)
+    ensure_directory(log.parent)
+    output = "" if result is None else result.stdout + result.stderr
+    log.write_text(output, encoding="utf-8")
+    return RefCheck(ref=ref, commit=commit, ok=result is not None and result.ok, seconds=seconds, log=log)
+
+
+def check_in_pool(pool: WorktreePool, commits: dict[str, str], command: str, *, jobs: int) -> list[RefCheck]:
+    """Check several refs concurrently in the pool's worktrees.
+
+    Args:
+        pool: The worktree pool.
+        commits: Mapping of ref to the commit to check.
+        command: The check command from check_command().
+        jobs: How many refs to check at once.
+
+    Returns:
+        The outcome for each ref, in the given order.
+
+    """
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(_check_ref, pool, ref, commit, command) for ref, commit in commits.items()]
+        return [future.result() for future in futures]
+
+
+def summary_lines(checks: list[RefCheck]) -> list[str]:
+    """Format the outcome of every ref as one summary.
+
+    Args:
+        checks: The outcome for each ref.
+
+    Returns:
+        The summary lines.
+
+    """
+    width = max(len(check.ref) for check in checks)
+    lines = [
+        f"{'✓' if check.ok else '✗'} {check.ref:<{width}}  {check.commit[:10]}  {check.seconds:7.1f}s  {check.log}"
+        for check in checks
+    ]
+    failed = sum(not check.ok for check in checks)
+    lines.append(f"{len(checks) - failed} of {len(checks)} ref(s) passed")
+    return lines
@@ -1,7 +1,13 @@
 """Lessons learnt from gen AI career break package."""
 
-from lessons_learnt.example import greet
+from lessons_learnt.example import calculate_sums, greet, greet_many
+from lessons_learnt.streaming import GreetingCache, astream_greetings, stream_greetings
 
 __all__ = [
+    "GreetingCache",
+    "astream_greetings",
+    "calculate_sums",
     "greet",
+    "greet_many",
+    "stream_greetings",
 ]
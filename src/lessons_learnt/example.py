@@ -1,5 +1,16 @@
 """Example module to demonstrate project structure."""
 
+import operator
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from itertools import islice
+
+DEFAULT_CHUNK_SIZE = 65_536
+SUMS_TYPECODE = "q"
+FLOAT_SUMS_TYPECODE = "d"
+# struct formats of floating-point buffers, whose sums are kept as doubles
+FLOAT_FORMATS = frozenset("efd")
+
 
 def greet(name: str) -> str:
     """Greet a person by name.
@@ -21,6 +32,45 @@ def greet(name: str) -> str:
     return f"Hello, {name}!"
 
 
+def greet_many(names: Iterable[str], *, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Greet many people, lazily and a chunk of names at a time.
+
+    Each chunk is validated up front and then formatted without a Python call per name, so a
+    chunk holding an empty name yields none of its greetings.
+
+    Args:
+        names: The names of the people to greet, e.g. a list or a generator
+        chunk_size: How many names are validated and formatted at once
+
+    Returns:
+        An iterator over the greeting messages, in the order of the names
+
+    Raises:
+        ValueError: If chunk_size is not positive, or, during iteration, a name is empty
+
+    Examples:
+        >>> list(greet_many(["Ada", "Grace"]))
+        ['Hello, Ada!', 'Hello, Grace!']
+
+    """
+    if chunk_size < 1:
+        msg = "chunk_size must be positive"
+        raise ValueError(msg)
+    return _greet_chunks(iter(names), chunk_size)
+
+
+def _greet_chunks(names: Iterator[str], chunk_size: int) -> Iterator[str]:
+    """Yield the greetings of each chunk of names once the chunk is validated."""
+    offset = 0
+    while chunk := list(islice(names, chunk_size)):
+        if not all(chunk):
+            index = offset + next(position for position, name in enumerate(chunk) if not name)
+            msg = f"Name cannot be empty (index {index})"
+            raise ValueError(msg)
+        yield from map("Hello, {}!".format, chunk)
+        offset += len(chunk)
+
+
 def calculate_sum(a: int, b: int) -> int:
     """Calculate the sum of two numbers.
 
@@ -37,3 +87,77 @@ def calculate_sum(a: int, b: int) -> int:
 
     """
     return a + b
+
+
+def _as_sequence(values: Sequence[float] | memoryview | array) -> Sequence[float]:
+    """View a buffer-protocol object as a flat sequence without copying it."""
+    try:
+        view = memoryview(values)  # type: ignore[arg-type]
+    except TypeError:
+        return values
+    if view.ndim != 1:
+        msg = f"Buffers must be one-dimensional, got {view.ndim} dimensions"
+        raise ValueError(msg)
+    return view
+
+
+def _sums_typecode(*values: Sequence[float]) -> str:
+    """Pick doubles for the sums when an input is a floating-point buffer, else signed 64-bit integers."""
+    if any(isinstance(view, memoryview) and view.format in FLOAT_FORMATS for view in values):
+        return FLOAT_SUMS_TYPECODE
+    return SUMS_TYPECODE
+
+
+def calculate_sums(
+    a: Sequence[float] | memoryview | array,
+    b: Sequence[float] | memoryview | array,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> array:
+    """Calculate the pairwise sums of two sequences of numbers.
+
+    Buffer-protocol inputs such as ``array``, ``memoryview`` or ``bytes`` are read through a
+    memoryview rather than copied, and every chunk is summed without a Python call per pair.
+    The sums are doubles when either input is a floating-point buffer and signed 64-bit integers
+    otherwise.
+
+    Args:
+        a: First numbers
+        b: Second numbers, as many as in a
+        chunk_size: How many pairs are summed at once
+
+    Returns:
+        An array of the sums, of typecode ``"d"`` or ``"q"``
+
+    Raises:
+        ValueError: If the inputs differ in length, a buffer is not one-dimensional or
+            chunk_size is not positive
+        TypeError: If an integer sum is not an integer, e.g. a float in a list; the message
+            names the index of the pair
+        OverflowError: If an integer sum does not fit in 64 bits; the message names the index
+            of the pair
+
+    Examples:
+        >>> calculate_sums([1, 2, 3], array("q", [10, 20, 30])).tolist()
+        [11, 22, 33]
+        >>> calculate_sums(array("d", [0.5, 1.5]), [1, 2]).tolist()
+        [1.5, 3.5]
+
+    """
+    if chunk_size < 1:
+        msg = "chunk_size must be positive"
+        raise ValueError(msg)
+    first, second = _as_sequence(a), _as_sequence(b)
+    if len(first) != len(second):
+        msg = f"Cannot pair {len(first)} numbers with {len(second)}"
+        raise ValueError(msg)
+    sums = array(_sums_typecode(first, second))
+    for start in range(0, len(first), chunk_size):
+        stop = start + chunk_size
+        try:
+            sums.extend(map(operator.add, first[start:stop], second[start:stop]))
+        except (TypeError, OverflowError) as error:
+            # extend appends one sum at a time, so the sums kept so far end at the failing pair
+            msg = f"Cannot store the sum of the numbers at index {len(sums)}: {error}"
+            raise type(error)(msg) from error
+    return sums
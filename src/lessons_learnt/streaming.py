@@ -0,0 +1,109 @@
+"""Streaming greetings served from a bounded memo cache."""
+
+from collections.abc import AsyncIterable, AsyncIterator, Iterable, Iterator
+from functools import lru_cache
+
+from lessons_learnt.example import greet
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class GreetingCache:
+    """A least-recently-used cache of greetings.
+
+    Empty names are never cached, so they raise the same ValueError as greet every time.
+
+    Attributes:
+        maxsize: The most greetings held at once.
+
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize the cache.
+
+        Args:
+            maxsize: The most greetings held at once
+
+        Raises:
+            ValueError: If maxsize is not positive
+
+        """
+        if maxsize < 1:
+            msg = "maxsize must be positive"
+            raise ValueError(msg)
+        self.maxsize = maxsize
+        self._greet = lru_cache(maxsize=maxsize)(greet)
+
+    def greet(self, name: str) -> str:
+        """Greet a person by name, reusing the greeting if the name was seen recently.
+
+        Args:
+            name: The name of the person to greet
+
+        Returns:
+            A greeting message
+
+        """
+        return self._greet(name)
+
+    @property
+    def hits(self) -> int:
+        """Return how many greetings were served from the cache."""
+        return self._greet.cache_info().hits
+
+    @property
+    def misses(self) -> int:
+        """Return how many greetings had to be built."""
+        return self._greet.cache_info().misses
+
+    def __len__(self) -> int:
+        """Return how many greetings are cached."""
+        return self._greet.cache_info().currsize
+
+    def clear(self) -> None:
+        """Empty the cache and reset its counters."""
+        self._greet.cache_clear()
+
+
+def stream_greetings(names: Iterable[str], cache: GreetingCache | None = None) -> Iterator[str]:
+    """Greet a stream of names, pulling each name only when its greeting is requested.
+
+    Args:
+        names: The names of the people to greet
+        cache: The cache to serve repeated names from; pass a shared one to reuse greetings
+            across streams, otherwise each stream gets its own
+
+    Yields:
+        A greeting message per name
+
+    Examples:
+        >>> list(stream_greetings(["Ada", "Ada"]))
+        ['Hello, Ada!', 'Hello, Ada!']
+
+    """
+    memo = cache if cache is not None else GreetingCache()
+    for name in names:
+        yield memo.greet(name)
+
+
+async def astream_greetings(
+    names: AsyncIterable[str] | Iterable[str], cache: GreetingCache | None = None
+) -> AsyncIterator[str]:
+    """Greet an asynchronous stream of names, pulling each name only when its greeting is awaited.
+
+    Args:
+        names: The names of the people to greet, as an async or a plain iterable
+        cache: The cache to serve repeated names from; pass a shared one to reuse greetings
+            across streams, otherwise each stream gets its own
+
+    Yields:
+        A greeting message per name
+
+    """
+    memo = cache if cache is not None else GreetingCache()
+    if isinstance(names, AsyncIterable):
+        async for name in names:
+            yield memo.greet(name)
+    else:
+        for name in names:
+            yield memo.greet(name)
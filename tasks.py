@@ -4,17 +4,25 @@ from invoke.collection import Collection
 
 # Import all task modules
 from project import project as project_tasks
+from project.output_capture import BoundedCaptureRunner
 from project.tasks import (
+    benchmarks,
+    cache,
     deptry,
     devcontainer,
+    env,
+    index,
     mypy,
     pipaudit,
     poetry,
     precommit,
+    profile,
     ruff,
     testing,
+    tools,
     trivy,
     vulture,
+    workers,
     xenon,
 )
 
@@ -22,15 +30,25 @@ from project.tasks import (
 ns = Collection()
 
 # Register all collections
+ns.add_collection(benchmarks.collection)
+ns.add_collection(cache.collection)
 ns.add_collection(deptry.collection)
 ns.add_collection(devcontainer.collection)
+ns.add_collection(env.collection)
+ns.add_collection(index.collection)
 ns.add_collection(mypy.collection)
 ns.add_collection(poetry.collection)
 ns.add_collection(pipaudit.collection)
 ns.add_collection(precommit.collection)
+ns.add_collection(profile.collection)
 ns.add_collection(project_tasks.collection)
 ns.add_collection(ruff.collection)
 ns.add_collection(testing.collection)
+ns.add_collection(tools.collection)
 ns.add_collection(trivy.collection)
 ns.add_collection(vulture.collection)
+ns.add_collection(workers.collection)
 ns.add_collection(xenon.collection)
+
+# Stream shown tool output to .quality/logs and keep only a bounded tail in memory
+ns.configure({"runners": {"local": BoundedCaptureRunner}})
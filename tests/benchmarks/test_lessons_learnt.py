@@ -0,0 +1,93 @@
+"""Micro-benchmarks of the lessons_learnt public API."""
+
+import asyncio
+from array import array
+from collections.abc import AsyncIterator, Callable, Iterable
+
+import pytest
+
+import lessons_learnt
+from lessons_learnt import GreetingCache, astream_greetings, calculate_sums, greet, greet_many, stream_greetings
+from lessons_learnt.example import calculate_sum
+from project.pytest_benchmarks import BenchmarkResult
+
+SIZES = [10, 1_000, 10_000]
+BENCHMARKED = {"GreetingCache", "astream_greetings", "calculate_sums", "greet", "greet_many", "stream_greetings"}
+
+Benchmark = Callable[..., BenchmarkResult]
+
+
+def _names(size: int) -> list[str]:
+    """Build names that repeat, as they do in the request path."""
+    return [f"user-{index % 100}" for index in range(size)]
+
+
+async def _drain(greetings: AsyncIterator[str]) -> None:
+    """Consume an asynchronous stream of greetings."""
+    async for _ in greetings:
+        pass
+
+
+async def _aiter(names: Iterable[str]) -> AsyncIterator[str]:
+    """Yield names asynchronously."""
+    for name in names:
+        yield name
+
+
+def test_every_public_name_is_benchmarked() -> None:
+    """Test that a benchmark is added with every name exported from lessons_learnt."""
+    assert set(lessons_learnt.__all__) == BENCHMARKED
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_greet(benchmark: Benchmark, size: int) -> None:
+    """Benchmark greeting names one call at a time."""
+    names = _names(size)
+    benchmark(lambda: [greet(name) for name in names], size=size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_greet_many(benchmark: Benchmark, size: int) -> None:
+    """Benchmark greeting names in bulk."""
+    names = _names(size)
+    benchmark(lambda: list(greet_many(names)), size=size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_calculate_sum(benchmark: Benchmark, size: int) -> None:
+    """Benchmark adding pairs one call at a time."""
+    first, second = list(range(size)), list(range(size, 0, -1))
+    benchmark(lambda: [calculate_sum(a, b) for a, b in zip(first, second, strict=True)], size=size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_calculate_sums(benchmark: Benchmark, size: int) -> None:
+    """Benchmark adding arrays of pairs in bulk."""
+    first, second = array("q", range(size)), array("q", range(size, 0, -1))
+    benchmark(lambda: calculate_sums(first, second), size=size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_greeting_cache(benchmark: Benchmark, size: int) -> None:
+    """Benchmark greeting repeated names through a warm cache."""
+    names = _names(size)
+    cache = GreetingCache()
+    benchmark(lambda: [cache.greet(name) for name in names], size=size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_stream_greetings(benchmark: Benchmark, size: int) -> None:
+    """Benchmark streaming greetings through a shared cache."""
+    names = _names(size)
+    cache = GreetingCache()
+    benchmark(lambda: list(stream_greetings(names, cache)), size=size)
+
+
+@pytest.mark.enable_socket  # the event loop's self-pipe is a socket pair
+@pytest.mark.parametrize("size", SIZES)
+def test_astream_greetings(benchmark: Benchmark, size: int) -> None:
+    """Benchmark streaming greetings asynchronously through a shared cache."""
+    names = _names(size)
+    cache = GreetingCache()
+    with asyncio.Runner() as runner:
+        benchmark(lambda: runner.run(_drain(astream_greetings(_aiter(names), cache))), size=size)
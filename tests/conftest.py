@@ -0,0 +1,4 @@
+"""Shared pytest configuration for the test suites."""
+
+# The project plugins stay inactive unless their options or fixtures are used; pytester runs them in their own tests
+pytest_plugins = ["project.collection_cache", "project.pytest_benchmarks", "project.pytest_costs", "pytester"]
@@ -1,8 +1,10 @@
 """Unit tests for the example module."""
 
+from array import array
+
 import pytest
 
-from lessons_learnt.example import calculate_sum, greet
+from lessons_learnt.example import calculate_sum, calculate_sums, greet, greet_many
 
 
 class TestGreet:
@@ -24,6 +26,34 @@ class TestGreet:
             greet("")
 
 
+class TestGreetMany:
+    """Test suite for the greet_many function."""
+
+    def test_greet_many_matches_greet(self) -> None:
+        """Test that every name gets the same greeting greet gives it."""
+        names = ["World", "Alice", "Bob"]
+        assert list(greet_many(names, chunk_size=2)) == [greet(name) for name in names]
+
+    def test_greet_many_is_lazy(self) -> None:
+        """Test that names are only consumed as greetings are requested."""
+        names = iter(["Alice", "Bob", "Carol", ""])
+        greetings = greet_many(names, chunk_size=2)
+        assert next(greetings) == "Hello, Alice!"
+        assert next(names) == "Carol"
+
+    def test_greet_many_reports_index_of_empty_name(self) -> None:
+        """Test that an empty name raises ValueError naming its position."""
+        greetings = greet_many(["Alice", "Bob", "Carol", ""], chunk_size=2)
+        assert [next(greetings) for _ in range(2)] == ["Hello, Alice!", "Hello, Bob!"]
+        with pytest.raises(ValueError, match=r"Name cannot be empty \(index 3\)"):
+            next(greetings)
+
+    def test_greet_many_rejects_non_positive_chunk_size(self) -> None:
+        """Test that a chunk size below one raises ValueError."""
+        with pytest.raises(ValueError, match="chunk_size must be positive"):
+            greet_many(["Alice"], chunk_size=0)
+
+
 class TestCalculateSum:
     """Test suite for the calculate_sum function."""
 
@@ -46,3 +76,47 @@ class TestCalculateSum:
         """Test sum with zero."""
         result = calculate_sum(0, 5)
         assert result == 5
+
+
+class TestCalculateSums:
+    """Test suite for the calculate_sums function."""
+
+    def test_calculate_sums_of_lists(self) -> None:
+        """Test pairwise sums across several chunks."""
+        result = calculate_sums([1, -2, 3, 0, 5], [4, -5, -6, 0, 5], chunk_size=2)
+        assert result == array("q", [5, -7, -3, 0, 10])
+
+    def test_calculate_sums_of_buffers(self) -> None:
+        """Test that arrays, memoryviews and bytes are accepted."""
+        result = calculate_sums(memoryview(array("i", [1, 2, 3])), b"\x0a\x14\x1e")
+        assert result.tolist() == [11, 22, 33]
+
+    def test_calculate_sums_of_empty_inputs(self) -> None:
+        """Test that empty inputs give an empty array."""
+        assert calculate_sums([], array("q")) == array("q")
+
+    def test_calculate_sums_rejects_different_lengths(self) -> None:
+        """Test that inputs of different lengths raise ValueError."""
+        with pytest.raises(ValueError, match="Cannot pair 2 numbers with 1"):
+            calculate_sums([1, 2], [3])
+
+    def test_calculate_sums_rejects_multidimensional_buffers(self) -> None:
+        """Test that a buffer with more than one dimension raises ValueError."""
+        grid = memoryview(bytes(4)).cast("B", (2, 2))
+        with pytest.raises(ValueError, match="one-dimensional"):
+            calculate_sums(grid, [1, 2])
+
+    def test_calculate_sums_of_float_buffers(self) -> None:
+        """Test that floating-point buffers give an array of doubles."""
+        result = calculate_sums(array("d", [0.5, 1.5, 2.5]), memoryview(array("f", [1.0, 2.0, 3.0])), chunk_size=2)
+        assert result == array("d", [1.5, 3.5, 5.5])
+
+    def test_calculate_sums_reports_index_of_non_integer_sum(self) -> None:
+        """Test that a float among integer inputs raises TypeError naming its index."""
+        with pytest.raises(TypeError, match=r"at index 3: "):
+            calculate_sums([1, 2, 3, 4.5], array("q", [1, 2, 3, 4]), chunk_size=2)
+
+    def test_calculate_sums_reports_index_of_overflowing_sum(self) -> None:
+        """Test that a sum too large for 64 bits raises OverflowError naming its index."""
+        with pytest.raises(OverflowError, match=r"at index 1: "):
+            calculate_sums(array("q", [1, 2**62]), [1, 2**62])
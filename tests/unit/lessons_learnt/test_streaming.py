@@ -0,0 +1,100 @@
+"""Unit tests for the streaming module."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from lessons_learnt.streaming import GreetingCache, astream_greetings, stream_greetings
+
+
+async def _names(*names: str) -> AsyncIterator[str]:
+    """Yield names asynchronously."""
+    for name in names:
+        await asyncio.sleep(0)
+        yield name
+
+
+async def _collect(greetings: AsyncIterator[str]) -> list[str]:
+    """Drain an asynchronous stream of greetings."""
+    return [greeting async for greeting in greetings]
+
+
+class TestGreetingCache:
+    """Test suite for the GreetingCache class."""
+
+    def test_repeated_names_are_hits(self) -> None:
+        """Test that a repeated name is served from the cache."""
+        cache = GreetingCache()
+        assert [cache.greet(name) for name in ["Alice", "Bob", "Alice"]] == [
+            "Hello, Alice!",
+            "Hello, Bob!",
+            "Hello, Alice!",
+        ]
+        assert (cache.hits, cache.misses, len(cache)) == (1, 2, 2)
+
+    def test_least_recently_used_name_is_evicted(self) -> None:
+        """Test that the cache holds at most maxsize greetings."""
+        cache = GreetingCache(maxsize=2)
+        for name in ["Alice", "Bob", "Alice", "Carol", "Bob"]:
+            cache.greet(name)
+        assert (cache.hits, cache.misses, len(cache)) == (1, 4, 2)
+
+    def test_empty_name_raises_every_time(self) -> None:
+        """Test that an empty name is not cached."""
+        cache = GreetingCache()
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Name cannot be empty"):
+                cache.greet("")
+        assert len(cache) == 0
+
+    def test_clear_resets_counters(self) -> None:
+        """Test that clearing empties the cache and its counters."""
+        cache = GreetingCache()
+        cache.greet("Alice")
+        cache.clear()
+        assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+
+    def test_maxsize_must_be_positive(self) -> None:
+        """Test that a maxsize below one raises ValueError."""
+        with pytest.raises(ValueError, match="maxsize must be positive"):
+            GreetingCache(maxsize=0)
+
+
+class TestStreamGreetings:
+    """Test suite for the stream_greetings function."""
+
+    def test_pulls_names_on_demand(self) -> None:
+        """Test that a name is only consumed when its greeting is requested."""
+        names = iter(["Alice", "Bob"])
+        greetings = stream_greetings(names)
+        assert next(greetings) == "Hello, Alice!"
+        assert next(names) == "Bob"
+
+    def test_shared_cache_spans_streams(self) -> None:
+        """Test that a cache passed to several streams serves names seen in earlier ones."""
+        cache = GreetingCache()
+        list(stream_greetings(["Alice"], cache))
+        assert list(stream_greetings(["Alice", "Bob"], cache)) == ["Hello, Alice!", "Hello, Bob!"]
+        assert (cache.hits, cache.misses) == (1, 2)
+
+
+@pytest.mark.enable_socket  # the event loop's self-pipe is a socket pair
+class TestAstreamGreetings:
+    """Test suite for the astream_greetings function."""
+
+    def test_greets_an_async_stream(self) -> None:
+        """Test that names from an async iterable are greeted in order through the cache."""
+        cache = GreetingCache()
+        greetings = asyncio.run(_collect(astream_greetings(_names("Alice", "Alice", "Bob"), cache)))
+        assert greetings == ["Hello, Alice!", "Hello, Alice!", "Hello, Bob!"]
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_greets_a_plain_iterable(self) -> None:
+        """Test that a plain iterable of names is accepted."""
+        assert asyncio.run(_collect(astream_greetings(["Alice"]))) == ["Hello, Alice!"]
+
+    def test_empty_name_raises(self) -> None:
+        """Test that an empty name in the stream raises ValueError."""
+        with pytest.raises(ValueError, match="Name cannot be empty"):
+            asyncio.run(_collect(astream_greetings(_names("Alice", ""))))
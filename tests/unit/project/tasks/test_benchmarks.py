@@ -0,0 +1,108 @@
+"""Unit tests for the benchmarks module."""
+
+import sys
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
+
+from project.tasks.benchmarks import bisect
+
+COMMITS = [f"{index:040d}" for index in range(9)]
+
+
+def _git(command: str, **_: object) -> Mock:
+    """Answer the git commands the bisect runs, and succeed for the benchmark command."""
+    if command.startswith("git rev-parse"):
+        return Mock(stdout=f"{COMMITS[0]}\n{COMMITS[-1]}\n")
+    if command.startswith("git rev-list"):
+        return Mock(stdout="\n".join(COMMITS[1:]) + "\n")
+    if command.startswith("git log"):
+        return Mock(stdout=f"Change {int(command.rsplit(maxsplit=1)[-1])}\n")
+    return Mock(ok=True)
+
+
+@pytest.fixture
+def checked_out(mocker: MockerFixture, tmp_path: Path) -> list[str]:
+    """Replace worktree checkouts with temporary directories and record the commits checked out."""
+    commits = []
+
+    @contextmanager
+    def checkout(_: str, commit: str) -> Iterator[Path]:
+        commits.append(commit)
+        yield tmp_path / commit
+
+    mocker.patch("project.tasks.benchmarks.checkout_workspace", side_effect=checkout)
+    mocker.patch("project.tasks.benchmarks.get_current_working_directory", return_value="/workspace")
+    mocker.patch("project.tasks.benchmarks.BisectReport.write", return_value=tmp_path / "bisect.json")
+    return commits
+
+
+def _timings(checked_out: list[str], slow_from: int) -> Callable[..., list[float]]:
+    """Time the command once, reporting 2s from commit slow_from onwards and 1s before it."""
+
+    def time_runs(run: Callable[[], None], repeat: int, _warmup: int) -> list[float]:
+        run()
+        return [2.0 if int(checked_out[-1]) >= slow_from else 1.0] * repeat
+
+    return time_runs
+
+
+class TestBisect:
+    """Test suite for the bisect task."""
+
+    def test_finds_first_slow_commit(self, mocker: MockerFixture, checked_out: list[str], capsys) -> None:  # noqa: ANN001
+        """Test that the bisect measures a logarithmic number of commits and reports the culprit."""
+        mocker.patch("project.tasks.benchmarks.time_runs", side_effect=_timings(checked_out, slow_from=6))
+        mock_context = MagicMock(spec_set=Context)
+        mock_context.run.side_effect = _git
+
+        bisect(mock_context, COMMITS[0], bad=COMMITS[-1], task="tests.unit", repeat=3)
+
+        assert checked_out == [COMMITS[0], COMMITS[8], COMMITS[4], COMMITS[6], COMMITS[5]]
+        output = capsys.readouterr().out
+        assert "First slow commit for tests.unit: 0000000000 Change 6 (+100.0% vs good" in output
+        command = mock_context.run.call_args_list[-1]
+        assert "-m invoke tests.unit" in command.args[0]
+        assert command.kwargs["env"]["VIRTUAL_ENV"] == sys.prefix
+        assert command.kwargs["env"]["PYTHONPATH"].endswith(f"{COMMITS[5]}/src")
+
+    def test_reports_no_slowdown(self, mocker: MockerFixture, checked_out: list[str], capsys) -> None:  # noqa: ANN001
+        """Test that only the good and bad commits are measured when the bad commit is not slow."""
+        mocker.patch("project.tasks.benchmarks.time_runs", side_effect=_timings(checked_out, slow_from=99))
+        mock_context = MagicMock(spec_set=Context)
+        mock_context.run.side_effect = _git
+
+        bisect(mock_context, COMMITS[0], pytest_selection="tests/unit -k cache")
+
+        assert checked_out == [COMMITS[0], COMMITS[8]]
+        assert (
+            "No slowdown above 10.0% between the good and bad commits for tests/unit -k cache"
+            in capsys.readouterr().out
+        )
+        assert "-m pytest tests/unit -k cache" in mock_context.run.call_args_list[-1].args[0]
+
+    def test_quotes_the_pytest_selection(self, mocker: MockerFixture, checked_out: list[str]) -> None:
+        """Test that each word of the pytest selection reaches pytest as one argument, never as shell syntax."""
+        mocker.patch("project.tasks.benchmarks.time_runs", side_effect=_timings(checked_out, slow_from=99))
+        mock_context = MagicMock(spec_set=Context)
+        mock_context.run.side_effect = _git
+
+        bisect(mock_context, COMMITS[0], pytest_selection="tests/unit -k 'cache and not slow' $(touch pwned)")
+
+        command = mock_context.run.call_args_list[-1].args[0]
+        assert "-m pytest tests/unit -k 'cache and not slow' '$(touch' 'pwned)' -q" in command
+
+    def test_fails_when_the_command_fails(self, mocker: MockerFixture, checked_out: list[str]) -> None:
+        """Test that a failing benchmark command stops the bisect."""
+        mocker.patch("project.tasks.benchmarks.time_runs", side_effect=_timings(checked_out, slow_from=99))
+        mock_context = MagicMock(spec_set=Context)
+        mock_context.run.side_effect = lambda command, **_: Mock(ok=False) if "invoke" in command else _git(command)
+
+        with pytest.raises(Exit, match="failed at 0000000000"):
+            bisect(mock_context, COMMITS[0])
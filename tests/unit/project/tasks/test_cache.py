@@ -0,0 +1,36 @@
+"""Unit tests for the cache module."""
+
+from unittest.mock import Mock
+
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.tasks.cache import serve
+
+
+class TestCache:
+    """Test suite for the serve function."""
+
+    def test_serve_starts_cache_server_for_directory(self, mocker: MockerFixture) -> None:
+        """Test that serve exposes the given directory over HTTP until interrupted."""
+        mock_store_class = mocker.patch("project.tasks.cache.DirectoryStore")
+        mock_server_class = mocker.patch("project.tasks.cache.CacheServer")
+        mock_server = mock_server_class.return_value.__enter__.return_value
+
+        serve(Mock(spec_set=Context), root="/srv/cache", port=9002, read_only=True)
+
+        mock_store_class.assert_called_once_with("/srv/cache")
+        mock_server_class.assert_called_once_with(
+            ("127.0.0.1", 9002), mock_store_class.return_value, read_only=True, write_token=None
+        )
+        mock_server.serve_forever.assert_called_once()
+
+    def test_read_write_serve_requires_uploads_to_carry_the_token(self, mocker: MockerFixture) -> None:
+        """Test that a read-write server is given the write token from the environment."""
+        mocker.patch.dict("os.environ", {"PROJECT_CACHE_TOKEN": "secret"})
+        mocker.patch("project.tasks.cache.DirectoryStore")
+        mock_server_class = mocker.patch("project.tasks.cache.CacheServer")
+
+        serve(Mock(spec_set=Context))
+
+        assert mock_server_class.call_args.kwargs == {"read_only": False, "write_token": "secret"}
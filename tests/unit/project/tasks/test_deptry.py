@@ -3,6 +3,7 @@
 from unittest.mock import Mock
 
 from invoke.context import Context
+from pytest_mock import MockerFixture
 
 from project.tasks.deptry import check
 
@@ -17,3 +18,14 @@ class TestDeptry:
         check(mock_context)
 
         mock_context.run.assert_called_once_with("poetry run deptry .", echo=True)
+
+    def test_check_runs_deptry_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that check runs deptry as a module under cProfile when profiling."""
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        check(mock_context, profile=True)
+
+        mock_context.run.assert_called_once_with(
+            "poetry run python -m cProfile -o .quality/profiles/deptry.check.pstats -m deptry .", echo=True
+        )
@@ -19,15 +19,15 @@ class TestDevcontainer:
         self.mock_workspace_path = Path("/mock/workspace")
         mocker.patch("project.tasks.devcontainer.get_current_working_directory", return_value=self.mock_workspace_path)
         self.mock_context = Mock(spec_set=Context)
+        self.mock_require_tools = mocker.patch("project.tasks.devcontainer.require_tools")
 
     def test_check_runs_build_up_and_exec_with_invoke_list_by_default(self) -> None:
         """Test that check runs build, up, and exec with invoke --list when no flags provided."""
         check(self.mock_context)
 
-        assert self.mock_context.run.call_count == 4
+        assert self.mock_context.run.call_count == 3
         self.mock_context.run.assert_has_calls(
             [
-                call("docker info", hide=True),
                 call(f"npx @devcontainers/cli build --workspace-folder {self.mock_workspace_path}", echo=True),
                 call(f"npx @devcontainers/cli up --workspace-folder {self.mock_workspace_path}", echo=True),
                 call(
@@ -39,13 +39,12 @@ class TestDevcontainer:
         )
 
     def test_check_only_runs_build_when_build_only_flag_is_true(self) -> None:
-        """Test that check only runs docker info and build when build_only is True."""
+        """Test that check only runs build when build_only is True."""
         check(self.mock_context, build_only=True)
 
-        assert self.mock_context.run.call_count == 2
+        assert self.mock_context.run.call_count == 1
         self.mock_context.run.assert_has_calls(
             [
-                call("docker info", hide=True),
                 call(f"npx @devcontainers/cli build --workspace-folder {self.mock_workspace_path}", echo=True),
             ]
         )
@@ -54,10 +53,9 @@ class TestDevcontainer:
         """Test that check runs invoke project.check instead of invoke --list when run_project_check is True."""
         check(self.mock_context, run_project_check=True)
 
-        assert self.mock_context.run.call_count == 4
+        assert self.mock_context.run.call_count == 3
         self.mock_context.run.assert_has_calls(
             [
-                call("docker info", hide=True),
                 call(f"npx @devcontainers/cli build --workspace-folder {self.mock_workspace_path}", echo=True),
                 call(f"npx @devcontainers/cli up --workspace-folder {self.mock_workspace_path}", echo=True),
                 call(
@@ -72,10 +70,40 @@ class TestDevcontainer:
         """Test that build_only takes precedence when both flags are True."""
         check(self.mock_context, build_only=True, run_project_check=True)
 
-        assert self.mock_context.run.call_count == 2
+        assert self.mock_context.run.call_count == 1
         self.mock_context.run.assert_has_calls(
             [
-                call("docker info", hide=True),
                 call(f"npx @devcontainers/cli build --workspace-folder {self.mock_workspace_path}", echo=True),
             ]
         )
+
+    def test_check_builds_prebaked_stage_when_prebaked_flag_is_true(self) -> None:
+        """Test that --prebaked selects the prebaked Dockerfile stage for build and up."""
+        check(self.mock_context, prebaked=True)
+
+        target_env = {"DEVCONTAINER_TARGET": "prebaked"}
+        self.mock_context.run.assert_has_calls(
+            [
+                call(
+                    f"npx @devcontainers/cli build --workspace-folder {self.mock_workspace_path}",
+                    echo=True,
+                    env=target_env,
+                ),
+                call(
+                    f"npx @devcontainers/cli up --workspace-folder {self.mock_workspace_path}",
+                    echo=True,
+                    env=target_env,
+                ),
+                call(
+                    f"npx @devcontainers/cli exec --workspace-folder {self.mock_workspace_path} "
+                    f"poetry run invoke --list",
+                    echo=True,
+                ),
+            ]
+        )
+
+    def test_check_requires_docker_and_npx_before_building(self) -> None:
+        """Test that check verifies its tools from the cached probes."""
+        check(self.mock_context, build_only=True)
+
+        self.mock_require_tools.assert_called_once_with(self.mock_context, "docker", "npx")
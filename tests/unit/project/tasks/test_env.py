@@ -0,0 +1,73 @@
+"""Unit tests for the env module."""
+
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
+
+from project.tasks.env import restore, snapshot
+
+
+class TestEnv:
+    """Test suite for the env snapshot tasks."""
+
+    def test_snapshot_builds_wheelhouse_and_archive(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that snapshot freezes the venv, builds wheels and archives it under the lock key."""
+        mocker.patch("project.tasks.env.lock_digest", return_value="a" * 64)
+        mocker.patch("project.tasks.env.snapshot_key", return_value="key")
+        mock_archive = mocker.patch("project.tasks.env.archive_venv", return_value=["bin/tool"])
+        mocker.patch("project.tasks.env.base_interpreter_home", return_value="/usr/bin")
+        mock_manifest = mocker.patch("project.tasks.env.write_manifest")
+        mocker.patch("project.tasks.env.proxy_environment", return_value={"PIP_INDEX_URL": "http://proxy/simple/"})
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [Mock(stdout="3.13\n"), Mock(stdout="invoke==2.2.1\n"), None]
+
+        snapshot(mock_context, venv=".venv", root=str(tmp_path))
+
+        commands = [call.args[0] for call in mock_context.run.call_args_list]
+        assert commands[1] == f"{Path('.venv/bin/python')} -m pip freeze --exclude-editable"
+        assert commands[2].startswith(f"{Path('.venv/bin/python')} -m pip wheel --no-deps -r {tmp_path / 'key'}")
+        assert mock_context.run.call_args_list[2].kwargs["env"] == {"PIP_INDEX_URL": "http://proxy/simple/"}
+        assert (tmp_path / "key" / "requirements.txt").read_text(encoding="utf-8") == "invoke==2.2.1\n"
+        mock_archive.assert_called_once_with(Path(".venv"), tmp_path / "key" / "venv.tar.gz")
+        mock_manifest.assert_called_once_with(tmp_path / "key", key="key", home="/usr/bin", relocated=["bin/tool"])
+
+    def test_restore_extracts_archive(self, tmp_path: Path, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that restore extracts the matching venv archive."""
+        mocker.patch("project.tasks.env.current_snapshot_directory", return_value=tmp_path)
+        mock_extract = mocker.patch("project.tasks.env.extract_venv", return_value=Path("/work/.venv"))
+        mock_context = Mock(spec_set=Context)
+
+        restore(mock_context)
+
+        mock_extract.assert_called_once_with(tmp_path, ".venv")
+        mock_context.run.assert_not_called()
+        assert "Restored /work/.venv" in capsys.readouterr().out
+
+    def test_restore_rebuilds_from_wheelhouse_when_archive_unusable(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that restore installs the wheelhouse offline into a fresh venv as a fallback."""
+        (tmp_path / "wheelhouse").mkdir()
+        mocker.patch("project.tasks.env.current_snapshot_directory", return_value=tmp_path)
+        mocker.patch("project.tasks.env.extract_venv", side_effect=FileNotFoundError("Base interpreter missing"))
+        mock_context = Mock(spec_set=Context)
+
+        restore(mock_context)
+
+        commands = [call.args[0] for call in mock_context.run.call_args_list]
+        assert commands[0] == f"{sys.executable} -m venv .venv"
+        assert "-m pip install --no-index --find-links" in commands[1]
+        assert commands[2] == "poetry install --only-root"
+
+    def test_restore_exits_without_snapshot(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that restore fails when there is no snapshot for the lock file."""
+        mocker.patch("project.tasks.env.current_snapshot_directory", return_value=tmp_path / "missing")
+        mocker.patch("project.tasks.env.extract_venv", side_effect=FileNotFoundError("No environment snapshot"))
+
+        with pytest.raises(Exit):
+            restore(Mock(spec_set=Context))
@@ -1,10 +1,45 @@
 """Unit tests for the mypy module."""
 
+import shutil
+from collections.abc import Callable
+from pathlib import Path
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
 
-from project.tasks.mypy import check
+from project.tasks.mypy import MAX_SHARDS, check
+from project.tool_probes import ToolProbe
+from project.utils import IndexedFile, WorkspaceIndex
+
+INDEX = WorkspaceIndex(
+    files=(
+        IndexedFile(path="README.md", blob="a" * 40, mode="100644"),
+        IndexedFile(path="project/utils.py", blob="b" * 40, mode="100644"),
+        IndexedFile(path="tasks.py", blob="c" * 40, mode="100644"),
+    )
+)
+
+
+@pytest.fixture(autouse=True)
+def _workspace_index(mocker: MockerFixture) -> None:
+    """Serve a fixed workspace index instead of running git."""
+    mocker.patch("project.tasks.mypy.workspace_index", return_value=INDEX)
+
+
+@pytest.fixture
+def shared_store(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, mocker: MockerFixture) -> Path:
+    """Run in an empty checkout with a shared store and a probed mypy version."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text("[tool.mypy]\nstrict = true\n", encoding="utf-8")
+    monkeypatch.setenv("MYPY_SHARED_CACHE", str(tmp_path / "store"))
+    mocker.patch(
+        "project.tasks.mypy.probe_environment",
+        return_value={"mypy": ToolProbe(name="mypy", available=True, version="1.18.2")},
+    )
+    return tmp_path / "store"
 
 
 class TestMypy:
@@ -14,6 +49,104 @@ class TestMypy:
         """Test that check runs mypy command with echo enabled."""
         mock_context = Mock(spec_set=Context)
 
-        check(mock_context)
+        check(mock_context, shared_cache=False)
+
+        mock_context.run.assert_called_once_with("poetry run mypy project/utils.py", echo=True)
+
+    def test_check_runs_mypy_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that check runs mypy as a module under cProfile when profiling."""
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        check(mock_context, profile=True, shared_cache=False)
+
+        mock_context.run.assert_called_once_with(
+            "poetry run python -m cProfile -o .quality/profiles/mypy.check.pstats -m mypy project/utils.py", echo=True
+        )
+
+    def test_check_seeds_cold_cache_and_publishes_changes(self, shared_store: Path) -> None:
+        """Test that a second checkout starts from the cache published by the first."""
+        first = Mock(spec_set=Context)
+        first.run.side_effect = _write_cache("module.data.json")
+
+        check(first)
+
+        command = first.run.call_args.args[0]
+        local = Path(command.split("--cache-dir ")[1].split()[0])
+        assert local.parent == Path(".quality/mypy/keyed")
+        assert (shared_store / local.name / "module.data.json").is_file()
+
+        shutil.rmtree(".quality")
+        second = Mock(spec_set=Context)
+        check(second)
+
+        assert (local / "module.data.json").is_file()
+
+    @pytest.mark.usefixtures("shared_store")
+    def test_check_skips_publish_when_cache_is_unchanged(self, mocker: MockerFixture) -> None:
+        """Test that a warm run that writes nothing does not copy the cache into the store."""
+        mock_publish = mocker.patch("project.tasks.mypy.SharedMypyCache.publish")
+
+        check(Mock(spec_set=Context))
+
+        mock_publish.assert_not_called()
+
+    def test_sharded_check_merges_shard_reports_and_keeps_exit_status(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that shards run in separate mypy processes and fail the task like a single run would."""
+        mocker.patch("project.tasks.mypy.plan_shards", return_value=[["project/utils.py"], ["tests/test_utils.py"]])
+        mocker.patch("project.tasks.mypy.SHARD_CACHE_ROOT", Path(".quality/mypy/shards"))
+        mocker.patch("project.tasks.mypy.shutil")
+        mocker.patch("project.tasks.mypy.os.cpu_count", return_value=8)
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [
+            Mock(stdout="Success: no issues found in 1 source file\n", stderr="", exited=0),
+            Mock(stdout="tests/test_utils.py:1: error: Oops  [misc]\n", stderr="", exited=1),
+        ]
+
+        with pytest.raises(Exit) as raised:
+            check(mock_context, shared_cache=False, sharded=True)
+
+        assert raised.value.code == 1
+        commands = sorted(call.args[0] for call in mock_context.run.call_args_list)
+        assert commands == [
+            "poetry run mypy --cache-dir .quality/mypy/shards/shard-0 project/utils.py",
+            "poetry run mypy --cache-dir .quality/mypy/shards/shard-1 tests/test_utils.py",
+        ]
+        output = capsys.readouterr().out
+        assert "tests/test_utils.py:1: error: Oops  [misc]\nFound 1 error in 1 file (checked 1 source file)" in output
+
+    def test_sharded_check_reports_the_traceback_of_a_crashed_shard(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that the stderr of a crashed shard is printed and the task fails with mypy's crash status."""
+        mocker.patch("project.tasks.mypy.plan_shards", return_value=[["project/utils.py"]])
+        mocker.patch("project.tasks.mypy.shutil")
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(stdout="", stderr="Traceback (most recent call last):\nboom\n", exited=2)
+
+        with pytest.raises(Exit) as raised:
+            check(mock_context, shared_cache=False, sharded=True)
+
+        assert raised.value.code == 2
+        assert "mypy shard 0 exited with status 2:\nTraceback (most recent call last):\nboom" in capsys.readouterr().out
+
+    def test_sharded_check_runs_at_most_max_shards(self, mocker: MockerFixture) -> None:
+        """Test that many shards are packed into MAX_SHARDS mypy processes."""
+        mocker.patch("project.tasks.mypy.plan_shards", return_value=[[f"pkg{index}/a.py"] for index in range(10)])
+        mocker.patch("project.tasks.mypy.shutil")
+        mocker.patch("project.tasks.mypy.os.cpu_count", return_value=64)
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(stdout="", stderr="", exited=0)
+
+        check(mock_context, shared_cache=False, sharded=True)
+
+        assert mock_context.run.call_count == MAX_SHARDS
+
+
+def _write_cache(name: str) -> Callable[..., None]:
+    """Build a fake mypy run that writes one cache file into the --cache-dir it is given."""
+
+    def run(command: str, **_: object) -> None:
+        cache_dir = Path(command.split("--cache-dir ")[1].split(maxsplit=1)[0])
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        (cache_dir / name).write_text("{}", encoding="utf-8")
 
-        mock_context.run.assert_called_once_with("poetry run mypy .", echo=True)
+    return run
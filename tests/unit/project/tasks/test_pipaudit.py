@@ -32,3 +32,17 @@ class TestPipaudit:
         ]
         mock_context.run.assert_has_calls(expected_calls, any_order=False)
         assert mock_context.run.call_count == 2
+
+    def test_check_runs_pip_audit_module_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that check runs the pip_audit module under cProfile when profiling."""
+        mocker.patch("project.tasks.pipaudit.ensure_directory")
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        check(mock_context, profile=True)
+
+        mock_context.run.assert_called_with(
+            "poetry run python -m cProfile -o .quality/profiles/pipaudit.check.pstats "
+            "-m pip_audit -r .quality/pipaudit/requirements.txt",
+            echo=True,
+        )
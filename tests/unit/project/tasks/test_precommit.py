@@ -2,8 +2,12 @@
 
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
 
+from project.precommit_hooks import Hook, HookResult
 from project.tasks.precommit import check, update
 
 
@@ -42,6 +46,35 @@ class TestPrecommit:
         mock_context.run.assert_any_call("poetry run pre-commit run md-toc --all-files", echo=True, warn=True)
         mock_context.run.assert_any_call("poetry run pre-commit run --all-files", echo=True)
 
+    def test_check_schedules_hooks_concurrently_with_jobs(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that check runs each hook through the scheduler and summarises them."""
+        hooks = [Hook("end-of-file-fixer"), Hook("check-ast")]
+        mocker.patch("project.tasks.precommit.load_hooks", return_value=hooks)
+        mock_run_hooks = mocker.patch(
+            "project.tasks.precommit.run_hooks",
+            return_value=[HookResult(hook_id=hook.hook_id, ok=True, seconds=0.1, output="") for hook in hooks],
+        )
+        mock_context = Mock(spec_set=Context)
+
+        check(mock_context, jobs=4)
+
+        mock_run_hooks.assert_called_once_with(mock_context, hooks, jobs=4)
+        mock_context.run.assert_not_called()
+        assert "2 of 2 hook(s) passed" in capsys.readouterr().out
+
+    def test_check_with_jobs_fails_and_shows_failed_hook_output(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a failing hook's output is shown and the check fails."""
+        mocker.patch("project.tasks.precommit.load_hooks", return_value=[Hook("gitleaks")])
+        mocker.patch(
+            "project.tasks.precommit.run_hooks",
+            return_value=[HookResult(hook_id="gitleaks", ok=False, seconds=0.1, output="leak found\n")],
+        )
+
+        with pytest.raises(Exit, match="Pre-commit hook\\(s\\) failed: gitleaks"):
+            check(Mock(spec_set=Context), jobs=2)
+
+        assert "--- gitleaks ---\nleak found" in capsys.readouterr().out
+
     def test_update_runs_precommit_autoupdate_with_echo_when_invoked(self) -> None:
         """Test that update runs pre-commit autoupdate command with echo enabled."""
         mock_context = Mock(spec_set=Context)
@@ -0,0 +1,40 @@
+"""Unit tests for the profile module."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.tasks.profile import report
+
+
+class TestProfile:
+    """Test suite for the report function."""
+
+    def test_report_prints_hint_when_no_profiles_exist(self, mocker: MockerFixture, tmp_path: Path, capsys) -> None:  # noqa: ANN001
+        """Test that report explains how to create profiles when there are none."""
+        mocker.patch("project.tasks.profile.PROFILES_DIRECTORY", tmp_path)
+
+        report(Mock(spec_set=Context))
+
+        assert "run a task with --profile first" in capsys.readouterr().out
+
+    def test_report_summarises_each_profile(self, mocker: MockerFixture, tmp_path: Path, capsys) -> None:  # noqa: ANN001
+        """Test that report writes collapsed stacks and prints the hottest frames for each profile."""
+        (tmp_path / "mypy.check.pstats").touch()
+        mocker.patch("project.tasks.profile.PROFILES_DIRECTORY", tmp_path)
+        mock_write = mocker.patch(
+            "project.tasks.profile.write_collapsed_stacks", return_value=tmp_path / "mypy.check.collapsed"
+        )
+        mock_hottest = mocker.patch(
+            "project.tasks.profile.hottest_frames", return_value=[("check_file (build.py:10)", 1.5, 4.0)]
+        )
+
+        report(Mock(spec_set=Context), limit=5)
+
+        mock_write.assert_called_once_with(tmp_path / "mypy.check.pstats")
+        mock_hottest.assert_called_once_with(tmp_path / "mypy.check.pstats", 5)
+        output = capsys.readouterr().out
+        assert "Profile: mypy.check" in output
+        assert "check_file (build.py:10)" in output
@@ -2,10 +2,27 @@
 
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from pytest_mock import MockerFixture
 
 from project.tasks.ruff import format as ruff_format
 from project.tasks.ruff import lint
+from project.utils import IndexedFile, WorkspaceIndex
+
+INDEX = WorkspaceIndex(
+    files=(
+        IndexedFile(path="README.md", blob="a" * 40, mode="100644"),
+        IndexedFile(path="project/utils.py", blob="b" * 40, mode="100644"),
+        IndexedFile(path="tasks.py", blob="c" * 40, mode="100644"),
+    )
+)
+
+
+@pytest.fixture(autouse=True)
+def _workspace_index(mocker: MockerFixture) -> None:
+    """Serve a fixed workspace index instead of running git."""
+    mocker.patch("project.tasks.ruff.workspace_index", return_value=INDEX)
 
 
 class TestRuff:
@@ -17,7 +34,9 @@ class TestRuff:
 
         lint(mock_context)
 
-        mock_context.run.assert_called_once_with("poetry run ruff check . --no-fix", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run ruff check project/utils.py tasks.py --force-exclude --no-fix", echo=True
+        )
 
     def test_lint_runs_check_with_fix_when_apply_safe_fixes_is_true(self) -> None:
         """Test that lint runs ruff check with --fix when apply_safe_fixes is True."""
@@ -25,7 +44,9 @@ class TestRuff:
 
         lint(mock_context, apply_safe_fixes=True)
 
-        mock_context.run.assert_called_once_with("poetry run ruff check . --fix ", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run ruff check project/utils.py tasks.py --force-exclude --fix ", echo=True
+        )
 
     def test_lint_runs_check_with_unsafe_fixes_when_apply_unsafe_fixes_is_true(self) -> None:
         """Test that lint runs ruff check with --unsafe-fixes when apply_unsafe_fixes is True."""
@@ -33,7 +54,9 @@ class TestRuff:
 
         lint(mock_context, apply_unsafe_fixes=True)
 
-        mock_context.run.assert_called_once_with("poetry run ruff check . --unsafe-fixes", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run ruff check project/utils.py tasks.py --force-exclude --unsafe-fixes", echo=True
+        )
 
     def test_format_runs_check_when_no_parameters_provided(self) -> None:
         """Test that format runs ruff format with --check when called without parameters."""
@@ -41,7 +64,9 @@ class TestRuff:
 
         ruff_format(mock_context)
 
-        mock_context.run.assert_called_once_with("poetry run ruff format . --check", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run ruff format project/utils.py tasks.py --force-exclude --check", echo=True
+        )
 
     def test_format_runs_with_no_preview_when_apply_safe_fixes_is_true(self) -> None:
         """Test that format runs ruff format with --no-preview when apply_safe_fixes is True."""
@@ -49,4 +74,6 @@ class TestRuff:
 
         ruff_format(mock_context, apply_safe_fixes=True)
 
-        mock_context.run.assert_called_once_with("poetry run ruff format . --no-preview", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run ruff format project/utils.py tasks.py --force-exclude --no-preview", echo=True
+        )
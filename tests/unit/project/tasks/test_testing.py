@@ -1,15 +1,27 @@
 """Unit tests for the testing module."""
 
+from pathlib import Path
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
 
-from project.tasks.testing import integration, tox, unit
+from project.tasks.testing import benchmark, coverage_benchmark, integration, merge_shards, shard, tox, unit
+
+UNIT_PLUGIN_ARGUMENTS = "--collection-cache=.quality/pytest/collection/tests.unit.json"
+UNIT_COST_REPORT = "--cost-report=.quality/pytest/costs/tests.unit.json"
 
 
 class TestTesting:
     """Test suite for the testing module functions."""
 
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker: MockerFixture) -> None:
+        """Pin the resolved coverage core so expectations do not depend on the interpreter."""
+        self.mock_resolve = mocker.patch("project.tasks.testing.resolve_coverage_core", return_value="ctrace")
+
     def test_unit_runs_pytest_with_coverage_when_invoked(self) -> None:
         """Test that unit runs pytest with unit test configuration and echo enabled."""
         mock_context = Mock(spec_set=Context)
@@ -17,10 +29,12 @@ class TestTesting:
         unit(mock_context)
 
         expected_command = (
-            "poetry run pytest tests/unit/ --disable-socket --cov=src --cov=project "
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS} "
+            "--cov=src --cov=project "
             "--cov-config=.unit-test-coveragerc --cov-report term-missing --cov-report term:skip-covered"
         )
-        mock_context.run.assert_called_once_with(expected_command, echo=True)
+        mock_context.run.assert_called_once_with(expected_command, echo=True, env={"COVERAGE_CORE": "ctrace"})
+        self.mock_resolve.assert_called_once_with("auto", branch=True)
 
     def test_integration_runs_pytest_with_coverage_when_invoked(self) -> None:
         """Test that integration runs pytest with integration test configuration and echo enabled."""
@@ -29,15 +43,301 @@ class TestTesting:
         integration(mock_context)
 
         expected_command = (
-            "poetry run pytest tests/integration/ --disable-socket --cov=src "
+            "poetry run pytest tests/integration/ --disable-socket "
+            "--collection-cache=.quality/pytest/collection/tests.integration.json --cov=src "
             "--cov-config=.integration-test-coveragerc --cov-report term-missing --cov-report term:skip-covered"
         )
-        mock_context.run.assert_called_once_with(expected_command, echo=True)
+        mock_context.run.assert_called_once_with(expected_command, echo=True, env={"COVERAGE_CORE": "ctrace"})
 
-    def test_tox_runs_tox_with_echo_when_invoked(self) -> None:
-        """Test that tox runs tox command with echo enabled."""
+    def test_tox_runs_tox_with_echo_when_invoked(self, mocker: MockerFixture) -> None:
+        """Test that tox runs tox command with echo enabled, with pip pointed at the index proxy when it runs."""
+        proxy_env = {"PIP_INDEX_URL": "http://127.0.0.1:8767/simple/"}
+        mocker.patch("project.tasks.testing.proxy_environment", return_value=proxy_env)
         mock_context = Mock(spec_set=Context)
 
         tox(mock_context)
 
-        mock_context.run.assert_called_once_with("poetry run tox", echo=True)
+        mock_context.run.assert_called_once_with("poetry run tox", echo=True, env=proxy_env)
+
+    def test_unit_runs_pytest_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that unit runs pytest as a module under cProfile when profiling."""
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, profile=True)
+
+        command = mock_context.run.call_args[0][0]
+        assert command.startswith(
+            "poetry run python -m cProfile -o .quality/profiles/tests.unit.pstats -m pytest tests/unit/ "
+        )
+
+    def test_integration_runs_pytest_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that integration runs pytest as a module under cProfile when profiling."""
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        integration(mock_context, profile=True)
+
+        command = mock_context.run.call_args[0][0]
+        assert command.startswith(
+            "poetry run python -m cProfile -o .quality/profiles/tests.integration.pstats -m pytest tests/integration/ "
+        )
+
+    def test_unit_runs_without_coverage_when_core_is_none(self) -> None:
+        """Test that the none coverage mode runs pytest uninstrumented."""
+        self.mock_resolve.return_value = None
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, coverage_core="none")
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS}",
+            echo=True,
+        )
+
+    def test_unit_measures_only_changed_files_when_changed_since_given(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that only changed files are measured, using a derived coverage config, and the gate is disabled."""
+        mock_changed = mocker.patch(
+            "project.tasks.testing.changed_python_files", return_value=["src/lessons_learnt/example.py"]
+        )
+        mock_write = mocker.patch(
+            "project.tasks.testing.write_changed_only_coveragerc", return_value=Path(".quality/derived.coveragerc")
+        )
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, changed_since="origin/main")
+
+        mock_changed.assert_called_once_with(mock_context, "origin/main", ["src", "project"])
+        mock_write.assert_called_once_with(
+            ".unit-test-coveragerc", ["src/lessons_learnt/example.py"], ".quality/pytest-cov/tests.unit.coveragerc"
+        )
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS} "
+            "--cov --cov-config=.quality/derived.coveragerc "
+            "--cov-report term-missing --cov-report term:skip-covered",
+            echo=True,
+            env={"COVERAGE_CORE": "ctrace"},
+        )
+        assert "Coverage gate disabled" in capsys.readouterr().out
+
+    def test_unit_skips_coverage_when_no_files_changed(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that coverage is skipped entirely when nothing under the sources changed."""
+        mocker.patch("project.tasks.testing.changed_python_files", return_value=[])
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, changed_since="origin/main")
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS}",
+            echo=True,
+        )
+        assert "skipping coverage" in capsys.readouterr().out
+
+    def test_coverage_benchmark_reports_overhead_per_mode(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that the benchmark times each supported mode and reports overhead against no coverage."""
+        self.mock_resolve.side_effect = lambda mode, **_: None if mode == "none" else mode
+        mocker.patch("project.tasks.testing.sysmon_unavailable_reason", return_value="needs Python 3.14+")
+        mocker.patch("project.tasks.testing.time.perf_counter", side_effect=[0.0, 1.0, 0.0, 3.0, 0.0, 1.5])
+        mock_context = Mock(spec_set=Context)
+
+        coverage_benchmark(mock_context, repeat=1)
+
+        envs = [call.kwargs["env"] for call in mock_context.run.call_args_list]
+        assert envs == [{}, {"COVERAGE_CORE": "pytrace"}, {"COVERAGE_CORE": "ctrace"}]
+        output = capsys.readouterr().out
+        assert "Skipping sysmon: needs Python 3.14+" in output
+        assert "200.0%" in output
+        assert "50.0%" in output
+
+    def test_benchmark_saves_the_first_run_as_baseline(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that results are saved as the baseline when there is none yet."""
+        report, baseline = tmp_path / "latest.json", tmp_path / "baseline.json"
+        report.write_text('{"test_a": {"p50": 0.1}}', encoding="utf-8")
+        mocker.patch("project.tasks.testing.BENCHMARK_REPORT_PATH", report)
+        mocker.patch("project.tasks.testing.BENCHMARK_BASELINE_PATH", baseline)
+        mock_context = Mock(spec_set=Context)
+
+        benchmark(mock_context, rounds=5)
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/benchmarks/ --disable-socket -q --benchmark-report={report} --benchmark-rounds=5",
+            echo=True,
+        )
+        assert baseline.read_text(encoding="utf-8") == report.read_text(encoding="utf-8")
+
+    def test_benchmark_fails_on_regression(self, tmp_path: Path, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a benchmark slower than the tolerance allows fails the run."""
+        report, baseline = tmp_path / "latest.json", tmp_path / "baseline.json"
+        report.write_text('{"test_a": {"p50": 0.13}, "test_b": {"p50": 0.2}}', encoding="utf-8")
+        baseline.write_text('{"test_a": {"p50": 0.1}, "test_b": {"p50": 0.2}}', encoding="utf-8")
+        mocker.patch("project.tasks.testing.BENCHMARK_REPORT_PATH", report)
+        mocker.patch("project.tasks.testing.BENCHMARK_BASELINE_PATH", baseline)
+
+        with pytest.raises(Exit, match=r"1 benchmark\(s\) regressed by more than 20%: test_a \(\+30.0%\)"):
+            benchmark(Mock(spec_set=Context), tolerance=20.0)
+        benchmark(Mock(spec_set=Context), tolerance=50.0)
+
+        assert "+30.0%" in capsys.readouterr().out
+
+    def test_shard_runs_only_the_selected_shard_files(self, mocker: MockerFixture) -> None:
+        """Test that a shard runs its files per suite with shard-specific coverage and JUnit output."""
+        mocker.patch(
+            "project.tasks.testing.discover_test_files",
+            return_value=["tests/integration/test_c.py", "tests/unit/test_a.py", "tests/unit/test_b.py"],
+        )
+        mocker.patch(
+            "project.tasks.testing.plan_shards",
+            return_value=[["tests/unit/test_b.py"], ["tests/integration/test_c.py", "tests/unit/test_a.py"]],
+        )
+        mocker.patch("project.tasks.testing.DurationHistory.load")
+        mocker.patch("project.tasks.testing.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        shard(mock_context, index=1, total=2)
+
+        assert mock_context.run.call_count == 2
+        unit_call, integration_call = mock_context.run.call_args_list
+        assert unit_call.args[0] == (
+            "poetry run pytest tests/unit/test_a.py --disable-socket "
+            "--collection-cache=.quality/pytest/collection/tests.unit.json "
+            "--junitxml=.quality/tests/shards/tests.unit.1.xml --cov=src --cov=project "
+            "--cov-config=.unit-test-coveragerc --cov-report= --cov-fail-under=0"
+        )
+        assert unit_call.kwargs["env"] == {
+            "COVERAGE_CORE": "ctrace",
+            "COVERAGE_FILE": ".quality/tests/shards/tests.unit.1.coverage",
+        }
+        assert integration_call.args[0].startswith("poetry run pytest tests/integration/test_c.py --disable-socket ")
+
+    def test_shard_rejects_index_outside_total(self) -> None:
+        """Test that an out-of-range shard index is rejected."""
+        with pytest.raises(ValueError, match="between 0 and 1"):
+            shard(Mock(spec_set=Context), index=2, total=2)
+
+    def test_merge_shards_combines_coverage_and_junit(
+        self,
+        mocker: MockerFixture,
+        tmp_path: Path,
+        capsys,  # noqa: ANN001
+    ) -> None:
+        """Test that merge combines shard coverage, enforces thresholds and merges JUnit reports."""
+        for name in ("tests.unit.0.coverage", "tests.unit.1.coverage", "tests.unit.0.xml"):
+            (tmp_path / name).touch()
+        mocker.patch("project.tasks.testing.SHARDS_DIRECTORY", tmp_path)
+        mock_history = mocker.patch("project.tasks.testing.DurationHistory.load").return_value
+        mock_record = mocker.patch("project.tasks.testing.record_junit_durations")
+        mock_merge = mocker.patch("project.tasks.testing.merge_junit_reports", return_value=Path("junit.xml"))
+        mock_context = Mock(spec_set=Context)
+
+        merge_shards(mock_context)
+
+        mock_context.run.assert_any_call(
+            f"poetry run coverage combine --rcfile=.unit-test-coveragerc "
+            f"{tmp_path / 'tests.unit.0.coverage'} {tmp_path / 'tests.unit.1.coverage'}",
+            echo=True,
+        )
+        mock_context.run.assert_any_call(
+            "poetry run coverage report --rcfile=.unit-test-coveragerc --show-missing", echo=True
+        )
+        assert mock_context.run.call_count == 2
+        mock_record.assert_called_once_with([tmp_path / "tests.unit.0.xml"], mock_history)
+        mock_history.save.assert_called_once()
+        mock_merge.assert_called_once()
+        assert "Merged 1 JUnit report(s) into junit.xml" in capsys.readouterr().out
+
+    def test_unit_passes_budgets_to_the_cost_plugin(self) -> None:
+        """Test that time, memory and marker budgets are passed to pytest's cost plugin."""
+        self.mock_resolve.return_value = None
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, coverage_core="none", time_budget=2.5, memory_budget=64, marker_budget=["slow=30:512"])
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS} {UNIT_COST_REPORT} "
+            "--time-budget=2.5 --memory-budget=64 --marker-budget=slow=30:512",
+            echo=True,
+        )
+
+    @pytest.mark.parametrize(
+        ("costs", "memory_costs", "expected"),
+        [
+            (True, False, UNIT_COST_REPORT),
+            (False, True, f"{UNIT_COST_REPORT} --cost-memory"),
+        ],
+    )
+    def test_unit_records_costs_only_when_asked(self, *, costs: bool, memory_costs: bool, expected: str) -> None:
+        """Test that costs are recorded on request, and memory is traced only for a memory report."""
+        self.mock_resolve.return_value = None
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, coverage_core="none", costs=costs, memory_costs=memory_costs)
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS} {expected}", echo=True
+        )
+
+    def test_unit_gates_on_diff_coverage(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that diff coverage writes a JSON report for the changed files and gates on their changed lines."""
+        mocker.patch("project.tasks.testing.changed_python_files", return_value=["src/lessons_learnt/example.py"])
+        mocker.patch(
+            "project.tasks.testing.write_changed_only_coveragerc", return_value=Path(".quality/derived.coveragerc")
+        )
+        mocker.patch(
+            "project.tasks.testing.load_report",
+            return_value={"files": {"src/lessons_learnt/example.py": {"executed_lines": [3], "missing_lines": [4]}}},
+        )
+        mock_changed = mocker.patch(
+            "project.tasks.testing.changed_lines", return_value={"src/lessons_learnt/example.py": {3, 4}}
+        )
+        mock_context = Mock(spec_set=Context)
+
+        with pytest.raises(Exit, match=r"Diff coverage 50.0% is below 80% for changes since origin/main"):
+            unit(mock_context, changed_since="origin/main", diff_coverage=True)
+
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/ --disable-socket {UNIT_PLUGIN_ARGUMENTS} "
+            "--cov --cov-config=.quality/derived.coveragerc --cov-report=json:.quality/pytest-cov/tests.unit.diff.json",
+            echo=True,
+            env={"COVERAGE_CORE": "ctrace"},
+        )
+        mock_changed.assert_called_once_with(mock_context, "origin/main", ["src/lessons_learnt/example.py"])
+        assert "src/lessons_learnt/example.py: 1/2 changed statements covered, missing 4" in capsys.readouterr().out
+
+    def test_diff_coverage_needs_a_base_ref(self) -> None:
+        """Test that diff coverage without changed_since is rejected."""
+        with pytest.raises(ValueError, match="pass --changed-since"):
+            integration(Mock(spec_set=Context), diff_coverage=True)
+
+    def test_unit_with_marker_only_collects_files_with_matching_tests(self, mocker: MockerFixture) -> None:
+        """Test that a marker expression narrows the run to the files the collection cache selects."""
+        self.mock_resolve.return_value = None
+        mocker.patch(
+            "project.tasks.testing.discover_test_files", return_value=["tests/unit/test_a.py", "tests/unit/test_b.py"]
+        )
+        mocker.patch("project.tasks.testing.config_digest", return_value="config")
+        mock_load = mocker.patch("project.tasks.testing.CollectionCache.load")
+        mock_select = mocker.patch("project.tasks.testing.select_files", return_value=["tests/unit/test_b.py"])
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, coverage_core="none", marker="not slow")
+
+        mock_load.assert_called_once_with(".quality/pytest/collection/tests.unit.json", "config")
+        mock_select.assert_called_once_with(
+            mock_load.return_value, ["tests/unit/test_a.py", "tests/unit/test_b.py"], "not slow"
+        )
+        mock_context.run.assert_called_once_with(
+            f"poetry run pytest tests/unit/test_b.py -m 'not slow' --disable-socket {UNIT_PLUGIN_ARGUMENTS}", echo=True
+        )
+
+    def test_unit_with_marker_skips_when_nothing_matches(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that pytest is not started when no cached test matches the marker expression."""
+        mocker.patch("project.tasks.testing.discover_test_files", return_value=["tests/unit/test_a.py"])
+        mocker.patch("project.tasks.testing.config_digest", return_value="config")
+        mocker.patch("project.tasks.testing.CollectionCache.load")
+        mocker.patch("project.tasks.testing.select_files", return_value=[])
+        mock_context = Mock(spec_set=Context)
+
+        unit(mock_context, marker="slow")
+
+        mock_context.run.assert_not_called()
+        assert "No tests in tests/unit/ match -m 'slow'; skipping" in capsys.readouterr().out
@@ -0,0 +1,31 @@
+"""Unit tests for the tools module."""
+
+from unittest.mock import Mock
+
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.tasks.tools import probe
+from project.tool_probes import ToolProbe
+
+
+class TestTools:
+    """Test suite for the tool probe tasks."""
+
+    def test_probe_lists_tools_and_passes_refresh(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that probe shows each tool's availability and version."""
+        mock_probe = mocker.patch(
+            "project.tasks.tools.probe_environment",
+            return_value={
+                "ruff": ToolProbe(name="ruff", available=True, version="0.9.0"),
+                "docker": ToolProbe(name="docker", available=False),
+            },
+        )
+        mock_context = Mock(spec_set=Context)
+
+        probe(mock_context, refresh=True)
+
+        mock_probe.assert_called_once_with(mock_context, refresh=True)
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].split() == ["✗", "docker", "unavailable"]
+        assert lines[1].split() == ["✓", "ruff", "0.9.0"]
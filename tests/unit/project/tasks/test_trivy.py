@@ -22,6 +22,8 @@ class TestTrivy:
             "project.tasks.trivy.get_current_working_directory", return_value=mock_workspace_path
         )
         mock_ensure_directory = mocker.patch("project.tasks.trivy.ensure_directory")
+        mock_index = mocker.patch("project.tasks.trivy.workspace_index").return_value
+        mock_index.unindexed_directories.return_value = [".quality", ".venv"]
 
         mock_context = Mock(spec_set=Context)
 
@@ -41,7 +43,10 @@ class TestTrivy:
             f"aquasec/trivy fs "
             f"--scanners vuln,secret,misconfig,license "
             f"--exit-code 1 "
+            f"--skip-dirs /workspace/.quality "
+            f"--skip-dirs /workspace/.venv "
             f"/workspace",
             echo=True,
         )
         assert mock_context.run.call_count == 1
+        mock_index.unindexed_directories.assert_called_once_with(mock_workspace_path)
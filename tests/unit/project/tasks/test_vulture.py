@@ -2,9 +2,26 @@
 
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from pytest_mock import MockerFixture
 
 from project.tasks.vulture import check, regenerate
+from project.utils import IndexedFile, WorkspaceIndex
+
+INDEX = WorkspaceIndex(
+    files=(
+        IndexedFile(path="README.md", blob="a" * 40, mode="100644"),
+        IndexedFile(path="project/utils.py", blob="b" * 40, mode="100644"),
+        IndexedFile(path="tasks.py", blob="c" * 40, mode="100644"),
+    )
+)
+
+
+@pytest.fixture(autouse=True)
+def _workspace_index(mocker: MockerFixture) -> None:
+    """Serve a fixed workspace index instead of running git."""
+    mocker.patch("project.tasks.vulture.workspace_index", return_value=INDEX)
 
 
 class TestVulture:
@@ -16,7 +33,9 @@ class TestVulture:
 
         check(mock_context)
 
-        mock_context.run.assert_called_once_with("poetry run vulture . vulture_whitelist", echo=True)
+        mock_context.run.assert_called_once_with(
+            "poetry run vulture project/utils.py tasks.py vulture_whitelist", echo=True
+        )
 
     def test_regenerate_runs_vulture_make_whitelist_with_echo_when_invoked(self) -> None:
         """Test that regenerate runs vulture command with --make-whitelist and echo enabled."""
@@ -25,3 +44,16 @@ class TestVulture:
         regenerate(mock_context)
 
         mock_context.run.assert_called_once_with("poetry run vulture . --make-whitelist > vulture_whitelist", echo=True)
+
+    def test_check_runs_vulture_under_cprofile_when_profile_is_true(self, mocker: MockerFixture) -> None:
+        """Test that check runs vulture as a module under cProfile when profiling."""
+        mocker.patch("project.profiling.ensure_directory")
+        mock_context = Mock(spec_set=Context)
+
+        check(mock_context, profile=True)
+
+        mock_context.run.assert_called_once_with(
+            "poetry run python -m cProfile -o .quality/profiles/vulture.check.pstats "
+            "-m vulture project/utils.py tasks.py vulture_whitelist",
+            echo=True,
+        )
@@ -0,0 +1,26 @@
+"""Unit tests for the workers module."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.tasks.workers import serve
+
+
+class TestWorkers:
+    """Test suite for the serve function."""
+
+    def test_serve_starts_worker_server_on_given_address(self, mocker: MockerFixture) -> None:
+        """Test that serve starts a worker server bound to the workspace and serves forever."""
+        mock_workspace_path = Path("/mock/workspace")
+        mocker.patch("project.tasks.workers.get_current_working_directory", return_value=mock_workspace_path)
+        mocker.patch("project.tasks.workers.worker_token", return_value="secret")
+        mock_server_class = mocker.patch("project.tasks.workers.WorkerServer")
+        mock_server = mock_server_class.return_value.__enter__.return_value
+
+        serve(Mock(spec_set=Context), host="0.0.0.0", port=9001)  # noqa: S104
+
+        mock_server_class.assert_called_once_with(("0.0.0.0", 9001), mock_workspace_path, "secret")  # noqa: S104
+        mock_server.serve_forever.assert_called_once()
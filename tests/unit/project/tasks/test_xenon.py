@@ -2,9 +2,26 @@
 
 from unittest.mock import Mock
 
+import pytest
 from invoke.context import Context
+from pytest_mock import MockerFixture
 
 from project.tasks.xenon import check
+from project.utils import IndexedFile, WorkspaceIndex
+
+INDEX = WorkspaceIndex(
+    files=(
+        IndexedFile(path="README.md", blob="a" * 40, mode="100644"),
+        IndexedFile(path="project/utils.py", blob="b" * 40, mode="100644"),
+        IndexedFile(path="tasks.py", blob="c" * 40, mode="100644"),
+    )
+)
+
+
+@pytest.fixture(autouse=True)
+def _workspace_index(mocker: MockerFixture) -> None:
+    """Serve a fixed workspace index instead of running git."""
+    mocker.patch("project.tasks.xenon.workspace_index", return_value=INDEX)
 
 
 class TestXenon:
@@ -17,5 +34,5 @@ class TestXenon:
         check(mock_context)
 
         mock_context.run.assert_called_once_with(
-            "poetry run xenon --max-absolute B --max-modules A --max-average A .", echo=True
+            "poetry run xenon --max-absolute B --max-modules A --max-average A project/utils.py tasks.py", echo=True
         )
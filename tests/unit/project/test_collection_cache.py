@@ -0,0 +1,172 @@
+"""Unit tests for the collection_cache module."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from project.collection_cache import CachedTest, CollectionCache, config_digest, marker_matcher, select_files
+
+PYPROJECT = '[tool.pytest.ini_options]\nmarkers = ["slow: slow tests"]\n'
+TEST_MODULE = """
+import pytest
+
+
+@pytest.mark.slow
+def test_slow():
+    pass
+
+
+@pytest.mark.parametrize("value", [1, 2])
+def test_values(value):
+    assert value
+"""
+MARKING_CONFTEST = """
+import pytest
+
+
+def pytest_collection_modifyitems(items):
+    for item in items:
+        item.add_marker(pytest.mark.tagged)
+"""
+
+
+@pytest.fixture
+def project_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a project with a pyproject.toml and a tests directory, and change into it."""
+    (tmp_path / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+    (tmp_path / "tests" / "unit").mkdir(parents=True)
+    (tmp_path / "tests" / "conftest.py").write_text("", encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class TestConfigDigest:
+    """Test suite for invalidating the cache when pytest configuration changes."""
+
+    def test_changes_with_conftest_and_pytest_settings(self, project_root: Path) -> None:
+        """Test that editing a conftest or the pytest settings changes the digest."""
+        original = config_digest()
+
+        (project_root / "tests" / "unit" / "conftest.py").write_text("FIXTURE = 1\n", encoding="utf-8")
+        with_conftest = config_digest()
+        (project_root / "pyproject.toml").write_text(PYPROJECT + 'addopts = "-q"\n', encoding="utf-8")
+        with_settings = config_digest()
+
+        assert len({original, with_conftest, with_settings}) == 3
+
+    def test_ignores_other_pyproject_tables(self, project_root: Path) -> None:
+        """Test that settings of other tools do not invalidate the cache."""
+        original = config_digest()
+
+        (project_root / "pyproject.toml").write_text(PYPROJECT + "[tool.ruff]\nline-length = 99\n", encoding="utf-8")
+
+        assert config_digest() == original
+
+
+class TestCollectionCache:
+    """Test suite for storing and looking up cached collection results."""
+
+    @pytest.mark.usefixtures("project_root")
+    def test_lookup_invalidates_changed_files_and_configuration(self) -> None:
+        """Test that cached tests are only returned for unchanged files under the same configuration."""
+        test_file = Path("tests/unit/test_a.py")
+        test_file.write_text(TEST_MODULE, encoding="utf-8")
+        cache = CollectionCache(".quality/collection.json", "config-a")
+        cache.record(test_file.as_posix(), [CachedTest(nodeid="tests/unit/test_a.py::test_slow", markers=["slow"])])
+        cache.save()
+
+        reloaded = CollectionCache.load(".quality/collection.json", "config-a")
+        assert reloaded.lookup("tests/unit/test_a.py") == [
+            CachedTest(nodeid="tests/unit/test_a.py::test_slow", markers=["slow"])
+        ]
+        assert CollectionCache.load(".quality/collection.json", "config-b").lookup("tests/unit/test_a.py") is None
+        assert reloaded.lookup("tests/unit/test_missing.py") is None
+        test_file.write_text(TEST_MODULE + "\n# edited\n", encoding="utf-8")
+        assert reloaded.lookup("tests/unit/test_a.py") is None
+
+    @pytest.mark.usefixtures("project_root")
+    def test_select_files_skips_unchanged_files_without_matches(self) -> None:
+        """Test that only files with matching or unknown tests are selected."""
+        for name in ("test_slow.py", "test_fast.py", "test_new.py"):
+            Path("tests/unit", name).write_text(TEST_MODULE, encoding="utf-8")
+        cache = CollectionCache("collection.json", "config")
+        cache.record("tests/unit/test_slow.py", [CachedTest(nodeid="test_slow.py::test_a", markers=["slow"])])
+        cache.record("tests/unit/test_fast.py", [CachedTest(nodeid="test_fast.py::test_b")])
+        files = ["tests/unit/test_fast.py", "tests/unit/test_new.py", "tests/unit/test_slow.py"]
+
+        assert select_files(cache, files, "slow") == ["tests/unit/test_new.py", "tests/unit/test_slow.py"]
+        assert select_files(cache, files, "not slow") == ["tests/unit/test_fast.py", "tests/unit/test_new.py"]
+        assert select_files(cache, files, "slow(reason='x')") == files
+
+
+class TestMarkerMatcher:
+    """Test suite for evaluating -m expressions against cached marker names."""
+
+    @pytest.mark.parametrize(
+        ("expression", "markers", "expected"),
+        [
+            ("slow", {"slow"}, True),
+            ("slow", set(), False),
+            ("not slow", {"slow"}, False),
+            ("slow and not network", {"slow"}, True),
+            ("slow and not network", {"slow", "network"}, False),
+            ("fast or (slow and network)", {"slow", "network"}, True),
+            ("not (fast or slow)", {"network"}, True),
+            ("", {"slow"}, False),
+        ],
+    )
+    def test_evaluates_marker_expressions(self, expression: str, markers: set[str], expected: bool) -> None:
+        """Test that and, or, not and parentheses combine marker names as pytest does."""
+        assert marker_matcher(expression)(markers) is expected
+
+    @pytest.mark.parametrize("expression", ["slow(reason=1)", "slow and", "(slow", "slow slow", "not"])
+    def test_rejects_unsupported_or_invalid_expressions(self, expression: str) -> None:
+        """Test that keyword arguments and malformed expressions are rejected."""
+        with pytest.raises(ValueError, match="marker"):
+            marker_matcher(expression)
+
+
+class TestCollectionRecorder:
+    """Test suite for recording collection results from a pytest run."""
+
+    def test_records_nodes_markers_and_parameters(self, pytester: pytest.Pytester) -> None:
+        """Test that every collected test is cached, including those the run deselects."""
+        pytester.makepyprojecttoml(PYPROJECT)
+        pytester.makepyfile(test_module=TEST_MODULE)
+        cache_file = pytester.path / "collection.json"
+
+        result = pytester.runpytest("-p", "project.collection_cache", f"--collection-cache={cache_file}", "-m", "slow")
+
+        result.assert_outcomes(passed=1, deselected=2)
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        assert cached["config"] == config_digest(pytester.path)
+        assert cached["files"]["test_module.py"]["tests"] == [
+            {"nodeid": "test_module.py::test_slow", "markers": ["slow"], "parameters": None},
+            {"nodeid": "test_module.py::test_values[1]", "markers": ["parametrize"], "parameters": "1"},
+            {"nodeid": "test_module.py::test_values[2]", "markers": ["parametrize"], "parameters": "2"},
+        ]
+
+    def test_partly_collected_files_are_not_recorded(self, pytester: pytest.Pytester) -> None:
+        """Test that a run of selected node ids does not overwrite a file's cached tests."""
+        pytester.makepyprojecttoml(PYPROJECT)
+        pytester.makepyfile(test_module=TEST_MODULE)
+        cache_file = pytester.path / "collection.json"
+
+        pytester.runpytest(
+            "-p", "project.collection_cache", f"--collection-cache={cache_file}", "test_module.py::test_slow"
+        )
+
+        assert json.loads(cache_file.read_text(encoding="utf-8"))["files"] == {}
+
+    def test_records_markers_added_by_other_plugins(self, pytester: pytest.Pytester) -> None:
+        """Test that markers added while other plugins modify the items are cached."""
+        pytester.makepyprojecttoml(PYPROJECT)
+        pytester.makeconftest(MARKING_CONFTEST)
+        pytester.makepyfile(test_module=TEST_MODULE)
+        cache_file = pytester.path / "collection.json"
+
+        pytester.runpytest("-p", "project.collection_cache", f"--collection-cache={cache_file}")
+
+        tests = json.loads(cache_file.read_text(encoding="utf-8"))["files"]["test_module.py"]["tests"]
+        assert all("tagged" in test["markers"] for test in tests)
@@ -0,0 +1,113 @@
+"""Unit tests for the coverage_modes module."""
+
+import configparser
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.coverage_modes import (
+    changed_python_files,
+    coverage_fail_under,
+    is_branch_coverage,
+    resolve_coverage_core,
+    write_changed_only_coveragerc,
+)
+
+
+class TestResolveCoverageCore:
+    """Test suite for the resolve_coverage_core function."""
+
+    def test_auto_uses_sysmon_when_supported(self, mocker: MockerFixture) -> None:
+        """Test that auto picks sys.monitoring on interpreters that support it."""
+        mocker.patch("project.coverage_modes.sysmon_unavailable_reason", return_value=None)
+
+        assert resolve_coverage_core("auto") == "sysmon"
+
+    def test_auto_falls_back_to_ctrace(self, mocker: MockerFixture) -> None:
+        """Test that auto picks the C tracer when sys.monitoring cannot be used."""
+        mocker.patch("project.coverage_modes.sysmon_unavailable_reason", return_value="too old")
+
+        assert resolve_coverage_core("auto") == "ctrace"
+
+    def test_explicit_sysmon_falls_back_with_notice(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that requesting sysmon on an unsupported interpreter falls back gracefully."""
+        mocker.patch("project.coverage_modes.sysmon_unavailable_reason", return_value="too old")
+
+        assert resolve_coverage_core("sysmon") == "ctrace"
+        assert "too old; falling back to ctrace" in capsys.readouterr().out
+
+    def test_none_disables_coverage_and_explicit_cores_pass_through(self) -> None:
+        """Test that none disables coverage and classic cores are used as requested."""
+        assert resolve_coverage_core("none") is None
+        assert resolve_coverage_core("pytrace") == "pytrace"
+        assert resolve_coverage_core("ctrace") == "ctrace"
+
+    def test_unknown_core_is_rejected(self) -> None:
+        """Test that an unknown mode raises a helpful error."""
+        with pytest.raises(ValueError, match="Unknown coverage core 'fast'"):
+            resolve_coverage_core("fast")
+
+
+class TestCoverageConfig:
+    """Test suite for the coverage configuration helpers."""
+
+    def test_is_branch_coverage_reads_run_section(self, tmp_path: Path) -> None:
+        """Test that branch coverage is detected from the coveragerc."""
+        enabled = tmp_path / "enabled"
+        enabled.write_text("[run]\nbranch = True\n", encoding="utf-8")
+        disabled = tmp_path / "disabled"
+        disabled.write_text("[report]\nfail_under = 80\n", encoding="utf-8")
+
+        assert is_branch_coverage(enabled) is True
+        assert is_branch_coverage(disabled) is False
+
+    def test_coverage_fail_under_reads_report_section(self, tmp_path: Path) -> None:
+        """Test that the threshold is read from the coveragerc and defaults to zero."""
+        configured = tmp_path / "configured"
+        configured.write_text("[report]\nfail_under = 80\n", encoding="utf-8")
+        unconfigured = tmp_path / "unconfigured"
+        unconfigured.write_text("[run]\nbranch = True\n", encoding="utf-8")
+
+        assert coverage_fail_under(configured) == 80.0
+        assert coverage_fail_under(unconfigured) == 0.0
+
+    def test_write_changed_only_coveragerc_includes_files_and_drops_threshold(self, tmp_path: Path) -> None:
+        """Test that the derived config measures only the given files without the global threshold."""
+        base = tmp_path / "base"
+        base.write_text("[report]\nfail_under = 80\nsort = cover\n\n[run]\nbranch = True\n", encoding="utf-8")
+
+        output = write_changed_only_coveragerc(base, ["src/a.py", "src/b.py"], tmp_path / "out" / "derived")
+
+        config = configparser.ConfigParser()
+        config.read(output, encoding="utf-8")
+        assert config.get("run", "include").split() == ["src/a.py", "src/b.py"]
+        assert config.getboolean("run", "branch") is True
+        assert not config.has_option("report", "fail_under")
+        assert config.get("report", "sort") == "cover"
+
+    def test_changed_python_files_filters_by_root_and_extension(
+        self,
+        mocker: MockerFixture,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that only existing Python files under the roots are returned."""
+        monkeypatch.chdir(tmp_path)
+        for name in ("src/a.py", "src/new.py", "project/b.py", "tests/c.py", "src/readme.md"):
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).touch()
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [
+            mocker.Mock(stdout="abc123\n"),
+            mocker.Mock(stdout="src/a.py\0project/b.py\0tests/c.py\0src/readme.md\0src/deleted.py\0"),
+            mocker.Mock(stdout="src/new.py\0"),
+        ]
+
+        files = changed_python_files(mock_context, "origin/main", ["src"])
+
+        assert files == ["src/a.py", "src/new.py"]
+        mock_context.run.assert_any_call("git merge-base origin/main HEAD", hide=True)
+        mock_context.run.assert_any_call("git diff --name-only -z abc123 --", hide=True)
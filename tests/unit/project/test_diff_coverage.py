@@ -0,0 +1,129 @@
+"""Unit tests for the diff_coverage module."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke.context import Context
+
+from project.diff_coverage import (
+    FileDiffCoverage,
+    changed_lines,
+    diff_coverage,
+    format_line_ranges,
+    load_report,
+    parse_changed_lines,
+    report_lines,
+    total_percent,
+)
+
+DIFF = """diff --git a/src/a.py b/src/a.py
+index 1111111..2222222 100644
+--- a/src/a.py
++++ b/src/a.py
+@@ -3,0 +4,2 @@ def a():
++    first = 1
++    second = 2
+@@ -10 +12 @@ def a():
+-    old = 0
++    new = 0
+diff --git a/src/removed.py b/src/removed.py
+deleted file mode 100644
+--- a/src/removed.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-gone = True
+-also_gone = True
+diff --git a/src/b.py b/src/b.py
+--- a/src/b.py
++++ b/src/b.py
+@@ -5,2 +4,0 @@
+-deleted = 1
+-deleted = 2
+"""
+
+
+class TestChangedLines:
+    """Test suite for reading changed lines from git."""
+
+    def test_parse_changed_lines(self) -> None:
+        """Test that added and modified lines are read and deletions are ignored."""
+        assert parse_changed_lines(DIFF) == {"src/a.py": {4, 5, 12}}
+
+    def test_untracked_files_count_as_entirely_changed(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that every line of an untracked file counts as changed."""
+        monkeypatch.chdir(tmp_path)
+        Path("new.py").write_text("a = 1\nb = 2\n", encoding="utf-8")
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [Mock(stdout="abc123\n"), Mock(stdout=DIFF), Mock(stdout="new.py\0")]
+
+        changed = changed_lines(mock_context, "origin/main", ["new.py", "src/a.py"])
+
+        assert changed == {"src/a.py": {4, 5, 12}, "new.py": {1, 2}}
+        mock_context.run.assert_any_call("git merge-base origin/main HEAD", hide=True)
+        mock_context.run.assert_any_call(
+            "git -c core.quotePath=false diff -U0 --no-color --no-ext-diff abc123 -- new.py src/a.py", hide=True
+        )
+
+    def test_refs_and_paths_are_quoted(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a base ref or path with shell syntax reaches git as a single argument."""
+        monkeypatch.chdir(tmp_path)
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [Mock(stdout="abc123\n"), Mock(stdout=""), Mock(stdout="")]
+
+        changed_lines(mock_context, "main; touch pwned", ["src/my file.py"])
+
+        commands = [call.args[0] for call in mock_context.run.call_args_list]
+        assert commands[0] == "git merge-base 'main; touch pwned' HEAD"
+        assert commands[1].endswith("-- 'src/my file.py'")
+        assert commands[2].endswith("-- 'src/my file.py'")
+
+    def test_no_files_runs_no_git_commands(self) -> None:
+        """Test that nothing is diffed when there are no files of interest."""
+        mock_context = Mock(spec_set=Context)
+
+        assert changed_lines(mock_context, "origin/main", []) == {}
+        mock_context.run.assert_not_called()
+
+
+class TestDiffCoverage:
+    """Test suite for intersecting coverage with changed lines."""
+
+    def test_only_changed_statements_are_judged(self, tmp_path: Path) -> None:
+        """Test that unchanged lines, non-statements and unmeasured files are ignored."""
+        report_file = tmp_path / "coverage.json"
+        report_file.write_text(
+            '{"files": {"src/a.py": {"executed_lines": [1, 4, 20], "missing_lines": [5, 6, 12]},'
+            ' "src/c.py": {"executed_lines": [1], "missing_lines": []}}}',
+            encoding="utf-8",
+        )
+
+        files = diff_coverage(
+            load_report(report_file), {"src/a.py": {3, 4, 5, 12}, "src/c.py": {2}, "src/unmeasured.py": {1}}
+        )
+
+        assert files == [FileDiffCoverage(path="src/a.py", statements=[4, 5, 12], missing=[5, 12])]
+        assert files[0].covered == 1
+        assert total_percent(files) == pytest.approx(100 / 3)
+
+    def test_nothing_changed_counts_as_covered(self) -> None:
+        """Test that a change without statements does not fail the gate."""
+        assert total_percent([]) == 100.0
+
+    def test_report_lines(self) -> None:
+        """Test that touched files list their missing changed lines."""
+        files = [
+            FileDiffCoverage(path="src/a.py", statements=[4, 5, 6, 9, 12], missing=[4, 5, 6, 9]),
+            FileDiffCoverage(path="src/b.py", statements=[1], missing=[]),
+        ]
+
+        assert report_lines(files) == [
+            "src/a.py: 1/5 changed statements covered, missing 4-6, 9",
+            "src/b.py: 1/1 changed statements covered",
+            "Diff coverage: 33.3% of 6 statements",
+        ]
+
+    def test_format_line_ranges(self) -> None:
+        """Test that consecutive lines collapse into ranges."""
+        assert format_line_ranges([1, 2, 3, 7, 9, 10]) == "1-3, 7, 9-10"
+        assert format_line_ranges([]) == ""
@@ -0,0 +1,54 @@
+"""Unit tests for the duration_history module."""
+
+import json
+from pathlib import Path
+
+from project.duration_history import DEFAULT_ESTIMATE_SECONDS, MAX_SAMPLES, DurationHistory
+
+
+class TestDurationHistory:
+    """Test suite for the DurationHistory class."""
+
+    def test_estimate_returns_default_for_unknown_task(self, tmp_path: Path) -> None:
+        """Test that tasks without samples fall back to the default estimate."""
+        history = DurationHistory(tmp_path / "durations.json")
+
+        assert history.estimate("unknown.task") == DEFAULT_ESTIMATE_SECONDS
+        assert history.estimate("unknown.task", default=5.0) == 5.0
+
+    def test_estimate_returns_median_of_samples(self, tmp_path: Path) -> None:
+        """Test that the estimate is the median so one outlier does not dominate."""
+        history = DurationHistory(tmp_path / "durations.json")
+        for seconds in (1.0, 2.0, 100.0):
+            history.record("mypy.check", seconds)
+
+        assert history.estimate("mypy.check") == 2.0
+
+    def test_record_keeps_only_most_recent_samples(self, tmp_path: Path) -> None:
+        """Test that only the most recent MAX_SAMPLES samples are kept."""
+        history = DurationHistory(tmp_path / "durations.json")
+        for seconds in range(MAX_SAMPLES + 5):
+            history.record("tests.unit", float(seconds))
+
+        assert history.samples["tests.unit"] == [float(seconds) for seconds in range(5, MAX_SAMPLES + 5)]
+
+    def test_save_and_load_round_trip(self, tmp_path: Path) -> None:
+        """Test that saved history is loaded back with the same samples."""
+        path = tmp_path / "nested" / "durations.json"
+        history = DurationHistory(path)
+        history.record("trivy.check", 12.5)
+        history.save()
+
+        loaded = DurationHistory.load(path)
+
+        assert json.loads(path.read_text(encoding="utf-8")) == {"trivy.check": [12.5]}
+        assert loaded.estimate("trivy.check") == 12.5
+
+    def test_load_returns_empty_history_when_file_is_corrupt(self, tmp_path: Path) -> None:
+        """Test that an unreadable history file is ignored rather than failing the run."""
+        path = tmp_path / "durations.json"
+        path.write_text("not json", encoding="utf-8")
+
+        history = DurationHistory.load(path)
+
+        assert history.samples == {}
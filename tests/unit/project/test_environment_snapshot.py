@@ -0,0 +1,102 @@
+"""Unit tests for the environment_snapshot module."""
+
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from project.environment_snapshot import (
+    ARCHIVE_NAME,
+    archive_venv,
+    base_interpreter_home,
+    current_snapshot_directory,
+    extract_venv,
+    lock_digest,
+    main,
+    snapshot_key,
+    write_manifest,
+)
+
+
+@pytest.fixture
+def venv(tmp_path: Path) -> Path:
+    """Create a minimal venv layout whose scripts and .pth files embed absolute paths."""
+    project = tmp_path / "project"
+    venv_path = project / ".venv"
+    (venv_path / "bin").mkdir(parents=True)
+    (venv_path / "lib" / "site-packages").mkdir(parents=True)
+    (tmp_path / "python-home").mkdir()
+    (venv_path / "pyvenv.cfg").write_text(f"home = {tmp_path / 'python-home'}\n", encoding="utf-8")
+    (venv_path / "bin" / "tool").write_text(f"#!{venv_path}/bin/python\nimport tool\n", encoding="utf-8")
+    (venv_path / "bin" / "native").write_bytes(f"\0{venv_path}".encode())
+    (venv_path / "lib" / "site-packages" / "project.pth").write_text(f"{project}/src\n", encoding="utf-8")
+    return venv_path
+
+
+def _snapshot(venv: Path, snapshot: Path) -> Path:
+    """Archive a venv into a snapshot directory with its manifest."""
+    snapshot.mkdir(parents=True)
+    relocated = archive_venv(venv, snapshot / ARCHIVE_NAME, venv.parent)
+    write_manifest(snapshot, key=snapshot.name, home=base_interpreter_home(venv), relocated=relocated)
+    return snapshot
+
+
+class TestSnapshotKey:
+    """Test suite for the snapshot key helpers."""
+
+    def test_key_combines_lock_hash_python_and_platform(self, tmp_path: Path) -> None:
+        """Test that the key changes with the lock file and the interpreter."""
+        lock_file = tmp_path / "poetry.lock"
+        lock_file.write_text("locked", encoding="utf-8")
+
+        key = snapshot_key(lock_digest(lock_file), "3.13", "linux-x86_64")
+
+        assert key == f"{lock_digest(lock_file)[:16]}-py3.13-linux-x86_64"
+        assert snapshot_key(lock_digest(lock_file), "3.14", "linux-x86_64") != key
+        assert current_snapshot_directory(tmp_path / "env", lock_file).parent == tmp_path / "env"
+
+
+class TestArchive:
+    """Test suite for archiving and restoring venvs."""
+
+    def test_restored_venv_points_at_new_location(self, venv: Path, tmp_path: Path) -> None:
+        """Test that absolute paths in scripts and .pth files are rewritten for the new checkout."""
+        snapshot = _snapshot(venv, tmp_path / "snapshots" / "key")
+        other_project = tmp_path / "other"
+
+        restored = extract_venv(snapshot, other_project / ".venv", other_project)
+
+        assert (restored / "bin" / "tool").read_text(encoding="utf-8").startswith(f"#!{restored}/bin/python\n")
+        assert (restored / "lib" / "site-packages" / "project.pth").read_text(encoding="utf-8") == (
+            f"{other_project.resolve()}/src\n"
+        )
+        assert (restored / "bin" / "native").read_bytes() == (venv / "bin" / "native").read_bytes()
+
+    def test_restore_rejects_missing_base_interpreter(self, venv: Path, tmp_path: Path) -> None:
+        """Test that a venv whose base interpreter is missing is not restored."""
+        snapshot = _snapshot(venv, tmp_path / "snapshots" / "key")
+        (tmp_path / "python-home").rmdir()
+
+        with pytest.raises(FileNotFoundError, match="Base interpreter"):
+            extract_venv(snapshot, tmp_path / "other" / ".venv")
+
+    def test_restore_refuses_to_replace_running_venv(self, venv: Path, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that the venv of the running interpreter is never replaced."""
+        snapshot = _snapshot(venv, tmp_path / "snapshots" / "key")
+        mocker.patch("project.environment_snapshot.sys.prefix", str(venv))
+
+        with pytest.raises(ValueError, match="while running from it"):
+            extract_venv(snapshot, venv)
+
+
+class TestMain:
+    """Test suite for the invoke-free entry point."""
+
+    def test_main_fails_without_snapshot(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys) -> None:  # noqa: ANN001
+        """Test that callers can fall back to poetry install when no snapshot exists."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "poetry.lock").write_text("locked", encoding="utf-8")
+
+        assert main(["restore", "--root", str(tmp_path / "env")]) == 1
+        assert main(["install", "--root", str(tmp_path / "env")]) == 1
+        assert "run 'invoke env.snapshot' first" in capsys.readouterr().out
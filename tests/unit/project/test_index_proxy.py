@@ -0,0 +1,194 @@
+"""Unit tests for the index_proxy module."""
+
+import functools
+import hashlib
+import http.server
+import socket
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from project.index_proxy import (
+    IndexCache,
+    IndexProxyServer,
+    normalize_project,
+    proxy_environment,
+    record_proxy_url,
+    rewrite_links,
+    running_proxy_url,
+)
+
+WHEEL = b"not really a wheel"
+WHEEL_NAME = "demo_pkg-1.0-py3-none-any.whl"
+WHEEL_DIGEST = hashlib.sha256(WHEEL).hexdigest()
+
+
+@contextmanager
+def _serve(server: http.server.HTTPServer) -> Iterator[None]:
+    """Run a server on a background thread until the block exits, polling often so shutdown is quick."""
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _closed_port() -> int:
+    """Return a local port nothing listens on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _get(url: str) -> bytes:
+    """Fetch a URL."""
+    with urllib.request.urlopen(url, timeout=5) as response:  # noqa: S310
+        return response.read()
+
+
+@pytest.fixture
+def fixture_index(tmp_path: Path) -> Iterator[http.server.HTTPServer]:
+    """Serve a local simple index with one project whose page links its wheel relatively."""
+    root = tmp_path / "upstream"
+    (root / "simple" / "demo-pkg").mkdir(parents=True)
+    (root / "packages").mkdir()
+    (root / "packages" / WHEEL_NAME).write_bytes(WHEEL)
+    (root / "simple" / "index.html").write_text('<a href="demo-pkg/">demo-pkg</a>', encoding="utf-8")
+    (root / "simple" / "demo-pkg" / "index.html").write_text(
+        f'<a href="../../packages/{WHEEL_NAME}#sha256={WHEEL_DIGEST}">{WHEEL_NAME}</a>', encoding="utf-8"
+    )
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=str(root))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    with _serve(server):
+        yield server
+
+
+@pytest.fixture
+def proxy(tmp_path: Path, fixture_index: http.server.HTTPServer) -> Iterator[IndexProxyServer]:
+    """Serve a caching proxy of the fixture index."""
+    upstream = f"http://127.0.0.1:{fixture_index.server_address[1]}/simple/"
+    server = IndexProxyServer(("127.0.0.1", 0), IndexCache(tmp_path / "index", upstream))
+    with _serve(server):
+        yield server
+
+
+class TestLinks:
+    """Test suite for normalizing names and rewriting index pages."""
+
+    def test_normalize_project(self) -> None:
+        """Test that names are normalized as PEP 503 requires."""
+        assert normalize_project("Foo.Bar__baz-") == "foo-bar-baz-"
+
+    def test_rewrite_links(self) -> None:
+        """Test that file links on cached hosts point at the proxy and other links are kept."""
+        page = (
+            '<a href="https://files.pythonhosted.org/packages/ab/demo-1.0.tar.gz#sha256=00">a</a>'
+            '<a href="../../packages/demo-1.0.whl">b</a>'
+            '<a href="https://elsewhere.example/demo-1.0.whl">c</a>'
+        )
+
+        rewritten = rewrite_links(
+            page, "https://index.example/simple/demo/", {"files.pythonhosted.org", "index.example"}
+        )
+
+        assert rewritten == (
+            '<a href="/files/https/files.pythonhosted.org/packages/ab/demo-1.0.tar.gz#sha256=00">a</a>'
+            '<a href="/files/https/index.example/packages/demo-1.0.whl">b</a>'
+            '<a href="https://elsewhere.example/demo-1.0.whl">c</a>'
+        )
+
+    def test_upstream_must_be_http(self, tmp_path: Path) -> None:
+        """Test that only http(s) upstreams are accepted."""
+        with pytest.raises(ValueError, match="must use http or https"):
+            IndexCache(tmp_path, "file:///simple/")
+
+
+@pytest.mark.enable_socket
+class TestProxy:
+    """Test suite for serving a fixture index through the proxy."""
+
+    def test_serves_pages_and_files_from_disk_once_warmed(
+        self, tmp_path: Path, proxy: IndexProxyServer, fixture_index: http.server.HTTPServer
+    ) -> None:
+        """Test that a project page and its wheel keep being served after the upstream goes away."""
+        page = _get(f"{proxy.url}Demo_Pkg/").decode("utf-8")
+        link = page.split('href="')[1].split("#")[0]
+        assert link == f"/files/http/127.0.0.1:{fixture_index.server_address[1]}/packages/{WHEEL_NAME}"
+        assert f"#sha256={WHEEL_DIGEST}" in page
+        wheel_url = f"http://127.0.0.1:{proxy.server_port}{link}"
+        assert _get(wheel_url) == WHEEL
+
+        fixture_index.shutdown()
+        fixture_index.server_close()
+        proxy.cache.page_ttl = 0
+
+        assert _get(f"{proxy.url}demo-pkg/").decode("utf-8") == page
+        assert _get(wheel_url) == WHEEL
+        assert (tmp_path / "index" / "pages" / "demo-pkg.html").is_file()
+
+    def test_serves_the_root_page(self, proxy: IndexProxyServer) -> None:
+        """Test that the page listing every project is proxied."""
+        assert b"demo-pkg" in _get(proxy.url)
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "simple/missing/",
+            "files/http/elsewhere.example/packages/demo.whl",
+            "other",
+        ],
+    )
+    def test_unknown_or_unsafe_requests_are_not_found(self, proxy: IndexProxyServer, path: str) -> None:
+        """Test that missing projects, files on other hosts and other paths get a 404."""
+        with pytest.raises(urllib.error.HTTPError, match="404"):
+            _get(f"http://127.0.0.1:{proxy.server_port}/{path}")
+
+    def test_unreachable_upstream_is_a_bad_gateway(self, tmp_path: Path) -> None:
+        """Test that an uncached page whose upstream is down is reported as a 502."""
+        server = IndexProxyServer(("127.0.0.1", 0), IndexCache(tmp_path, f"http://127.0.0.1:{_closed_port()}/simple/"))
+
+        with (
+            _serve(server),
+            pytest.raises(urllib.error.HTTPError, match="502"),
+        ):
+            _get(f"{server.url}demo/")
+
+    def test_file_paths_cannot_leave_the_cache(self, tmp_path: Path) -> None:
+        """Test that file paths with empty or relative segments are refused."""
+        cache = IndexCache(tmp_path, "https://pypi.org/simple/")
+
+        assert cache.file("https", "files.pythonhosted.org", "packages/../../secret") is None
+        assert cache.file("https", "files.pythonhosted.org", "packages//demo.whl") is None
+        assert cache.file("file", "files.pythonhosted.org", "packages/demo.whl") is None
+
+    def test_offline_serves_only_the_cache(self, tmp_path: Path) -> None:
+        """Test that an offline proxy answers 404 for anything it has not cached."""
+        cache = IndexCache(tmp_path, "https://pypi.org/simple/", offline=True)
+
+        assert cache.page("demo") is None
+        assert cache.file("https", "files.pythonhosted.org", "packages/demo.whl") is None
+
+
+@pytest.mark.enable_socket
+class TestProxyEnvironment:
+    """Test suite for pointing tasks at a running proxy."""
+
+    def test_points_pip_at_a_running_proxy(self, tmp_path: Path, proxy: IndexProxyServer) -> None:
+        """Test that the recorded URL of a live proxy becomes PIP_INDEX_URL."""
+        record_proxy_url(proxy.url, tmp_path)
+
+        assert proxy_environment(tmp_path) == {"PIP_INDEX_URL": proxy.url}
+
+    def test_ignores_a_missing_or_stopped_proxy(self, tmp_path: Path) -> None:
+        """Test that no settings are returned without a live proxy."""
+        assert proxy_environment(tmp_path) == {}
+        record_proxy_url(f"http://127.0.0.1:{_closed_port()}/simple/", tmp_path)
+
+        assert running_proxy_url(tmp_path) is None
@@ -0,0 +1,96 @@
+"""Unit tests for the mypy_cache module."""
+
+import os
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockerFixture
+
+from project.mypy_cache import SharedMypyCache, cache_key, config_digest
+
+
+@pytest.fixture
+def checkout(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Run in an empty checkout."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _publish(store: Path, key: str, size: int, last_used: float, max_bytes: int = 10_000) -> list[str]:
+    """Publish a working copy holding one file of the given size, then age the entry."""
+    cache = SharedMypyCache(store, key, max_bytes=max_bytes)
+    cache.local.mkdir(parents=True)
+    (cache.local / "module.data.json").write_bytes(b"x" * size)
+    evicted = cache.publish()
+    os.utime(store / key / ".last-used", (last_used, last_used))
+    return evicted
+
+
+class TestCacheKey:
+    """Test suite for the cache key helpers."""
+
+    def test_key_changes_with_mypy_config(self, tmp_path: Path) -> None:
+        """Test that a config change selects a different entry."""
+        pyproject = tmp_path / "pyproject.toml"
+        pyproject.write_text("[tool.mypy]\nstrict = true\n[tool.ruff]\nline-length = 120\n", encoding="utf-8")
+        strict = config_digest(pyproject)
+        pyproject.write_text("[tool.mypy]\nstrict = true\n[tool.ruff]\nline-length = 100\n", encoding="utf-8")
+        assert config_digest(pyproject) == strict
+
+        pyproject.write_text("[tool.mypy]\nstrict = false\n", encoding="utf-8")
+        assert config_digest(pyproject) != strict
+        assert cache_key("3.13", "1.18.2", strict) == f"py3.13-mypy1.18.2-{strict[:16]}"
+
+
+@pytest.mark.usefixtures("checkout")
+class TestSharedMypyCache:
+    """Test suite for the SharedMypyCache class."""
+
+    def test_restore_only_seeds_cold_working_copies(self, tmp_path: Path) -> None:
+        """Test that a published entry seeds a missing working copy but never overwrites one."""
+        _publish(tmp_path / "store", "key", size=10, last_used=1.0)
+        (Path(".quality/mypy/keyed/key/module.data.json")).unlink()
+        cache = SharedMypyCache(tmp_path / "store", "key")
+
+        assert not cache.restore()
+        Path(".quality/mypy/keyed/key").rmdir()
+        assert cache.restore()
+        assert (cache.local / "module.data.json").read_bytes() == b"x" * 10
+        assert not (cache.local / ".last-used").exists()
+
+    def test_publish_evicts_least_recently_used_entries(self, tmp_path: Path) -> None:
+        """Test that the oldest entries are evicted once the store exceeds its size limit."""
+        store = tmp_path / "store"
+        _publish(store, "oldest", size=400, last_used=1.0)
+        _publish(store, "recent", size=400, last_used=3.0)
+
+        evicted = _publish(store, "newest", size=400, last_used=2.0, max_bytes=1000)
+
+        assert evicted == ["oldest"]
+        assert sorted(path.name for path in store.iterdir() if not path.name.startswith(".")) == ["newest", "recent"]
+
+    def test_publish_sweeps_stale_staging_directories(self, tmp_path: Path) -> None:
+        """Test that staging left by interrupted publishers is removed, but not staging still being copied."""
+        store = tmp_path / "store"
+        stale = store / ".other-abc123"
+        fresh = store / ".other-def456"
+        for staging in (stale, fresh):
+            (staging / "partial").mkdir(parents=True)
+        os.utime(stale, (1.0, 1.0))
+
+        _publish(store, "key", size=10, last_used=1.0)
+
+        assert not stale.exists()
+        assert fresh.is_dir()
+
+    def test_failed_publish_removes_its_staging(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that a publish failing mid-copy does not leave its staging directory behind."""
+        store = tmp_path / "store"
+        cache = SharedMypyCache(store, "key")
+        cache.local.mkdir(parents=True)
+        mocker.patch("project.mypy_cache.shutil.copytree", side_effect=OSError("disk full"))
+
+        with pytest.raises(OSError, match="disk full"):
+            cache.publish()
+
+        assert [path.name for path in store.iterdir()] == []
@@ -0,0 +1,101 @@
+"""Unit tests for the mypy_shards module."""
+
+from pathlib import Path
+
+import pytest
+
+from project.mypy_shards import bound_shards, merge_reports, plan_shards, top_level_package
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create packages where alpha and beta import each other and tests imports alpha."""
+    monkeypatch.chdir(tmp_path)
+    sources = {
+        "src/alpha/__init__.py": "from beta import thing\n",
+        "beta/thing.py": "import alpha.core\n",
+        "tests/test_alpha.py": "import os\nfrom alpha import core\nfrom . import helpers\n",
+        "tasks.py": "import invoke\n",
+    }
+    for path, source in sources.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source, encoding="utf-8")
+    return tmp_path
+
+
+class TestPlanShards:
+    """Test suite for the plan_shards function."""
+
+    def test_top_level_package_strips_source_root(self) -> None:
+        """Test that src-layout packages and root modules are named like their imports."""
+        assert top_level_package("src/lessons_learnt/main.py") == "lessons_learnt"
+        assert top_level_package("project/tasks/mypy.py") == "project"
+        assert top_level_package("tasks.py") == "tasks"
+
+    @pytest.mark.usefixtures("workspace")
+    def test_cyclic_packages_share_a_shard(self) -> None:
+        """Test that packages importing each other are checked together and the rest separately."""
+        shards = plan_shards(["beta/thing.py", "src/alpha/__init__.py", "tasks.py", "tests/test_alpha.py"])
+
+        assert shards == [["src/alpha/__init__.py", "beta/thing.py"], ["tasks.py"], ["tests/test_alpha.py"]]
+
+
+class TestMergeReports:
+    """Test suite for the merge_reports function."""
+
+    def test_diagnostics_of_shared_modules_are_reported_once(self) -> None:
+        """Test that duplicate diagnostics are dropped and the summary counts the merged errors."""
+        shared_error = "alpha/core.py:3: error: Incompatible types in assignment  [assignment]"
+        outputs = [
+            f"{shared_error}\nFound 1 error in 1 file (checked 2 source files)\n",
+            (
+                f"{shared_error}\ntests/test_alpha.py:9:5: error: Missing return  [return]\n"
+                "tests/test_alpha.py:9:5: note: See docs\nFound 2 errors in 2 files (checked 1 source file)\n"
+            ),
+        ]
+
+        report = merge_reports(outputs, [1, 1], checked_files=3)
+
+        assert report.lines == [
+            shared_error,
+            "tests/test_alpha.py:9:5: error: Missing return  [return]",
+            "tests/test_alpha.py:9:5: note: See docs",
+        ]
+        assert report.summary == "Found 2 errors in 2 files (checked 3 source files)"
+        assert report.exit_code == 1
+
+    def test_crash_exit_status_wins(self) -> None:
+        """Test that a crashed shard fails the merged run with mypy's crash status and keeps its traceback."""
+        report = merge_reports(
+            ["Success: no issues found in 2 source files\n", "", ""],
+            [0, 2, 1],
+            checked_files=4,
+            errors=["", "Traceback (most recent call last):\n  ...\nRuntimeError: boom\n", "ignored\n"],
+        )
+
+        assert report.lines == [
+            "mypy shard 1 exited with status 2:",
+            "Traceback (most recent call last):",
+            "  ...",
+            "RuntimeError: boom",
+        ]
+        assert report.summary == "mypy failed in 1 shard (checked 4 source files)"
+        assert report.exit_code == 2
+
+    def test_crash_is_reported_next_to_type_errors(self) -> None:
+        """Test that the summary counts the errors and still says a shard failed."""
+        report = merge_reports(["a.py:1: error: Oops  [misc]\n", ""], [1, 2], checked_files=2, errors=["", "boom\n"])
+
+        assert report.summary == "Found 1 error in 1 file (checked 2 source files); mypy failed in 1 shard"
+
+
+class TestBoundShards:
+    """Test suite for the bound_shards function."""
+
+    def test_packs_shards_into_balanced_groups(self) -> None:
+        """Test that shards are combined into at most the limit, largest first into the smallest group."""
+        shards = [["a1", "a2", "a3"], ["b1"], ["c1", "c2"], ["d1"]]
+
+        assert bound_shards(shards, 2) == [["a1", "a2", "a3", "d1"], ["b1", "c1", "c2"]]
+        assert bound_shards(shards, 4) == shards
+        assert bound_shards(shards, 1) == [["a1", "a2", "a3", "b1", "c1", "c2", "d1"]]
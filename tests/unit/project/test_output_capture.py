@@ -0,0 +1,64 @@
+"""Unit tests for the output_capture module."""
+
+import sys
+from pathlib import Path
+
+import pytest
+from invoke.config import Config
+from invoke.context import Context
+
+from project.output_capture import BoundedCaptureRunner, capture_log_path
+from project.trace_timeline import TraceRecorder, recording
+
+PRINT_LINES = f"{sys.executable} -c \"[print(f'line {{n}}') for n in range(2000)]\""
+
+
+@pytest.fixture
+def context(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Context:
+    """Create a context whose runner keeps a 100 character tail and logs to a temporary directory."""
+    monkeypatch.setattr(BoundedCaptureRunner, "tail_characters", 100)
+    monkeypatch.setattr(BoundedCaptureRunner, "log_directory", tmp_path)
+    return Context(config=Config(overrides={"runners": {"local": BoundedCaptureRunner}}))
+
+
+class TestBoundedCaptureRunner:
+    """Test suite for the BoundedCaptureRunner class."""
+
+    def test_shown_output_keeps_tail_and_logs_everything(self, context: Context, tmp_path: Path, capsys) -> None:  # noqa: ANN001
+        """Test that shown output is echoed and logged in full while only its tail stays in memory."""
+        result = context.run(PRINT_LINES, in_stream=False)
+
+        assert result.stdout.endswith("line 1999\n")
+        assert len(result.stdout) < 200
+        assert result.stdout_log == capture_log_path(PRINT_LINES, "stdout", tmp_path)
+        logged = result.stdout_log.read_text(encoding="utf-8")
+        assert logged.startswith("line 0\n")
+        assert logged.count("\n") == 2000
+        assert "line 0\n" in capsys.readouterr().out
+
+    def test_hidden_output_is_captured_in_full(self, context: Context) -> None:
+        """Test that hidden output, which callers parse, is neither truncated nor logged."""
+        result = context.run(PRINT_LINES, hide=True, in_stream=False)
+
+        assert result.stdout.count("\n") == 2000
+        assert result.stdout_log is None
+
+    def test_commands_are_traced_while_recording(self, context: Context) -> None:
+        """Test that each command adds a span with its exit code to the active trace."""
+        recorder = TraceRecorder()
+
+        with recording(recorder):
+            context.run("exit 3", hide=True, warn=True, in_stream=False)
+
+        assert [(event["name"], event["args"]) for event in recorder.events if event["ph"] == "X"] == [
+            ("exit 3", {"exited": 3})
+        ]
+
+    def test_log_path_is_stable_per_command(self, tmp_path: Path) -> None:
+        """Test that log names are readable and distinguish commands with the same prefix."""
+        path = capture_log_path("pytest tests/unit", "stderr", tmp_path)
+
+        assert path == capture_log_path("pytest tests/unit", "stderr", tmp_path)
+        assert path.name.startswith("pytest-tests-unit-")
+        assert path.name.endswith(".stderr.log")
+        assert path != capture_log_path("pytest tests/unit -x", "stderr", tmp_path)
@@ -0,0 +1,102 @@
+"""Unit tests for the perf_bisect module."""
+
+import json
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from project.perf_bisect import BisectReport, Measurement, first_slow_commit, slowdown, time_runs
+
+
+def _measurement(commit: str, *samples: float) -> Measurement:
+    """Build a measurement whose subject names the commit."""
+    return Measurement(commit=commit, subject=f"Change {commit}", samples=list(samples))
+
+
+class TestMeasurements:
+    """Test suite for timing and comparing measurements."""
+
+    def test_time_runs_discards_warmup_runs(self, mocker: MockerFixture) -> None:
+        """Test that warm-up runs are executed but not timed."""
+        mocker.patch("project.perf_bisect.time.perf_counter", side_effect=[0.0, 1.0, 1.0, 3.0])
+        runs: list[None] = []
+
+        samples = time_runs(lambda: runs.append(None), repeat=2, warmup=1)
+
+        assert len(runs) == 3
+        assert samples == [1.0, 2.0]
+
+    def test_median_spread_and_slowdown(self) -> None:
+        """Test that measurements are compared by their medians."""
+        good = _measurement("good", 1.0, 2.0, 1.0)
+        bad = _measurement("bad", 1.5, 1.5, 9.0)
+
+        assert good.median == 1.0
+        assert good.spread == 100.0
+        assert slowdown(good, bad) == 50.0
+        assert slowdown(bad, good) < 0
+        assert slowdown(_measurement("zero", 0.0), bad) == 0.0
+
+
+class TestFirstSlowCommit:
+    """Test suite for the binary search."""
+
+    def test_finds_first_slow_commit_in_logarithmic_steps(self) -> None:
+        """Test that the first slow commit is found without measuring every commit."""
+        commits = [f"c{index}" for index in range(17)]
+        measured = []
+
+        def is_slow(commit: str) -> bool:
+            measured.append(commit)
+            return int(commit[1:]) >= 11
+
+        assert first_slow_commit(commits, is_slow) == 11
+        assert len(measured) == 4
+
+    def test_adjacent_commits(self) -> None:
+        """Test that the bad commit is the culprit when it directly follows the good one."""
+        assert first_slow_commit(["good", "bad"], lambda _: True) == 1
+
+
+class TestBisectReport:
+    """Test suite for formatting and writing the report."""
+
+    def test_lines_name_the_culprit(self) -> None:
+        """Test that the verdict compares the culprit with the good commit and its parent."""
+        report = BisectReport(
+            target="tests.unit",
+            threshold=10.0,
+            measurements=[_measurement("a" * 40, 1.0), _measurement("b" * 40, 1.0), _measurement("c" * 40, 2.0)],
+            culprit="c" * 40,
+        )
+
+        lines = report.lines()
+
+        assert len(lines) == 5
+        assert lines[3].split()[:3] == ["cccccccccc", "2.00", "0.0%"]
+        assert lines[4] == (
+            "First slow commit for tests.unit: cccccccccc Change "
+            + "c" * 40
+            + " (+100.0% vs good, +100.0% vs bbbbbbbbbb)"
+        )
+
+    def test_lines_without_culprit(self) -> None:
+        """Test that the report says so when the bad commit is not slow."""
+        report = BisectReport(
+            target="tests/unit -k cache",
+            threshold=5.0,
+            measurements=[_measurement("a", 1.0), _measurement("b", 1.02)],
+            culprit=None,
+        )
+
+        assert report.lines()[-1] == "No slowdown above 5.0% between the good and bad commits for tests/unit -k cache"
+
+    def test_write(self, tmp_path: Path) -> None:
+        """Test that the report is written as JSON."""
+        report = BisectReport(target="mypy.check", threshold=10.0, measurements=[_measurement("a", 1.0)], culprit=None)
+
+        path = report.write(tmp_path / "bisect" / "report.json")
+
+        written = json.loads(path.read_text(encoding="utf-8"))
+        assert written["target"] == "mypy.check"
+        assert written["measurements"][0]["samples"] == [1.0]
@@ -0,0 +1,110 @@
+"""Unit tests for the precommit_hooks module."""
+
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+from invoke.context import Context
+
+from project.precommit_hooks import PRE_COMMIT_CONFIG, Hook, HookResult, load_hooks, run_hooks, summary_lines
+
+REPOSITORY_ROOT = Path(__file__).parents[3]
+
+CONFIG = """
+repos:
+-   repo: https://github.com/pre-commit/pre-commit-hooks
+    rev: v6.0.0
+    hooks:
+    -   id: check-ast
+    -   id: end-of-file-fixer
+    -   id: pretty-format-json
+        args: ['--autofix']
+-   repo: https://github.com/gitleaks/gitleaks
+    rev: v8.30.0
+    hooks:
+      - id: gitleaks
+-   repo: local
+    hooks:
+      - id: check-ast
+        args: ['--fix']
+"""
+
+
+class TestLoadHooks:
+    """Test suite for reading the configured hooks."""
+
+    def test_reads_hooks_in_order_once_per_id(self, tmp_path: Path) -> None:
+        """Test that repeated ids are listed once and keep any autofix configuration."""
+        config = tmp_path / ".pre-commit-config.yaml"
+        config.write_text(CONFIG, encoding="utf-8")
+
+        hooks = load_hooks(config)
+
+        assert [hook.hook_id for hook in hooks] == ["check-ast", "end-of-file-fixer", "pretty-format-json", "gitleaks"]
+        assert [hook.modifies_files for hook in hooks] == [True, True, True, False]
+
+    def test_empty_config_has_no_hooks(self, tmp_path: Path) -> None:
+        """Test that an empty configuration file yields no hooks."""
+        config = tmp_path / ".pre-commit-config.yaml"
+        config.write_text("", encoding="utf-8")
+
+        assert load_hooks(config) == []
+
+    def test_repository_config_is_scheduled(self) -> None:
+        """Test that the repository's fixers are recognised and its checkers are not."""
+        hooks = {hook.hook_id: hook for hook in load_hooks(REPOSITORY_ROOT / PRE_COMMIT_CONFIG)}
+
+        modifying = {hook_id for hook_id, hook in hooks.items() if hook.modifies_files}
+        assert modifying == {"end-of-file-fixer", "pretty-format-json", "md-toc"}
+        assert "gitleaks" in hooks
+
+
+class TestRunHooks:
+    """Test suite for scheduling the hooks."""
+
+    def test_fixers_run_serially_before_concurrent_checkers(self) -> None:
+        """Test that file-modifying hooks run first and read-only hooks overlap."""
+        started = threading.Barrier(2, timeout=5)
+        order = []
+
+        def run(command: str, **_: object) -> Mock:
+            hook_id = command.split()[4]
+            order.append(hook_id)
+            if hook_id in {"check-ast", "gitleaks"}:
+                started.wait()  # only returns once both checkers are running at the same time
+            return Mock(ok=hook_id != "gitleaks", stdout=f"{hook_id} output\n", stderr="")
+
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = run
+        hooks = [Hook("check-ast"), Hook("end-of-file-fixer"), Hook("gitleaks"), Hook("md-toc")]
+
+        results = run_hooks(mock_context, hooks, jobs=2)
+
+        assert order[:2] == ["end-of-file-fixer", "md-toc"]
+        assert [(result.hook_id, result.ok) for result in results] == [
+            ("end-of-file-fixer", True),
+            ("md-toc", True),
+            ("check-ast", True),
+            ("gitleaks", False),
+        ]
+        assert results[3].output == "gitleaks output\n"
+        mock_context.run.assert_any_call(
+            "poetry run pre-commit run md-toc --all-files", hide=True, warn=True, in_stream=False
+        )
+
+
+class TestSummary:
+    """Test suite for summarising the hooks."""
+
+    def test_summary_lines(self) -> None:
+        """Test that each hook is listed with its result and timing, then the totals."""
+        results = [
+            HookResult(hook_id="end-of-file-fixer", ok=True, seconds=0.5, output=""),
+            HookResult(hook_id="gitleaks", ok=False, seconds=1.25, output="leak"),
+        ]
+
+        assert summary_lines(results, wall_seconds=1.5) == [
+            "✓ end-of-file-fixer    0.50s",
+            "✗ gitleaks             1.25s  failed",
+            "1 of 2 hook(s) passed in 1.50s (1.75s of hook time)",
+        ]
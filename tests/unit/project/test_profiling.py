@@ -0,0 +1,128 @@
+"""Unit tests for the profiling module."""
+
+import cProfile
+import pstats
+import subprocess
+import sys
+from pathlib import Path
+
+from pytest_mock import MockerFixture
+
+from project.profiling import collapse_stacks, hottest_frames, tool_command, write_collapsed_stacks
+
+
+def _inner() -> int:
+    """Burn a little CPU so it shows up in the profile."""
+    return sum(index * index for index in range(20_000))
+
+
+def _outer() -> int:
+    """Call the inner function so the profile has a nested stack."""
+    return _inner() + _inner()
+
+
+TOOL_MODULE = """
+def inner():
+    return sum(index * index for index in range(200_000))
+
+
+def outer():
+    return inner() + inner()
+
+
+if __name__ == "__main__":
+    outer()
+"""
+
+
+def _write_profile(path: Path) -> Path:
+    """Profile _outer and write the stats to a file."""
+    profiler = cProfile.Profile()
+    profiler.runcall(_outer)
+    profiler.dump_stats(str(path))
+    return path
+
+
+class TestToolCommand:
+    """Test suite for the tool_command function."""
+
+    def test_tool_command_runs_console_script_without_profile(self) -> None:
+        """Test that the plain command is unchanged when not profiling."""
+        assert tool_command("mypy", ".") == "poetry run mypy ."
+
+    def test_tool_command_runs_module_under_cprofile_with_profile(self, mocker: MockerFixture) -> None:
+        """Test that profiling runs the tool's module under cProfile and creates the profiles directory."""
+        mock_ensure_directory = mocker.patch("project.profiling.ensure_directory")
+
+        command = tool_command("pip-audit", "-r req.txt", module="pip_audit", profile_name="pipaudit.check")
+
+        assert command == (
+            "poetry run python -m cProfile -o .quality/profiles/pipaudit.check.pstats -m pip_audit -r req.txt"
+        )
+        mock_ensure_directory.assert_called_once()
+
+
+class TestProfileAnalysis:
+    """Test suite for the profile analysis functions."""
+
+    def test_collapse_stacks_nests_callees_under_callers(self, tmp_path: Path) -> None:
+        """Test that collapsed stacks place the inner function beneath the outer one."""
+        stats = pstats.Stats(str(_write_profile(tmp_path / "task.pstats")))
+
+        stacks = collapse_stacks(stats)
+
+        assert any("_outer (test_profiling.py" in stack and "_inner (test_profiling.py" in stack for stack in stacks)
+        assert all(micros > 0 for micros in stacks.values())
+
+    def test_collapse_stacks_roots_a_module_run_at_its_module_frame(self, tmp_path: Path) -> None:
+        """Test that a tool profiled with 'python -m cProfile -m' keeps its own frames despite the runpy cycle."""
+        (tmp_path / "burn_tool.py").write_text(TOOL_MODULE, encoding="utf-8")
+        pstats_file = tmp_path / "tool.pstats"
+        subprocess.run(  # noqa: S603
+            [sys.executable, "-m", "cProfile", "-o", str(pstats_file), "-m", "burn_tool"], cwd=tmp_path, check=True
+        )
+
+        stacks = collapse_stacks(pstats.Stats(str(pstats_file)))
+
+        tool_stacks = [stack for stack in stacks if "outer (burn_tool.py" in stack and "inner (burn_tool.py" in stack]
+        assert tool_stacks
+        assert all(stack.startswith("<module>") for stack in tool_stacks)
+        assert sum(stacks[stack] for stack in tool_stacks) > sum(stacks.values()) / 2
+
+    def test_collapse_stacks_bounds_the_walk_of_many_paths(self, mocker: MockerFixture) -> None:
+        """Test that a graph with exponentially many caller paths is collapsed quickly and keeps its time."""
+        layers = 40
+        raw: dict[tuple[str, int, str], tuple] = {("layer.py", 0, "root"): (1, 1, 0.0, 1.0, {})}
+        for layer in range(1, layers + 1):
+            callers = (
+                {("layer.py", 0, "root"): (1, 1, 0.0, 0.5)}
+                if layer == 1
+                else {("layer.py", layer - 1, name): (1, 1, 0.0, 0.25) for name in ("left", "right")}
+            )
+            self_time = 0.5 if layer == layers else 0.0
+            for name in ("left", "right"):
+                raw[("layer.py", layer, name)] = (2, 2, self_time, 0.5, callers)
+        stats = mocker.Mock(spec=pstats.Stats)
+        stats.stats = raw
+
+        stacks = collapse_stacks(stats)
+
+        assert len(stacks) < 100_000
+        assert abs(sum(stacks.values()) - 1_000_000) < 1_000
+
+    def test_write_collapsed_stacks_writes_file_next_to_pstats(self, tmp_path: Path) -> None:
+        """Test that a .collapsed file in 'stack count' format is written next to the pstats file."""
+        collapsed_file = write_collapsed_stacks(_write_profile(tmp_path / "task.pstats"))
+
+        assert collapsed_file == tmp_path / "task.collapsed"
+        for line in collapsed_file.read_text(encoding="utf-8").splitlines():
+            stack, _, count = line.rpartition(" ")
+            assert stack
+            assert int(count) > 0
+
+    def test_hottest_frames_orders_by_self_time(self, tmp_path: Path) -> None:
+        """Test that the hottest frames are sorted by self time and limited."""
+        frames = hottest_frames(_write_profile(tmp_path / "task.pstats"), limit=2)
+
+        assert len(frames) == 2
+        assert frames[0][1] >= frames[1][1]
@@ -1,14 +1,23 @@
 """Unit tests for the project module."""
 
+from pathlib import Path
 from unittest.mock import ANY
 
 import pytest
 from invoke.context import Context
+from invoke.exceptions import Exit
 from pytest_mock import MockerFixture
 
-from project.project import check, update
+from project.duration_history import DurationHistory
+from project.project import check, check_refs, update
 from project.project_task_runner import ProjectTask, ProjectTaskRunner
+from project.remote_workers import WORKER_TASKS, WORKER_TOKEN_VARIABLE
+from project.result_cache import environment_fingerprint
 from project.tasks import deptry, mypy, pipaudit, poetry, precommit, ruff, testing, trivy, vulture, xenon
+from project.tasks import profile as profile_tasks
+from project.tool_probes import ToolProbe
+from project.trace_timeline import TraceRecorder
+from project.worktree_pool import RefCheck
 
 
 class TestUpdate:
@@ -59,6 +68,16 @@ class TestCheck:
         self.mock_context = mocker.Mock(spec_set=Context)
         self.mock_runner = mocker.Mock(spec_set=ProjectTaskRunner)
         self.mock_runner_class = mocker.patch("project.project.ProjectTaskRunner", return_value=self.mock_runner)
+        self.mock_history = mocker.Mock(spec_set=DurationHistory)
+        mocker.patch("project.project.DurationHistory.load", return_value=self.mock_history)
+        self.mock_backend_class = mocker.patch("project.project.RemoteWorkerBackend")
+        mocker.patch.dict("os.environ", {WORKER_TOKEN_VARIABLE: "secret"})
+        self.mock_snapshot = mocker.patch("project.project.create_snapshot_ref", return_value="abc123")
+        self.mock_digest = mocker.patch("project.project.compute_input_digest", return_value="digest")
+        self.mock_cache_class = mocker.patch("project.project.ResultCache")
+        self.mock_create_store = mocker.patch("project.project.create_store")
+        self.probes = {"ruff": ToolProbe(name="ruff", available=True, version="0.9.0")}
+        mocker.patch("project.project.probe_environment", return_value=self.probes)
 
     def test_check_creates_runner_with_all_check_tasks(self) -> None:
         """Test that check creates a ProjectTaskRunner with all check tasks."""
@@ -67,23 +86,96 @@ class TestCheck:
         self.mock_runner_class.assert_called_once_with(
             self.mock_context,
             [
-                ProjectTask(name="precommit.check", func=precommit.check, kwargs={"apply_safe_fixes": False}),
-                ProjectTask(name="ruff.format", func=ruff.format, kwargs={"apply_safe_fixes": False}),
+                ProjectTask(
+                    name="precommit.check",
+                    func=precommit.check,
+                    kwargs={"apply_safe_fixes": False},
+                    cacheable=True,
+                    priority=3,
+                    requires=("poetry", "pre-commit"),
+                ),
+                ProjectTask(
+                    name="ruff.format",
+                    func=ruff.format,
+                    kwargs={"apply_safe_fixes": False},
+                    cacheable=True,
+                    priority=5,
+                    requires=("poetry", "ruff"),
+                ),
                 ProjectTask(
                     name="ruff.lint",
                     func=ruff.lint,
                     kwargs={"apply_safe_fixes": False, "apply_unsafe_fixes": False},
+                    cacheable=True,
+                    priority=5,
+                    requires=("poetry", "ruff"),
+                ),
+                ProjectTask(
+                    name="mypy.check",
+                    func=mypy.check,
+                    kwargs={"profile": False},
+                    cacheable=True,
+                    priority=4,
+                    requires=("poetry", "mypy"),
+                ),
+                ProjectTask(
+                    name="vulture.check",
+                    func=vulture.check,
+                    kwargs={"profile": False},
+                    cacheable=True,
+                    priority=2,
+                    requires=("poetry", "vulture"),
+                ),
+                ProjectTask(
+                    name="xenon.check",
+                    func=xenon.check,
+                    kwargs={},
+                    cacheable=True,
+                    priority=2,
+                    requires=("poetry", "xenon"),
+                ),
+                ProjectTask(
+                    name="tests.unit",
+                    func=testing.unit,
+                    kwargs={"profile": False},
+                    cacheable=True,
+                    priority=4,
+                    requires=("poetry", "pytest", "coverage"),
+                ),
+                ProjectTask(
+                    name="tests.integration",
+                    func=testing.integration,
+                    kwargs={"profile": False},
+                    cacheable=True,
+                    priority=3,
+                    requires=("poetry", "pytest", "coverage"),
                 ),
-                ProjectTask(name="mypy.check", func=mypy.check, kwargs={}),
-                ProjectTask(name="vulture.check", func=vulture.check, kwargs={}),
-                ProjectTask(name="xenon.check", func=xenon.check, kwargs={}),
-                ProjectTask(name="tests.unit", func=testing.unit, kwargs={}),
-                ProjectTask(name="tests.integration", func=testing.integration, kwargs={}),
-                ProjectTask(name="pipaudit.check", func=pipaudit.check, kwargs={}),
-                ProjectTask(name="deptry.check", func=deptry.check, kwargs={}),
-                ProjectTask(name="trivy.check", func=trivy.check, kwargs={}),
+                ProjectTask(
+                    name="pipaudit.check",
+                    func=pipaudit.check,
+                    kwargs={"profile": False},
+                    priority=1,
+                    requires=("poetry", "pip-audit"),
+                ),
+                ProjectTask(
+                    name="deptry.check",
+                    func=deptry.check,
+                    kwargs={"profile": False},
+                    cacheable=True,
+                    priority=2,
+                    requires=("poetry", "deptry"),
+                ),
+                ProjectTask(name="trivy.check", func=trivy.check, kwargs={}, priority=1, requires=("docker",)),
             ],
             None,
+            backend=None,
+            history=self.mock_history,
+            cache=self.mock_cache_class.return_value,
+            jobs=1,
+            budget=None,
+            trace=None,
+            probes=self.probes,
+            allow_missing_tools=False,
         )
         self.mock_runner.run.assert_called_once()
 
@@ -114,4 +206,235 @@ class TestCheck:
         skip_list = ["mypy.check", "testing.unit"]
         check(self.mock_context, skip=skip_list)
 
-        self.mock_runner_class.assert_called_once_with(ANY, ANY, skip_list)
+        self.mock_runner_class.assert_called_once_with(
+            ANY,
+            ANY,
+            skip_list,
+            backend=None,
+            history=ANY,
+            cache=ANY,
+            jobs=1,
+            budget=None,
+            trace=None,
+            probes=self.probes,
+            allow_missing_tools=False,
+        )
+
+    def test_check_uses_remote_backend_when_workers_given(self) -> None:
+        """Test that check distributes tasks to remote workers when worker addresses are given."""
+        check(self.mock_context, workers=["127.0.0.1:9000"], ref="main")
+
+        self.mock_backend_class.assert_called_once_with(
+            ["127.0.0.1:9000"],
+            self.mock_history,
+            ref="main",
+            token="secret",  # noqa: S106
+        )
+        self.mock_runner_class.assert_called_once_with(
+            ANY,
+            ANY,
+            None,
+            backend=self.mock_backend_class.return_value,
+            history=self.mock_history,
+            cache=None,
+            jobs=1,
+            budget=None,
+            trace=None,
+            probes=None,
+            allow_missing_tools=False,
+        )
+        self.mock_snapshot.assert_not_called()
+        self.mock_cache_class.assert_not_called()
+
+    def test_check_ships_workspace_snapshot_when_snapshot_flag_is_true(self) -> None:
+        """Test that check sends a snapshot of the working tree to the workers."""
+        check(self.mock_context, workers=["127.0.0.1:9000"], snapshot=True)
+
+        self.mock_snapshot.assert_called_once_with(self.mock_context)
+        self.mock_backend_class.assert_called_once_with(
+            ["127.0.0.1:9000"],
+            self.mock_history,
+            ref="abc123",
+            token="secret",  # noqa: S106
+        )
+        self.mock_cache_class.assert_not_called()
+
+    def test_check_tasks_are_all_accepted_by_workers(self) -> None:
+        """Test that workers accept every check task with the arguments the coordinator ships."""
+        check(self.mock_context, profile=True)
+
+        for project_task in self.mock_runner_class.call_args[0][1]:
+            assert set(project_task.kwargs) <= WORKER_TASKS[project_task.name]
+
+    def test_check_uses_local_result_cache_by_default(self) -> None:
+        """Test that check creates a result cache keyed by the workspace input digest."""
+        check(self.mock_context)
+
+        self.mock_digest.assert_called_once_with(self.mock_context)
+        self.mock_cache_class.assert_called_once_with(
+            "digest", remote=None, read_only=False, tool_versions={**environment_fingerprint(), "ruff": "0.9.0"}
+        )
+
+    def test_check_passes_remote_cache_tier_and_read_only_flag(self, mocker: MockerFixture) -> None:
+        """Test that check adds the shared cache tier in read-only mode when requested."""
+        mocker.patch.dict("os.environ", {"PROJECT_CACHE_TOKEN": "secret"})
+
+        check(self.mock_context, cache_remote="http://cache:8766", cache_read_only=True)
+
+        self.mock_create_store.assert_called_once_with("http://cache:8766", token="secret")  # noqa: S106
+        self.mock_cache_class.assert_called_once_with(
+            "digest", remote=self.mock_create_store.return_value, read_only=True, tool_versions=ANY
+        )
+
+    def test_check_disables_result_cache_when_applying_fixes(self) -> None:
+        """Test that fix runs never reuse or store cached results."""
+        check(self.mock_context, apply_safe_fixes=True)
+
+        self.mock_cache_class.assert_not_called()
+        assert self.mock_runner_class.call_args.kwargs["cache"] is None
+
+    def test_check_disables_result_cache_when_no_cache_flag_given(self) -> None:
+        """Test that --no-cache disables the result cache."""
+        check(self.mock_context, cache=False)
+
+        self.mock_cache_class.assert_not_called()
+
+    def test_check_profiles_python_tools_and_appends_report(self) -> None:
+        """Test that --profile is passed to Python-based tools, adds the report and disables the cache."""
+        check(self.mock_context, profile=True)
+
+        tasks_list = self.mock_runner_class.call_args[0][1]
+        profiled = {task.name for task in tasks_list if task.kwargs.get("profile")}
+
+        assert profiled == {
+            "mypy.check",
+            "vulture.check",
+            "tests.unit",
+            "tests.integration",
+            "pipaudit.check",
+            "deptry.check",
+        }
+        assert tasks_list[-1] == ProjectTask(
+            name="profile.report",
+            func=profile_tasks.report,
+            kwargs={},
+            depends_on=tuple(sorted(profiled, key=[task.name for task in tasks_list].index)),
+        )
+        self.mock_cache_class.assert_not_called()
+
+    def test_check_passes_jobs_to_runner(self) -> None:
+        """Test that --jobs is passed to the runner."""
+        check(self.mock_context, jobs=4)
+
+        assert self.mock_runner_class.call_args.kwargs["jobs"] == 4
+
+    def test_check_orders_fixing_tasks_before_others_when_applying_fixes(self) -> None:
+        """Test that fixing tasks run in sequence and every other task waits for them."""
+        check(self.mock_context, apply_safe_fixes=True)
+
+        depends_on = {task.name: task.depends_on for task in self.mock_runner_class.call_args[0][1]}
+
+        assert depends_on["precommit.check"] == ()
+        assert depends_on["ruff.format"] == ("precommit.check",)
+        assert depends_on["ruff.lint"] == ("ruff.format",)
+        assert depends_on["mypy.check"] == ("ruff.lint",)
+        assert depends_on["trivy.check"] == ("ruff.lint",)
+
+    def test_check_tasks_are_independent_without_fixes(self) -> None:
+        """Test that read-only checks have no ordering constraints."""
+        check(self.mock_context)
+
+        assert all(task.depends_on == () for task in self.mock_runner_class.call_args[0][1])
+
+    def test_check_orders_other_tasks_after_precommit_when_concurrent(self) -> None:
+        """Test that concurrent tasks wait for pre-commit, whose hooks rewrite files even without fixes."""
+        check(self.mock_context, jobs=4)
+
+        depends_on = {task.name: task.depends_on for task in self.mock_runner_class.call_args[0][1]}
+
+        assert depends_on.pop("precommit.check") == ()
+        assert set(depends_on.values()) == {("precommit.check",)}
+
+    def test_check_quick_preset_runs_fast_static_checks_only(self) -> None:
+        """Test that the quick preset limits the run to the fast static checks."""
+        check(self.mock_context, preset="quick")
+
+        names = [task.name for task in self.mock_runner_class.call_args[0][1]]
+
+        assert names == ["ruff.format", "ruff.lint", "vulture.check", "xenon.check"]
+
+    def test_check_rejects_unknown_preset(self) -> None:
+        """Test that an unknown preset name raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown check preset"):
+            check(self.mock_context, preset="nightly")
+
+    def test_check_passes_budget_to_runner(self) -> None:
+        """Test that --budget is passed to the runner and a zero budget means no budget."""
+        check(self.mock_context, budget=10.0)
+        check(self.mock_context, budget=0.0)
+
+        assert [call.kwargs["budget"] for call in self.mock_runner_class.call_args_list] == [10.0, None]
+
+    def test_check_assigns_required_tools_for_preflight(self) -> None:
+        """Test that each check task lists the tools the runner's preflight verifies."""
+        check(self.mock_context, preset="quick")
+
+        tasks_list = self.mock_runner_class.call_args[0][1]
+        assert {task.name: task.requires for task in tasks_list} == {
+            "ruff.format": ("poetry", "ruff"),
+            "ruff.lint": ("poetry", "ruff"),
+            "vulture.check": ("poetry", "vulture"),
+            "xenon.check": ("poetry", "xenon"),
+        }
+
+    def test_check_passes_trace_recorder_to_runner(self) -> None:
+        """Test that --trace gives the runner a recorder for the run's timeline."""
+        check(self.mock_context, trace=True)
+
+        assert isinstance(self.mock_runner_class.call_args.kwargs["trace"], TraceRecorder)
+
+
+class TestCheckRefs:
+    """Test suite for the check-refs task."""
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, mocker: MockerFixture) -> None:
+        """Set up common mocks for all check-refs tests."""
+        self.mock_context = mocker.Mock(spec_set=Context)
+        self.mock_resolve = mocker.patch("project.project.resolve_refs", return_value={"main": "aaa", "dev": "bbb"})
+        self.mock_pool_class = mocker.patch("project.project.WorktreePool")
+        self.mock_check = mocker.patch("project.project.check_in_pool")
+
+    def _results(self, *, dev_ok: bool) -> list[RefCheck]:
+        """Build check results where main passes."""
+        return [
+            RefCheck(ref="main", commit="aaa", ok=True, seconds=1.0, log=Path("main.log")),
+            RefCheck(ref="dev", commit="bbb", ok=dev_ok, seconds=2.0, log=Path("dev.log")),
+        ]
+
+    def test_checks_refs_in_a_bounded_pool(self, capsys) -> None:  # noqa: ANN001
+        """Test that refs are checked concurrently in a pool sized by jobs and summarised."""
+        self.mock_check.return_value = self._results(dev_ok=True)
+
+        check_refs(self.mock_context, ref=["main", "dev"], skip=["trivy.check"], jobs=3, preset="quick")
+
+        self.mock_resolve.assert_called_once_with(self.mock_context, ["main", "dev"])
+        self.mock_pool_class.assert_called_once_with(self.mock_context, size=3)
+        pool, commits, command = self.mock_check.call_args.args
+        assert pool is self.mock_pool_class.return_value
+        assert commits == {"main": "aaa", "dev": "bbb"}
+        assert "project.check --preset quick --skip trivy.check --cache-remote " in command
+        assert self.mock_check.call_args.kwargs == {"jobs": 3}
+        assert "2 of 2 ref(s) passed" in capsys.readouterr().out
+
+    def test_fails_when_any_ref_fails(self) -> None:
+        """Test that a failing ref fails the task after the summary."""
+        self.mock_check.return_value = self._results(dev_ok=False)
+
+        with pytest.raises(Exit):
+            check_refs(self.mock_context, ref=["main", "dev"])
+
+    def test_requires_a_ref(self) -> None:
+        """Test that at least one ref must be given."""
+        with pytest.raises(Exit, match="at least one --ref"):
+            check_refs(self.mock_context)
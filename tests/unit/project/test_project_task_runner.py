@@ -1,10 +1,20 @@
 """Unit tests for the project_task_runner module."""
 
+from pathlib import Path
+
+import pytest
 from invoke import task
 from invoke.context import Context
+from invoke.exceptions import Exit, UnexpectedExit
+from invoke.runners import Result
 from pytest_mock import MockerFixture
 
-from project.project_task_runner import ProjectTask, ProjectTaskRunner
+from project.duration_history import DurationHistory
+from project.output_capture import CapturedResult
+from project.project_task_runner import ProjectTask, ProjectTaskRunner, TaskOutcome
+from project.result_cache import CacheEntry, ResultCache
+from project.tool_probes import ToolProbe
+from project.trace_timeline import TraceRecorder
 
 
 class TestProjectTask:
@@ -132,3 +142,266 @@ class TestProjectTaskRunner:
         runner.run()
 
         mock_task.assert_called_once_with(mock_context, arg1="value1", arg2=42, arg3=True)
+
+    def test_runner_records_durations_in_history(self, mocker: MockerFixture) -> None:
+        """Test that runner records each executed task's duration and saves the history."""
+        mock_context = mocker.Mock(spec_set=Context)
+        mock_history = mocker.Mock(spec_set=DurationHistory)
+
+        tasks = [ProjectTask(name="timed.task", func=mocker.Mock(spec=task), kwargs={})]
+
+        runner = ProjectTaskRunner(mock_context, tasks, history=mock_history)
+        runner.run()
+
+        mock_history.record.assert_called_once_with("timed.task", mocker.ANY)
+        mock_history.save.assert_called_once()
+
+    def test_runner_delegates_pending_tasks_to_backend(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that runner hands non-skipped tasks to the backend instead of calling them."""
+        mock_context = mocker.Mock(spec_set=Context)
+        mock_task = mocker.Mock(spec=task)
+        mock_backend = mocker.Mock()
+        mock_backend.run.return_value = [TaskOutcome(name="remote.task", exit_code=0, duration=1.0, worker="w1")]
+
+        tasks = [
+            ProjectTask(name="remote.task", func=mock_task, kwargs={}),
+            ProjectTask(name="skipped.task", func=mock_task, kwargs={}),
+        ]
+
+        runner = ProjectTaskRunner(mock_context, tasks, skip=["skipped.task"], backend=mock_backend)
+        runner.run()
+
+        mock_backend.run.assert_called_once_with([tasks[0]])
+        mock_task.assert_not_called()
+        assert runner.executed == ["remote.task"]
+        captured = capsys.readouterr()
+        assert "✓ remote.task on w1 (1.0s)" in captured.out
+
+    def test_runner_skips_backend_tasks_whose_dependencies_failed(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that tasks the backend did not start because a dependency failed are reported as skipped."""
+        mock_backend = mocker.Mock()
+        mock_backend.run.return_value = [TaskOutcome(name="fix.task", exit_code=1, duration=1.0, worker="w1")]
+        tasks = [
+            ProjectTask(name="fix.task", func=mocker.Mock(spec=task), kwargs={}),
+            ProjectTask(name="check.task", func=mocker.Mock(spec=task), kwargs={}, depends_on=("fix.task",)),
+        ]
+
+        runner = ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, backend=mock_backend)
+        with pytest.raises(Exit):
+            runner.run()
+
+        assert runner.failed == ["fix.task"]
+        assert runner.skipped == ["check.task"]
+        assert "⊘ Skipping: check.task (a dependency failed)" in capsys.readouterr().out
+
+    def test_runner_never_caches_results_of_a_backend_run(self, mocker: MockerFixture) -> None:
+        """Test that a backend checking another ref neither reads nor writes the local workspace's cache."""
+        mock_backend = mocker.Mock()
+        mock_backend.run.return_value = [TaskOutcome(name="remote.task", exit_code=0, duration=1.0, worker="w1")]
+        mock_cache = mocker.Mock()
+        tasks = [ProjectTask(name="remote.task", func=mocker.Mock(spec=task), kwargs={}, cacheable=True)]
+
+        runner = ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, backend=mock_backend, cache=mock_cache)
+        runner.run()
+
+        mock_backend.run.assert_called_once_with(tasks)
+        mock_cache.get.assert_not_called()
+        mock_cache.put.assert_not_called()
+        assert runner.executed == ["remote.task"]
+
+    def test_runner_exits_with_failure_when_backend_reports_failed_task(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that runner reports failed backend tasks and exits non-zero."""
+        mock_context = mocker.Mock(spec_set=Context)
+        mock_backend = mocker.Mock()
+        mock_backend.run.return_value = [
+            TaskOutcome(name="good.task", exit_code=0, duration=1.0),
+            TaskOutcome(name="bad.task", exit_code=2, duration=1.0),
+        ]
+        tasks = [
+            ProjectTask(name="good.task", func=mocker.Mock(spec=task), kwargs={}),
+            ProjectTask(name="bad.task", func=mocker.Mock(spec=task), kwargs={}),
+        ]
+
+        runner = ProjectTaskRunner(mock_context, tasks, backend=mock_backend)
+        with pytest.raises(Exit):
+            runner.run()
+
+        assert runner.failed == ["bad.task"]
+        captured = capsys.readouterr()
+        assert "✗ Failed: 1 task(s)" in captured.out
+
+    def test_runner_reuses_cached_result_for_cacheable_task(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a cacheable task with a cache hit is not executed."""
+        mock_context = mocker.Mock(spec_set=Context)
+        mock_task = mocker.Mock(spec=task)
+        mock_cache = mocker.Mock(spec_set=ResultCache)
+        mock_cache.get.return_value = CacheEntry(task="cached.task", duration=4.0, created_at=0.0)
+
+        tasks = [ProjectTask(name="cached.task", func=mock_task, kwargs={}, cacheable=True)]
+
+        runner = ProjectTaskRunner(mock_context, tasks, cache=mock_cache)
+        runner.run()
+
+        mock_task.assert_not_called()
+        assert runner.cached == ["cached.task"]
+        captured = capsys.readouterr()
+        assert "↺ Cached: cached.task (saves 4.0s)" in captured.out
+        assert "↺ Cached: 1 task(s)" in captured.out
+
+    def test_runner_stores_green_results_for_cacheable_tasks_only(self, mocker: MockerFixture) -> None:
+        """Test that only cacheable tasks are looked up and stored after succeeding."""
+        mock_context = mocker.Mock(spec_set=Context)
+        mock_cache = mocker.Mock(spec_set=ResultCache)
+        mock_cache.get.return_value = None
+
+        cacheable = ProjectTask(name="cacheable.task", func=mocker.Mock(spec=task), kwargs={}, cacheable=True)
+        uncacheable = ProjectTask(name="uncacheable.task", func=mocker.Mock(spec=task), kwargs={})
+
+        runner = ProjectTaskRunner(mock_context, [cacheable, uncacheable], cache=mock_cache)
+        runner.run()
+
+        mock_cache.get.assert_called_once_with(cacheable)
+        mock_cache.put.assert_called_once_with(cacheable, mocker.ANY)
+
+    def test_runner_runs_tasks_concurrently_after_their_dependencies(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that concurrent runs respect dependencies and report the predicted and actual makespan."""
+        mock_context = mocker.Mock(spec_set=Context)
+        order: list[str] = []
+        tasks = [
+            ProjectTask(
+                name=name, func=mocker.Mock(spec=task, side_effect=lambda _c, n=name: order.append(n)), kwargs={}
+            )
+            for name in ("fix", "lint", "types")
+        ]
+        tasks[1].depends_on = ("fix",)
+        tasks[2].depends_on = ("fix",)
+        history = DurationHistory(samples={"fix": [1.0], "lint": [2.0], "types": [4.0]})
+        mocker.patch.object(history, "save")
+
+        runner = ProjectTaskRunner(mock_context, tasks, history=history, jobs=2)
+        runner.run()
+
+        assert order[0] == "fix"
+        assert sorted(runner.executed) == ["fix", "lint", "types"]
+        captured = capsys.readouterr()
+        assert "Makespan with 2 jobs: predicted 5.0s, actual" in captured.out
+
+    def test_runner_skips_dependents_of_failed_concurrent_task(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a failed task stops its dependents but not unrelated tasks, then exits non-zero."""
+        mock_context = mocker.Mock(spec_set=Context)
+        failing = mocker.Mock(spec=task, side_effect=UnexpectedExit(Result(command="fix", exited=1)))
+        dependent = mocker.Mock(spec=task)
+        unrelated = mocker.Mock(spec=task)
+        tasks = [
+            ProjectTask(name="fix", func=failing, kwargs={}),
+            ProjectTask(name="lint", func=dependent, kwargs={}, depends_on=("fix",)),
+            ProjectTask(name="audit", func=unrelated, kwargs={}),
+        ]
+
+        runner = ProjectTaskRunner(mock_context, tasks, jobs=2)
+        with pytest.raises(Exit):
+            runner.run()
+
+        dependent.assert_not_called()
+        unrelated.assert_called_once_with(mock_context)
+        assert runner.failed == ["fix"]
+        assert runner.skipped == ["lint"]
+        assert "⊘ Skipping: lint (a dependency failed)" in capsys.readouterr().out
+
+    def test_runner_keeps_going_when_a_concurrent_task_raises(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that an unexpected exception fails its task without aborting the other tasks."""
+        mock_context = mocker.Mock(spec_set=Context)
+        broken = mocker.Mock(spec=task, side_effect=OSError("disk full"))
+        unrelated = mocker.Mock(spec=task)
+        tasks = [
+            ProjectTask(name="broken", func=broken, kwargs={}),
+            ProjectTask(name="audit", func=unrelated, kwargs={}),
+        ]
+
+        runner = ProjectTaskRunner(mock_context, tasks, jobs=2)
+        with pytest.raises(Exit):
+            runner.run()
+
+        unrelated.assert_called_once_with(mock_context)
+        assert runner.failed == ["broken"]
+        assert runner.executed == ["audit"]
+        assert "broken raised OSError: disk full" in capsys.readouterr().out
+
+    def test_runner_skips_tasks_whose_tools_are_unavailable(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that the preflight skips tasks needing an unavailable tool before running anything."""
+        scan = mocker.Mock(spec=task)
+        lint = mocker.Mock(spec=task)
+        tasks = [
+            ProjectTask(name="trivy.check", func=scan, kwargs={}, requires=("docker",)),
+            ProjectTask(name="ruff.lint", func=lint, kwargs={}, requires=("poetry", "ruff")),
+        ]
+        probes = {"docker": ToolProbe(name="docker", available=False)}
+
+        runner = ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, probes=probes)
+        with pytest.raises(Exit, match=r"tools are unavailable: trivy\.check"):
+            runner.run()
+
+        scan.assert_not_called()
+        lint.assert_called_once()
+        assert runner.skipped == ["trivy.check"]
+        assert runner.unavailable == ["trivy.check"]
+        assert "⊘ Skipping: trivy.check (docker unavailable)" in capsys.readouterr().out
+
+    def test_runner_passes_with_missing_tools_when_allowed(self, mocker: MockerFixture) -> None:
+        """Test that tasks skipped for unavailable tools only fail the run unless the user accepts them."""
+        tasks = [ProjectTask(name="trivy.check", func=mocker.Mock(spec=task), kwargs={}, requires=("docker",))]
+        probes = {"docker": ToolProbe(name="docker", available=False)}
+
+        runner = ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, probes=probes, allow_missing_tools=True)
+        runner.run()
+
+        assert runner.skipped == ["trivy.check"]
+
+    def test_runner_writes_trace_with_a_span_per_task(self, mocker: MockerFixture, tmp_path: Path, capsys) -> None:  # noqa: ANN001
+        """Test that a traced run records each task, including failed ones, and writes the trace."""
+        failing = mocker.Mock(spec=task, side_effect=UnexpectedExit(Result(command="pip-audit", exited=1)))
+        tasks = [
+            ProjectTask(name="ruff.lint", func=mocker.Mock(spec=task), kwargs={}),
+            ProjectTask(name="pipaudit.check", func=failing, kwargs={}),
+        ]
+        trace = TraceRecorder(tmp_path / "trace.json")
+
+        with pytest.raises(Exit):
+            ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, jobs=2, trace=trace).run()
+
+        assert sorted(event["name"] for event in trace.events if event["ph"] == "X") == ["pipaudit.check", "ruff.lint"]
+        assert (tmp_path / "trace.json").is_file()
+        assert f"Trace written to {tmp_path / 'trace.json'}" in capsys.readouterr().out
+
+    def test_runner_points_at_output_log_of_failed_concurrent_task(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a failed command's full output log is reported instead of its in-memory tail."""
+        result = CapturedResult(command="pytest", exited=1, stdout_log=Path(".quality/logs/pytest.stdout.log"))
+        failing = mocker.Mock(spec=task, side_effect=UnexpectedExit(result))
+        tasks = [ProjectTask(name="tests.unit", func=failing, kwargs={})]
+
+        with pytest.raises(Exit):
+            ProjectTaskRunner(mocker.Mock(spec_set=Context), tasks, jobs=2).run()
+
+        assert f"tests.unit: full stdout in {Path('.quality/logs/pytest.stdout.log')}" in capsys.readouterr().out
+
+    def test_runner_defers_low_priority_tasks_outside_budget(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a budget keeps the most valuable tasks that fit and reports the rest as deferred."""
+        mock_context = mocker.Mock(spec_set=Context)
+        slow = mocker.Mock(spec=task)
+        tasks = [
+            ProjectTask(name="lint", func=mocker.Mock(spec=task), kwargs={}, priority=5),
+            ProjectTask(name="audit", func=slow, kwargs={}, priority=1),
+            ProjectTask(name="types", func=mocker.Mock(spec=task), kwargs={}, priority=4),
+        ]
+        history = DurationHistory(samples={"lint": [2.0], "audit": [30.0], "types": [6.0]})
+        mocker.patch.object(history, "save")
+
+        runner = ProjectTaskRunner(mock_context, tasks, history=history, budget=10.0)
+        runner.run()
+
+        slow.assert_not_called()
+        assert runner.executed == ["lint", "types"]
+        assert runner.deferred == ["audit"]
+        captured = capsys.readouterr()
+        assert "⏸ Deferring: audit (~30.0s, budget 10.0s)" in captured.out
+        assert "⏸ Deferred: 1 task(s)" in captured.out
@@ -0,0 +1,92 @@
+"""Unit tests for the pytest_benchmarks module."""
+
+import json
+
+import pytest
+
+from project.pytest_benchmarks import (
+    BenchmarkResult,
+    Regression,
+    comparison_lines,
+    find_regressions,
+    load_results,
+    percentile,
+)
+
+TEST_MODULE = """
+def test_sums(benchmark):
+    numbers = list(range(100))
+    result = benchmark(lambda: sum(numbers), size=100)
+    assert len(result.samples) == 3
+
+
+def test_plain():
+    pass
+"""
+BASELINE = {"test_a": {"p50": 0.10}, "test_b": {"p50": 0.20}, "test_gone": {"p50": 0.30}}
+CURRENT = {"test_a": {"p50": 0.13}, "test_b": {"p50": 0.21}, "test_new": {"p50": 0.05}}
+
+
+class TestResults:
+    """Test suite for summarising benchmark samples."""
+
+    def test_percentile_is_nearest_rank(self) -> None:
+        """Test that percentiles pick the smallest sample covering the requested share."""
+        samples = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+        assert [percentile(samples, percent) for percent in (0, 20, 50, 90, 100)] == [1.0, 1.0, 3.0, 5.0, 5.0]
+
+    def test_summary(self) -> None:
+        """Test that a result reports its latency percentiles and throughput at the median."""
+        result = BenchmarkResult(name="test_a", size=1000, samples=[0.2, 0.1, 0.4])
+
+        assert result.summary() == {"size": 1000, "rounds": 3, "p50": 0.2, "p90": 0.4, "p99": 0.4, "throughput": 5000.0}
+
+
+class TestComparison:
+    """Test suite for comparing results with a baseline."""
+
+    def test_find_regressions(self) -> None:
+        """Test that only benchmarks slower than the tolerance regress."""
+        assert find_regressions(CURRENT, BASELINE, tolerance=10.0) == [
+            Regression(name="test_a", baseline=0.10, current=0.13)
+        ]
+        assert find_regressions(CURRENT, BASELINE, tolerance=50.0) == []
+
+    def test_comparison_lines(self) -> None:
+        """Test that every benchmark is listed, including new and missing ones."""
+        assert comparison_lines(CURRENT, BASELINE) == [
+            "  +30.0%     130.000 ms  test_a",
+            "   +5.0%     210.000 ms  test_b",
+            " missing                 test_gone",
+            "     new      50.000 ms  test_new",
+        ]
+
+
+class TestPlugin:
+    """Test suite for the plugin in a pytest run."""
+
+    def test_lists_results_without_writing_a_report(self, pytester: pytest.Pytester) -> None:
+        """Test that benchmarks are listed in the summary even without a report file."""
+        pytester.makepyfile(TEST_MODULE)
+
+        result = pytester.runpytest("-p", "project.pytest_benchmarks", "--benchmark-rounds=3")
+
+        result.assert_outcomes(passed=2)
+        result.stdout.fnmatch_lines(["*benchmarks*", "*p50 (ms)*", "*::test_sums"])
+        assert "written to" not in result.stdout.str()
+
+    def test_writes_the_report(self, pytester: pytest.Pytester) -> None:
+        """Test that the results of each benchmark are written when a report is requested."""
+        pytester.makepyfile(TEST_MODULE)
+        report = pytester.path / "benchmarks.json"
+
+        result = pytester.runpytest(
+            "-p", "project.pytest_benchmarks", "--benchmark-rounds=3", f"--benchmark-report={report}"
+        )
+
+        result.assert_outcomes(passed=2)
+        results = load_results(report)
+        assert list(results) == ["test_writes_the_report.py::test_sums"]
+        assert results["test_writes_the_report.py::test_sums"]["rounds"] == 3
+        assert json.loads(report.read_text(encoding="utf-8")) == results
@@ -0,0 +1,124 @@
+"""Unit tests for the pytest_costs module."""
+
+import argparse
+import json
+
+import pytest
+
+from project.pytest_costs import BYTES_PER_MIB, Budget, CostRecord, parse_marker_budget, slow_marker_suggestions
+
+TEST_MODULE = """
+import time
+
+import pytest
+
+
+def test_fast():
+    pass
+
+
+@pytest.mark.slow
+def test_marked_slow_but_fast():
+    pass
+
+
+def test_sleeps():
+    time.sleep(0.2)
+
+
+@pytest.mark.budget(memory_mib=1)
+def test_allocates():
+    data = bytearray(4 * 1024 * 1024)
+    assert data
+"""
+
+
+class TestBudgets:
+    """Test suite for parsing and checking budgets."""
+
+    def test_parse_marker_budget(self) -> None:
+        """Test that either limit of a marker budget may be left out."""
+        assert parse_marker_budget("slow=30:512") == ("slow", Budget(seconds=30.0, memory_mib=512.0))
+        assert parse_marker_budget("integration=5") == ("integration", Budget(seconds=5.0))
+        assert parse_marker_budget("db=:64") == ("db", Budget(memory_mib=64.0))
+
+    @pytest.mark.parametrize("value", ["=5", "slow=fast", "slow=1:lots"])
+    def test_parse_marker_budget_rejects_malformed_values(self, value: str) -> None:
+        """Test that malformed marker budgets are rejected as usage errors."""
+        with pytest.raises(argparse.ArgumentTypeError, match="MARKER=SECONDS"):
+            parse_marker_budget(value)
+
+    def test_violations(self) -> None:
+        """Test that each exceeded limit is reported and unset limits are ignored."""
+        cost = CostRecord(nodeid="test_a", seconds=2.0, peak_bytes=3 * BYTES_PER_MIB)
+
+        assert Budget(seconds=1.0, memory_mib=2.0).violations(cost) == [
+            "took 2.00s, budget 1s",
+            "peaked at 3.0 MiB, budget 2 MiB",
+        ]
+        assert Budget(seconds=5.0).violations(cost) == []
+
+    def test_slow_marker_suggestions(self) -> None:
+        """Test that markers are suggested for slow tests and questioned on fast ones."""
+        costs = [
+            CostRecord(nodeid="test_b", seconds=0.1, peak_bytes=0, markers=["slow"]),
+            CostRecord(nodeid="test_a", seconds=1.5, peak_bytes=0),
+            CostRecord(nodeid="test_c", seconds=2.0, peak_bytes=0, markers=["slow"]),
+        ]
+
+        assert slow_marker_suggestions(costs, slow_seconds=1.0) == [
+            "add @pytest.mark.slow to test_a (1.50s)",
+            "remove @pytest.mark.slow from test_b (0.10s)",
+        ]
+
+
+class TestPlugin:
+    """Test suite for the plugin in a pytest run."""
+
+    def test_inactive_without_cost_report(self, pytester: pytest.Pytester) -> None:
+        """Test that budgets are not enforced unless costs are recorded."""
+        pytester.makepyfile(TEST_MODULE)
+
+        result = pytester.runpytest("-p", "project.pytest_costs", "--time-budget=0.01")
+
+        result.assert_outcomes(passed=4)
+        assert "slowest tests" not in result.stdout.str()
+
+    def test_records_costs_and_enforces_budgets(self, pytester: pytest.Pytester) -> None:
+        """Test that costs are reported and written, and tests over their budget fail."""
+        pytester.makepyfile(TEST_MODULE)
+        report = pytester.path / "costs.json"
+
+        result = pytester.runpytest(
+            "-p", "project.pytest_costs", f"--cost-report={report}", "--cost-top=2", "--time-budget=0.1"
+        )
+
+        result.assert_outcomes(passed=2, failed=2)
+        result.stdout.fnmatch_lines(
+            [
+                "*Over budget: took 0.2*s, budget 0.1s*",
+                "*Over budget: peaked at 4.* MiB, budget 1 MiB*",
+                "*2 slowest tests*",
+                "*s  test_records_costs_and_enforces_budgets.py::test_sleeps",
+                "*1 most memory-hungry tests*",
+                "*MiB  test_records_costs_and_enforces_budgets.py::test_allocates",
+                "*slow marker suggestions*",
+                "remove @pytest.mark.slow from *::test_marked_slow_but_fast*",
+            ]
+        )
+        costs = {cost["nodeid"].split("::")[1]: cost for cost in json.loads(report.read_text(encoding="utf-8"))}
+        assert costs["test_sleeps"]["seconds"] >= 0.2
+        assert costs["test_sleeps"]["peak_bytes"] is None
+        assert costs["test_allocates"]["peak_bytes"] >= 4 * BYTES_PER_MIB
+        assert costs["test_marked_slow_but_fast"]["markers"] == ["slow"]
+
+    def test_records_every_memory_peak_on_request(self, pytester: pytest.Pytester) -> None:
+        """Test that --cost-memory traces allocations for every test, not just those with a memory budget."""
+        pytester.makepyfile(TEST_MODULE)
+        report = pytester.path / "costs.json"
+
+        result = pytester.runpytest("-p", "project.pytest_costs", f"--cost-report={report}", "--cost-memory")
+
+        result.assert_outcomes(passed=3, failed=1)
+        costs = json.loads(report.read_text(encoding="utf-8"))
+        assert all(cost["peak_bytes"] is not None for cost in costs)
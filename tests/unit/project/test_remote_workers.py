@@ -0,0 +1,307 @@
+"""Unit tests for the remote_workers module."""
+
+import io
+import json
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke import task
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.duration_history import DurationHistory
+from project.project_task_runner import ProjectTask, TaskOutcome
+from project.remote_workers import (
+    DEFAULT_WORKER_PORT,
+    WORKER_ERROR_EXIT_CODE,
+    WORKER_TOKEN_VARIABLE,
+    RemoteWorkerBackend,
+    TaskRequest,
+    WorkerServer,
+    build_invoke_argv,
+    create_snapshot_ref,
+    handle_request,
+    parse_address,
+    plan_assignments,
+    worker_token,
+)
+
+TOKEN = "secret"  # noqa: S105
+
+
+def _events(output: bytes) -> list[dict]:
+    """Decode the JSON event lines written by a worker."""
+    return [json.loads(line) for line in output.splitlines()]
+
+
+class TestTaskRequest:
+    """Test suite for the TaskRequest dataclass."""
+
+    def test_request_round_trips_through_json_line(self) -> None:
+        """Test that a request survives serialization to a JSON line and back."""
+        request = TaskRequest(name="ruff.lint", kwargs={"apply_safe_fixes": True}, ref="abc123")
+
+        assert TaskRequest.from_line(request.to_line()) == request
+
+    def test_from_line_rejects_invalid_task_names(self) -> None:
+        """Test that task names which could smuggle extra arguments are rejected."""
+        with pytest.raises(ValueError, match="Invalid task name"):
+            TaskRequest.from_line(b'{"name": "mypy.check --help"}\n')
+
+    @pytest.mark.parametrize(
+        ("payload", "message"),
+        [
+            ({"name": "poetry.update"}, "Invalid task name"),
+            ({"name": "mypy.check", "kwargs": {"config_file": "/etc/passwd"}}, "Invalid arguments"),
+            ({"name": "ruff.lint", "kwargs": {"apply_safe_fixes": "yes"}}, "must be flags"),
+            ({"name": "mypy.check", "ref": "--orphan"}, "Invalid ref"),
+            (["mypy.check"], "Invalid task name"),
+        ],
+    )
+    def test_from_line_accepts_only_check_tasks_and_their_flags(self, payload: object, message: str) -> None:
+        """Test that workers refuse tasks outside project.check, unknown arguments and option-like refs."""
+        with pytest.raises(ValueError, match=message):
+            TaskRequest.from_line(json.dumps(payload).encode("utf-8"))
+
+    def test_worker_token_is_required(self, mocker: MockerFixture) -> None:
+        """Test that the shared token is read from the environment and must be set."""
+        mocker.patch.dict("os.environ", {WORKER_TOKEN_VARIABLE: TOKEN})
+        assert worker_token() == TOKEN
+
+        mocker.patch.dict("os.environ", {WORKER_TOKEN_VARIABLE: ""})
+        with pytest.raises(ValueError, match=WORKER_TOKEN_VARIABLE):
+            worker_token()
+
+
+class TestHelpers:
+    """Test suite for the module-level helper functions."""
+
+    def test_build_invoke_argv_converts_kwargs_to_flags(self) -> None:
+        """Test that true booleans become flags, lists repeat and false or None values are dropped."""
+        argv = build_invoke_argv(
+            "project.check",
+            {"apply_safe_fixes": True, "apply_unsafe_fixes": False, "skip": ["a", "b"], "ref": None, "port": 1},
+        )
+
+        assert argv == [
+            sys.executable,
+            "-m",
+            "invoke",
+            "project.check",
+            "--apply-safe-fixes",
+            "--skip",
+            "a",
+            "--skip",
+            "b",
+            "--port",
+            "1",
+        ]
+
+    def test_plan_assignments_balances_longest_tasks_first(self) -> None:
+        """Test that tasks are assigned longest-first to the least loaded worker."""
+        history = DurationHistory(samples={"slow": [100.0], "medium": [60.0], "fast1": [30.0], "fast2": [30.0]})
+        tasks = [
+            ProjectTask(name=name, func=Mock(spec=task), kwargs={}) for name in ("fast1", "fast2", "medium", "slow")
+        ]
+
+        assignments = plan_assignments(tasks, ["w1", "w2"], history)
+
+        assert [item.name for item in assignments["w1"]] == ["slow"]
+        assert [item.name for item in assignments["w2"]] == ["medium", "fast1", "fast2"]
+
+    def test_parse_address_defaults_port(self) -> None:
+        """Test that addresses without a port use the default worker port."""
+        assert parse_address("worker-1") == ("worker-1", DEFAULT_WORKER_PORT)
+        assert parse_address("127.0.0.1:9000") == ("127.0.0.1", 9000)
+
+    def test_create_snapshot_ref_prefers_stash_commit(self) -> None:
+        """Test that the snapshot uses git stash create when the tree has changes."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value.stdout = "deadbeef\n"
+
+        assert create_snapshot_ref(mock_context) == "deadbeef"
+        mock_context.run.assert_called_once_with("git stash create", hide=True)
+
+    def test_create_snapshot_ref_falls_back_to_head_for_clean_tree(self) -> None:
+        """Test that the snapshot is HEAD when there are no local changes."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [Mock(stdout=""), Mock(stdout="cafebabe\n")]
+
+        assert create_snapshot_ref(mock_context) == "cafebabe"
+
+
+class TestHandleRequest:
+    """Test suite for the worker-side request handler."""
+
+    def test_handle_request_streams_output_and_exit_code(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that the worker streams each output line followed by the exit code."""
+        mocker.patch(
+            "project.remote_workers.build_invoke_argv",
+            return_value=[sys.executable, "-c", "print('first'); print('second'); raise SystemExit(3)"],
+        )
+        wfile = io.BytesIO()
+
+        handle_request(io.BytesIO(TaskRequest(name="mypy.check", token=TOKEN).to_line()), wfile, tmp_path, TOKEN)
+
+        assert _events(wfile.getvalue()) == [
+            {"event": "log", "line": "first"},
+            {"event": "log", "line": "second"},
+            {"event": "exit", "code": 3},
+        ]
+
+    def test_handle_request_rejects_malformed_request(self, tmp_path: Path) -> None:
+        """Test that a malformed request is answered with an error exit code."""
+        wfile = io.BytesIO()
+
+        handle_request(io.BytesIO(b'{"name": "bad name"}\n'), wfile, tmp_path, TOKEN)
+
+        assert _events(wfile.getvalue())[-1] == {"event": "exit", "code": WORKER_ERROR_EXIT_CODE}
+
+    def test_handle_request_rejects_wrong_token(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that a request without the shared token is not run."""
+        mock_popen = mocker.patch("project.remote_workers.subprocess.Popen")
+        wfile = io.BytesIO()
+
+        handle_request(io.BytesIO(TaskRequest(name="mypy.check", token="guess").to_line()), wfile, tmp_path, TOKEN)  # noqa: S106
+
+        mock_popen.assert_not_called()
+        assert _events(wfile.getvalue()) == [
+            {"event": "log", "line": "Rejected request: invalid token"},
+            {"event": "exit", "code": WORKER_ERROR_EXIT_CODE},
+        ]
+
+    def test_handle_request_runs_in_worktree_for_ref(self, mocker: MockerFixture, tmp_path: Path) -> None:
+        """Test that a request with a ref is run inside a temporary git worktree."""
+        mock_run = mocker.patch("project.remote_workers.subprocess.run")
+        mock_popen = mocker.patch("project.remote_workers.subprocess.Popen")
+        mock_popen.return_value.stdout = io.StringIO("ok\n")
+        mock_popen.return_value.wait.return_value = 0
+        wfile = io.BytesIO()
+
+        request = TaskRequest(name="mypy.check", ref="abc123", token=TOKEN)
+        handle_request(io.BytesIO(request.to_line()), wfile, tmp_path, TOKEN)
+
+        add_command = mock_run.call_args_list[0][0][0]
+        remove_command = mock_run.call_args_list[1][0][0]
+        assert add_command[:6] == ["git", "-C", str(tmp_path), "worktree", "add", "--detach"]
+        assert add_command[-1] == "abc123"
+        assert remove_command[:5] == ["git", "-C", str(tmp_path), "worktree", "remove"]
+        assert mock_popen.call_args.kwargs["cwd"] == Path(add_command[6])
+        assert _events(wfile.getvalue())[-1] == {"event": "exit", "code": 0}
+
+
+class TestRemoteWorkerBackend:
+    """Test suite for the RemoteWorkerBackend class."""
+
+    @pytest.fixture
+    def worker_addresses(self, mocker: MockerFixture, tmp_path: Path) -> Iterator[list[str]]:
+        """Start two local worker servers that run a small script instead of invoke."""
+        mocker.patch(
+            "project.remote_workers.build_invoke_argv",
+            side_effect=lambda name, _kwargs: [
+                sys.executable,
+                "-c",
+                f"print('running {name}'); raise SystemExit({1 if name == 'trivy.check' else 0})",
+            ],
+        )
+        servers = [WorkerServer(("127.0.0.1", 0), tmp_path, TOKEN) for _ in range(2)]
+        threads = [threading.Thread(target=server.serve_forever, daemon=True) for server in servers]
+        for thread in threads:
+            thread.start()
+        yield [f"127.0.0.1:{server.server_address[1]}" for server in servers]
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_backend_requires_at_least_one_worker(self) -> None:
+        """Test that a backend without workers is rejected."""
+        with pytest.raises(ValueError, match="At least one worker"):
+            RemoteWorkerBackend([], token=TOKEN)
+
+    def test_worker_server_requires_a_token(self, tmp_path: Path) -> None:
+        """Test that a worker cannot be started without a token."""
+        with pytest.raises(ValueError, match="non-empty token"):
+            WorkerServer(("127.0.0.1", 0), tmp_path, "")
+
+    @pytest.mark.enable_socket
+    def test_backend_runs_tasks_on_local_worker_processes(
+        self,
+        worker_addresses: list[str],
+        capsys,  # noqa: ANN001
+    ) -> None:
+        """Test that tasks are shipped to real local workers and their results streamed back."""
+        history = DurationHistory(samples={"mypy.check": [10.0], "trivy.check": [5.0]})
+        tasks = [ProjectTask(name=name, func=Mock(spec=task), kwargs={}) for name in ("mypy.check", "trivy.check")]
+
+        outcomes = RemoteWorkerBackend(worker_addresses, history, token=TOKEN, timeout=30).run(tasks)
+
+        assert {outcome.name: outcome.exit_code for outcome in outcomes} == {"mypy.check": 0, "trivy.check": 1}
+        assert {outcome.worker for outcome in outcomes} == set(worker_addresses)
+        assert len(history.samples["mypy.check"]) == 2
+        assert history.samples["trivy.check"] == [5.0]
+        captured = capsys.readouterr()
+        assert "[mypy.check] running mypy.check" in captured.out
+        assert "[trivy.check] running trivy.check" in captured.out
+
+    def test_backend_reports_unreachable_worker_as_failure(self, mocker: MockerFixture, capsys) -> None:  # noqa: ANN001
+        """Test that a connection error is reported as a failed task rather than raised."""
+        mocker.patch("project.remote_workers.socket.create_connection", side_effect=ConnectionRefusedError("refused"))
+        tasks = [ProjectTask(name="mypy.check", func=Mock(spec=task), kwargs={})]
+
+        outcomes = RemoteWorkerBackend(["127.0.0.1:1"], token=TOKEN).run(tasks)
+
+        assert outcomes[0].exit_code == WORKER_ERROR_EXIT_CODE
+        assert "worker 127.0.0.1:1 failed: refused" in capsys.readouterr().out
+
+    def test_backend_reports_malformed_worker_output_as_failure(self, capsys) -> None:  # noqa: ANN001
+        """Test that output that is not a JSON event fails the task instead of raising."""
+        stream = io.BytesIO(b'{"event": "log", "line": "ok"}\nTraceback (most recent call last):\n')
+
+        assert RemoteWorkerBackend._consume_events("mypy.check", stream) == WORKER_ERROR_EXIT_CODE  # noqa: SLF001
+        assert "[mypy.check] malformed event from worker" in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        "stream",
+        [
+            b'{"event": "exit"}\n',
+            b'{"event": "exit", "code": "0"}\n',
+            b'{"line": "no event"}\n',
+            b"[1, 2]\n",
+            b'{"event": "log", "line": "cut off"}\n',
+        ],
+    )
+    def test_backend_reports_partial_or_malformed_events_as_failure(self, stream: bytes) -> None:
+        """Test that events missing their fields, or a stream without an exit event, fail the task."""
+        exit_code = RemoteWorkerBackend._consume_events("mypy.check", io.BytesIO(stream))  # noqa: SLF001
+
+        assert exit_code == WORKER_ERROR_EXIT_CODE
+
+    def test_backend_runs_tasks_after_their_dependencies(self, mocker: MockerFixture) -> None:
+        """Test that a fixer runs alone before the checks depending on it, and failed dependencies stop dependents."""
+        waves: list[set[str]] = []
+
+        def run_wave(_self: RemoteWorkerBackend, wave: list[ProjectTask]) -> list[TaskOutcome]:
+            waves.append({project_task.name for project_task in wave})
+            return [
+                TaskOutcome(
+                    name=project_task.name, exit_code=1 if project_task.name == "ruff.format" else 0, duration=1.0
+                )
+                for project_task in wave
+            ]
+
+        mocker.patch.object(RemoteWorkerBackend, "_run_wave", run_wave)
+        tasks = [
+            ProjectTask(name="precommit.check", func=Mock(spec=task), kwargs={}),
+            ProjectTask(name="ruff.format", func=Mock(spec=task), kwargs={}, depends_on=("precommit.check",)),
+            ProjectTask(name="mypy.check", func=Mock(spec=task), kwargs={}, depends_on=("ruff.format",)),
+            ProjectTask(name="xenon.check", func=Mock(spec=task), kwargs={}, depends_on=("precommit.check",)),
+        ]
+
+        outcomes = RemoteWorkerBackend(["127.0.0.1:1"], token=TOKEN).run(tasks)
+
+        assert waves == [{"precommit.check"}, {"ruff.format", "xenon.check"}]
+        assert [outcome.name for outcome in outcomes] == ["precommit.check", "ruff.format", "xenon.check"]
@@ -0,0 +1,168 @@
+"""Unit tests for the result_cache module."""
+
+import hashlib
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke import task
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.project_task_runner import ProjectTask
+from project.result_cache import (
+    CacheEntry,
+    CacheServer,
+    DirectoryStore,
+    HttpStore,
+    ResultCache,
+    compute_input_digest,
+    create_store,
+)
+
+KEY = hashlib.sha256(b"example").hexdigest()
+TOKEN = "secret"  # noqa: S105
+
+
+def _task(name: str = "mypy.check", **kwargs: object) -> ProjectTask:
+    """Build a cacheable ProjectTask for the tests."""
+    return ProjectTask(name=name, func=Mock(spec=task), kwargs=dict(kwargs), cacheable=True)
+
+
+class TestDirectoryStore:
+    """Test suite for the DirectoryStore class."""
+
+    def test_put_and_get_round_trip(self, tmp_path: Path) -> None:
+        """Test that a stored entry can be read back."""
+        store = DirectoryStore(tmp_path)
+        entry = CacheEntry(task="mypy.check", duration=1.5, created_at=1.0)
+
+        store.put(KEY, entry)
+
+        assert store.get(KEY) == entry
+        assert (tmp_path / KEY[:2] / f"{KEY}.json").is_file()
+
+    def test_get_returns_none_for_missing_key(self, tmp_path: Path) -> None:
+        """Test that a missing entry is a miss."""
+        assert DirectoryStore(tmp_path).get(KEY) is None
+
+    def test_put_rejects_keys_that_are_not_digests(self, tmp_path: Path) -> None:
+        """Test that keys cannot escape the store directory."""
+        with pytest.raises(ValueError, match="Invalid cache key"):
+            DirectoryStore(tmp_path).put("../../etc", CacheEntry(task="x", duration=0.0, created_at=0.0))
+
+
+class TestResultCache:
+    """Test suite for the ResultCache class."""
+
+    def test_key_changes_with_inputs_kwargs_and_tools(self, tmp_path: Path) -> None:
+        """Test that every key component invalidates the cached result."""
+        base = ResultCache("digest", DirectoryStore(tmp_path), tool_versions={"python": "3.13"})
+        keys = {
+            base.key_for(_task()),
+            base.key_for(_task(name="ruff.lint")),
+            base.key_for(_task(apply_safe_fixes=True)),
+            ResultCache("other", DirectoryStore(tmp_path), tool_versions={"python": "3.13"}).key_for(_task()),
+            ResultCache("digest", DirectoryStore(tmp_path), tool_versions={"python": "3.14"}).key_for(_task()),
+        }
+
+        assert len(keys) == 5
+
+    def test_get_promotes_remote_hit_to_local_store(self, tmp_path: Path) -> None:
+        """Test that a remote hit is copied into the local store."""
+        local = DirectoryStore(tmp_path / "local")
+        remote = DirectoryStore(tmp_path / "remote")
+        ResultCache("digest", remote).put(_task(), 2.0)
+
+        cache = ResultCache("digest", local, remote)
+        entry = cache.get(_task())
+
+        assert entry is not None
+        assert entry.duration == 2.0
+        assert local.get(cache.key_for(_task())) == entry
+
+    def test_put_skips_remote_store_in_read_only_mode(self, tmp_path: Path) -> None:
+        """Test that read-only clients never write to the shared tier."""
+        local = DirectoryStore(tmp_path / "local")
+        remote = DirectoryStore(tmp_path / "remote")
+
+        cache = ResultCache("digest", local, remote, read_only=True)
+        cache.put(_task(), 2.0)
+
+        assert local.get(cache.key_for(_task())) is not None
+        assert remote.get(cache.key_for(_task())) is None
+
+
+class TestHelpers:
+    """Test suite for the module-level helper functions."""
+
+    def test_create_store_picks_backend_from_location(self, tmp_path: Path) -> None:
+        """Test that URLs create HTTP stores and paths create directory stores."""
+        assert isinstance(create_store("http://cache:8766"), HttpStore)
+        assert isinstance(create_store(str(tmp_path)), DirectoryStore)
+
+    def test_http_store_rejects_non_http_urls(self) -> None:
+        """Test that only http and https URLs are accepted."""
+        with pytest.raises(ValueError, match="http or https"):
+            HttpStore("file:///etc/passwd")
+
+    def test_compute_input_digest_rebuilds_workspace_index(self, mocker: MockerFixture) -> None:
+        """Test that the digest comes from a freshly built workspace index."""
+        mock_index = mocker.patch("project.result_cache.workspace_index")
+        mock_index.return_value.digest.return_value = "digest"
+        mock_context = Mock(spec_set=Context)
+
+        assert compute_input_digest(mock_context) == "digest"
+        mock_index.assert_called_once_with(mock_context, refresh=True)
+
+
+class TestCacheServer:
+    """Test suite for the HTTP stand-in cache server."""
+
+    @pytest.fixture
+    def server_url(self, tmp_path: Path, request: pytest.FixtureRequest) -> Iterator[str]:
+        """Start a local cache server, read-only when the test is parametrized with True."""
+        read_only = getattr(request, "param", False)
+        server = CacheServer(
+            ("127.0.0.1", 0), DirectoryStore(tmp_path / "server"), read_only=read_only, write_token=TOKEN
+        )
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @pytest.mark.enable_socket
+    def test_http_store_round_trips_through_server(self, server_url: str) -> None:
+        """Test that results uploaded over HTTP are served back to other clients."""
+        entry = CacheEntry(task="mypy.check", duration=3.0, created_at=1.0)
+
+        HttpStore(server_url, token=TOKEN).put(KEY, entry)
+
+        assert HttpStore(server_url).get(KEY) == entry
+        assert HttpStore(server_url).get(hashlib.sha256(b"missing").hexdigest()) is None
+
+    @pytest.mark.enable_socket
+    @pytest.mark.parametrize("server_url", [True], indirect=True)
+    def test_read_only_server_rejects_uploads(self, server_url: str, capsys) -> None:  # noqa: ANN001
+        """Test that a read-only server refuses uploads without failing the client."""
+        HttpStore(server_url, token=TOKEN).put(KEY, CacheEntry(task="mypy.check", duration=3.0, created_at=1.0))
+
+        assert HttpStore(server_url).get(KEY) is None
+        assert "could not upload result" in capsys.readouterr().out
+
+    @pytest.mark.enable_socket
+    @pytest.mark.parametrize("token", [None, "guess"])
+    def test_server_rejects_uploads_without_the_write_token(self, server_url: str, token: str | None, capsys) -> None:  # noqa: ANN001
+        """Test that only clients holding the write token can store results."""
+        HttpStore(server_url, token=token).put(KEY, CacheEntry(task="mypy.check", duration=3.0, created_at=1.0))
+
+        assert HttpStore(server_url).get(KEY) is None
+        assert "401" in capsys.readouterr().out
+
+    def test_read_write_server_requires_a_write_token(self, tmp_path: Path) -> None:
+        """Test that a server accepting uploads cannot be started without a token."""
+        with pytest.raises(ValueError, match="needs a write token"):
+            CacheServer(("127.0.0.1", 0), DirectoryStore(tmp_path))
@@ -0,0 +1,133 @@
+"""Unit tests for the scheduling module."""
+
+import pytest
+from invoke import task
+from pytest_mock import MockerFixture
+
+from project.project_task_runner import ProjectTask
+from project.scheduling import (
+    critical_path_priorities,
+    dependency_closure,
+    next_ready,
+    select_within_budget,
+    simulate_makespan,
+    unmet_dependencies,
+)
+
+DURATIONS = {"format": 1.0, "lint": 2.0, "types": 10.0, "tests": 6.0, "audit": 3.0}
+
+
+def _tasks(mocker: MockerFixture, **depends_on: tuple[str, ...]) -> list[ProjectTask]:
+    """Build one ProjectTask per entry in DURATIONS with the given dependencies."""
+    return [
+        ProjectTask(name=name, func=mocker.Mock(spec=task), kwargs={}, depends_on=depends_on.get(name, ()))
+        for name in DURATIONS
+    ]
+
+
+class TestCriticalPathPriorities:
+    """Test suite for the critical_path_priorities function."""
+
+    def test_priority_includes_longest_chain_of_dependents(self, mocker: MockerFixture) -> None:
+        """Test that a short task gains the priority of the long chain waiting on it."""
+        tasks = _tasks(mocker, lint=("format",), types=("format",))
+
+        priorities = critical_path_priorities(tasks, DURATIONS.__getitem__)
+
+        assert priorities["format"] == 11.0
+        assert priorities["types"] == 10.0
+        assert priorities["audit"] == 3.0
+
+    def test_dependency_cycle_raises_value_error(self, mocker: MockerFixture) -> None:
+        """Test that cyclic dependencies are rejected."""
+        tasks = _tasks(mocker, format=("lint",), lint=("format",))
+
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            critical_path_priorities(tasks, DURATIONS.__getitem__)
+
+
+class TestNextReady:
+    """Test suite for the next_ready and unmet_dependencies functions."""
+
+    def test_ready_tasks_are_ordered_by_priority(self, mocker: MockerFixture) -> None:
+        """Test that only tasks without pending dependencies are ready, highest priority first.
+
+        Dependencies on tasks that are not being scheduled, e.g. skipped ones, count as met.
+        """
+        tasks = _tasks(mocker, lint=("format",), audit=("absent",))
+        waiting = unmet_dependencies(tasks)
+
+        assert next_ready(waiting, DURATIONS) == ["types", "tests", "audit", "format"]
+
+
+class TestSimulateMakespan:
+    """Test suite for the simulate_makespan function."""
+
+    def test_single_job_makespan_is_total_duration(self, mocker: MockerFixture) -> None:
+        """Test that running one task at a time takes the sum of the durations."""
+        assert simulate_makespan(_tasks(mocker), 1, DURATIONS.__getitem__) == sum(DURATIONS.values())
+
+    def test_parallel_makespan_follows_critical_path(self, mocker: MockerFixture) -> None:
+        """Test that the slowest chain bounds the makespan when there are enough jobs."""
+        tasks = _tasks(mocker, types=("format",))
+
+        assert simulate_makespan(tasks, 2, DURATIONS.__getitem__) == 11.0
+        assert simulate_makespan(tasks, 5, DURATIONS.__getitem__) == 11.0
+
+
+class TestSelectWithinBudget:
+    """Test suite for the select_within_budget function."""
+
+    def test_keeps_highest_priority_tasks_that_fit(self, mocker: MockerFixture) -> None:
+        """Test that lower-priority tasks are deferred when the budget runs out."""
+        tasks = _tasks(mocker)
+        for task_priority, project_task in zip((5, 5, 1, 4, 2), tasks, strict=True):
+            project_task.priority = task_priority
+
+        selected, deferred = select_within_budget(tasks, 12.0, 1, DURATIONS.__getitem__)
+
+        assert [project_task.name for project_task in selected] == ["format", "lint", "tests", "audit"]
+        assert [project_task.name for project_task in deferred] == ["types"]
+
+    def test_parallel_jobs_fit_more_tasks(self, mocker: MockerFixture) -> None:
+        """Test that the budget is compared with the predicted makespan rather than the total time."""
+        selected, deferred = select_within_budget(_tasks(mocker), 12.0, 2, DURATIONS.__getitem__)
+
+        assert len(selected) == len(DURATIONS)
+        assert deferred == []
+
+    def test_defers_tasks_whose_dependencies_are_deferred(self, mocker: MockerFixture) -> None:
+        """Test that a task is not selected without the tasks it depends on."""
+        tasks = _tasks(mocker, format=("types",))
+
+        selected, deferred = select_within_budget(tasks, 9.0, 1, DURATIONS.__getitem__)
+
+        assert [project_task.name for project_task in selected] == ["lint", "audit"]
+        assert [project_task.name for project_task in deferred] == ["format", "types", "tests"]
+
+    def test_pulls_in_a_shared_low_priority_dependency(self, mocker: MockerFixture) -> None:
+        """Test that important tasks waiting on a low-priority fixer are kept, with the fixer, when they fit."""
+        tasks = _tasks(mocker, lint=("format",), types=("format",), tests=("format",), audit=("format",))
+        for task_priority, project_task in zip((0, 5, 5, 4, 1), tasks, strict=True):
+            project_task.priority = task_priority
+
+        selected, deferred = select_within_budget(tasks, 12.0, 4, DURATIONS.__getitem__)
+
+        assert [project_task.name for project_task in selected] == list(DURATIONS)
+        assert deferred == []
+
+    def test_charges_dependencies_against_the_budget(self, mocker: MockerFixture) -> None:
+        """Test that a task is deferred when it only fits without the dependencies it needs."""
+        tasks = _tasks(mocker, lint=("types",))
+        tasks[1].priority = 5
+
+        selected, deferred = select_within_budget(tasks, 11.0, 1, DURATIONS.__getitem__)
+
+        assert [project_task.name for project_task in selected] == ["format", "tests", "audit"]
+        assert [project_task.name for project_task in deferred] == ["lint", "types"]
+
+    def test_dependency_closure_is_transitive(self, mocker: MockerFixture) -> None:
+        """Test that the closure follows dependencies of dependencies."""
+        waiting = unmet_dependencies(_tasks(mocker, tests=("types",), types=("format",)))
+
+        assert dependency_closure("tests", waiting) == {"tests", "types", "format"}
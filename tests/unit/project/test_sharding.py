@@ -0,0 +1,129 @@
+"""Unit tests for the sharding module."""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+
+from project.duration_history import DurationHistory
+from project.sharding import (
+    DEFAULT_FILE_WEIGHT,
+    discover_test_files,
+    file_weights,
+    junit_durations,
+    merge_junit_reports,
+    plan_shards,
+    record_junit_durations,
+)
+
+JUNIT_REPORT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest" tests="2" failures="1" errors="0" skipped="0" time="3.5">
+<testcase classname="tests.unit.test_a.TestA" name="test_one" time="1.5" />
+<testcase classname="tests.unit.test_a" name="test_two[1]" time="2.0" />
+</testsuite></testsuites>
+"""
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a small test tree and make it the working directory."""
+    monkeypatch.chdir(tmp_path)
+    for name in (
+        "tests/unit/test_a.py",
+        "tests/unit/sub/test_b.py",
+        "tests/unit/helpers.py",
+        "tests/integration/test_c.py",
+    ):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+    return tmp_path
+
+
+class TestSharding:
+    """Test suite for shard planning."""
+
+    def test_discover_test_files_finds_test_modules_only(self, workspace: Path) -> None:  # noqa: ARG002
+        """Test that only test_*.py files are discovered, sorted by path."""
+        files = discover_test_files(["tests/unit", "tests/integration"])
+
+        assert files == ["tests/integration/test_c.py", "tests/unit/sub/test_b.py", "tests/unit/test_a.py"]
+
+    def test_file_weights_sum_tests_and_default_unknown_files_to_median(self) -> None:
+        """Test that files are weighted by their tests and unknown files get the median weight."""
+        history = DurationHistory(
+            samples={"a.py::test_1": [1.0], "a.py::test_2": [2.0], "b.py::test_1": [5.0], "c.py::test_1": [9.0]}
+        )
+
+        weights = file_weights(["a.py", "b.py", "c.py", "new.py"], history)
+
+        assert weights == {"a.py": 3.0, "b.py": 5.0, "c.py": 9.0, "new.py": 5.0}
+
+    def test_file_weights_default_without_history(self) -> None:
+        """Test that every file gets the default weight when nothing has been recorded."""
+        assert file_weights(["a.py", "b.py"], DurationHistory()) == {
+            "a.py": DEFAULT_FILE_WEIGHT,
+            "b.py": DEFAULT_FILE_WEIGHT,
+        }
+
+    def test_plan_shards_balances_by_weight(self) -> None:
+        """Test that heavy files are spread so shard totals are balanced."""
+        shards = plan_shards({"a": 8.0, "b": 5.0, "c": 4.0, "d": 3.0, "e": 1.0}, total=2)
+
+        assert shards == [["a", "d"], ["b", "c", "e"]]
+
+    def test_plan_shards_covers_every_file_exactly_once(self) -> None:
+        """Test that every file lands in exactly one shard, even with more shards than files."""
+        shards = plan_shards({"a": 1.0, "b": 1.0}, total=3)
+
+        assert sorted(name for shard in shards for name in shard) == ["a", "b"]
+        assert len(shards) == 3
+
+    def test_plan_shards_rejects_zero_shards(self) -> None:
+        """Test that a shard count below one is rejected."""
+        with pytest.raises(ValueError, match="at least 1"):
+            plan_shards({"a": 1.0}, total=0)
+
+
+class TestJunitReports:
+    """Test suite for JUnit report handling."""
+
+    def test_junit_durations_rebuild_node_ids(self, workspace: Path) -> None:
+        """Test that JUnit class names are mapped back to pytest node ids."""
+        report = workspace / "report.xml"
+        report.write_text(JUNIT_REPORT, encoding="utf-8")
+
+        assert junit_durations(report) == {
+            "tests/unit/test_a.py::TestA::test_one": 1.5,
+            "tests/unit/test_a.py::test_two[1]": 2.0,
+        }
+
+    def test_record_junit_durations_updates_history(self, workspace: Path) -> None:
+        """Test that recorded durations are added to the history per node id."""
+        report = workspace / "report.xml"
+        report.write_text(JUNIT_REPORT, encoding="utf-8")
+        history = DurationHistory(workspace / "durations.json")
+
+        record_junit_durations([report], history)
+
+        assert history.estimate("tests/unit/test_a.py::TestA::test_one") == 1.5
+
+    def test_merge_junit_reports_combines_suites_and_totals(self, tmp_path: Path) -> None:
+        """Test that shard reports are merged into one document with summed totals."""
+        first = tmp_path / "first.xml"
+        first.write_text(JUNIT_REPORT, encoding="utf-8")
+        second = tmp_path / "second.xml"
+        second.write_text(
+            '<testsuite name="pytest" tests="1" failures="0" errors="0" skipped="1" time="0.5">'
+            '<testcase classname="x" name="y" time="0.5" /></testsuite>',
+            encoding="utf-8",
+        )
+
+        output = merge_junit_reports([first, second], tmp_path / "out" / "junit.xml")
+
+        root = ET.parse(output).getroot()  # noqa: S314
+        assert root.tag == "testsuites"
+        assert len(root.findall("testsuite")) == 2
+        assert root.get("tests") == "3"
+        assert root.get("failures") == "1"
+        assert root.get("skipped") == "1"
+        assert root.get("time") == "4.000"
@@ -0,0 +1,142 @@
+"""Unit tests for the tool_probes module."""
+
+import importlib.metadata
+import json
+import shlex
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke.context import Context
+from invoke.exceptions import Exit
+from pytest_mock import MockerFixture
+
+from project.tool_probes import (
+    PACKAGE_PROBES,
+    UNAVAILABLE,
+    ToolProbe,
+    missing_tools,
+    probe_environment,
+    probe_key,
+    probe_versions,
+    require_tools,
+)
+
+
+@pytest.fixture
+def on_path(mocker: MockerFixture) -> None:
+    """Make every executable appear on PATH except npx."""
+    mocker.patch("project.tool_probes.shutil.which", side_effect=lambda name: None if name == "npx" else name)
+
+
+class TestProbeEnvironment:
+    """Test suite for probing and caching tool versions."""
+
+    @pytest.fixture(autouse=True)
+    def installed_packages(self, mocker: MockerFixture) -> None:
+        """Make every Python tool appear installed in invoke's environment."""
+        mocker.patch("project.tool_probes.importlib.metadata.version", return_value="1.0")
+
+    @pytest.mark.usefixtures("on_path")
+    def test_probes_commands_and_packages(self, tmp_path: Path) -> None:
+        """Test that missing executables and failing commands are unavailable and versions are recorded."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [
+            Mock(ok=True, stdout="27.3.1\n"),
+            Mock(ok=True, stdout="Poetry (version 2.1.1)\n"),
+            Mock(ok=False, stdout=""),
+        ]
+
+        probes = probe_environment(mock_context, root=tmp_path)
+
+        assert probes["docker"] == ToolProbe(name="docker", available=True, version="27.3.1")
+        assert probes["npx"] == ToolProbe(name="npx", available=False)
+        assert probes["poetry"].version == "Poetry (version 2.1.1)"
+        assert not probes["trivy-image"].available
+        assert probes["pytest"].available
+        assert mock_context.run.call_count == 3
+
+    @pytest.mark.usefixtures("on_path")
+    def test_probes_are_reused_until_refreshed(self, tmp_path: Path) -> None:
+        """Test that cached probes avoid re-running version commands in the same session."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(ok=True, stdout="1.0\n")
+
+        first = probe_environment(mock_context, root=tmp_path)
+        second = probe_environment(mock_context, root=tmp_path)
+        probe_environment(mock_context, root=tmp_path, refresh=True)
+
+        assert first == second
+        assert mock_context.run.call_count == 6
+
+    def test_unavailable_tools_are_probed_again_on_every_run(self, tmp_path: Path, mocker: MockerFixture) -> None:
+        """Test that only available tools are cached, so a tool installed since the last run is found."""
+        which = mocker.patch(
+            "project.tool_probes.shutil.which", side_effect=lambda name: None if name == "npx" else name
+        )
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(ok=True, stdout="1.0\n")
+
+        assert not probe_environment(mock_context, root=tmp_path)["npx"].available
+        which.side_effect = lambda name: name
+        probes = probe_environment(mock_context, root=tmp_path)
+
+        assert probes["npx"] == ToolProbe(name="npx", available=True, version="1.0")
+        assert mock_context.run.call_count == 4
+
+    @pytest.mark.usefixtures("on_path")
+    def test_packages_missing_from_invokes_environment_are_read_from_poetry(
+        self, tmp_path: Path, mocker: MockerFixture
+    ) -> None:
+        """Test that tools invoke cannot import, e.g. when it runs from pipx, are probed through poetry run."""
+        mocker.patch(
+            "project.tool_probes.importlib.metadata.version",
+            side_effect=importlib.metadata.PackageNotFoundError("absent"),
+        )
+        mock_context = Mock(spec_set=Context)
+        versions = dict.fromkeys(PACKAGE_PROBES, "1.0") | {"xenon": None}
+        mock_context.run.side_effect = lambda command, **_: (
+            Mock(ok=True, stdout=json.dumps(versions))
+            if command.startswith("poetry run python")
+            else Mock(ok=True, stdout="1.0\n")
+        )
+
+        probes = probe_environment(mock_context, root=tmp_path)
+
+        assert probes["mypy"] == ToolProbe(name="mypy", available=True, version="1.0")
+        assert not probes["xenon"].available
+        poetry_runs = [call for call in mock_context.run.call_args_list if "poetry run" in call.args[0]]
+        assert len(poetry_runs) == 1
+        assert shlex.split(poetry_runs[0].args[0])[5:] == list(PACKAGE_PROBES)
+
+    def test_key_changes_with_path_and_lock_file(self, tmp_path: Path) -> None:
+        """Test that probes are cached separately per PATH and lock file."""
+        lock_file = tmp_path / "poetry.lock"
+        lock_file.write_text("locked", encoding="utf-8")
+        key = probe_key("/usr/bin", lock_file)
+
+        assert probe_key("/opt/bin", lock_file) != key
+        lock_file.write_text("updated", encoding="utf-8")
+        assert probe_key("/usr/bin", lock_file) != key
+
+
+class TestPreflight:
+    """Test suite for the preflight helpers."""
+
+    PROBES = {  # noqa: RUF012
+        "docker": ToolProbe(name="docker", available=False),
+        "ruff": ToolProbe(name="ruff", available=True, version="0.9.0"),
+    }
+
+    def test_missing_tools_ignores_unprobed_tools(self) -> None:
+        """Test that only probed and unavailable tools are reported missing."""
+        assert missing_tools(("docker", "ruff", "make"), self.PROBES) == ["docker"]
+        assert probe_versions(self.PROBES) == {"docker": UNAVAILABLE, "ruff": "0.9.0"}
+
+    def test_require_tools_exits_when_a_tool_is_unavailable(self, mocker: MockerFixture) -> None:
+        """Test that tasks fail fast with a hint instead of failing halfway through."""
+        mocker.patch("project.tool_probes.probe_environment", return_value=self.PROBES)
+
+        require_tools(Mock(spec_set=Context), "ruff")
+        with pytest.raises(Exit, match="docker"):
+            require_tools(Mock(spec_set=Context), "docker", "ruff")
@@ -0,0 +1,58 @@
+"""Unit tests for the trace_timeline module."""
+
+import json
+import threading
+from pathlib import Path
+
+from project.trace_timeline import TraceRecorder, active_recorder, recording
+
+
+def _events(trace: dict, phase: str) -> list[dict]:
+    """Return the trace events of one phase, e.g. ``X`` for spans or ``M`` for track names."""
+    return [event for event in trace["traceEvents"] if event["ph"] == phase]
+
+
+def _traced_run(path: Path) -> dict:
+    """Trace a task on the main thread while a worker thread runs a task with a command inside it."""
+    recorder = TraceRecorder(path)
+
+    def work() -> None:
+        with recorder.span("pipaudit.check", "task"):
+            start = recorder.now()
+            recorder.add_span("pip-audit", "command", start, recorder.now(), {"exited": 0})
+
+    with recorder.span("ruff.lint", "task"):
+        worker = threading.Thread(target=work)
+        worker.start()
+        worker.join()
+    return json.loads(recorder.write().read_text(encoding="utf-8"))
+
+
+class TestTraceRecorder:
+    """Test suite for the TraceRecorder class."""
+
+    def test_each_thread_gets_a_named_track(self, tmp_path: Path) -> None:
+        """Test that spans from a worker thread are put on their own track."""
+        trace = _traced_run(tmp_path / "trace.json")
+
+        tracks = {event["args"]["name"]: event["tid"] for event in _events(trace, "M")}
+        spans = {event["name"]: event["tid"] for event in _events(trace, "X")}
+        assert tracks == {"worker-0": 0, "main": 1}
+        assert spans == {"pip-audit": 0, "pipaudit.check": 0, "ruff.lint": 1}
+
+    def test_command_spans_nest_inside_their_task(self, tmp_path: Path) -> None:
+        """Test that a command span lies within the span of the task that ran it."""
+        spans = {event["name"]: event for event in _events(_traced_run(tmp_path / "trace.json"), "X")}
+
+        task, command = spans["pipaudit.check"], spans["pip-audit"]
+        assert task["ts"] <= command["ts"]
+        assert command["ts"] + command["dur"] <= task["ts"] + task["dur"] + 1
+        assert command["args"] == {"exited": 0}
+
+    def test_recording_activates_recorder_for_a_block(self) -> None:
+        """Test that the recorder is only active inside the block."""
+        recorder = TraceRecorder()
+
+        with recording(recorder):
+            assert active_recorder() is recorder
+        assert active_recorder() is None
@@ -0,0 +1,149 @@
+"""Unit tests for the utils module."""
+
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from invoke.context import Context
+from pytest_mock import MockerFixture
+
+from project.utils import (
+    IndexedFile,
+    WorkspaceIndex,
+    build_workspace_index,
+    git_blob_hash,
+    merge_base,
+    workspace_index,
+)
+
+STAGED = (
+    "100644 1111111111111111111111111111111111111111 0\tREADME.md\0"
+    "100644 5555555555555555555555555555555555555555 0\tcafé.py\0"
+    "100755 2222222222222222222222222222222222222222 0\tproject/tasks/run.sh\0"
+    "100644 3333333333333333333333333333333333333333 0\tproject/utils.py\0"
+    "100644 4444444444444444444444444444444444444444 0\tremoved.py\0"
+)
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Create a workspace with one modified tracked file and one untracked file."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "project").mkdir()
+    (tmp_path / "project" / "utils.py").write_text("changed = True\n", encoding="utf-8")
+    (tmp_path / "new.py").write_text("new = True\n", encoding="utf-8")
+    (tmp_path / "new file.py").write_text("spaced = True\n", encoding="utf-8")
+    return tmp_path
+
+
+def _context(changed: str) -> Mock:
+    """Build a context whose git commands report the staged files and the given NUL-separated changed files."""
+    mock_context = Mock(spec_set=Context)
+    mock_context.run.side_effect = [Mock(stdout=STAGED), Mock(stdout=changed)]
+    return mock_context
+
+
+class TestBuildWorkspaceIndex:
+    """Test suite for the build_workspace_index function."""
+
+    def test_index_combines_git_index_with_changed_and_untracked_files(self, workspace: Path) -> None:
+        """Test that changed files are rehashed, untracked files added and deleted files dropped."""
+        mock_context = _context("project/utils.py\0new.py\0new file.py\0removed.py\0")
+
+        index = build_workspace_index(mock_context)
+
+        assert [indexed.path for indexed in index.files] == [
+            "README.md",
+            "café.py",
+            "new file.py",
+            "new.py",
+            "project/tasks/run.sh",
+            "project/utils.py",
+        ]
+        assert all("-z" in call.args[0].split() for call in mock_context.run.call_args_list)
+        files = {indexed.path: indexed for indexed in index.files}
+        assert files["README.md"].blob == "1" * 40
+        assert files["café.py"].blob == "5" * 40
+        assert files["project/utils.py"] == IndexedFile(
+            path="project/utils.py",
+            blob=git_blob_hash(workspace / "project" / "utils.py"),
+            mode="100644",
+        )
+        assert files["new.py"].mode == "100644"
+
+    def test_git_blob_hash_matches_git(self, tmp_path: Path) -> None:
+        """Test that blob hashes use git's object format."""
+        (tmp_path / "hello.txt").write_bytes(b"hello\n")
+
+        assert git_blob_hash(tmp_path / "hello.txt") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+    @pytest.mark.usefixtures("workspace")
+    def test_workspace_index_is_built_once_unless_refreshed(self, mocker: MockerFixture) -> None:
+        """Test that the index is reused across calls in the same directory."""
+        mock_build = mocker.patch("project.utils.build_workspace_index")
+        mocker.patch("project.utils._workspace_indexes", {})
+        mock_context = Mock(spec_set=Context)
+
+        first = workspace_index(mock_context)
+        second = workspace_index(mock_context)
+        workspace_index(mock_context, refresh=True)
+
+        assert first is second
+        assert mock_build.call_count == 2
+
+
+class TestMergeBase:
+    """Test suite for the merge_base function."""
+
+    def test_merge_base_quotes_the_ref(self) -> None:
+        """Test that the base ref is passed to git as one argument and the commit is returned."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(stdout="abc123\n")
+
+        assert merge_base(mock_context, "origin/main; true") == "abc123"
+        mock_context.run.assert_called_once_with("git merge-base 'origin/main; true' HEAD", hide=True)
+
+    def test_merge_base_requires_a_common_commit(self) -> None:
+        """Test that unrelated histories are reported rather than diffed against nothing."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(stdout="")
+
+        with pytest.raises(ValueError, match="No merge-base"):
+            merge_base(mock_context, "orphan")
+
+
+class TestWorkspaceIndex:
+    """Test suite for the WorkspaceIndex class."""
+
+    @pytest.mark.usefixtures("workspace")
+    def test_paths_filter_by_type_and_exclude_patterns(self) -> None:
+        """Test that paths can be narrowed to a file type and fnmatch exclusions."""
+        index = build_workspace_index(_context("new.py\0"))
+
+        assert index.paths() == [
+            "README.md",
+            "café.py",
+            "new.py",
+            "project/tasks/run.sh",
+            "project/utils.py",
+            "removed.py",
+        ]
+        assert index.paths("python") == ["café.py", "new.py", "project/utils.py", "removed.py"]
+        assert index.paths("python", exclude=["project/*", "new.py", "café.py"]) == ["removed.py"]
+        assert index.paths("shell") == ["project/tasks/run.sh"]
+
+    def test_digest_changes_with_file_content(self) -> None:
+        """Test that the digest covers blob hashes."""
+        before = WorkspaceIndex(files=(IndexedFile(path="a.py", blob="1" * 40, mode="100644"),))
+        after = WorkspaceIndex(files=(IndexedFile(path="a.py", blob="2" * 40, mode="100644"),))
+
+        assert before.digest() != after.digest()
+
+    def test_unindexed_directories_lists_directories_without_indexed_files(self, workspace: Path) -> None:
+        """Test that tool output and virtualenv directories are reported for skipping."""
+        (workspace / ".venv").mkdir()
+        (workspace / ".quality").mkdir()
+
+        index = build_workspace_index(_context(""))
+
+        assert index.unindexed_directories(workspace) == [".quality", ".venv"]
@@ -0,0 +1,164 @@
+"""Unit tests for the worktree_pool module."""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock, call
+
+import pytest
+from invoke.context import Context
+from invoke.exceptions import Exit
+
+from project.worktree_pool import (
+    RefCheck,
+    WorktreePool,
+    check_command,
+    check_in_pool,
+    log_path,
+    resolve_refs,
+    summary_lines,
+)
+
+
+class TestResolveRefs:
+    """Test suite for resolving refs before checking them."""
+
+    def test_resolves_each_ref_to_a_commit(self) -> None:
+        """Test that refs map to the commits git resolves them to."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [Mock(ok=True, stdout="aaa\n"), Mock(ok=True, stdout="bbb\n")]
+
+        assert resolve_refs(mock_context, ["main", "release/1.0"]) == {"main": "aaa", "release/1.0": "bbb"}
+        mock_context.run.assert_any_call("git rev-parse --verify --quiet 'main^{commit}'", hide=True, warn=True)
+
+    def test_unknown_ref_fails_before_checking(self) -> None:
+        """Test that an unknown ref stops the run."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(ok=False, stdout="")
+
+        with pytest.raises(Exit, match="Unknown git ref: typo"):
+            resolve_refs(mock_context, ["typo"])
+
+
+class TestWorktreePool:
+    """Test suite for handing out pooled worktrees."""
+
+    def test_creates_missing_slots_and_reuses_existing_ones(self, tmp_path: Path) -> None:
+        """Test that a new slot is added as a worktree and an existing one is switched and cleaned."""
+        mock_context = Mock(spec_set=Context)
+        pool = WorktreePool(mock_context, size=1, root=tmp_path)
+        slot = tmp_path / "slot-0"
+
+        with pool.checkout("aaa") as worktree:
+            assert worktree == slot
+        slot.mkdir()
+        (slot / ".git").touch()
+        with pool.checkout("bbb") as worktree:
+            assert worktree == slot
+
+        assert mock_context.run.call_args_list == [
+            call("git worktree prune", hide=True, in_stream=False),
+            call(f"git worktree add --detach --no-checkout --force {slot} aaa", hide=True, in_stream=False),
+            call(f"git -C {slot} checkout --quiet --detach --force aaa", hide=True, in_stream=False),
+            call(f"git -C {slot} clean -fd --quiet", hide=True, in_stream=False),
+            call(f"git -C {slot} checkout --quiet --detach --force bbb", hide=True, in_stream=False),
+            call(f"git -C {slot} clean -fd --quiet", hide=True, in_stream=False),
+        ]
+
+    def test_worktree_administration_is_serialised(self, tmp_path: Path) -> None:
+        """Test that concurrent checkouts never prune or add worktrees at the same time."""
+        active = 0
+        most_active = 0
+        lock = threading.Lock()
+
+        def run(command: str, **_: object) -> None:
+            nonlocal active, most_active
+            if " worktree " not in command:
+                return
+            with lock:
+                active += 1
+                most_active = max(most_active, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = run
+        pool = WorktreePool(mock_context, size=3, root=tmp_path)
+
+        def check_out(commit: str) -> None:
+            with pool.checkout(commit):
+                time.sleep(0.01)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(check_out, ["aaa", "bbb", "ccc"]))
+
+        assert most_active == 1
+        assert mock_context.run.call_count == 12
+
+    def test_slot_is_returned_when_checkout_fails(self, tmp_path: Path) -> None:
+        """Test that a failed checkout does not shrink the pool."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.side_effect = [RuntimeError("git failed"), None, None, None, None]
+        pool = WorktreePool(mock_context, size=1, root=tmp_path)
+
+        with pytest.raises(RuntimeError, match="git failed"), pool.checkout("aaa"):
+            pass
+        with pool.checkout("aaa") as worktree:
+            assert worktree == tmp_path / "slot-0"
+
+
+class TestCheckInPool:
+    """Test suite for checking refs concurrently."""
+
+    def test_checks_each_ref_and_writes_its_log(self, tmp_path: Path) -> None:
+        """Test that every ref is checked in a worktree against the current environment."""
+        mock_context = Mock(spec_set=Context)
+        mock_context.run.return_value = Mock(ok=True, stdout="checked\n", stderr="warning\n")
+        pool = WorktreePool(mock_context, size=2, root=tmp_path)
+
+        results = check_in_pool(pool, {"main": "aaa", "feature/x": "bbb"}, "invoke project.check", jobs=2)
+
+        assert [(result.ref, result.commit, result.ok) for result in results] == [
+            ("main", "aaa", True),
+            ("feature/x", "bbb", True),
+        ]
+        assert (tmp_path / "logs" / "main.log").read_text(encoding="utf-8") == "checked\nwarning\n"
+        assert (tmp_path / "logs" / "feature-x.log").is_file()
+        check_calls = [entry for entry in mock_context.run.call_args_list if entry.args[0].startswith("cd ")]
+        assert len(check_calls) == 2
+        assert check_calls[0].kwargs["env"]["VIRTUAL_ENV"] == sys.prefix
+        assert check_calls[0].kwargs["env"]["PYTHONPATH"].endswith("/src")
+
+    def test_check_command_shares_the_result_cache(self) -> None:
+        """Test that every worktree's check uses the shared result cache tier."""
+        command = check_command({"preset": "quick", "skip": ["trivy.check"]}, Path("/repo/.quality/cache/refs"))
+
+        assert command.endswith(
+            "-m invoke project.check --preset quick --skip trivy.check --cache-remote /repo/.quality/cache/refs"
+        )
+
+
+class TestSummary:
+    """Test suite for reporting the outcome of every ref."""
+
+    def test_log_path_is_a_slug_of_the_ref(self) -> None:
+        """Test that refs with slashes map to flat log file names."""
+        assert log_path("feature/new thing", ".quality/worktrees") == Path(
+            ".quality/worktrees/logs/feature-new-thing.log"
+        )
+
+    def test_summary_lines(self) -> None:
+        """Test that each ref is listed with its commit, duration and log, then the totals."""
+        checks = [
+            RefCheck(ref="main", commit="a" * 40, ok=True, seconds=12.34, log=Path("logs/main.log")),
+            RefCheck(ref="release/1.0", commit="b" * 40, ok=False, seconds=3.0, log=Path("logs/release-1.0.log")),
+        ]
+
+        assert summary_lines(checks) == [
+            "✓ main         aaaaaaaaaa     12.3s  logs/main.log",
+            "✗ release/1.0  bbbbbbbbbb      3.0s  logs/release-1.0.log",
+            "1 of 2 ref(s) passed",
+        ]